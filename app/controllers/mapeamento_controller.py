@@ -2,6 +2,7 @@
 
 import json
 import os
+import tempfile
 from urllib.parse import quote
 
 from qgis.PyQt.QtCore import QObject, QTimer, pyqtSignal
@@ -9,6 +10,8 @@ from qgis.core import QgsApplication, QgsVectorLayer, QgsMessageLog, Qgis
 
 from ...infra.config.settings import PLUGIN_NAME
 from ...infra.http.client import HttpClient
+from ...infra.http.decoder import ResponseDecoder
+from ...infra.tasks.worker_pool import WorkerPool
 from ...app.state.store import AppState
 
 
@@ -21,7 +24,7 @@ class MapeamentoController(QObject):
     # gpkg_path, mapeamento_id, meta — download consolidado read-only
     zonal_upload_completed = pyqtSignal(str, int)    # gpkg_path, zonal_id
     versions_loaded = pyqtSignal(int, dict)          # zonal_id, versions_data
-    compare_fgb_ready = pyqtSignal(int, str, bytes)  # zonal_id, batch_uuid, fgb_bytes
+    compare_fgb_ready = pyqtSignal(int, str, str)    # zonal_id, batch_uuid, gpkg_path
     upload_progress = pyqtSignal(dict)               # UploadBatchStatus dict
     conflict_detected = pyqtSignal(str)              # batchUuid
     conflict_data_ready = pyqtSignal(str, bytes)     # batchUuid, response body
@@ -30,14 +33,25 @@ class MapeamentoController(QObject):
     overlay_data_ready = pyqtSignal(int, dict)        # zonal_id, overlay_data
     notifications_loaded = pyqtSignal(list)           # List[dict] notificações
     pareceres_loaded = pyqtSignal(int, list)          # mapeamento_id, List[dict] pareceres
+    index_extraction_completed = pyqtSignal(bool, str, str)  # ok, msg, indices_path
 
     def __init__(self, state: AppState, http_client: HttpClient,
-                 config_repo, token_provider=None, parent=None):
+                 config_repo, token_provider=None, decoder=None,
+                 gpkg_inspector=None, parent=None):
         super().__init__(parent)
         self._state = state
         self._http = http_client
         self._config = config_repo
         self._token_provider = token_provider
+        # Parse de bodies grandes (catalogo, overlay, tilesMetodos) fora da main thread
+        self._decoder = decoder or ResponseDecoder()
+        # Leituras de GPKG/sidecar locais fora da main thread
+        if gpkg_inspector is None:
+            from ...domain.services.gpkg_inspector import GpkgInspector
+            gpkg_inspector = GpkgInspector(
+                WorkerPool(max_workers=2, name="satirriga-gpkg"), self,
+            )
+        self._gpkg_inspector = gpkg_inspector
 
         # Timer de renovação de editToken (verifica a cada 1h)
         self._renew_timer = QTimer(self)
@@ -66,12 +80,18 @@ class MapeamentoController(QObject):
         self._pending_reprocess_zonal_id = None
         self._pending_finalizar_zonal_request_id = None
         self._pending_finalizar_zonal_id = None
-        self._pending_poll_ids = {}      # request_id -> zonal_id
         self._pending_status_oneshot_ids = {}  # request_id -> zonal_id (leitura pontual)
-        self._polling_zonals = {}        # zonal_id -> {"request_id": None, "errors": 0}
+        # Geracao por endpoint: cada submit incrementa; resultados decodificados
+        # de geracoes anteriores (worker thread atrasado) sao descartados
+        self._generations = {}
+        # Polling de status em lote (GET /zonal/status?ids=...) com fallback individual
+        from ...domain.services.zonal_status_service import ZonalStatusPoller
+        self._status_poller = ZonalStatusPoller(http_client, config_repo)
+        # Single-shot reagendado para o proximo zonal vencido (agenda adaptativa)
         self._poll_timer = QTimer(self)
-        self._poll_timer.setInterval(1000)
+        self._poll_timer.setSingleShot(True)
         self._poll_timer.timeout.connect(self._poll_active_zonals)
+        self._poll_pause_reasons = set()  # ex.: {"dock_hidden", "app_inactive"}
         self._pending_overlay_ids = {}   # request_id -> zonal_id
         self._pending_versions_ids = {}   # request_id -> zonal_id
         self._pending_compare_ids = {}    # request_id -> (zonal_id, batch_uuid)
@@ -86,6 +106,8 @@ class MapeamentoController(QObject):
         # Conecta signals do HttpClient
         self._http.request_finished.connect(self._on_request_finished)
         self._http.request_error.connect(self._on_request_error)
+        self._http.request_failed.connect(self._on_request_failed)
+        self._http.download_finished.connect(self._on_download_finished)
 
     def _api_url(self, path):
         base = self._config.get("api_base_url").rstrip("/")
@@ -96,6 +118,11 @@ class MapeamentoController(QObject):
         from ...domain.services.gpkg_service import gpkg_base_dir
         return gpkg_base_dir(self._config.get("gpkg_base_dir"))
 
+    @property
+    def gpkg_inspector(self):
+        """``GpkgInspector`` compartilhado (leituras de disco em worker threads)."""
+        return self._gpkg_inspector
+
     # ----------------------------------------------------------------
     # Catalogo Zonal (V2)
     # ----------------------------------------------------------------
@@ -124,6 +151,7 @@ class MapeamentoController(QObject):
             params += f"&direction={quote(direction)}"
         url = self._api_url(f"/zonal/catalogo?{params}")
         self._state.set_loading("catalogo", True)
+        self._next_generation("catalogo")
         self._pending_catalogo_id = self._http.get(url)
 
     def load_notifications(self, size=10):
@@ -169,6 +197,7 @@ class MapeamentoController(QObject):
             params += f"&descricao={quote(descricao)}"
         url = self._api_url(f"/zonal/catalogo?{params}")
         self._state.set_loading("catalogo_homologacao", True)
+        self._next_generation("catalogo_homologacao")
         self._pending_catalogo_homologacao_id = self._http.get(url)
 
     def load_upload_history(self, page=1, size=20, status="", mapeamento_id=""):
@@ -183,6 +212,7 @@ class MapeamentoController(QObject):
             params += f"&mapeamentoId={quote(mapeamento_id)}"
         url = self._api_url(f"/zonal/upload/history?{params}")
         self._state.set_loading("upload_history", True)
+        self._next_generation("upload_history")
         self._pending_upload_history_id = self._http.get(url)
 
     def fetch_overlay_data(self, zonal_id):
@@ -206,7 +236,12 @@ class MapeamentoController(QObject):
         if not self._state.is_authenticated:
             return
         url = self._api_url(f"/zonal/{zonal_id}/compare?batchUuid={quote(str(batch_uuid))}")
-        req_id = self._http.get(url)
+        # GPKG gravado direto em disco (streaming) — o widget assume o arquivo
+        fd, dest_path = tempfile.mkstemp(
+            suffix=f"_{str(batch_uuid)[:8]}.gpkg", prefix="compare_",
+        )
+        os.close(fd)
+        req_id = self._http.download_to_file(url, dest_path)
         self._pending_compare_ids[req_id] = (zonal_id, batch_uuid)
 
     def emitir_parecer(self, zonal_id, decisao, motivo=""):
@@ -284,43 +319,78 @@ class MapeamentoController(QObject):
 
     def start_polling_zonal(self, zonal_id):
         """Inicia polling de status para um zonal em reprocessamento."""
-        if zonal_id not in self._polling_zonals:
-            self._polling_zonals[zonal_id] = {"request_id": None, "errors": 0}
-        if not self._poll_timer.isActive():
-            self._poll_timer.start()
+        self._status_poller.start(zonal_id)
+        self._schedule_poll()
 
     def stop_polling_zonal(self, zonal_id):
         """Para polling de um zonal específico."""
-        self._polling_zonals.pop(zonal_id, None)
-        # Remove request pendente associada
-        stale = [rid for rid, zid in self._pending_poll_ids.items() if zid == zonal_id]
-        for rid in stale:
-            self._pending_poll_ids.pop(rid, None)
-        if not self._polling_zonals and self._poll_timer.isActive():
-            self._poll_timer.stop()
+        self._status_poller.stop(zonal_id)
+        self._schedule_poll()
 
     def is_polling(self, zonal_id):
         """Retorna True se o zonal está sendo monitorado."""
-        return zonal_id in self._polling_zonals
+        return self._status_poller.is_polling(zonal_id)
 
     def _poll_active_zonals(self):
-        """Slot do QTimer: dispara GET /api/zonal/:id/status para cada zonal ativo."""
-        if not self._state.is_authenticated:
+        """Slot do QTimer: consulta o status de todos os zonais ativos (em lote)."""
+        if self._state.is_authenticated:
+            self._status_poller.poll()
+        self._schedule_poll()
+
+    def _schedule_poll(self):
+        """(Re)agenda o timer para o próximo zonal vencido.
+
+        Sem zonais ociosos (todos com request em voo) o timer fica parado —
+        a chegada da resposta reagenda.
+        """
+        if self._poll_pause_reasons or not self._status_poller.has_watched:
+            self._poll_timer.stop()
+            return
+        delay_ms = self._status_poller.next_due_in_ms()
+        if delay_ms is None:
+            self._poll_timer.stop()
             return
-        for zonal_id, entry in list(self._polling_zonals.items()):
-            if entry["request_id"] is not None:
-                continue  # request em voo, aguardar resposta
-            url = self._api_url(f"/zonal/{zonal_id}/status")
-            request_id = self._http.get(url)
-            entry["request_id"] = request_id
-            self._pending_poll_ids[request_id] = zonal_id
+        self._poll_timer.start(max(delay_ms, 100))
+
+    def set_polling_paused(self, reason, paused):
+        """Pausa/retoma o polling de status (dock oculto, QGIS em segundo plano).
+
+        Zonais vencidos durante a pausa são consultados ao retomar.
+        """
+        if paused:
+            self._poll_pause_reasons.add(reason)
+        else:
+            self._poll_pause_reasons.discard(reason)
+        self._schedule_poll()
+
+    def _apply_poll_results(self, updates, stopped):
+        """Repassa status recebidos à UI e trata zonais que saíram do polling."""
+        for zid, zonal_status in updates:
+            self._state.zonal_status_polled.emit(zid, zonal_status)
+        final_status = dict(updates)
+        for zid, reason in stopped:
+            if reason == "terminal":
+                QgsMessageLog.logMessage(
+                    f"[Poll] Zonal {zid} finalizou reprocessamento: "
+                    f"{final_status.get(zid, '')}",
+                    PLUGIN_NAME, Qgis.Info,
+                )
+            else:
+                self._state.set_error(
+                    "reprocess",
+                    f"Polling do zonal {zid} falhou 5 vezes consecutivas."
+                )
+                QgsMessageLog.logMessage(
+                    f"[Poll] Zonal {zid}: 5 erros consecutivos, polling encerrado",
+                    PLUGIN_NAME, Qgis.Warning,
+                )
+        self._schedule_poll()
 
     def cleanup_polling(self):
         """Para todo polling. Chamado no unload do plugin."""
         if self._poll_timer.isActive():
             self._poll_timer.stop()
-        self._polling_zonals.clear()
-        self._pending_poll_ids.clear()
+        self._status_poller.clear()
 
     # ----------------------------------------------------------------
     # Finalizar zonal (enviar para homologação)
@@ -342,41 +412,27 @@ class MapeamentoController(QObject):
     # ----------------------------------------------------------------
 
     def _check_token_renewal(self):
-        """Verifica sidecars locais e renova tokens com menos de 24h de validade."""
-        from datetime import datetime, timezone
-        from ...domain.services.gpkg_service import (
-            gpkg_base_dir, read_sidecar, list_local_gpkgs,
-        )
+        """Verifica sidecars locais e renova tokens com menos de 24h de validade.
 
-        if not self._state.is_authenticated or not self._token_provider:
-            return
+        A varredura (catalogo + sidecars) roda no ``GpkgInspector``; as
+        renovacoes sao disparadas na main thread com o resultado.
+        """
+        from ...domain.services.gpkg_inspector import expiring_edit_tokens
 
-        base = gpkg_base_dir(self._config.get("gpkg_base_dir"))
-        if not os.path.isdir(base):
+        if not self._state.is_authenticated or not self._token_provider:
             return
 
-        now = datetime.now(timezone.utc)
-        threshold_hours = 24
+        base = self.get_gpkg_base_dir()
+        self._gpkg_inspector.run(
+            "token_renewal", base, expiring_edit_tokens, base,
+            on_done=self._on_expiring_edit_tokens,
+        )
 
-        for entry in list_local_gpkgs(base):
-            if entry.get("type") != "v2":
-                continue
-            gpkg = entry["path"]
-            try:
-                sidecar = read_sidecar(gpkg)
-                expires_at = sidecar.get("expiresAt")
-                edit_token = sidecar.get("editToken")
-                zonal_id = sidecar.get("zonalId")
-                if not expires_at or not edit_token or not zonal_id:
-                    continue
-                exp_dt = datetime.fromisoformat(
-                    expires_at.replace("Z", "+00:00")
-                )
-                remaining = (exp_dt - now).total_seconds() / 3600
-                if 0 < remaining < threshold_hours:
-                    self._renew_edit_token(zonal_id, edit_token, gpkg_path=gpkg)
-            except (ValueError, TypeError, OSError):
-                continue
+    def _on_expiring_edit_tokens(self, candidates):
+        if not self._state.is_authenticated:
+            return
+        for zonal_id, edit_token, gpkg in candidates:
+            self._renew_edit_token(zonal_id, edit_token, gpkg_path=gpkg)
 
     def _renew_edit_token(self, zonal_id, edit_token, gpkg_path=None):
         """Envia POST /api/zonal/:id/renew-token."""
@@ -400,6 +456,7 @@ class MapeamentoController(QObject):
             "metodo_apply": metodo_apply,
             "gpkg_path": gpkg_path,
         }
+        self._next_generation("raster")
         self._pending_raster_id = self._http.get(url)
 
     def load_mascara(self, mapeamento_id):
@@ -427,58 +484,34 @@ class MapeamentoController(QObject):
     # Request handlers
     # ----------------------------------------------------------------
 
+    def _next_generation(self, endpoint):
+        generation = self._generations.get(endpoint, 0) + 1
+        self._generations[endpoint] = generation
+        return generation
+
+    def _is_stale(self, endpoint, generation):
+        return generation != self._generations.get(endpoint, 0)
+
     def _on_request_finished(self, request_id, status_code, body):
         if request_id == self._pending_catalogo_id:
             self._pending_catalogo_id = None
-            self._state.set_loading("catalogo", False)
-            try:
-                from ...domain.models.zonal import CatalogoItem
-                data = json.loads(body)
-                if isinstance(data, list):
-                    items_raw = data
-                    pagination = {}
-                else:
-                    items_raw = data.get("data") or data.get("content") or []
-                    pagination = data.get("pagination") or {}
-                items = [CatalogoItem.from_dict(item) for item in items_raw]
-                self._state.catalogo_items = (items, pagination)
-                QgsMessageLog.logMessage(
-                    f"[Catalogo] {len(items)} zonais carregados"
-                    f" (pag {pagination.get('page', '?')}/{pagination.get('totalPages', '?')})",
-                    PLUGIN_NAME, Qgis.Info,
-                )
-            except Exception as e:
-                QgsMessageLog.logMessage(
-                    f"Erro ao parsear catalogo: {e}\nBody: {body[:500]}",
-                    PLUGIN_NAME, Qgis.Warning,
-                )
-                self._state.set_error("catalogo", f"Erro ao processar catalogo: {e}")
+            gen = self._generations.get("catalogo", 0)
+            from ...domain.services.response_parsers import parse_catalogo_page
+            self._decoder.decode(
+                body, parse_catalogo_page,
+                lambda result: self._on_catalogo_decoded(result, gen),
+                lambda err: self._on_catalogo_decode_failed(err, body, gen),
+            )
 
         elif request_id == self._pending_catalogo_homologacao_id:
             self._pending_catalogo_homologacao_id = None
-            self._state.set_loading("catalogo_homologacao", False)
-            try:
-                from ...domain.models.zonal import CatalogoItem
-                data = json.loads(body)
-                if isinstance(data, list):
-                    items_raw = data
-                    pagination = {}
-                else:
-                    items_raw = data.get("data") or data.get("content") or []
-                    pagination = data.get("pagination") or {}
-                items = [CatalogoItem.from_dict(item) for item in items_raw]
-                self._state.catalogo_homologacao_changed.emit(items, pagination)
-                QgsMessageLog.logMessage(
-                    f"[Homologacao] {len(items)} zonais carregados"
-                    f" (pag {pagination.get('page', '?')}/{pagination.get('totalPages', '?')})",
-                    PLUGIN_NAME, Qgis.Info,
-                )
-            except Exception as e:
-                QgsMessageLog.logMessage(
-                    f"Erro ao parsear catalogo homologacao: {e}",
-                    PLUGIN_NAME, Qgis.Warning,
-                )
-                self._state.set_error("catalogo_homologacao", str(e))
+            gen = self._generations.get("catalogo_homologacao", 0)
+            from ...domain.services.response_parsers import parse_catalogo_page
+            self._decoder.decode(
+                body, parse_catalogo_page,
+                lambda result: self._on_catalogo_homologacao_decoded(result, gen),
+                lambda err: self._on_catalogo_homologacao_decode_failed(err, gen),
+            )
 
         elif request_id == self._pending_parecer_id:
             self._pending_parecer_id = None
@@ -495,42 +528,15 @@ class MapeamentoController(QObject):
 
         elif request_id == self._pending_raster_id:
             self._pending_raster_id = None
-            try:
-                from ...domain.services.raster_service import build_raster_hierarchy
-                from ...domain.services.gpkg_service import read_sidecar
-                data = json.loads(body)
-                metodo = self._pending_raster_meta.get("metodo_apply", "")
-                gpkg_path = self._pending_raster_meta.get("gpkg_path")
-
-                # Lê sidecar para config de visualização por mapeamento
-                sidecar = read_sidecar(gpkg_path) if gpkg_path else {}
-
-                # Diagnostico: loga estrutura do primeiro tile
-                if isinstance(data, list) and data:
-                    sample = data[0]
-                    keys = sorted(sample.keys()) if isinstance(sample, dict) else "N/A"
-                    QgsMessageLog.logMessage(
-                        f"[Raster] tilesMetodos: {len(data)} tiles, "
-                        f"metodo={metodo}, keys={keys}",
-                        PLUGIN_NAME, Qgis.Info,
-                    )
-
-                hierarchy = build_raster_hierarchy(data, metodo, sidecar)
-                self._state.raster_layers_ready.emit(hierarchy)
-                total = sum(
-                    len(bg.layers)
-                    for dg in hierarchy.dates
-                    for bg in dg.bands
-                )
-                QgsMessageLog.logMessage(
-                    f"[Raster] {total} camadas em {len(hierarchy.dates)} datas",
-                    PLUGIN_NAME, Qgis.Info,
-                )
-            except Exception as e:
-                QgsMessageLog.logMessage(
-                    f"Erro ao parsear tiles raster: {e}",
-                    PLUGIN_NAME, Qgis.Warning,
-                )
+            metodo = self._pending_raster_meta.get("metodo_apply", "")
+            gpkg_path = self._pending_raster_meta.get("gpkg_path")
+            gen = self._generations.get("raster", 0)
+            self._decoder.decode(
+                body,
+                lambda raw: _parse_raster_tiles(raw, metodo, gpkg_path),
+                lambda hierarchy: self._on_raster_decoded(hierarchy, gen),
+                lambda err: self._on_raster_decode_failed(err, gen),
+            )
 
         elif request_id == self._pending_conflict_fetch_id:
             self._pending_conflict_fetch_id = None
@@ -550,24 +556,15 @@ class MapeamentoController(QObject):
 
         elif request_id == self._pending_upload_history_id:
             self._pending_upload_history_id = None
-            self._state.set_loading("upload_history", False)
-            try:
-                from ...domain.models.upload_batch import UploadHistoryItem
-                data = json.loads(body)
-                items_raw = data.get("data") or []
-                pagination = data.get("pagination") or {}
-                items = [UploadHistoryItem.from_dict(item) for item in items_raw]
-                self._state.upload_history_changed.emit(items, pagination)
-                QgsMessageLog.logMessage(
-                    f"[UploadHistory] {len(items)} batches carregados",
-                    PLUGIN_NAME, Qgis.Info,
-                )
-            except Exception as e:
-                QgsMessageLog.logMessage(
-                    f"Erro ao parsear historico de uploads: {e}",
-                    PLUGIN_NAME, Qgis.Warning,
-                )
-                self._state.set_error("upload_history", str(e))
+            gen = self._generations.get("upload_history", 0)
+            from ...domain.services.response_parsers import (
+                parse_upload_history_page,
+            )
+            self._decoder.decode(
+                body, parse_upload_history_page,
+                lambda result: self._on_upload_history_decoded(result, gen),
+                lambda err: self._on_upload_history_decode_failed(err, gen),
+            )
 
         elif request_id == self._pending_suprimir_id:
             self._pending_suprimir_id = None
@@ -657,28 +654,10 @@ class MapeamentoController(QObject):
                     PLUGIN_NAME, Qgis.Warning,
                 )
 
-        elif request_id in self._pending_poll_ids:
-            zid = self._pending_poll_ids.pop(request_id)
-            if zid in self._polling_zonals:
-                self._polling_zonals[zid]["request_id"] = None
-                self._polling_zonals[zid]["errors"] = 0
-            try:
-                data = json.loads(body)
-                zonal_status = data.get("status", "")
-                self._state.zonal_status_polled.emit(zid, zonal_status)
-                # Parar polling se saiu dos estados intermediários
-                _intermediate = {"PROCESSING", "OVERLAID", "CREATED", "CONSOLIDATING"}
-                if zonal_status not in _intermediate:
-                    self.stop_polling_zonal(zid)
-                    QgsMessageLog.logMessage(
-                        f"[Poll] Zonal {zid} finalizou reprocessamento: {zonal_status}",
-                        PLUGIN_NAME, Qgis.Info,
-                    )
-            except Exception as e:
-                QgsMessageLog.logMessage(
-                    f"[Poll] Erro ao parsear status do zonal {zid}: {e}",
-                    PLUGIN_NAME, Qgis.Warning,
-                )
+        elif self._status_poller.owns(request_id):
+            self._apply_poll_results(
+                *self._status_poller.handle_response(request_id, body)
+            )
 
         elif request_id == self._pending_renew_id:
             self._pending_renew_id = None
@@ -687,15 +666,11 @@ class MapeamentoController(QObject):
             self._pending_renew_zonal_id = None
             self._pending_renew_gpkg_path = None
             try:
-                from ...domain.services.gpkg_service import (
-                    read_sidecar, write_sidecar,
-                )
+                from ...domain.services.gpkg_service import update_sidecar
                 data = json.loads(body)
                 new_expires = data.get("expiresAt")
                 if new_expires and zonal_id and gpkg:
-                    sidecar = read_sidecar(gpkg)
-                    sidecar["expiresAt"] = new_expires
-                    write_sidecar(gpkg, sidecar)
+                    update_sidecar(gpkg, {"expiresAt": new_expires})
                     QgsMessageLog.logMessage(
                         f"editToken renovado para zonal #{zonal_id} até {new_expires}",
                         PLUGIN_NAME, Qgis.Info,
@@ -717,32 +692,14 @@ class MapeamentoController(QObject):
                     PLUGIN_NAME, Qgis.Warning,
                 )
 
-        elif request_id in self._pending_compare_ids:
-            zonal_id, batch_uuid = self._pending_compare_ids.pop(request_id)
-            # body é bytes (GeoPackage binario — backend migrou de FGB para
-            # GPKG via ogr2ogr para evitar bug do PostGIS 3.4.x ST_AsFlatGeobuf).
-            # Nome do signal preservado por compatibilidade.
-            self.compare_fgb_ready.emit(zonal_id, batch_uuid, body)
-
         elif request_id in self._pending_overlay_ids:
             zonal_id = self._pending_overlay_ids.pop(request_id)
-            try:
-                data = json.loads(body)
-                # A API pode retornar {data: {geomId: {...}}} ou diretamente {geomId: {...}}
-                overlay = data.get("data", data) if isinstance(data, dict) else {}
-                QgsMessageLog.logMessage(
-                    f"[Overlay] zonal {zonal_id}: {len(overlay)} chaves, "
-                    f"keys_sample={list(overlay.keys())[:5]}",
-                    PLUGIN_NAME, Qgis.Info,
-                )
-                self.overlay_data_ready.emit(zonal_id, overlay)
-            except Exception as e:
-                body_preview = body[:300].decode("utf-8", errors="replace") if body else "(vazio)"
-                QgsMessageLog.logMessage(
-                    f"Erro ao parsear overlay data para zonal {zonal_id}: {e}\n"
-                    f"Body preview: {body_preview}",
-                    PLUGIN_NAME, Qgis.Warning,
-                )
+            from ...domain.services.response_parsers import parse_overlay_data
+            self._decoder.decode(
+                body, parse_overlay_data,
+                lambda overlay: self._on_overlay_decoded(zonal_id, overlay),
+                lambda err: self._on_overlay_decode_failed(zonal_id, err, body),
+            )
 
         elif request_id in self._pending_mascara_ids:
             mapeamento_id = self._pending_mascara_ids.pop(request_id)
@@ -796,6 +753,128 @@ class MapeamentoController(QObject):
                     PLUGIN_NAME, Qgis.Warning,
                 )
 
+    def _on_download_finished(self, request_id, status_code, file_path):
+        if request_id in self._pending_compare_ids:
+            zonal_id, batch_uuid = self._pending_compare_ids.pop(request_id)
+            # GeoPackage binario (backend migrou de FGB para GPKG via ogr2ogr
+            # para evitar bug do PostGIS 3.4.x ST_AsFlatGeobuf).
+            # Nome do signal preservado por compatibilidade.
+            self.compare_fgb_ready.emit(zonal_id, batch_uuid, file_path)
+
+    # ----------------------------------------------------------------
+    # Decoded payloads (podem chegar de worker thread via ResponseDecoder)
+    # ----------------------------------------------------------------
+
+    def _on_catalogo_decoded(self, result, generation):
+        if self._is_stale("catalogo", generation):
+            return  # Nova pagina ja solicitada — resultado obsoleto
+        self._state.set_loading("catalogo", False)
+        items, pagination = result
+        self._state.catalogo_items = (items, pagination)
+        QgsMessageLog.logMessage(
+            f"[Catalogo] {len(items)} zonais carregados"
+            f" (pag {pagination.get('page', '?')}/{pagination.get('totalPages', '?')})",
+            PLUGIN_NAME, Qgis.Info,
+        )
+
+    def _on_catalogo_decode_failed(self, error_msg, body, generation):
+        if self._is_stale("catalogo", generation):
+            return
+        self._state.set_loading("catalogo", False)
+        QgsMessageLog.logMessage(
+            f"Erro ao parsear catalogo: {error_msg}\nBody: {body[:500]}",
+            PLUGIN_NAME, Qgis.Warning,
+        )
+        self._state.set_error("catalogo", f"Erro ao processar catalogo: {error_msg}")
+
+    def _on_catalogo_homologacao_decoded(self, result, generation):
+        if self._is_stale("catalogo_homologacao", generation):
+            return
+        self._state.set_loading("catalogo_homologacao", False)
+        items, pagination = result
+        self._state.catalogo_homologacao_changed.emit(items, pagination)
+        QgsMessageLog.logMessage(
+            f"[Homologacao] {len(items)} zonais carregados"
+            f" (pag {pagination.get('page', '?')}/{pagination.get('totalPages', '?')})",
+            PLUGIN_NAME, Qgis.Info,
+        )
+
+    def _on_catalogo_homologacao_decode_failed(self, error_msg, generation):
+        if self._is_stale("catalogo_homologacao", generation):
+            return
+        self._state.set_loading("catalogo_homologacao", False)
+        QgsMessageLog.logMessage(
+            f"Erro ao parsear catalogo homologacao: {error_msg}",
+            PLUGIN_NAME, Qgis.Warning,
+        )
+        self._state.set_error("catalogo_homologacao", error_msg)
+
+    def _on_upload_history_decoded(self, result, generation):
+        if self._is_stale("upload_history", generation):
+            return
+        self._state.set_loading("upload_history", False)
+        items, pagination = result
+        self._state.upload_history_changed.emit(items, pagination)
+        QgsMessageLog.logMessage(
+            f"[UploadHistory] {len(items)} batches carregados",
+            PLUGIN_NAME, Qgis.Info,
+        )
+
+    def _on_upload_history_decode_failed(self, error_msg, generation):
+        if self._is_stale("upload_history", generation):
+            return
+        self._state.set_loading("upload_history", False)
+        QgsMessageLog.logMessage(
+            f"Erro ao parsear historico de uploads: {error_msg}",
+            PLUGIN_NAME, Qgis.Warning,
+        )
+        self._state.set_error("upload_history", error_msg)
+
+    def _on_raster_decoded(self, hierarchy, generation):
+        if self._is_stale("raster", generation):
+            return  # Outro job solicitado — tiles do anterior descartados
+        self._state.raster_layers_ready.emit(hierarchy)
+        total = sum(
+            len(bg.layers)
+            for dg in hierarchy.dates
+            for bg in dg.bands
+        )
+        QgsMessageLog.logMessage(
+            f"[Raster] {total} camadas em {len(hierarchy.dates)} datas",
+            PLUGIN_NAME, Qgis.Info,
+        )
+
+    def _on_raster_decode_failed(self, error_msg, generation):
+        if self._is_stale("raster", generation):
+            return
+        QgsMessageLog.logMessage(
+            f"Erro ao parsear tiles raster: {error_msg}",
+            PLUGIN_NAME, Qgis.Warning,
+        )
+
+    def _on_overlay_decoded(self, zonal_id, overlay):
+        QgsMessageLog.logMessage(
+            f"[Overlay] zonal {zonal_id}: {len(overlay)} chaves, "
+            f"keys_sample={list(overlay.keys())[:5]}",
+            PLUGIN_NAME, Qgis.Info,
+        )
+        self.overlay_data_ready.emit(zonal_id, overlay)
+
+    def _on_overlay_decode_failed(self, zonal_id, error_msg, body):
+        body_preview = body[:300].decode("utf-8", errors="replace") if body else "(vazio)"
+        QgsMessageLog.logMessage(
+            f"Erro ao parsear overlay data para zonal {zonal_id}: {error_msg}\n"
+            f"Body preview: {body_preview}",
+            PLUGIN_NAME, Qgis.Warning,
+        )
+
+    def _on_request_failed(self, request_id, status_code, error_msg):
+        # Polling precisa do status HTTP (detecta ausência do endpoint em lote)
+        if self._status_poller.owns(request_id):
+            self._apply_poll_results(
+                *self._status_poller.handle_failure(request_id, status_code)
+            )
+
     def _on_request_error(self, request_id, error_msg):
         if request_id == self._pending_catalogo_id:
             self._pending_catalogo_id = None
@@ -847,21 +926,6 @@ class MapeamentoController(QObject):
                 f"[Status] Falha one-shot zonal {zid}: {error_msg}",
                 PLUGIN_NAME, Qgis.Info,
             )
-        elif request_id in self._pending_poll_ids:
-            zid = self._pending_poll_ids.pop(request_id)
-            if zid in self._polling_zonals:
-                self._polling_zonals[zid]["request_id"] = None
-                self._polling_zonals[zid]["errors"] += 1
-                if self._polling_zonals[zid]["errors"] >= 5:
-                    self.stop_polling_zonal(zid)
-                    self._state.set_error(
-                        "reprocess",
-                        f"Polling do zonal {zid} falhou 5 vezes consecutivas."
-                    )
-                    QgsMessageLog.logMessage(
-                        f"[Poll] Zonal {zid}: 5 erros consecutivos, polling encerrado",
-                        PLUGIN_NAME, Qgis.Warning,
-                    )
         elif request_id == self._pending_pareceres_id:
             self._pending_pareceres_id = None
             self._pending_pareceres_mapeamento_id = None
@@ -1073,20 +1137,33 @@ class MapeamentoController(QObject):
     # ----------------------------------------------------------------
 
     def upload_zonal_edits(self, gpkg_path, conflict_strategy="REJECT_CONFLICTS"):
-        """Inicia upload de edicoes via fluxo zonal V2."""
-        from ...infra.tasks.upload_task import UploadZonalTask
-        from ...domain.services.gpkg_service import read_sidecar
+        """Inicia upload de edicoes via fluxo zonal V2.
 
+        O sidecar (metadados de checkout) e lido no ``GpkgInspector``; a
+        task e criada quando a leitura chega na main thread.
+        """
         if not self._state.is_authenticated or not self._token_provider:
             self._state.set_error("upload", "Nao autenticado")
             return
 
-        token = self._token_provider()
+        self._gpkg_inspector.sidecar(
+            gpkg_path,
+            on_done=lambda sidecar: self._start_zonal_upload(
+                gpkg_path, conflict_strategy, sidecar,
+            ),
+            on_error=lambda msg: self._state.set_error(
+                "upload", f"Erro ao ler metadados do GPKG: {msg}",
+            ),
+        )
+
+    def _start_zonal_upload(self, gpkg_path, conflict_strategy, sidecar):
+        from ...infra.tasks.upload_task import UploadZonalTask
+
+        token = self._token_provider() if self._token_provider else None
         if not token:
             self._state.set_error("upload", "Token nao disponivel")
             return
 
-        sidecar = read_sidecar(gpkg_path)
         edit_token = sidecar.get("editToken")
         zonal_id = sidecar.get("zonalId")
         zonal_version = sidecar.get("zonalVersion", 0)
@@ -1146,7 +1223,7 @@ class MapeamentoController(QObject):
         self._cleanup_finished_tasks()
         self._state.set_loading("upload", False)
         if success:
-            self._mark_uploaded(gpkg_path)
+            self._reload_gpkg_layers(gpkg_path)
             self.zonal_upload_completed.emit(gpkg_path, zonal_id)
             QgsMessageLog.logMessage(
                 f"Upload zonal concluido: {gpkg_path}", PLUGIN_NAME, Qgis.Info,
@@ -1157,6 +1234,49 @@ class MapeamentoController(QObject):
                 f"Upload zonal falhou: {message}", PLUGIN_NAME, Qgis.Warning,
             )
 
+    def extract_zonal_indexes(self, gpkg_path, points, image_ids, cache_path=None):
+        """Extrai indices espectrais de ``points`` x ``image_ids`` em lote.
+
+        O resultado vai para a tabela ``indices`` em ``indices_path(gpkg)``,
+        unida as feicoes por ``_original_fid``.
+        """
+        from ...infra.tasks.index_extraction_task import IndexExtractionTask
+        from ...domain.services.gpkg_service import indices_path
+
+        token = self._token_provider() if self._token_provider else None
+        if not token:
+            self._state.set_error("indices", "Token nao disponivel")
+            return
+
+        output_path = indices_path(gpkg_path)
+        task = IndexExtractionTask(
+            indexes_url=self._api_url("/mapeamento/tiles/get/indexs/images"),
+            access_token=token,
+            points=points,
+            image_ids=image_ids,
+            output_path=output_path,
+            cache_path=cache_path,
+        )
+        task.signals.completed.connect(
+            lambda success, msg: self._on_index_extraction_completed(
+                success, msg, output_path,
+            )
+        )
+        task.signals.status_message.connect(
+            lambda msg: QgsMessageLog.logMessage(msg, PLUGIN_NAME, Qgis.Info)
+        )
+
+        self._active_tasks.append(task)
+        QgsApplication.taskManager().addTask(task)
+
+    def _on_index_extraction_completed(self, success, message, output_path):
+        self._cleanup_finished_tasks()
+        if not success:
+            QgsMessageLog.logMessage(
+                f"Extracao de indices falhou: {message}", PLUGIN_NAME, Qgis.Warning,
+            )
+        self.index_extraction_completed.emit(success, message, output_path)
+
     # ----------------------------------------------------------------
     # Helpers
     # ----------------------------------------------------------------
@@ -1168,41 +1288,23 @@ class MapeamentoController(QObject):
             if t.status() not in (t.Complete, t.Terminated)
         ]
 
-    def _mark_uploaded(self, gpkg_path):
-        """Marca features MODIFIED/NEW como UPLOADED no GPKG via dataProvider batch."""
-        from ...domain.models.enums import SyncStatusEnum
-        from datetime import datetime, timezone
-
-        layer = QgsVectorLayer(gpkg_path, "mark_uploaded", "ogr")
-        if not layer.isValid():
-            return
+    def _reload_gpkg_layers(self, gpkg_path):
+        """Recarrega camadas do projeto abertas sobre ``gpkg_path``.
 
-        sync_idx = layer.fields().indexOf("_sync_status")
-        ts_idx = layer.fields().indexOf("_sync_timestamp")
-        if sync_idx < 0:
-            return
-
-        now_iso = datetime.now(timezone.utc).isoformat()
-        attr_changes = {}
-        deleted_fids = []
-        for feat in layer.getFeatures():
-            status = feat.attribute(sync_idx)
-            if status in (SyncStatusEnum.MODIFIED.value, SyncStatusEnum.NEW.value):
-                changes = {sync_idx: SyncStatusEnum.UPLOADED.value}
-                if ts_idx >= 0:
-                    changes[ts_idx] = now_iso
-                attr_changes[feat.id()] = changes
-            elif status == SyncStatusEnum.DELETED.value:
-                # Tombstones ja processados pelo servidor — remover do GPKG
-                deleted_fids.append(feat.id())
+        A transicao de sync pos-upload e gravada no GPKG pela UploadZonalTask
+        (fora da main thread); aqui so invalidamos o cache dos providers.
+        """
+        from qgis.core import QgsProject
 
-        provider = layer.dataProvider()
-        if attr_changes:
-            provider.changeAttributeValues(attr_changes)
-        if deleted_fids:
-            provider.deleteFeatures(deleted_fids)
-        if attr_changes or deleted_fids:
-            provider.forceReload()
+        target = os.path.normcase(os.path.abspath(gpkg_path))
+        for layer in QgsProject.instance().mapLayers().values():
+            if not isinstance(layer, QgsVectorLayer):
+                continue
+            source = layer.source().split("|")[0]
+            if os.path.normcase(os.path.abspath(source)) != target:
+                continue
+            layer.dataProvider().forceReload()
+            layer.triggerRepaint()
 
     # ----------------------------------------------------------------
     # Edit tracking
@@ -1212,7 +1314,11 @@ class MapeamentoController(QObject):
                               metodo_id=None, zonal_id=None):
         """Conecta signals para rastrear edicoes na camada.
 
-        Usa beforeCommitChanges para capturar IDs editados do editBuffer,
+        GPKGs com journal de alteracoes (triggers SQLite, instalados no
+        download ou migrados aqui) ja mantem _sync_status e tombstones na
+        propria transacao do commit; resta apenas recarregar a camada apos
+        o commit. Sem journal (migracao falhou, arquivo somente leitura),
+        usa beforeCommitChanges para capturar IDs editados do editBuffer,
         e afterCommitChanges para persistir o _sync_status no GPKG.
 
         Oculta campos internos (_sync_status, _original_fid, etc.) do
@@ -1224,7 +1330,13 @@ class MapeamentoController(QObject):
         from ...domain.services.attribute_schema import INTERNAL_FIELDS
 
         layer_id = layer.id()
-        self._pending_edit_fids[layer_id] = {"changed": set(), "deleted_originals": []}
+        self._pending_edit_fids[layer_id] = {
+            "changed": set(), "added": set(), "deleted_originals": [],
+        }
+
+        # GPKGs antigos: cria indices de _sync_status/_original_fid usados
+        # na deteccao de features novas (no-op se ja existem)
+        self._ensure_layer_sync_indexes(layer)
 
         # Oculta campos internos do formulario de atributos
         for field_name in INTERNAL_FIELDS:
@@ -1234,9 +1346,21 @@ class MapeamentoController(QObject):
                     idx, QgsEditorWidgetSetup("Hidden", {})
                 )
 
+        if self._ensure_layer_change_journal(layer):
+            self._pending_edit_fids.pop(layer_id, None)
+            layer.afterCommitChanges.connect(
+                lambda: QTimer.singleShot(0, lambda: self._on_journal_commit(layer))
+            )
+            return
+
         layer.beforeCommitChanges.connect(
             lambda: self._capture_edited_fids(layer)
         )
+        # FIDs definitivos das features adicionadas (os do editBuffer sao
+        # temporarios/negativos)
+        layer.committedFeaturesAdded.connect(
+            lambda _lid, features: self._capture_added_fids(layer, features)
+        )
         layer.afterCommitChanges.connect(
             lambda: QTimer.singleShot(0, lambda: self._mark_edited_features(layer))
         )
@@ -1311,9 +1435,116 @@ class MapeamentoController(QObject):
         prev_deleted = existing.get("deleted_originals", [])
         self._pending_edit_fids[layer_id] = {
             "changed": prev_changed | changed_fids,
+            "added": existing.get("added", set()),
             "deleted_originals": prev_deleted + deleted_originals,
         }
 
+    def _capture_added_fids(self, layer, features):
+        """Registra FIDs definitivos das features adicionadas no commit."""
+        entry = self._pending_edit_fids.setdefault(
+            layer.id(), {"changed": set(), "added": set(), "deleted_originals": []},
+        )
+        entry.setdefault("added", set()).update(f.id() for f in features)
+
+    def _ensure_layer_sync_indexes(self, layer):
+        from ...domain.services.gpkg_service import ensure_sync_indexes
+
+        gpkg_file = layer.source().split("|")[0]
+        try:
+            created = ensure_sync_indexes(gpkg_file)
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                f"[EditTrack] falha ao criar indices de sync em {gpkg_file}: {e}",
+                PLUGIN_NAME, Qgis.Warning,
+            )
+            return
+        if created:
+            QgsMessageLog.logMessage(
+                f"[EditTrack] {created} indices de sync criados em {gpkg_file}",
+                PLUGIN_NAME, Qgis.Info,
+            )
+
+    def _ensure_layer_change_journal(self, layer) -> bool:
+        """Instala/migra o journal de triggers no GPKG da camada. True se ativo."""
+        from ...domain.services.change_journal import (
+            has_change_journal, install_change_journal,
+        )
+
+        gpkg_file = layer.source().split("|")[0]
+        try:
+            migrated = install_change_journal(gpkg_file)
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                f"[EditTrack] falha ao instalar journal em {gpkg_file}: {e} "
+                "(rastreio via signals)",
+                PLUGIN_NAME, Qgis.Warning,
+            )
+            return False
+        if migrated:
+            # Tombstones legados sairam da tabela de features
+            layer.dataProvider().forceReload()
+            QgsMessageLog.logMessage(
+                f"[EditTrack] journal de alteracoes instalado em {gpkg_file} "
+                f"({migrated} tabela(s) migrada(s))",
+                PLUGIN_NAME, Qgis.Info,
+            )
+        return has_change_journal(gpkg_file)
+
+    def _on_journal_commit(self, layer):
+        """Pos-commit com journal: os triggers ja gravaram o estado de sync."""
+        # Recarrega para refletir _sync_status/_sync_timestamp escritos pelos
+        # triggers (o cache do provider ainda tem os valores anteriores)
+        layer.dataProvider().forceReload()
+        layer.triggerRepaint()
+        QgsMessageLog.logMessage(
+            f"[EditTrack] commit em {layer.name()} — sync mantido pelo journal",
+            PLUGIN_NAME, Qgis.Info,
+        )
+        self.edit_tracking_done.emit()
+
+    def _find_new_feature_fids(self, layer, sync_idx, ofid_idx, added_fids):
+        """FIDs de features novas sem percorrer a camada inteira.
+
+        Combina (a) as features adicionadas neste commit e (b) uma consulta
+        por expressao — compilada em SQL pelo provider OGR e atendida pelos
+        indices de _sync_status/_original_fid — que traz as candidatas de
+        commits anteriores ainda sem marcacao; o criterio final
+        (``is_new_feature``) e aplicado em Python sobre as candidatas.
+        """
+        from qgis.core import QgsFeatureRequest
+        from ...domain.services.gpkg_service import (
+            is_new_feature, new_feature_filter_expression,
+        )
+
+        def is_new(feat):
+            original_fid = feat.attribute(ofid_idx) if ofid_idx >= 0 else None
+            return is_new_feature(feat.attribute(sync_idx), original_fid)
+
+        attrs = [sync_idx] + ([ofid_idx] if ofid_idx >= 0 else [])
+        expr = new_feature_filter_expression(has_original_fid=ofid_idx >= 0)
+        req = (
+            QgsFeatureRequest()
+            .setFilterExpression(expr)
+            .setFlags(QgsFeatureRequest.NoGeometry)
+            .setSubsetOfAttributes(attrs)
+        )
+        new_fids = {feat.id() for feat in layer.getFeatures(req) if is_new(feat)}
+
+        # Features recem-adicionadas passam pelo mesmo criterio (a expressao
+        # ja as cobre; aqui garante o resultado sem depender da compilacao)
+        remaining = set(added_fids) - new_fids
+        if remaining:
+            req = (
+                QgsFeatureRequest()
+                .setFilterFids(list(remaining))
+                .setFlags(QgsFeatureRequest.NoGeometry)
+                .setSubsetOfAttributes(attrs)
+            )
+            new_fids.update(
+                feat.id() for feat in layer.getFeatures(req) if is_new(feat)
+            )
+        return new_fids
+
     def _mark_edited_features(self, layer):
         """Marca features editadas como MODIFIED, novas como NEW,
         e insere tombstones DELETED para features removidas.
@@ -1333,6 +1564,7 @@ class MapeamentoController(QObject):
         layer_id = layer.id()
         fid_data = self._pending_edit_fids.pop(layer_id, None)
         changed_fids = fid_data.get("changed", set()) if fid_data else set()
+        added_fids = fid_data.get("added", set()) if fid_data else set()
         deleted_originals = fid_data.get("deleted_originals", []) if fid_data else []
 
         sync_idx = layer.fields().indexOf("_sync_status")
@@ -1351,11 +1583,6 @@ class MapeamentoController(QObject):
             SyncStatusEnum.MODIFIED.value,
             SyncStatusEnum.UPLOADED.value,
         )
-        already_tracked = (
-            SyncStatusEnum.NEW.value,
-            SyncStatusEnum.MODIFIED.value,
-            SyncStatusEnum.UPLOADED.value,
-        )
 
         # Batch: {fid: {field_idx: new_value, ...}, ...}
         attr_changes = {}
@@ -1380,24 +1607,16 @@ class MapeamentoController(QObject):
         #    b) _original_fid NULL/0 e status nao e NEW/MODIFIED/UPLOADED
         #       (defesa contra "Remember values" do QGIS preenchendo
         #       _sync_status = DOWNLOADED em features recem-criadas)
-        for feat in layer.getFeatures():
-            fid = feat.id()
+        #    Consulta indexada + FIDs do commit (sem full scan da camada).
+        new_fids = self._find_new_feature_fids(layer, sync_idx, ofid_idx, added_fids)
+        for fid in new_fids:
             if fid in attr_changes:
                 continue
-            status = feat.attribute(sync_idx)
-            original_fid = (
-                feat.attribute(ofid_idx) if ofid_idx >= 0 else None
-            )
-
-            status_is_null = not status
-            has_no_server_fid = not original_fid and status not in already_tracked
-
-            if status_is_null or has_no_server_fid:
-                changes = {sync_idx: SyncStatusEnum.NEW.value}
-                if ts_idx >= 0:
-                    changes[ts_idx] = now_iso
-                attr_changes[fid] = changes
-                new_count += 1
+            changes = {sync_idx: SyncStatusEnum.NEW.value}
+            if ts_idx >= 0:
+                changes[ts_idx] = now_iso
+            attr_changes[fid] = changes
+            new_count += 1
 
         if attr_changes:
             ok = layer.dataProvider().changeAttributeValues(attr_changes)
@@ -1448,6 +1667,31 @@ class MapeamentoController(QObject):
             )
 
         self._pending_edit_fids[layer_id] = {
-            "changed": set(), "deleted_originals": [],
+            "changed": set(), "added": set(), "deleted_originals": [],
         }
         self.edit_tracking_done.emit()
+
+
+def _parse_raster_tiles(body, metodo_apply, gpkg_path=None):
+    """Parser de GET /mapeamento/tilesMetodos — roda no ResponseDecoder.
+
+    Le o sidecar (config de visualizacao por mapeamento) no mesmo passo,
+    evitando I/O de disco na main thread.
+    """
+    from ...domain.services.raster_service import build_raster_hierarchy
+    from ...domain.services.gpkg_service import read_sidecar
+
+    data = json.loads(body)
+    sidecar = read_sidecar(gpkg_path) if gpkg_path else {}
+
+    # Diagnostico: loga estrutura do primeiro tile
+    if isinstance(data, list) and data:
+        sample = data[0]
+        keys = sorted(sample.keys()) if isinstance(sample, dict) else "N/A"
+        QgsMessageLog.logMessage(
+            f"[Raster] tilesMetodos: {len(data)} tiles, "
+            f"metodo={metodo_apply}, keys={keys}",
+            PLUGIN_NAME, Qgis.Info,
+        )
+
+    return build_raster_hierarchy(data, metodo_apply, sidecar)
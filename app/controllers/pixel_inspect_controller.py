@@ -2,9 +2,23 @@
 
 Liga PixelInspectMapTool -> TileIndexesService -> PixelInspectDialog.
 Resolve image_ids dos grupos de data expandidos na arvore de camadas
-(custom property satirriga/image_id gravada em plugin._on_raster_layers_ready).
+(custom property satirriga/image_id gravada em plugin._on_raster_layers_ready)
+e envia so as que cobrem o ponto (``FootprintIndex`` pelo tile MGRS).
+
+No modo hover o map tool consulta o cache a cada movimento
+(``_probe_hover``) e so debounca o que precisa ir a rede. So existe uma
+consulta "principal" em voo: um novo ponto
+cancela a anterior (HttpClient.cancel), salvo quando cai no mesmo pixel.
+Pontos a frente do cursor sao pre-consultados (ate ``_MAX_PREFETCH`` por
+amostra) so para aquecer o cache; prefetches que continuam a frente na
+nova direcao seguem em voo e o total de consultas do hover (principal +
+prefetch) e limitado a ``_MAX_HOVER_IN_FLIGHT``. Se o cursor chega num
+pixel ja em prefetch, a resposta e adotada como consulta principal.
 """
 
+import json
+import os
+import sqlite3
 from typing import List, Optional
 
 from qgis.PyQt.QtCore import QObject, pyqtSignal
@@ -16,13 +30,21 @@ from qgis.core import (
     QgsProject,
 )
 
+from ...domain.services.pixel_index_cache import (
+    PixelIndexCache, is_ahead, pixel_cell,
+)
+from ...domain.services.scene_footprints import FootprintIndex
 from ...domain.services.tile_indexes_service import TileIndexesService
 from ...infra.config.settings import PLUGIN_NAME
 from ...ui.tools.pixel_inspect_map_tool import PixelInspectMapTool
 
 
 _MAX_IMAGE_IDS = 10  # limite defensivo de payload
+_MAX_PREFETCH = 2    # pontos de prefetch por amostra do hover
+_MAX_HOVER_IN_FLIGHT = 4  # consultas do hover em voo (principal + prefetch)
 _IMAGE_ID_PROP = "satirriga/image_id"
+# Camadas mosaico (uma por data + banda) guardam a lista de cenas em JSON
+_MOSAIC_IDS_PROP = "satirriga/mosaic_image_ids"
 
 
 class PixelInspectController(QObject):
@@ -33,14 +55,22 @@ class PixelInspectController(QObject):
     indexes_loading = pyqtSignal(float, float)       # lat, lon
     indexes_no_images = pyqtSignal(float, float)     # nenhum raster ativo
 
-    def __init__(self, canvas, http_client, config_repo, parent=None):
+    def __init__(self, canvas, http_client, config_repo, cache_path=None,
+                 parent=None):
         super().__init__(parent)
         self._canvas = canvas
         self._http = http_client
-        self._service = TileIndexesService(http_client, config_repo)
+        self._service = TileIndexesService(
+            http_client, config_repo, self._open_cache(cache_path),
+        )
+
+        self._footprints = FootprintIndex()
 
         self._tool = PixelInspectMapTool(canvas)
         self._tool.point_clicked.connect(self._on_point_clicked)
+        self._tool.point_hovered.connect(self._on_point_hovered)
+        self._tool.prefetch_requested.connect(self._on_prefetch_requested)
+        self._tool.set_cache_probe(self._probe_hover)
 
         self._http.request_finished.connect(self._on_request_finished)
         self._http.request_error.connect(self._on_request_error)
@@ -48,6 +78,26 @@ class PixelInspectController(QObject):
         self._pending_id: Optional[str] = None
         self._pending_coords: Optional[tuple] = None  # (lat, lon)
         self._pending_image_ids: List[str] = []
+        self._pending_all_ids: List[str] = []
+        self._pending_hits: List = []  # SceneIndexes ja em cache
+        self._pending_key: Optional[tuple] = None  # (cenas, pixel) em voo
+        # request_id -> (chave, lat, lon, image_ids consultados)
+        self._prefetch = {}
+        self._hover_coords: Optional[tuple] = None  # ultimo ponto do hover
+
+    @staticmethod
+    def _open_cache(cache_path):
+        """Cache persistente em ``cache_path``; em memoria se indisponivel."""
+        if cache_path:
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                return PixelIndexCache(cache_path)
+            except (OSError, sqlite3.Error) as e:
+                QgsMessageLog.logMessage(
+                    f"[PixelInspect] Cache em disco indisponivel: {e}",
+                    PLUGIN_NAME, Qgis.Warning,
+                )
+        return PixelIndexCache()
 
     # ------------------------------------------------------------------
     # Map tool lifecycle
@@ -66,61 +116,167 @@ class PixelInspectController(QObject):
     def clear_marker(self):
         self._tool.clear_marker()
 
+    def index_scenes(self, image_ids):
+        """Indexa footprints das cenas (ao carregar a hierarquia raster)."""
+        self._footprints.add(image_ids)
+
+    def set_hover_enabled(self, enabled: bool):
+        """Liga/desliga consulta continua sob o cursor."""
+        self._tool.set_hover_enabled(enabled)
+        if not enabled:
+            self._cancel_prefetch()
+            self._hover_coords = None
+
     def cleanup(self):
         self._cancel_pending()
+        self._cancel_prefetch()
         self.deactivate()
         self._tool.cleanup()
-        self._service.clear_cache()
+        self._service.close()
 
     # ------------------------------------------------------------------
     # Click handling
     # ------------------------------------------------------------------
 
     def _on_point_clicked(self, lat: float, lon: float):
-        image_ids = self._resolve_active_image_ids()
-        if not image_ids:
+        self._inspect(lat, lon, hover=False)
+
+    def _on_point_hovered(self, lat: float, lon: float):
+        self._hover_coords = (lat, lon)
+        self._inspect(lat, lon, hover=True)
+
+    def _probe_hover(self, lat: float, lon: float) -> bool:
+        """Atende o hover sem rede se possivel (chamado a cada movimento)."""
+        if self._serve_locally(lat, lon) is not None:
+            return False
+        self._hover_coords = (lat, lon)
+        return True
+
+    def _serve_locally(self, lat: float, lon: float):
+        """Entrega o ponto sem rede; senao ``(image_ids, hits, missing)``."""
+        active_ids = self._resolve_active_image_ids()
+        if not active_ids:
+            self._cancel_pending()
             self.indexes_no_images.emit(lat, lon)
+            return None
+        image_ids = self._covering(active_ids, lat, lon)
+        if not image_ids:
+            # Ponto fora de todas as cenas ativas: nada a consultar
+            self._cancel_pending()
+            self.indexes_ready.emit(lat, lon, [])
+            return None
+
+        # Cache por cena/pixel: todas em cache -> entrega imediata
+        hits, missing = self._service.split_cached(image_ids, lat, lon)
+        if not missing:
+            self._cancel_pending()
+            self.indexes_ready.emit(lat, lon, hits)
+            return None
+        return image_ids, hits, missing
+
+    def _inspect(self, lat: float, lon: float, hover: bool):
+        local = self._serve_locally(lat, lon)
+        if local is None:
             return
+        image_ids, hits, missing = local
 
-        # Cache hit -> entrega imediata
-        cached = self._service.cached_for(image_ids, lat, lon)
-        if cached is not None:
-            self.indexes_ready.emit(lat, lon, cached)
-            return
+        key = self._pixel_key(image_ids, lat, lon)
+        if hover and self._pending_id and key == self._pending_key:
+            return  # mesmo pixel ja em consulta
 
         # Descarta request anterior (resposta seria irrelevante)
         self._cancel_pending()
 
         self.indexes_loading.emit(lat, lon)
-        self._pending_image_ids = image_ids
+        self._pending_image_ids = missing
+        self._pending_all_ids = image_ids
+        self._pending_hits = hits
         self._pending_coords = (lat, lon)
-        self._pending_id = self._service.request(image_ids, lat, lon)
-
-        QgsMessageLog.logMessage(
-            f"[PixelInspect] POST indices: lat={lat} lon={lon} "
-            f"({len(image_ids)} cena(s))",
-            PLUGIN_NAME, Qgis.Info,
-        )
+        self._pending_key = key
+
+        # Prefetch em voo para o mesmo pixel: adota a resposta
+        for request_id, entry in list(self._prefetch.items()):
+            if entry[0] == key:
+                del self._prefetch[request_id]
+                self._pending_image_ids = entry[3]
+                self._pending_id = request_id
+                return
+
+        self._pending_id = self._service.request(missing, lat, lon)
+
+        if not hover:
+            QgsMessageLog.logMessage(
+                f"[PixelInspect] POST indices: lat={lat} lon={lon} "
+                f"({len(missing)} de {len(image_ids)} cena(s))",
+                PLUGIN_NAME, Qgis.Info,
+            )
+
+    def _on_prefetch_requested(self, points):
+        """Aquece o cache nos pontos a frente do cursor (sem emitir sinais)."""
+        if not points:
+            return
+        # Prefetch que ficou para tras na nova direcao ja nao serve; os que
+        # continuam a frente seguem em voo
+        if self._hover_coords is not None:
+            lat0, lon0 = self._hover_coords
+            for request_id, (_key, lat, lon, _ids) in list(self._prefetch.items()):
+                if not is_ahead(lat, lon, lat0, lon0, *points[0]):
+                    self._cancel_request(request_id)
+                    del self._prefetch[request_id]
+
+        active_ids = self._resolve_active_image_ids()
+        in_flight = {entry[0] for entry in self._prefetch.values()}
+        for lat, lon in points[:_MAX_PREFETCH]:
+            if len(self._prefetch) + (1 if self._pending_id else 0) >= _MAX_HOVER_IN_FLIGHT:
+                break
+            image_ids = self._covering(active_ids, lat, lon)
+            if not image_ids:
+                continue
+            key = self._pixel_key(image_ids, lat, lon)
+            if key == self._pending_key or key in in_flight:
+                continue
+            _hits, missing = self._service.split_cached(image_ids, lat, lon)
+            if missing:
+                request_id = self._service.request(missing, lat, lon)
+                self._prefetch[request_id] = (key, lat, lon, missing)
+                in_flight.add(key)
 
     def _on_request_finished(self, request_id, status_code, body):
+        prefetch = self._prefetch.pop(request_id, None)
+        if prefetch is not None:
+            _key, lat, lon, missing = prefetch
+            scenes = self._service.parse_response(body)
+            if scenes is not None:
+                self._service.store(missing, lat, lon, scenes)
+            return
         if request_id != self._pending_id:
             return
         lat, lon = self._pending_coords or (0.0, 0.0)
         image_ids = self._pending_image_ids
-        self._pending_id = None
-        self._pending_coords = None
-        self._pending_image_ids = []
+        all_ids = self._pending_all_ids
+        hits = self._pending_hits
+        self._clear_pending()
 
         scenes = self._service.parse_response(body)
-        self._service.store(image_ids, lat, lon, scenes)
-        self.indexes_ready.emit(lat, lon, scenes)
+        if scenes is None:
+            # Body invalido: mostra so o que veio do cache, sem gravar ausencias
+            QgsMessageLog.logMessage(
+                f"[PixelInspect] Resposta sem JSON de cenas (HTTP {status_code})",
+                PLUGIN_NAME, Qgis.Warning,
+            )
+            scenes = []
+        else:
+            self._service.store(image_ids, lat, lon, scenes)
+        self.indexes_ready.emit(
+            lat, lon, self._service.merge(all_ids, hits, scenes),
+        )
 
     def _on_request_error(self, request_id, error_msg):
+        if self._prefetch.pop(request_id, None) is not None:
+            return
         if request_id != self._pending_id:
             return
-        self._pending_id = None
-        self._pending_coords = None
-        self._pending_image_ids = []
+        self._clear_pending()
         QgsMessageLog.logMessage(
             f"[PixelInspect] Erro: {error_msg}",
             PLUGIN_NAME, Qgis.Warning,
@@ -129,18 +285,41 @@ class PixelInspectController(QObject):
 
     def _cancel_pending(self):
         if self._pending_id:
-            try:
-                self._http.cancel(self._pending_id)
-            except Exception:
-                pass
+            self._cancel_request(self._pending_id)
+        self._clear_pending()
+
+    def _cancel_prefetch(self):
+        for request_id in list(self._prefetch):
+            self._cancel_request(request_id)
+        self._prefetch.clear()
+
+    def _cancel_request(self, request_id):
+        try:
+            self._http.cancel(request_id)
+        except Exception:
+            pass
+
+    @staticmethod
+    def _pixel_key(image_ids, lat, lon) -> tuple:
+        """Identifica a consulta: cenas + pixel de 10 m (da primeira cena)."""
+        return tuple(image_ids), pixel_cell(image_ids[0], lat, lon)
+
+    def _clear_pending(self):
         self._pending_id = None
+        self._pending_key = None
         self._pending_coords = None
         self._pending_image_ids = []
+        self._pending_all_ids = []
+        self._pending_hits = []
 
     # ------------------------------------------------------------------
     # Resolucao de image_ids ativos
     # ------------------------------------------------------------------
 
+    def _covering(self, image_ids: List[str], lat: float, lon: float) -> List[str]:
+        """Cenas de ``image_ids`` cujo footprint contem o ponto (ate _MAX_IMAGE_IDS)."""
+        return self._footprints.covering(lat, lon, image_ids)[:_MAX_IMAGE_IDS]
+
     def _resolve_active_image_ids(self) -> List[str]:
         """Coleta image_ids dos grupos de data expandidos na arvore.
 
@@ -148,7 +327,8 @@ class PixelInspectController(QObject):
             1. Grupos de data com isExpanded()=True → todas as camadas SatIrriga.
             2. Fallback: primeiro grupo de data encontrado (mais recente).
 
-        Deduplica preservando ordem; limita a _MAX_IMAGE_IDS por payload.
+        Deduplica preservando ordem. O limite de _MAX_IMAGE_IDS por payload
+        e aplicado depois do filtro por footprint (``_covering``).
         """
         root = QgsProject.instance().layerTreeRoot()
 
@@ -166,8 +346,6 @@ class PixelInspectController(QObject):
                 if img_id and img_id not in seen:
                     seen.add(img_id)
                     ids.append(img_id)
-                    if len(ids) >= _MAX_IMAGE_IDS:
-                        return ids
         return ids
 
     def _iter_date_groups(self, node):
@@ -194,7 +372,8 @@ class PixelInspectController(QObject):
                 for sub in child.children():
                     if isinstance(sub, QgsLayerTreeLayer):
                         layer = sub.layer()
-                        if layer and layer.customProperty(_IMAGE_ID_PROP):
+                        if layer and (layer.customProperty(_IMAGE_ID_PROP)
+                                      or layer.customProperty(_MOSAIC_IDS_PROP)):
                             return True
         return False
 
@@ -204,9 +383,12 @@ class PixelInspectController(QObject):
             layer = child.layer()
             if not layer:
                 continue
-            img_id = layer.customProperty(_IMAGE_ID_PROP)
-            if img_id and "-" not in img_id:  # ignora image_ids compostos (diff)
-                yield img_id
+            mosaic_ids = layer.customProperty(_MOSAIC_IDS_PROP)
+            img_ids = (json.loads(mosaic_ids) if mosaic_ids
+                       else [layer.customProperty(_IMAGE_ID_PROP)])
+            for img_id in img_ids:
+                if img_id and "-" not in img_id:  # ignora image_ids compostos (diff)
+                    yield img_id
 
     def _iter_layer_nodes(self, node):
         if isinstance(node, QgsLayerTreeLayer):
@@ -1,10 +1,20 @@
-"""Controller de series temporais — consulta API e emite resultados."""
+"""Controller de series temporais — consulta API e emite resultados.
+
+Resultados ficam no ``TimeSeriesCache`` por ponto (grade de ~11 m) e dia:
+cada consulta busca apenas as lacunas de cada ponto. Pontos com a mesma
+lacuna vao no mesmo POST (estender a data final de uma consulta gera um
+unico request curto; um ponto novo gera um request so para ele).
+"""
 
 import json
+import os
+import sqlite3
 
 from qgis.PyQt.QtCore import QObject, pyqtSignal
 from qgis.core import QgsMessageLog, Qgis
 
+from ...domain.models.timeseries import TimeSeriesResult
+from ...domain.services.timeseries_cache import TimeSeriesCache, snap_key
 from ...infra.config.settings import PLUGIN_NAME
 from ...infra.http.client import HttpClient
 
@@ -15,71 +25,152 @@ class TimeSeriesController(QObject):
     timeseries_data_ready = pyqtSignal(list)   # List[TimeSeriesResult]
     timeseries_error = pyqtSignal(str)         # mensagem de erro
 
-    def __init__(self, http_client: HttpClient, config_repo, parent=None):
+    def __init__(self, http_client: HttpClient, config_repo, cache_path=None,
+                 parent=None):
         super().__init__(parent)
         self._http = http_client
         self._config = config_repo
-        self._pending_id = None
+        self._cache = self._open_cache(cache_path)
+        # request_id -> (pontos, inicio, fim) da lacuna consultada
+        self._pending = {}
+        self._query = None   # (pontos, inicio, fim) da consulta em andamento
 
         self._http.request_finished.connect(self._on_request_finished)
         self._http.request_error.connect(self._on_request_error)
 
+    @staticmethod
+    def _open_cache(cache_path):
+        """Cache persistente em ``cache_path``; em memoria se indisponivel."""
+        if cache_path:
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                return TimeSeriesCache(cache_path)
+            except (OSError, sqlite3.Error) as e:
+                QgsMessageLog.logMessage(
+                    f"[TimeSeries] Cache em disco indisponivel: {e}",
+                    PLUGIN_NAME, Qgis.Warning,
+                )
+        return TimeSeriesCache()
+
+    def cleanup(self):
+        self._cancel_pending()
+        self._cache.close()
+
     def _api_url(self, path):
         base = self._config.get("api_base_url").rstrip("/")
         return f"{base}{path}"
 
     def fetch_timeseries(self, points, start_date, end_date):
-        """POST /api/timeseries/points com pontos e intervalo de datas.
+        """Serie dos pontos no intervalo, buscando na API so o que falta.
 
         Args:
             points: Lista de TimeSeriesPoint.
             start_date: Data inicial (YYYY-MM-DD).
             end_date: Data final (YYYY-MM-DD).
         """
-        url = self._api_url(
-            f"/timeseries/points?start_date={start_date}&end_date={end_date}"
-        )
-        payload = json.dumps({
-            "points": [
-                {"id": p.id, "color": p.color, "lon": p.lon, "lat": p.lat}
-                for p in points
-            ]
-        }).encode("utf-8")
-        self._pending_id = self._http.post_json(url, payload)
+        # Consulta anterior ainda em voo nao interessa mais
+        self._cancel_pending()
+        self._query = (list(points), start_date, end_date)
+
+        # Agrupa pontos pela mesma lacuna -> um POST por lacuna
+        by_gap = {}
+        for p in points:
+            for gap in self._cache.gaps(snap_key(p.lat, p.lon), start_date, end_date):
+                by_gap.setdefault(gap, []).append(p)
+
+        if not by_gap:
+            self._emit_results()
+            return
+
+        for (gap_start, gap_end), gap_points in by_gap.items():
+            url = self._api_url(
+                f"/timeseries/points?start_date={gap_start}&end_date={gap_end}"
+            )
+            payload = json.dumps({
+                "points": [
+                    {"id": p.id, "color": p.color, "lon": p.lon, "lat": p.lat}
+                    for p in gap_points
+                ]
+            }).encode("utf-8")
+            request_id = self._http.post_json(url, payload)
+            self._pending[request_id] = (gap_points, gap_start, gap_end)
         QgsMessageLog.logMessage(
-            f"[TimeSeries] Consultando {len(points)} ponto(s) "
-            f"de {start_date} a {end_date}",
+            f"[TimeSeries] Consultando {len(points)} ponto(s) de {start_date} "
+            f"a {end_date} ({len(by_gap)} lacuna(s) fora do cache)",
             PLUGIN_NAME, Qgis.Info,
         )
 
     def _on_request_finished(self, request_id, status_code, body):
-        if request_id != self._pending_id:
+        entry = self._pending.pop(request_id, None)
+        if entry is None:
             return
-        self._pending_id = None
+        gap_points, gap_start, gap_end = entry
         try:
-            from ...domain.models.timeseries import TimeSeriesResult
             data = json.loads(body)
             if not isinstance(data, list):
                 data = [data]
             results = [TimeSeriesResult.from_dict(item) for item in data]
-            self.timeseries_data_ready.emit(results)
-            QgsMessageLog.logMessage(
-                f"[TimeSeries] {len(results)} serie(s) recebida(s)",
-                PLUGIN_NAME, Qgis.Info,
-            )
         except Exception as e:
             QgsMessageLog.logMessage(
                 f"[TimeSeries] Erro ao parsear resposta: {e}",
                 PLUGIN_NAME, Qgis.Warning,
             )
-            self.timeseries_error.emit(str(e))
+            self._fail(str(e))
+            return
+
+        by_id = {p.id: p for p in gap_points}
+        for result in results:
+            point = by_id.get(result.id)
+            if point is None:
+                continue
+            self._cache.store(
+                snap_key(point.lat, point.lon), gap_start, gap_end, result.data,
+                label=result.label,
+            )
+        QgsMessageLog.logMessage(
+            f"[TimeSeries] {len(results)} serie(s) recebida(s) "
+            f"({gap_start} a {gap_end})",
+            PLUGIN_NAME, Qgis.Info,
+        )
+        if not self._pending:
+            self._emit_results()
 
     def _on_request_error(self, request_id, error_msg):
-        if request_id != self._pending_id:
+        if self._pending.pop(request_id, None) is None:
             return
-        self._pending_id = None
         QgsMessageLog.logMessage(
             f"[TimeSeries] Erro na requisição: {error_msg}",
             PLUGIN_NAME, Qgis.Warning,
         )
+        self._fail(error_msg)
+
+    def _emit_results(self):
+        """Monta a serie completa de cada ponto a partir do cache."""
+        points, start_date, end_date = self._query
+        self._query = None
+        results = [
+            TimeSeriesResult(
+                id=p.id,
+                label=self._cache.label(snap_key(p.lat, p.lon)),
+                color=p.color,
+                data=self._cache.dataset(
+                    snap_key(p.lat, p.lon), start_date, end_date,
+                ),
+            )
+            for p in points
+        ]
+        self.timeseries_data_ready.emit(results)
+
+    def _fail(self, error_msg):
+        # Lacunas que ja chegaram ficam no cache; o restante e descartado
+        self._cancel_pending()
         self.timeseries_error.emit(error_msg)
+
+    def _cancel_pending(self):
+        for request_id in list(self._pending):
+            try:
+                self._http.cancel(request_id)
+            except Exception:
+                pass
+        self._pending.clear()
+        self._query = None
@@ -0,0 +1,137 @@
+"""Modelo observavel dos GPKGs locais (QFileSystemWatcher + catalogo)."""
+
+import os
+
+from qgis.PyQt.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+from qgis.core import QgsMessageLog, Qgis
+
+from ...infra.config.settings import PLUGIN_NAME
+
+
+class LocalGpkgModel(QObject):
+    """Mantem ``{path: entry}`` dos GPKGs locais e emite eventos por entrada.
+
+    Alteracoes no disco (novos diretorios/arquivos, sidecar ou GPKG
+    regravado) chegam pelo ``QFileSystemWatcher``; sinais do plugin
+    (download, upload, edicao) chamam ``schedule_rescan``. Os eventos sao
+    agrupados por ``DEBOUNCE_MS`` e cada rescan usa o catalogo persistente
+    (``list_local_gpkgs``) no ``GpkgInspector``, emitindo apenas o que mudou.
+    Um rescan pedido com outro em andamento roda assim que o atual termina.
+    """
+
+    entries_reset = pyqtSignal(list)      # lista completa (base alterada)
+    entry_inserted = pyqtSignal(dict)     # entry
+    entry_updated = pyqtSignal(dict)      # entry
+    entry_removed = pyqtSignal(str)       # path
+
+    DEBOUNCE_MS = 300
+
+    def __init__(self, base_dir_provider, inspector, parent=None):
+        super().__init__(parent)
+        self._base_dir_provider = base_dir_provider
+        self._inspector = inspector
+        self._base_dir = None
+        self._entries = {}  # path -> entry
+        self._scanning = False
+        self._rescan_pending = False
+        self._inspector.inspection_failed.connect(self._on_inspection_failed)
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(lambda _p: self.schedule_rescan())
+        self._watcher.fileChanged.connect(lambda _p: self.schedule_rescan())
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(self.DEBOUNCE_MS)
+        self._debounce.timeout.connect(self.rescan)
+
+    @property
+    def entries(self) -> list:
+        return list(self._entries.values())
+
+    def schedule_rescan(self):
+        """Agenda um rescan (eventos em rajada viram um unico rescan)."""
+        self._debounce.start()
+
+    def rescan(self):
+        """Relista via catalogo (worker thread) e emite o que mudou."""
+        self._debounce.stop()
+        if self._scanning:
+            self._rescan_pending = True
+            return
+        self._scanning = True
+        self._rescan_pending = False
+        base_dir = self._base_dir_provider()
+        self._inspector.list_local(
+            base_dir, True,
+            on_done=lambda current: self._on_listing(base_dir, current),
+        )
+
+    def _on_listing(self, base_dir, current):
+        self._scanning = False
+        self._apply_listing(base_dir, current)
+        if self._rescan_pending:
+            self.rescan()
+
+    def _on_inspection_failed(self, kind, target, message):
+        if kind != "listing_counts" or not self._scanning:
+            return
+        QgsMessageLog.logMessage(
+            f"Erro ao listar GPKGs: {message}", PLUGIN_NAME, Qgis.Warning,
+        )
+        self._on_listing(target, [])
+
+    def _apply_listing(self, base_dir, current):
+        from ...domain.services.gpkg_catalog import diff_entries
+
+        if base_dir != self._base_dir:
+            self._base_dir = base_dir
+            self._entries = {e["path"]: e for e in current}
+            self._update_watches()
+            self.entries_reset.emit(current)
+            return
+
+        inserted, updated, removed = diff_entries(self._entries, current)
+        self._entries = {e["path"]: e for e in current}
+        # Arquivos substituidos (rename atomico) saem da lista do watcher
+        self._update_watches()
+        for path in removed:
+            self.entry_removed.emit(path)
+        for entry in updated:
+            self.entry_updated.emit(entry)
+        for entry in inserted:
+            self.entry_inserted.emit(entry)
+
+    def _update_watches(self):
+        """Observa a base, os diretorios ate cada GPKG, o GPKG e o sidecar."""
+        from ...domain.services.gpkg_service import sidecar_path
+
+        dirs, files = set(), set()
+        base = os.path.abspath(self._base_dir) if self._base_dir else None
+        if base and os.path.isdir(base):
+            dirs.add(base)
+        for path in self._entries:
+            files.add(path)
+            sc = sidecar_path(path)
+            if os.path.exists(sc):
+                files.add(sc)
+            folder = os.path.dirname(path)
+            while base and folder.startswith(base) and folder not in dirs:
+                dirs.add(folder)
+                folder = os.path.dirname(folder)
+
+        watched_dirs = set(self._watcher.directories())
+        watched_files = set(self._watcher.files())
+        stale = list((watched_dirs - dirs) | (watched_files - files))
+        if stale:
+            self._watcher.removePaths(stale)
+        new = list((dirs - watched_dirs) | (files - watched_files))
+        if new:
+            self._watcher.addPaths(new)
+
+    def cleanup(self):
+        self._debounce.stop()
+        self._rescan_pending = False
+        paths = self._watcher.directories() + self._watcher.files()
+        if paths:
+            self._watcher.removePaths(paths)
@@ -0,0 +1,292 @@
+"""Journal de alteracoes no proprio GPKG — triggers SQLite de sync.
+
+Triggers ``AFTER INSERT/UPDATE/DELETE`` na tabela do zonal mantem
+``_sync_status``/``_sync_timestamp`` e registram delecoes de features do
+servidor em ``_satirriga_tombstones``. O estado de sync passa a ser
+atualizado na mesma transacao da edicao, inclusive quando ela vem de fora
+do plugin (Processing, outra instancia do QGIS, ogr2ogr).
+
+Transicoes mantidas pelos triggers:
+  - INSERT com status NULL/vazio, ou sem ``_original_fid`` e status fora de
+    NEW/MODIFIED/UPLOADED/DELETED ("Remember values") -> NEW
+  - UPDATE de feature DOWNLOADED/UPLOADED que nao alterou os campos de
+    sync -> MODIFIED (o timestamp marca a primeira edicao desde o sync)
+  - DELETE de feature com ``_original_fid`` -> linha em ``_satirriga_tombstones``
+
+Atualizacoes feitas pelo proprio plugin (ex.: MODIFIED -> UPLOADED) alteram
+``_sync_status`` e por isso nao disparam o trigger de UPDATE.
+
+Outros tres triggers mantem ``_satirriga_sync_counts`` (features por
+``_sync_status``), lido por ``read_sync_counts`` sem varrer a camada.
+
+As tabelas auxiliares nao sao registradas em ``gpkg_contents`` (nao
+aparecem como camadas). Leitura via sqlite3; escrita via OGR, como o restante do
+plugin.
+"""
+
+from ..models.enums import SyncStatusEnum
+from .gpkg_service import fold_sync_counts, open_gpkg_readonly, sync_feature_tables
+
+TOMBSTONE_TABLE = "_satirriga_tombstones"
+COUNTS_TABLE = "_satirriga_sync_counts"
+
+# Colunas exigidas na tabela de features para instalar o journal
+JOURNAL_REQUIRED_FIELDS = frozenset({"_sync_status", "_sync_timestamp", "_original_fid"})
+
+_NOW_SQL = "strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')"
+
+
+def journal_trigger_names(table_name: str) -> list:
+    """Nomes dos triggers do journal para ``table_name``."""
+    return [
+        f"trg_{table_name}_sync_insert",
+        f"trg_{table_name}_sync_update",
+        f"trg_{table_name}_sync_delete",
+        f"trg_{table_name}_count_insert",
+        f"trg_{table_name}_count_update",
+        f"trg_{table_name}_count_delete",
+    ]
+
+
+def _count_delta_sql(table_name: str, status_expr: str, delta: str) -> str:
+    """Corpo de trigger que soma ``delta`` ao contador de ``status_expr``."""
+    key = f"COALESCE({status_expr}, '')"
+    return (
+        f'INSERT OR IGNORE INTO "{COUNTS_TABLE}" (table_name, status, n) '
+        f"VALUES ('{table_name}', {key}, 0); "
+        f'UPDATE "{COUNTS_TABLE}" SET n = n {delta} '
+        f"WHERE table_name = '{table_name}' AND status = {key};"
+    )
+
+
+def sync_counts_seed_statements(table_name: str) -> list:
+    """Recalcula os contadores de ``table_name`` com GROUP BY (idempotente)."""
+    return [
+        f'CREATE TABLE IF NOT EXISTS "{COUNTS_TABLE}" ('
+        "table_name TEXT NOT NULL, "
+        "status TEXT NOT NULL, "
+        "n INTEGER NOT NULL DEFAULT 0, "
+        "PRIMARY KEY (table_name, status))",
+        f'DELETE FROM "{COUNTS_TABLE}" WHERE table_name = \'{table_name}\'',
+        f'INSERT INTO "{COUNTS_TABLE}" (table_name, status, n) '
+        f"SELECT '{table_name}', COALESCE(\"_sync_status\", ''), COUNT(*) "
+        f'FROM "{table_name}" GROUP BY 2',
+    ]
+
+
+def change_journal_statements(table_name: str, migrate: bool = False) -> list:
+    """SQL (idempotente) que instala o journal em ``table_name``.
+
+    Com ``migrate=True``, move antes os tombstones legados (linhas sem
+    geometria com ``_sync_status = DELETED`` na propria tabela) para
+    ``_satirriga_tombstones``.
+    """
+    t = table_name
+    new = SyncStatusEnum.NEW.value
+    modified = SyncStatusEnum.MODIFIED.value
+    deleted = SyncStatusEnum.DELETED.value
+    tracked = ", ".join(
+        f"'{s.value}'" for s in (
+            SyncStatusEnum.NEW, SyncStatusEnum.MODIFIED,
+            SyncStatusEnum.UPLOADED, SyncStatusEnum.DELETED,
+        )
+    )
+    editable = ", ".join(
+        f"'{s.value}'" for s in (SyncStatusEnum.DOWNLOADED, SyncStatusEnum.UPLOADED)
+    )
+    (insert_trg, update_trg, delete_trg,
+     count_insert_trg, count_update_trg, count_delete_trg) = journal_trigger_names(t)
+
+    statements = [
+        f'CREATE TABLE IF NOT EXISTS "{TOMBSTONE_TABLE}" ('
+        "table_name TEXT NOT NULL, "
+        "original_fid INTEGER NOT NULL, "
+        "deleted_at TEXT, "
+        "PRIMARY KEY (table_name, original_fid))",
+    ]
+    if migrate:
+        statements += [
+            f'INSERT OR IGNORE INTO "{TOMBSTONE_TABLE}" '
+            "(table_name, original_fid, deleted_at) "
+            f"SELECT '{t}', \"_original_fid\", \"_sync_timestamp\" FROM \"{t}\" "
+            f"WHERE \"_sync_status\" = '{deleted}' "
+            "AND \"_original_fid\" IS NOT NULL AND \"_original_fid\" != 0",
+            f"DELETE FROM \"{t}\" WHERE \"_sync_status\" = '{deleted}'",
+        ]
+    statements += [
+        f'CREATE TRIGGER IF NOT EXISTS "{insert_trg}" AFTER INSERT ON "{t}" '
+        "WHEN NEW.\"_sync_status\" IS NULL OR NEW.\"_sync_status\" = '' "
+        "OR ((NEW.\"_original_fid\" IS NULL OR NEW.\"_original_fid\" = 0) "
+        f"AND NEW.\"_sync_status\" NOT IN ({tracked})) "
+        f"BEGIN UPDATE \"{t}\" SET \"_sync_status\" = '{new}', "
+        f"\"_sync_timestamp\" = {_NOW_SQL} WHERE rowid = NEW.rowid; END",
+
+        f'CREATE TRIGGER IF NOT EXISTS "{update_trg}" AFTER UPDATE ON "{t}" '
+        f"WHEN OLD.\"_sync_status\" IN ({editable}) "
+        "AND NEW.\"_sync_status\" IS OLD.\"_sync_status\" "
+        "AND NEW.\"_sync_timestamp\" IS OLD.\"_sync_timestamp\" "
+        f"BEGIN UPDATE \"{t}\" SET \"_sync_status\" = '{modified}', "
+        f"\"_sync_timestamp\" = {_NOW_SQL} WHERE rowid = NEW.rowid; END",
+
+        f'CREATE TRIGGER IF NOT EXISTS "{delete_trg}" AFTER DELETE ON "{t}" '
+        "WHEN OLD.\"_original_fid\" IS NOT NULL AND OLD.\"_original_fid\" != 0 "
+        f"AND OLD.\"_sync_status\" IS NOT '{deleted}' "
+        f"BEGIN INSERT OR REPLACE INTO \"{TOMBSTONE_TABLE}\" "
+        "(table_name, original_fid, deleted_at) "
+        f"VALUES ('{t}', OLD.\"_original_fid\", {_NOW_SQL}); END",
+    ]
+    # Contadores: semeados com o estado atual e mantidos pelos triggers.
+    # Cada ajuste garante a linha antes (ordem entre triggers nao importa).
+    statements += sync_counts_seed_statements(t)
+    inc_new = _count_delta_sql(t, 'NEW."_sync_status"', "+ 1")
+    dec_old = _count_delta_sql(t, 'OLD."_sync_status"', "- 1")
+    statements += [
+        f'CREATE TRIGGER IF NOT EXISTS "{count_insert_trg}" AFTER INSERT ON "{t}" '
+        f"BEGIN {inc_new} END",
+
+        f'CREATE TRIGGER IF NOT EXISTS "{count_update_trg}" '
+        f'AFTER UPDATE OF "_sync_status" ON "{t}" '
+        "WHEN NEW.\"_sync_status\" IS NOT OLD.\"_sync_status\" "
+        f"BEGIN {dec_old} {inc_new} END",
+
+        f'CREATE TRIGGER IF NOT EXISTS "{count_delete_trg}" AFTER DELETE ON "{t}" '
+        f"BEGIN {dec_old} END",
+    ]
+    return statements
+
+
+def _journal_state(gpkg_path_str: str):
+    """``(tabelas de sync, tabelas sem journal)``; ``([], [])`` se ilegivel."""
+    import sqlite3
+
+    conn = open_gpkg_readonly(gpkg_path_str)
+    if conn is None:
+        return [], []
+    try:
+        triggers = {
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+            )
+        }
+        tables = [
+            table for table, columns in sync_feature_tables(conn).items()
+            if JOURNAL_REQUIRED_FIELDS <= columns
+        ]
+    except sqlite3.Error:
+        return [], []
+    finally:
+        conn.close()
+    missing = [t for t in tables if not set(journal_trigger_names(t)) <= triggers]
+    return tables, missing
+
+
+def tables_missing_journal(gpkg_path_str: str) -> list:
+    """Tabelas de features com campos de sync ainda sem o journal completo."""
+    return _journal_state(gpkg_path_str)[1]
+
+
+def has_change_journal(gpkg_path_str: str) -> bool:
+    """True se todas as tabelas de sync do GPKG ja tem o journal instalado."""
+    tables, missing = _journal_state(gpkg_path_str)
+    return bool(tables) and not missing
+
+
+def install_change_journal(gpkg_path_str: str) -> int:
+    """Migra o GPKG para o journal (idempotente). Retorna tabelas migradas.
+
+    Tombstones legados sao movidos para ``_satirriga_tombstones`` na mesma
+    transacao que cria os triggers.
+    """
+    tables = tables_missing_journal(gpkg_path_str)
+    if not tables:
+        return 0
+
+    from osgeo import ogr
+
+    ds = ogr.Open(gpkg_path_str, 1)
+    if ds is None:
+        return 0
+    try:
+        ds.StartTransaction()
+        try:
+            for table in tables:
+                for stmt in change_journal_statements(table, migrate=True):
+                    ds.ExecuteSQL(stmt)
+        except Exception:
+            ds.RollbackTransaction()
+            raise
+        ds.CommitTransaction()
+    finally:
+        ds = None
+    return len(tables)
+
+
+def read_tombstones(gpkg_path_str: str, table_name: str = None) -> list:
+    """``[(original_fid, deleted_at)]`` pendentes de envio (ordem de delecao)."""
+    import sqlite3
+
+    conn = open_gpkg_readonly(gpkg_path_str)
+    if conn is None:
+        return []
+    try:
+        sql = f'SELECT original_fid, deleted_at FROM "{TOMBSTONE_TABLE}"'
+        params = ()
+        if table_name:
+            sql += " WHERE table_name = ?"
+            params = (table_name,)
+        return [tuple(row) for row in conn.execute(sql + " ORDER BY deleted_at", params)]
+    except sqlite3.Error:
+        # Tabela inexistente: GPKG sem journal
+        return []
+    finally:
+        conn.close()
+
+
+def read_sync_counts(gpkg_path_str: str):
+    """Contagem por status lida de ``_satirriga_sync_counts`` (sem varrer features).
+
+    Retorna None se o GPKG nao tem o journal completo (usar o ``GROUP BY``
+    de ``count_sync_status_grouped``).
+    """
+    import sqlite3
+
+    tables, missing = _journal_state(gpkg_path_str)
+    if not tables or missing:
+        return None
+    conn = open_gpkg_readonly(gpkg_path_str)
+    if conn is None:
+        return None
+    try:
+        placeholders = ",".join("?" for _ in tables)
+        rows = conn.execute(
+            f'SELECT status, n FROM "{COUNTS_TABLE}" '
+            f"WHERE table_name IN ({placeholders})",
+            tables,
+        ).fetchall()
+        tombstones = conn.execute(
+            f'SELECT COUNT(*) FROM "{TOMBSTONE_TABLE}"'
+        ).fetchone()[0]
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+    return fold_sync_counts(rows, tombstones)
+
+
+def rebuild_sync_counts(gpkg_path_str: str):
+    """Recalcula ``_satirriga_sync_counts`` a partir das features (via OGR)."""
+    tables, _ = _journal_state(gpkg_path_str)
+    if not tables:
+        return
+
+    from osgeo import ogr
+
+    ds = ogr.Open(gpkg_path_str, 1)
+    if ds is None:
+        return
+    try:
+        for table in tables:
+            for stmt in sync_counts_seed_statements(table):
+                ds.ExecuteSQL(stmt)
+    finally:
+        ds = None
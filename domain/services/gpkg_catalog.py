@@ -0,0 +1,282 @@
+"""Indice persistente dos GPKGs locais (SQLite na pasta base).
+
+O banco fica em ``{base}/.satirriga_index/catalog.sqlite``: o journal do
+SQLite cria/remove arquivos a cada escrita, e mante-lo num subdiretorio
+proprio (ignorado na descoberta) preserva o mtime da pasta base.
+
+Substitui a varredura ``rglob`` + leitura de todos os sidecars a cada
+listagem. Guarda, por diretorio, a listagem (subdiretorios e ``.gpkg``)
+validada pelo mtime do diretorio, e por GPKG a entrada de
+``build_gpkg_entry`` e as contagens de sync, validadas pelo mtime/tamanho
+do arquivo, do sidecar e do ``-wal``. Um mtime muito recente (mesmo
+segundo da leitura) nao e cacheado — em sistemas de arquivos de rede a
+resolucao do mtime e grosseira e uma escrita logo apos a leitura passaria
+despercebida.
+
+Tasks de download/upload atualizam o indice diretamente (``update``) ao
+gravar um GPKG; o restante e detectado pela diferenca de mtime.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+from .gpkg_service import (
+    build_gpkg_entry, count_features_by_sync_status, sidecar_path,
+)
+
+CATALOG_DIRNAME = ".satirriga_index"
+CATALOG_FILENAME = "catalog.sqlite"
+SCHEMA_VERSION = 1
+
+# mtimes mais novos que isto (ns) nao sao considerados estaveis
+_RACY_WINDOW_NS = 2_000_000_000
+
+# Conexoes sao abertas por operacao (main thread e worker threads); o lock
+# serializa as escritas do proprio processo
+_lock = threading.Lock()
+
+
+def _stat_key(path: str):
+    """``(mtime_ns, size)`` ou None se o arquivo nao existe."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _stable(mtime_ns: int) -> bool:
+    return time.time_ns() - mtime_ns > _RACY_WINDOW_NS
+
+
+class GpkgCatalog:
+    """Catalogo dos GPKGs sob ``base_dir`` persistido em ``CATALOG_FILENAME``."""
+
+    def __init__(self, base_dir: str):
+        self._base = os.path.abspath(base_dir)
+        self._db_path = os.path.join(self._base, CATALOG_DIRNAME, CATALOG_FILENAME)
+
+    @classmethod
+    def for_gpkg(cls, gpkg_path: str):
+        """Catalogo existente que cobre ``gpkg_path`` (ate 3 niveis acima) ou None."""
+        folder = os.path.dirname(os.path.abspath(gpkg_path))
+        for _ in range(4):
+            if os.path.exists(os.path.join(folder, CATALOG_DIRNAME, CATALOG_FILENAME)):
+                return cls(folder)
+            parent = os.path.dirname(folder)
+            if parent == folder:
+                break
+            folder = parent
+        return None
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def entries(self, with_sync_counts: bool = False) -> list:
+        """Entradas no formato de ``list_local_gpkgs`` (revalidadas por mtime)."""
+        with _lock, closing(self._connect()) as conn:
+            paths = self._discover(conn)
+            cached = {
+                row[0]: row for row in conn.execute(
+                    "SELECT path, file_key, sidecar_key, entry, counts_key, counts "
+                    "FROM gpkgs"
+                )
+            }
+            result = []
+            for path in paths:
+                entry = self._refresh_one(conn, path, cached.get(path), with_sync_counts)
+                if entry is not None:
+                    result.append(entry)
+
+            stale = set(cached) - set(paths)
+            conn.executemany("DELETE FROM gpkgs WHERE path = ?", [(p,) for p in stale])
+            conn.commit()
+        return result
+
+    # ------------------------------------------------------------------
+    # Atualizacao direta (tasks)
+    # ------------------------------------------------------------------
+
+    def update(self, gpkg_path: str, with_sync_counts: bool = True):
+        """Reindexa um GPKG recem-gravado e invalida a listagem dos diretorios acima."""
+        path = os.path.abspath(gpkg_path)
+        with _lock, closing(self._connect()) as conn:
+            self._invalidate_dirs(conn, path)
+            entry = self._refresh_one(conn, path, None, with_sync_counts)
+            conn.commit()
+        return entry
+
+    def remove(self, gpkg_path: str):
+        """Remove um GPKG do indice (arquivo apagado pelo plugin)."""
+        path = os.path.abspath(gpkg_path)
+        with _lock, closing(self._connect()) as conn:
+            conn.execute("DELETE FROM gpkgs WHERE path = ?", (path,))
+            self._invalidate_dirs(conn, path)
+            conn.commit()
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self._db_path), exist_ok=True)
+        conn = sqlite3.connect(self._db_path, timeout=5)
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        except sqlite3.DatabaseError:
+            # Indice corrompido: e apenas cache, recria do zero
+            conn.close()
+            os.remove(self._db_path)
+            conn = sqlite3.connect(self._db_path, timeout=5)
+            version = 0
+        if version != SCHEMA_VERSION:
+            conn.executescript(
+                "DROP TABLE IF EXISTS dirs;"
+                "DROP TABLE IF EXISTS gpkgs;"
+                "CREATE TABLE dirs (path TEXT PRIMARY KEY, mtime_ns INTEGER, "
+                "subdirs TEXT, gpkgs TEXT);"
+                "CREATE TABLE gpkgs (path TEXT PRIMARY KEY, file_key TEXT, "
+                "sidecar_key TEXT, entry TEXT, counts_key TEXT, counts TEXT);"
+                f"PRAGMA user_version = {SCHEMA_VERSION};"
+            )
+        return conn
+
+    def _discover(self, conn) -> list:
+        """Caminhos dos ``.gpkg`` sob a base, relistando so diretorios alterados."""
+        cached = {
+            row[0]: row[1:] for row in conn.execute(
+                "SELECT path, mtime_ns, subdirs, gpkgs FROM dirs"
+            )
+        }
+        found, visited = [], set()
+        stack = [self._base]
+        while stack:
+            folder = stack.pop()
+            try:
+                mtime_ns = os.stat(folder).st_mtime_ns
+            except OSError:
+                continue
+            visited.add(folder)
+
+            row = cached.get(folder)
+            if row is not None and row[0] == mtime_ns:
+                subdirs, gpkgs = json.loads(row[1]), json.loads(row[2])
+            else:
+                subdirs, gpkgs = [], []
+                try:
+                    with os.scandir(folder) as it:
+                        for item in it:
+                            if item.is_dir():
+                                if item.name != CATALOG_DIRNAME:
+                                    subdirs.append(item.name)
+                            elif item.name.endswith(".gpkg") and item.is_file():
+                                gpkgs.append(item.name)
+                except OSError:
+                    continue
+                conn.execute(
+                    "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?)",
+                    (folder, mtime_ns if _stable(mtime_ns) else -1,
+                     json.dumps(sorted(subdirs)), json.dumps(sorted(gpkgs))),
+                )
+
+            found.extend(os.path.join(folder, name) for name in gpkgs)
+            stack.extend(os.path.join(folder, name) for name in subdirs)
+
+        stale = set(cached) - visited
+        conn.executemany("DELETE FROM dirs WHERE path = ?", [(p,) for p in stale])
+        return sorted(found)
+
+    def _invalidate_dirs(self, conn, path: str):
+        folder = os.path.dirname(path)
+        while folder.startswith(self._base):
+            conn.execute("DELETE FROM dirs WHERE path = ?", (folder,))
+            parent = os.path.dirname(folder)
+            if parent == folder:
+                break
+            folder = parent
+
+    def _refresh_one(self, conn, path, row, with_sync_counts):
+        file_key = _stat_key(path)
+        if file_key is None:
+            conn.execute("DELETE FROM gpkgs WHERE path = ?", (path,))
+            return None
+        sc_key = _stat_key(sidecar_path(path))
+        file_key_s = json.dumps(file_key)
+        sc_key_s = json.dumps(sc_key)
+
+        if row is not None and row[1] == file_key_s and row[2] == sc_key_s:
+            entry = json.loads(row[3])
+        else:
+            entry = build_gpkg_entry(path)
+            stable = _stable(file_key[0]) and (sc_key is None or _stable(sc_key[0]))
+            conn.execute(
+                "INSERT OR REPLACE INTO gpkgs (path, file_key, sidecar_key, entry) "
+                "VALUES (?, ?, ?, ?)",
+                (path, file_key_s if stable else "", sc_key_s, json.dumps(entry)),
+            )
+            row = None
+
+        if with_sync_counts:
+            # Edicoes em modo WAL alteram apenas o -wal ate o checkpoint
+            wal_key = _stat_key(path + "-wal")
+            counts_key = json.dumps([file_key, wal_key])
+            if row is not None and row[4] == counts_key:
+                counts = json.loads(row[5])
+            else:
+                counts = count_features_by_sync_status(path)
+                stable = _stable(file_key[0]) and (wal_key is None or _stable(wal_key[0]))
+                conn.execute(
+                    "UPDATE gpkgs SET counts_key = ?, counts = ? WHERE path = ?",
+                    (counts_key if stable else "", json.dumps(counts), path),
+                )
+            entry["sync_counts"] = counts
+        return entry
+
+
+def index_gpkg(gpkg_path: str, with_sync_counts: bool = True):
+    """Atualiza a entrada de ``gpkg_path`` no catalogo que o cobre (se houver).
+
+    Chamado pelas tasks apos gravar GPKG/sidecar. Falhas sao ignoradas: o
+    indice se corrige pela diferenca de mtime na proxima listagem.
+    """
+    try:
+        catalog = GpkgCatalog.for_gpkg(gpkg_path)
+        if catalog is not None:
+            catalog.update(gpkg_path, with_sync_counts=with_sync_counts)
+    except (OSError, sqlite3.Error):
+        pass
+
+
+def unindex_gpkg(gpkg_path: str):
+    """Remove ``gpkg_path`` do catalogo que o cobre (se houver)."""
+    try:
+        catalog = GpkgCatalog.for_gpkg(gpkg_path)
+        if catalog is not None:
+            catalog.remove(gpkg_path)
+    except (OSError, sqlite3.Error):
+        pass
+
+
+def diff_entries(previous: dict, current: list):
+    """Compara ``{path: entry}`` anterior com a listagem atual.
+
+    Retorna ``(inseridas, alteradas, removidas)`` — listas de entradas para
+    as duas primeiras e de caminhos para a ultima, na ordem de ``current``.
+    """
+    inserted, updated = [], []
+    seen = set()
+    for entry in current:
+        path = entry["path"]
+        seen.add(path)
+        old = previous.get(path)
+        if old is None:
+            inserted.append(entry)
+        elif old != entry:
+            updated.append(entry)
+    removed = [path for path in previous if path not in seen]
+    return inserted, updated, removed
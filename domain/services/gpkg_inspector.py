@@ -0,0 +1,206 @@
+"""Inspecao somente-leitura de GPKGs locais fora da main thread.
+
+Listagem (catalogo), contagens de sync, sidecar e versao do schema eram
+lidas de forma sincrona nos slots da UI. ``GpkgInspector`` agenda essas
+leituras num pool de threads (``WorkerPool``, injetado) e entrega o
+resultado por signal na main thread. As funcoes executadas usam apenas
+sqlite3/json/os — nenhum ``QgsVectorLayer`` —, seguras fora da main thread.
+
+Pedidos concorrentes para o mesmo alvo (dois cards pedindo o sidecar do
+mesmo GPKG, rescans em rajada da mesma pasta) sao agrupados: um unico job
+roda e todos os callbacks recebem o mesmo resultado — ou, se a leitura
+falhar, todos os ``on_error`` recebem a mesma mensagem.
+"""
+
+import os
+from datetime import datetime, timezone
+
+from qgis.PyQt.QtCore import QObject, pyqtSignal
+
+from .gpkg_service import (
+    count_features_by_sync_status, detect_gpkg_version, list_local_gpkgs,
+    read_sidecar,
+)
+
+
+class RequestCoalescer:
+    """Agrupa callbacks de pedidos concorrentes por chave (sem dependencia Qt)."""
+
+    def __init__(self):
+        self._waiting = {}  # chave -> [(callback, on_error)]
+
+    def add(self, key, callback=None, on_error=None) -> bool:
+        """Registra o pedido; True se nao havia job em andamento para a chave."""
+        first = key not in self._waiting
+        self._waiting.setdefault(key, []).append((callback, on_error))
+        return first
+
+    def resolve(self, key) -> list:
+        """Encerra a chave e retorna os callbacks que aguardavam o resultado."""
+        return [cb for cb, _err in self._waiting.pop(key, []) if cb is not None]
+
+    def reject(self, key) -> list:
+        """Encerra a chave e retorna os ``on_error`` dos pedidos agrupados."""
+        return [err for _cb, err in self._waiting.pop(key, []) if err is not None]
+
+    def is_pending(self, key) -> bool:
+        return key in self._waiting
+
+    def clear(self):
+        self._waiting.clear()
+
+
+def local_gpkg_status(gpkg_path_str: str) -> dict:
+    """Estado local de um GPKG para os cards: existencia, tamanho e sidecar."""
+    try:
+        size = os.path.getsize(gpkg_path_str)
+    except OSError:
+        return {"exists": False}
+    return {
+        "exists": True,
+        "size_bytes": size,
+        "sidecar": read_sidecar(gpkg_path_str),
+    }
+
+
+def expiring_edit_tokens(base_dir: str, threshold_hours: float = 24, now=None) -> list:
+    """``[(zonal_id, edit_token, gpkg_path)]`` com editToken vencendo em breve.
+
+    Usa o ``expires_at`` indexado no catalogo para ler o sidecar somente
+    dos candidatos. Tokens ja vencidos nao entram (renovacao nao se aplica).
+    """
+    if not os.path.isdir(base_dir):
+        return []
+    now = now or datetime.now(timezone.utc)
+    candidates = []
+    for entry in list_local_gpkgs(base_dir):
+        if entry.get("type") != "v2":
+            continue
+        indexed_exp = entry.get("expires_at")
+        if indexed_exp:
+            try:
+                exp_dt = datetime.fromisoformat(indexed_exp.replace("Z", "+00:00"))
+                if (exp_dt - now).total_seconds() / 3600 >= threshold_hours:
+                    continue
+            except (ValueError, TypeError, AttributeError):
+                pass
+        gpkg = entry["path"]
+        try:
+            sidecar = read_sidecar(gpkg)
+            expires_at = sidecar.get("expiresAt")
+            edit_token = sidecar.get("editToken")
+            zonal_id = sidecar.get("zonalId")
+            if not expires_at or not edit_token or not zonal_id:
+                continue
+            exp_dt = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
+            remaining = (exp_dt - now).total_seconds() / 3600
+            if 0 < remaining < threshold_hours:
+                candidates.append((zonal_id, edit_token, gpkg))
+        except (ValueError, TypeError, OSError):
+            continue
+    return candidates
+
+
+class GpkgInspector(QObject):
+    """Leituras de GPKG em worker threads, com deduplicacao por caminho.
+
+    ``pool`` segue a interface de ``WorkerPool``:
+    ``submit(fn, *args, on_done=..., on_error=...)`` com callbacks na main
+    thread. Cada resultado e emitido no signal do tipo e repassado aos
+    ``on_done`` de todos os pedidos agrupados; falhas vao para
+    ``inspection_failed`` e para os ``on_error`` (mensagem).
+    """
+
+    listing_ready = pyqtSignal(str, list)         # base_dir, entradas
+    sync_counts_ready = pyqtSignal(str, dict)     # gpkg_path, contagens
+    sidecar_ready = pyqtSignal(str, dict)         # gpkg_path, sidecar
+    local_status_ready = pyqtSignal(str, dict)    # gpkg_path, estado local
+    version_ready = pyqtSignal(str, int)          # gpkg_path, versao
+    inspection_failed = pyqtSignal(str, str, str)  # tipo, alvo, mensagem
+
+    def __init__(self, pool, parent=None):
+        super().__init__(parent)
+        self._pool = pool
+        self._coalescer = RequestCoalescer()
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def list_local(self, base_dir: str, with_sync_counts: bool = True,
+                   on_done=None, on_error=None):
+        """Lista os GPKGs de ``base_dir`` (catalogo persistente)."""
+        kind = "listing_counts" if with_sync_counts else "listing"
+        self._request(
+            kind, base_dir, self.listing_ready,
+            list_local_gpkgs, (base_dir, with_sync_counts), on_done, on_error,
+        )
+
+    def sync_counts(self, gpkg_path: str, verify: bool = False,
+                    on_done=None, on_error=None):
+        """Contagens por ``_sync_status`` (contadores do journal ou GROUP BY)."""
+        kind = "sync_counts_verify" if verify else "sync_counts"
+        self._request(
+            kind, gpkg_path, self.sync_counts_ready,
+            count_features_by_sync_status, (gpkg_path, verify), on_done, on_error,
+        )
+
+    def sidecar(self, gpkg_path: str, on_done=None, on_error=None):
+        """Conteudo do sidecar ``.satirriga.json`` ({} se ausente)."""
+        self._request(
+            "sidecar", gpkg_path, self.sidecar_ready,
+            read_sidecar, (gpkg_path,), on_done, on_error,
+        )
+
+    def local_status(self, gpkg_path: str, on_done=None, on_error=None):
+        """Existencia, tamanho e sidecar do GPKG (ver ``local_gpkg_status``)."""
+        self._request(
+            "local_status", gpkg_path, self.local_status_ready,
+            local_gpkg_status, (gpkg_path,), on_done, on_error,
+        )
+
+    def version(self, gpkg_path: str, on_done=None, on_error=None):
+        """Versao do schema (``detect_gpkg_version``)."""
+        self._request(
+            "version", gpkg_path, self.version_ready,
+            detect_gpkg_version, (gpkg_path,), on_done, on_error,
+        )
+
+    def run(self, kind: str, target: str, fn, *args, on_done=None, on_error=None):
+        """Executa ``fn(*args)`` somente-leitura, agrupado por ``(kind, target)``."""
+        self._request(kind, target, None, fn, args, on_done, on_error)
+
+    def is_pending(self, kind: str, target: str) -> bool:
+        return self._coalescer.is_pending((kind, target))
+
+    def shutdown(self):
+        """Descarta pedidos pendentes e encerra o pool (unload do plugin)."""
+        self._coalescer.clear()
+        self._pool.shutdown()
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _request(self, kind, target, signal, fn, args, on_done, on_error=None):
+        key = (kind, target)
+        if not self._coalescer.add(key, on_done, on_error):
+            return  # job identico em andamento: aguarda o mesmo resultado
+        self._pool.submit(
+            fn, *args,
+            on_done=lambda result: self._finish(key, signal, result),
+            on_error=lambda msg: self._fail(key, msg),
+        )
+
+    def _finish(self, key, signal, result):
+        callbacks = self._coalescer.resolve(key)
+        if signal is not None:
+            signal.emit(key[1], result)
+        for callback in callbacks:
+            callback(result)
+
+    def _fail(self, key, message):
+        errbacks = self._coalescer.reject(key)
+        self.inspection_failed.emit(key[0], key[1], message)
+        for errback in errbacks:
+            errback(message)
@@ -1,12 +1,12 @@
 """Servico de GeoPackage — paths, nomes, schema de sync."""
 
-import json
 import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
-from qgis.core import QgsApplication
-
 from ..models.enums import SyncStatusEnum, DownloadOrigin
+from .sidecar_repository import SidecarRepository
 
 # Campos adicionais de controle de sync inseridos no GPKG local (V1)
 SYNC_FIELDS = [
@@ -27,12 +27,27 @@ SYNC_FIELDS_V2 = [
 ]
 
 SIDECAR_FILENAME = ".satirriga.json"
+# Tabela local de indices espectrais por feicao (extracao em lote)
+INDICES_FILENAME = "satirriga_indices.sqlite"
+
+# Campos de sync usados em filtros (deteccao de NEW, contagens) — indexados
+SYNC_INDEXED_FIELDS = ("_sync_status", "_original_fid")
+
+# Sidecars compartilhados por main thread, worker pool e tasks
+_sidecars = SidecarRepository()
+
+# Memo de detect_gpkg_version: path -> ((mtime_ns, size), versao)
+_VERSION_CACHE_SIZE = 512
+_version_cache = OrderedDict()
+_version_lock = threading.Lock()
 
 
 def gpkg_base_dir(configured_dir: str = "") -> str:
     """Retorna diretorio base para GPKGs. Usa configurado ou fallback."""
     if configured_dir and os.path.isdir(configured_dir):
         return configured_dir
+    from qgis.core import QgsApplication
+
     default = os.path.join(
         QgsApplication.qgisSettingsDirPath(), "satirriga_data"
     )
@@ -76,41 +91,335 @@ def sidecar_path(gpkg_path_str: str) -> str:
     return os.path.join(os.path.dirname(gpkg_path_str), SIDECAR_FILENAME)
 
 
+def indices_path(gpkg_path_str: str) -> str:
+    """Retorna caminho da tabela de indices extraidos ao lado do GPKG."""
+    return os.path.join(os.path.dirname(gpkg_path_str), INDICES_FILENAME)
+
+
 def write_sidecar(gpkg_path_str: str, data: dict):
-    """Grava JSON de metadados de checkout ao lado do GPKG."""
-    path = sidecar_path(gpkg_path_str)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    """Grava JSON de metadados de checkout ao lado do GPKG (atomico)."""
+    _sidecars.write(sidecar_path(gpkg_path_str), data)
+
+
+def update_sidecar(gpkg_path_str: str, changes: dict) -> dict:
+    """Mescla ``changes`` no sidecar e grava; retorna o conteudo resultante.
+
+    Preferir a ``read_sidecar`` + ``write_sidecar`` quando apenas alguns
+    campos mudam: atualizacoes concorrentes nao se sobrescrevem.
+    """
+    return _sidecars.update(sidecar_path(gpkg_path_str), changes)
 
 
 def read_sidecar(gpkg_path_str: str) -> dict:
-    """Le JSON do sidecar. Retorna {} se inexistente."""
-    path = sidecar_path(gpkg_path_str)
-    if not os.path.exists(path):
-        return {}
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError):
-        return {}
+    """Le JSON do sidecar (cache validado por mtime). Retorna {} se inexistente."""
+    return _sidecars.read(sidecar_path(gpkg_path_str))
 
 
 def detect_gpkg_version(gpkg_path_str: str) -> int:
-    """Detecta versao do GPKG: 2 (zonal), 1 (mapeamento), 0 (desconhecido)."""
-    from qgis.core import QgsVectorLayer
+    """Detecta versao do GPKG: 2 (zonal), 1 (mapeamento), 0 (desconhecido).
 
-    layer = QgsVectorLayer(gpkg_path_str, "detect_version", "ogr")
-    if not layer.isValid():
+    Le apenas o schema (``gpkg_contents`` + ``PRAGMA table_info``) via
+    sqlite3 — seguro fora da main thread, sem instanciar provider OGR. O
+    resultado e memoizado por ``(path, mtime_ns, size)``: chamadas repetidas
+    custam um ``stat``.
+    """
+    try:
+        st = os.stat(gpkg_path_str)
+    except OSError:
+        return 0
+    key = os.path.abspath(gpkg_path_str)
+    stat_key = (st.st_mtime_ns, st.st_size)
+    with _version_lock:
+        cached = _version_cache.get(key)
+        if cached is not None and cached[0] == stat_key:
+            _version_cache.move_to_end(key)
+            return cached[1]
+
+    version = _read_gpkg_version(gpkg_path_str)
+    with _version_lock:
+        _version_cache[key] = (stat_key, version)
+        _version_cache.move_to_end(key)
+        while len(_version_cache) > _VERSION_CACHE_SIZE:
+            _version_cache.popitem(last=False)
+    return version
+
+
+def detect_gpkg_versions(paths) -> dict:
+    """``{path: versao}`` para varios GPKGs (ver ``detect_gpkg_version``)."""
+    return {path: detect_gpkg_version(path) for path in paths}
+
+
+def _read_gpkg_version(gpkg_path_str: str) -> int:
+    import sqlite3
+    from contextlib import closing
+
+    conn = open_gpkg_readonly(gpkg_path_str)
+    if conn is None:
+        return 0
+    try:
+        with closing(conn):
+            tables = [
+                row[0] for row in conn.execute(
+                    "SELECT table_name FROM gpkg_contents "
+                    "WHERE data_type = 'features'"
+                )
+            ]
+            for table in tables:
+                quoted = table.replace('"', '""')
+                columns = {
+                    row[1] for row in conn.execute(f'PRAGMA table_info("{quoted}")')
+                }
+                if "_zonal_id" in columns:
+                    return 2
+                if "_mapeamento_id" in columns:
+                    return 1
+    except sqlite3.Error:
         return 0
-
-    field_names = [f.name() for f in layer.fields()]
-    if "_zonal_id" in field_names:
-        return 2
-    if "_mapeamento_id" in field_names:
-        return 1
     return 0
 
 
+# Status de features ja rastreadas (nao sao "novas" mesmo sem _original_fid)
+_TRACKED_STATUSES = (
+    SyncStatusEnum.NEW.value,
+    SyncStatusEnum.MODIFIED.value,
+    SyncStatusEnum.UPLOADED.value,
+)
+
+
+def new_feature_filter_expression(has_original_fid: bool = True) -> str:
+    """Expressao QGIS com as candidatas a feature nova (ver ``is_new_feature``).
+
+    ``_sync_status`` NULL/vazio ou sem ``_original_fid``: cada termo do OR
+    e atendido por um dos indices de ``ensure_sync_indexes`` (compilada
+    pelo provider OGR em SQL, o plano e MULTI-INDEX OR, sem varredura). O
+    filtro por status ja rastreado fica para ``is_new_feature``, sobre as
+    poucas candidatas. Sem ``_original_fid`` (schema V1 antigo) nao ha
+    termo indexavel para o status fora de NEW/MODIFIED/UPLOADED.
+    """
+    status_null = "\"_sync_status\" IS NULL OR \"_sync_status\" = ''"
+    if not has_original_fid:
+        tracked = ", ".join(f"'{s}'" for s in _TRACKED_STATUSES)
+        return f"{status_null} OR \"_sync_status\" NOT IN ({tracked})"
+    return (
+        f"{status_null} OR \"_original_fid\" IS NULL OR \"_original_fid\" = 0"
+    )
+
+
+def is_new_feature(sync_status, original_fid) -> bool:
+    """Criterio de feature nova de ``MapeamentoController._mark_edited_features``.
+
+    ``_sync_status`` NULL/vazio, ou sem ``_original_fid`` e com status fora
+    de NEW/MODIFIED/UPLOADED ("Remember values" do QGIS).
+    """
+    return not sync_status or (
+        not original_fid and sync_status not in _TRACKED_STATUSES
+    )
+
+
+def sync_index_statements(table_name: str) -> list:
+    """CREATE INDEX (idempotente) dos campos de sync para uma tabela do GPKG."""
+    return [
+        f'CREATE INDEX IF NOT EXISTS "idx_{table_name}{field}" '
+        f'ON "{table_name}" ("{field}")'
+        for field in SYNC_INDEXED_FIELDS
+    ]
+
+
+def open_gpkg_readonly(gpkg_path_str: str):
+    """Conexao sqlite3 somente leitura ao GPKG; None se ausente/ilegivel.
+
+    Apenas para leitura — escritas passam pelo OGR (triggers de rtree do
+    GPKG dependem de funcoes ST_* registradas pelo GDAL).
+    """
+    import sqlite3
+
+    if not os.path.exists(gpkg_path_str):
+        return None
+    try:
+        return sqlite3.connect(
+            f"{Path(gpkg_path_str).resolve().as_uri()}?mode=ro", uri=True,
+        )
+    except sqlite3.Error:
+        return None
+
+
+def sync_feature_tables(conn) -> dict:
+    """``{tabela: colunas}`` das tabelas de features que possuem ``_sync_status``."""
+    result = {}
+    tables = [
+        row[0] for row in conn.execute(
+            "SELECT table_name FROM gpkg_contents WHERE data_type = 'features'"
+        )
+    ]
+    for table in tables:
+        columns = {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+        if "_sync_status" in columns:
+            result[table] = columns
+    return result
+
+
+def missing_sync_indexes(gpkg_path_str: str) -> list:
+    """Statements de indices de sync ainda ausentes no GPKG (leitura via sqlite3).
+
+    Considera apenas tabelas de features que possuem os campos de sync.
+    """
+    import sqlite3
+
+    conn = open_gpkg_readonly(gpkg_path_str)
+    if conn is None:
+        return []
+    try:
+        existing = {
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+        }
+        statements = []
+        for table, columns in sync_feature_tables(conn).items():
+            for field, stmt in zip(SYNC_INDEXED_FIELDS, sync_index_statements(table)):
+                if field in columns and f"idx_{table}{field}" not in existing:
+                    statements.append(stmt)
+        return statements
+    except sqlite3.Error:
+        return []
+    finally:
+        conn.close()
+
+
+def ensure_sync_indexes(gpkg_path_str: str) -> int:
+    """Cria indices de ``_sync_status``/``_original_fid`` ausentes. Retorna quantos.
+
+    GPKGs baixados a partir desta versao ja vem indexados (DownloadZonalTask);
+    aqui cobre arquivos antigos. Escrita via OGR, como o restante do plugin.
+    """
+    statements = missing_sync_indexes(gpkg_path_str)
+    if not statements:
+        return 0
+
+    from osgeo import ogr
+
+    ds = ogr.Open(gpkg_path_str, 1)
+    if ds is None:
+        return 0
+    try:
+        for stmt in statements:
+            ds.ExecuteSQL(stmt)
+    finally:
+        ds = None
+    return len(statements)
+
+
+# Linhas por comando nas transicoes pos-upload (limite de termos do SQLite)
+_MARK_CHUNK = 200
+
+
+def _sql_text(value) -> str:
+    """Literal SQL de texto (ou NULL) para comandos via ``ExecuteSQL``."""
+    if value is None:
+        return "NULL"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def mark_uploaded_statements(table_name: str, timestamp: str, features=(),
+                             deleted_fids=(), tombstone_fids=None,
+                             fid_column: str = "fid") -> list:
+    """SQL da transicao pos-upload restrita ao que foi exportado.
+
+    ``features`` e ``[(fid, _sync_timestamp)]`` das feicoes MODIFIED/NEW
+    enviadas: so passam a UPLOADED se nao foram editadas depois do export
+    (timestamp igual). ``deleted_fids`` sao as linhas DELETED legadas
+    enviadas e ``tombstone_fids`` os ``original_fid`` dos tombstones do
+    journal enviados (None se o GPKG nao tem journal). Edicoes e delecoes
+    feitas durante o upload continuam pendentes.
+    """
+    features = list(features)
+    deleted_fids = [int(f) for f in deleted_fids]
+    tombstone_fids = [int(f) for f in tombstone_fids or ()]
+    statements = []
+    for i in range(0, len(features), _MARK_CHUNK):
+        match = " OR ".join(
+            f'("{fid_column}" = {int(fid)} AND "_sync_timestamp" IS {_sql_text(ts)})'
+            for fid, ts in features[i:i + _MARK_CHUNK]
+        )
+        statements.append(
+            f'UPDATE "{table_name}" SET "_sync_status" = '
+            f"'{SyncStatusEnum.UPLOADED.value}', \"_sync_timestamp\" = '{timestamp}' "
+            f"WHERE \"_sync_status\" IN ('{SyncStatusEnum.MODIFIED.value}', "
+            f"'{SyncStatusEnum.NEW.value}') AND ({match})"
+        )
+    # Tombstones legados (linhas DELETED) ja processados pelo servidor
+    for i in range(0, len(deleted_fids), _MARK_CHUNK):
+        fids = ", ".join(str(f) for f in deleted_fids[i:i + _MARK_CHUNK])
+        statements.append(
+            f'DELETE FROM "{table_name}" WHERE "_sync_status" = '
+            f"'{SyncStatusEnum.DELETED.value}' AND \"{fid_column}\" IN ({fids})"
+        )
+    for i in range(0, len(tombstone_fids), _MARK_CHUNK):
+        fids = ", ".join(str(f) for f in tombstone_fids[i:i + _MARK_CHUNK])
+        statements.append(
+            'DELETE FROM "_satirriga_tombstones" WHERE "table_name" = '
+            f"{_sql_text(table_name)} AND \"original_fid\" IN ({fids})"
+        )
+    return statements
+
+
+def mark_uploaded(gpkg_path_str: str, table_name: str, features=(),
+                  deleted_fids=(), tombstone_fids=()) -> dict:
+    """Transicao de sync apos upload aceito, em uma unica transacao OGR.
+
+    Recebe o que foi exportado (ver ``mark_uploaded_statements``).
+    Executavel fora da main thread (UploadZonalTask). Retorna a contagem
+    por status anterior a transicao (para log). Camadas abertas sobre o
+    arquivo precisam de ``forceReload()`` depois.
+    """
+    from datetime import datetime, timezone
+
+    conn = open_gpkg_readonly(gpkg_path_str)
+    if conn is None:
+        return empty_sync_counts()
+    try:
+        if table_name not in sync_feature_tables(conn):
+            return empty_sync_counts()
+        fid_column = next(
+            (row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')
+             if row[5]),
+            "fid",
+        )
+        has_tombstones = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+            "AND name = '_satirriga_tombstones'"
+        ).fetchone() is not None
+    finally:
+        conn.close()
+
+    before = count_features_by_sync_status(gpkg_path_str)
+    now_iso = datetime.now(timezone.utc).isoformat()
+    statements = mark_uploaded_statements(
+        table_name, now_iso, features, deleted_fids,
+        tombstone_fids if has_tombstones else None, fid_column,
+    )
+    if not statements:
+        return before
+
+    from osgeo import ogr
+
+    ds = ogr.Open(gpkg_path_str, 1)
+    if ds is None:
+        raise IOError(f"Falha ao abrir GPKG para escrita: {gpkg_path_str}")
+    try:
+        ds.StartTransaction()
+        try:
+            for stmt in statements:
+                ds.ExecuteSQL(stmt)
+        except Exception:
+            ds.RollbackTransaction()
+            raise
+        ds.CommitTransaction()
+    finally:
+        ds = None
+    return before
+
+
 SATIRRIGA_ROOT_GROUP = "SatIrriga"
 
 
@@ -129,109 +438,220 @@ def layer_name(metodo_apply: str) -> str:
     return metodo_apply
 
 
-def count_features_by_sync_status(gpkg_path_str: str) -> dict:
+def empty_sync_counts() -> dict:
+    """Contagem zerada no formato de ``count_features_by_sync_status``."""
+    return {"DOWNLOADED": 0, "MODIFIED": 0, "UPLOADED": 0, "NEW": 0, "DELETED": 0, "total": 0}
+
+
+def fold_sync_counts(rows, tombstones: int = 0) -> dict:
+    """Agrega ``[(status, n)]`` (+ tombstones do journal) em contagem por status.
+
+    Status fora dos conhecidos (ou NULL) entram apenas no total.
+    """
+    counts = empty_sync_counts()
+    for status, n in rows:
+        if status in counts and status != "total":
+            counts[status] += n
+        counts["total"] += n
+    counts["DELETED"] += tombstones
+    counts["total"] += tombstones
+    return counts
+
+
+def count_sync_status_grouped(gpkg_path_str: str):
+    """Contagem por ``GROUP BY _sync_status`` via sqlite3 (sem QgsVectorLayer).
+
+    Usa o indice de ``_sync_status``; inclui os tombstones do journal.
+    Retorna None se o arquivo nao puder ser lido como GPKG com campos de sync.
+    """
+    import sqlite3
+
+    conn = open_gpkg_readonly(gpkg_path_str)
+    if conn is None:
+        return None
+    try:
+        tables = sync_feature_tables(conn)
+        if not tables:
+            return None
+        rows = []
+        for table in tables:
+            rows += conn.execute(
+                f'SELECT "_sync_status", COUNT(*) FROM "{table}" GROUP BY 1'
+            ).fetchall()
+        try:
+            tombstones = conn.execute(
+                'SELECT COUNT(*) FROM "_satirriga_tombstones"'
+            ).fetchone()[0]
+        except sqlite3.Error:
+            tombstones = 0
+        return fold_sync_counts(rows, tombstones)
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+
+def count_features_by_sync_status(gpkg_path_str: str, verify: bool = False) -> dict:
     """Conta features por status de sync no GPKG.
 
-    Returns dict: {DOWNLOADED: n, MODIFIED: n, UPLOADED: n, NEW: n, total: n}
+    Ordem de fontes: contadores mantidos pelo journal (leitura de poucas
+    linhas), ``GROUP BY`` via sqlite3 e, sem campos de sync, o total de
+    features. Tudo via sqlite3 — pode rodar fora da main thread.
+    Com ``verify=True`` confere os contadores contra o ``GROUP BY`` e os
+    recalcula se divergirem.
+
+    Returns dict: {DOWNLOADED: n, MODIFIED: n, UPLOADED: n, NEW: n, DELETED: n, total: n}
     """
-    from qgis.core import QgsVectorLayer
+    from .change_journal import read_sync_counts, rebuild_sync_counts
 
-    counts = {"DOWNLOADED": 0, "MODIFIED": 0, "UPLOADED": 0, "NEW": 0, "DELETED": 0, "total": 0}
-    layer = QgsVectorLayer(gpkg_path_str, "count_sync", "ogr")
-    if not layer.isValid():
+    counts = read_sync_counts(gpkg_path_str)
+    if counts is not None and not verify:
         return counts
 
-    sync_idx = layer.fields().indexOf("_sync_status")
-    if sync_idx < 0:
-        counts["total"] = layer.featureCount()
+    grouped = count_sync_status_grouped(gpkg_path_str)
+    if grouped is not None:
+        if counts is not None and counts != grouped:
+            try:
+                rebuild_sync_counts(gpkg_path_str)
+            except Exception:
+                pass  # contagem via GROUP BY continua valida
+        return grouped
+    if counts is not None:
         return counts
 
-    for feat in layer.getFeatures():
-        status = feat.attribute(sync_idx)
-        if status in counts:
-            counts[status] += 1
-        counts["total"] += 1
+    # Sem campos de sync: apenas o total de features (tambem via sqlite3,
+    # para que a contagem possa rodar em worker thread)
+    import sqlite3
 
+    counts = empty_sync_counts()
+    conn = open_gpkg_readonly(gpkg_path_str)
+    if conn is None:
+        return counts
+    try:
+        for (table,) in conn.execute(
+            "SELECT table_name FROM gpkg_contents WHERE data_type = 'features'"
+        ).fetchall():
+            quoted = table.replace('"', '""')
+            counts["total"] += conn.execute(
+                f'SELECT COUNT(*) FROM "{quoted}"'
+            ).fetchone()[0]
+    except sqlite3.Error:
+        pass
+    finally:
+        conn.close()
     return counts
 
 
-def list_local_gpkgs(base_dir: str) -> list:
-    """Lista todos os GPKGs na pasta base com metadados (V1 e V2)."""
-    result = []
-    base = Path(base_dir)
-    if not base.exists():
-        return result
+def list_local_gpkgs(base_dir: str, with_sync_counts: bool = False) -> list:
+    """Lista todos os GPKGs na pasta base com metadados (V1 e V2).
 
-    known_origins = {o.value for o in DownloadOrigin}
+    Servido pelo indice persistente (``GpkgCatalog``), que so relista
+    diretorios e relê sidecars cujo mtime mudou. Com ``with_sync_counts``
+    cada entrada traz ``sync_counts`` (tambem cacheado por mtime). Se o
+    indice nao puder ser usado (pasta somente leitura etc.), varre a pasta.
+    """
+    if not Path(base_dir).exists():
+        return []
 
-    for gpkg_file in base.rglob("*.gpkg"):
-        mapeamento_id = None
-        metodo_id = None
-        zonal_id = None
-        gpkg_type = "v1"
-        origin = None
+    from .gpkg_catalog import GpkgCatalog
 
-        parent_name = gpkg_file.parent.name
-        fname = gpkg_file.stem
+    try:
+        return GpkgCatalog(base_dir).entries(with_sync_counts=with_sync_counts)
+    except Exception:
+        entries = scan_local_gpkgs(base_dir)
+        if with_sync_counts:
+            for entry in entries:
+                entry["sync_counts"] = count_features_by_sync_status(entry["path"])
+        return entries
 
-        # Detecta V2: zonal_X/zonal_X.gpkg
-        if parent_name.startswith("zonal_") and fname.startswith("zonal_"):
-            try:
-                zonal_id = int(parent_name.split("_", 1)[1])
-                gpkg_type = "v2"
-            except (ValueError, IndexError):
-                pass
 
-            grandparent = gpkg_file.parent.parent.name
-            if grandparent in known_origins:
-                origin = grandparent
+def scan_local_gpkgs(base_dir: str) -> list:
+    """Varredura completa (``rglob``) da pasta base, sem indice."""
+    base = Path(base_dir)
+    if not base.exists():
+        return []
+    return [build_gpkg_entry(gpkg_file) for gpkg_file in base.rglob("*.gpkg")]
 
-        # Detecta V1: mapeamento_X/metodo_Y.gpkg
-        if parent_name.startswith("mapeamento_"):
-            try:
-                mapeamento_id = int(parent_name.split("_", 1)[1])
-            except (ValueError, IndexError):
-                pass
 
-        if fname.startswith("metodo_"):
-            try:
-                metodo_id = int(fname.split("_", 1)[1])
-            except (ValueError, IndexError):
-                pass
-
-        sc_path = sidecar_path(str(gpkg_file))
-        has_sidecar = os.path.exists(sc_path)
-
-        # Enriquece com dados do sidecar (mapeamentoId, dataReferencia, descricao, origin)
-        sc_data = read_sidecar(str(gpkg_file)) if has_sidecar else {}
-        if sc_data.get("origin") and sc_data["origin"] in known_origins:
-            origin = sc_data["origin"]
-
-        origin_key = DownloadOrigin.coerce(origin).value
-
-        entry = {
-            "path": str(gpkg_file),
-            "mapeamento_id": mapeamento_id,
-            "metodo_id": metodo_id,
-            "zonal_id": zonal_id,
-            "type": gpkg_type,
-            "origin": origin_key,
-            "has_sidecar": has_sidecar,
-            "size_mb": round(gpkg_file.stat().st_size / (1024 * 1024), 2),
-        }
+def build_gpkg_entry(gpkg_file) -> dict:
+    """Metadados de um GPKG local a partir do caminho e do sidecar."""
+    gpkg_file = Path(gpkg_file)
+    known_origins = {o.value for o in DownloadOrigin}
 
-        if sc_data:
-            if sc_data.get("mapeamentoId"):
-                entry["mapeamento_id"] = sc_data["mapeamentoId"]
-            if sc_data.get("dataReferencia"):
-                entry["data_referencia"] = sc_data["dataReferencia"]
-            if sc_data.get("descricao"):
-                entry["descricao"] = sc_data["descricao"]
-            if sc_data.get("jobId"):
-                entry["job_id"] = sc_data["jobId"]
-            if sc_data.get("metodoApply"):
-                entry["metodo_apply"] = sc_data["metodoApply"]
+    mapeamento_id = None
+    metodo_id = None
+    zonal_id = None
+    gpkg_type = "v1"
+    origin = None
+
+    parent_name = gpkg_file.parent.name
+    fname = gpkg_file.stem
+
+    # Detecta V2: zonal_X/zonal_X.gpkg
+    if parent_name.startswith("zonal_") and fname.startswith("zonal_"):
+        try:
+            zonal_id = int(parent_name.split("_", 1)[1])
+            gpkg_type = "v2"
+        except (ValueError, IndexError):
+            pass
+
+        grandparent = gpkg_file.parent.parent.name
+        if grandparent in known_origins:
+            origin = grandparent
+
+    # Detecta V1: mapeamento_X/metodo_Y.gpkg
+    if parent_name.startswith("mapeamento_"):
+        try:
+            mapeamento_id = int(parent_name.split("_", 1)[1])
+        except (ValueError, IndexError):
+            pass
+
+    if fname.startswith("metodo_"):
+        try:
+            metodo_id = int(fname.split("_", 1)[1])
+        except (ValueError, IndexError):
+            pass
+
+    sc_path = sidecar_path(str(gpkg_file))
+    has_sidecar = os.path.exists(sc_path)
+
+    # Nome fora dos padroes (arquivo copiado/renomeado): decide pelo schema
+    if zonal_id is None and mapeamento_id is None and metodo_id is None:
+        if detect_gpkg_version(str(gpkg_file)) == 2:
+            gpkg_type = "v2"
+
+    # Enriquece com dados do sidecar (mapeamentoId, dataReferencia, descricao, origin)
+    sc_data = read_sidecar(str(gpkg_file)) if has_sidecar else {}
+    if sc_data.get("origin") and sc_data["origin"] in known_origins:
+        origin = sc_data["origin"]
 
-        result.append(entry)
+    origin_key = DownloadOrigin.coerce(origin).value
 
-    return result
+    entry = {
+        "path": str(gpkg_file),
+        "mapeamento_id": mapeamento_id,
+        "metodo_id": metodo_id,
+        "zonal_id": zonal_id,
+        "type": gpkg_type,
+        "origin": origin_key,
+        "has_sidecar": has_sidecar,
+        "size_mb": round(gpkg_file.stat().st_size / (1024 * 1024), 2),
+    }
+
+    if sc_data:
+        if sc_data.get("mapeamentoId"):
+            entry["mapeamento_id"] = sc_data["mapeamentoId"]
+        if entry["zonal_id"] is None and gpkg_type == "v2" and sc_data.get("zonalId"):
+            entry["zonal_id"] = sc_data["zonalId"]
+        if sc_data.get("dataReferencia"):
+            entry["data_referencia"] = sc_data["dataReferencia"]
+        if sc_data.get("descricao"):
+            entry["descricao"] = sc_data["descricao"]
+        if sc_data.get("jobId"):
+            entry["job_id"] = sc_data["jobId"]
+        if sc_data.get("metodoApply"):
+            entry["metodo_apply"] = sc_data["metodoApply"]
+        if sc_data.get("expiresAt"):
+            entry["expires_at"] = sc_data["expiresAt"]
+
+    return entry
@@ -0,0 +1,125 @@
+"""Extracao em lote de indices espectrais por feicao de um zonal.
+
+O endpoint de indices (``/mapeamento/tiles/get/indexs/images``) recebe um
+ponto e ate ``MAX_SCENES_PER_REQUEST`` cenas. Para triagem de um zonal
+inteiro, cada feicao vira um ponto (ponto na superficie do poligono) e
+as cenas sao divididas em lotes; as respostas sao gravadas numa tabela
+sqlite ao lado do GPKG (``indices``), unida as feicoes por
+``_original_fid``. Cada extracao grava numa tabela de preparo
+(``indices_new``) que substitui ``indices`` so ao final com sucesso —
+cancelamento ou falha mantem a extracao anterior intacta.
+"""
+
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from typing import List
+
+# Mesmo limite defensivo do PixelInspectController
+MAX_SCENES_PER_REQUEST = 10
+
+INDICES_TABLE = "indices"
+# Extracao em andamento grava aqui; a troca so acontece se ela concluir
+STAGING_TABLE = "indices_new"
+_INDEX_FIELDS = ("ndvi", "savi", "evi", "ndwi", "mndwi", "albedo")
+
+
+@dataclass
+class FeaturePoint:
+    """Ponto de amostragem de uma feicao (WGS84)."""
+    original_fid: int
+    lat: float
+    lon: float
+
+
+def chunked(items: List, size: int) -> List[List]:
+    """Divide ``items`` em lotes de ate ``size`` elementos."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def request_count(points: int, scenes: int,
+                  max_scenes: int = MAX_SCENES_PER_REQUEST) -> int:
+    """Requisicoes necessarias sem cache (para confirmacao na UI)."""
+    return points * -(-scenes // max_scenes) if scenes else 0
+
+
+def scene_image_ids(hierarchy) -> List[str]:
+    """``image_id`` das cenas da hierarquia (sem diferencas), sem repeticao."""
+    seen, ids = set(), []
+    for date_group in hierarchy.dates:
+        for band_group in date_group.bands:
+            for config in band_group.layers:
+                image_id = config.image_id
+                # image_ids compostos (diferencas) nao sao consultaveis
+                if image_id and "-" not in image_id and image_id not in seen:
+                    seen.add(image_id)
+                    ids.append(image_id)
+    return ids
+
+
+def begin_extraction(path: str):
+    """Cria a tabela de preparo vazia (``indices_new``) para uma extracao."""
+    with closing(sqlite3.connect(path, timeout=10)) as conn:
+        conn.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        _create_table(conn, STAGING_TABLE)
+        conn.commit()
+
+
+def commit_extraction(path: str):
+    """Troca ``indices`` pela tabela de preparo numa unica transacao."""
+    with closing(sqlite3.connect(path, timeout=10, isolation_level=None)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"DROP TABLE IF EXISTS {INDICES_TABLE}")
+            conn.execute(f"ALTER TABLE {STAGING_TABLE} RENAME TO {INDICES_TABLE}")
+            _create_index(conn, INDICES_TABLE)
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def discard_extraction(path: str):
+    """Descarta a tabela de preparo (extracao cancelada ou com falha)."""
+    with closing(sqlite3.connect(path, timeout=10)) as conn:
+        conn.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        conn.commit()
+
+
+def write_index_batch(path: str, results, table: str = INDICES_TABLE) -> int:
+    """Grava (substitui) ``[(FeaturePoint, [SceneIndexes])]`` numa transacao."""
+    rows = [
+        (point.original_fid, scene.id_imagem, scene.tile, scene.data_formatada,
+         point.lat, point.lon) + tuple(getattr(scene, f) for f in _INDEX_FIELDS)
+        for point, scenes in results
+        for scene in scenes
+    ]
+    with closing(sqlite3.connect(path, timeout=10)) as conn:
+        _create_table(conn, table)
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {table} VALUES "
+            f"({', '.join('?' * (6 + len(_INDEX_FIELDS)))})",
+            rows,
+        )
+        conn.commit()
+    return len(rows)
+
+
+def _create_table(conn, table: str):
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {table} ("
+        "_original_fid INTEGER NOT NULL, id_imagem TEXT NOT NULL, tile TEXT, "
+        "data TEXT, lat REAL, lon REAL, "
+        + ", ".join(f"{f} REAL" for f in _INDEX_FIELDS)
+        + ", PRIMARY KEY (_original_fid, id_imagem))"
+    )
+    if table == INDICES_TABLE:
+        _create_index(conn, table)
+
+
+def _create_index(conn, table: str):
+    # Indice criado so na tabela final: o nome acompanha a tabela e some
+    # com ela no DROP da troca
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS {table}_fid ON {table} (_original_fid)"
+    )
@@ -0,0 +1,291 @@
+"""Cache persistente de indices espectrais por pixel Sentinel-2.
+
+Cada cena tem grade de 10 m no UTM do seu tile MGRS (origem dos tiles em
+multiplos de 10 m). A chave de cache e ``(image_id, coluna, linha)`` dessa
+grade: dois cliques no mesmo pixel da cena sao o mesmo registro, e cada
+cena e cacheada separadamente — uma consulta com outro conjunto de cenas
+reaproveita as que ja foram vistas.
+
+Registros ficam em sqlite (``pixels``) com ultimo acesso para despejo LRU
+quando passam de ``max_entries``. Cenas que a API nao retornou para o
+ponto (fora da cobertura) sao gravadas sem payload para nao serem
+repetidas; como a ausencia pode ser transitoria (cena ainda em
+processamento, falha parcial), esses registros valem ate
+``NO_DATA_MAX_AGE_DAYS`` e depois a cena e consultada de novo.
+"""
+
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+
+from ..models.pixel_indexes import SceneIndexes
+
+PIXEL_SIZE_M = 10
+NO_DATA_MAX_AGE_DAYS = 7
+SCHEMA_VERSION = 2
+
+# Despejo e verificado a cada N gravacoes (COUNT(*) nao e de graca)
+_EVICT_EVERY = 200
+
+# Tile MGRS no image_id: "..._T23LKC" / "..._T24MXT_..."
+_MGRS_RE = re.compile(r"(?:^|_)T(\d{2})([C-X])[A-Z]{2}(?:_|$)")
+
+# WGS84 / UTM
+_A = 6378137.0
+_F = 1 / 298.257223563
+_E2 = _F * (2 - _F)
+_EP2 = _E2 / (1 - _E2)
+_K0 = 0.9996
+
+
+def utm_zone_for(image_id: str, lat: float, lon: float) -> Tuple[int, bool]:
+    """``(zona, sul)`` do tile MGRS da cena; pelo ponto se nao houver tile."""
+    m = _MGRS_RE.search(image_id or "")
+    if m:
+        return int(m.group(1)), m.group(2) < "N"
+    zone = int((lon + 180) // 6) % 60 + 1
+    return zone, lat < 0
+
+
+def latlon_to_utm(lat: float, lon: float, zone: int, south: bool) -> Tuple[float, float]:
+    """Projecao transversa de Mercator (Snyder) — ``(easting, northing)``."""
+    phi = math.radians(lat)
+    lam = math.radians(lon - ((zone - 1) * 6 - 180 + 3))
+    sin_phi, cos_phi, tan_phi = math.sin(phi), math.cos(phi), math.tan(phi)
+    n = _A / math.sqrt(1 - _E2 * sin_phi * sin_phi)
+    t = tan_phi * tan_phi
+    c = _EP2 * cos_phi * cos_phi
+    a = lam * cos_phi
+    e4, e6 = _E2 * _E2, _E2 * _E2 * _E2
+    m = _A * (
+        (1 - _E2 / 4 - 3 * e4 / 64 - 5 * e6 / 256) * phi
+        - (3 * _E2 / 8 + 3 * e4 / 32 + 45 * e6 / 1024) * math.sin(2 * phi)
+        + (15 * e4 / 256 + 45 * e6 / 1024) * math.sin(4 * phi)
+        - (35 * e6 / 3072) * math.sin(6 * phi)
+    )
+    easting = _K0 * n * (
+        a + (1 - t + c) * a ** 3 / 6
+        + (5 - 18 * t + t * t + 72 * c - 58 * _EP2) * a ** 5 / 120
+    ) + 500000.0
+    northing = _K0 * (m + n * tan_phi * (
+        a * a / 2 + (5 - t + 9 * c + 4 * c * c) * a ** 4 / 24
+        + (61 - 58 * t + t * t + 600 * c - 330 * _EP2) * a ** 6 / 720
+    ))
+    if south:
+        northing += 10000000.0
+    return easting, northing
+
+
+def utm_to_latlon(easting: float, northing: float, zone: int,
+                  south: bool) -> Tuple[float, float]:
+    """Inversa de ``latlon_to_utm`` (Snyder) — ``(lat, lon)``."""
+    x = easting - 500000.0
+    y = northing - (10000000.0 if south else 0.0)
+    e4, e6 = _E2 * _E2, _E2 * _E2 * _E2
+    mu = (y / _K0) / (_A * (1 - _E2 / 4 - 3 * e4 / 64 - 5 * e6 / 256))
+    e1 = (1 - math.sqrt(1 - _E2)) / (1 + math.sqrt(1 - _E2))
+    phi1 = (
+        mu + (3 * e1 / 2 - 27 * e1 ** 3 / 32) * math.sin(2 * mu)
+        + (21 * e1 ** 2 / 16 - 55 * e1 ** 4 / 32) * math.sin(4 * mu)
+        + (151 * e1 ** 3 / 96) * math.sin(6 * mu)
+        + (1097 * e1 ** 4 / 512) * math.sin(8 * mu)
+    )
+    sin1, cos1, tan1 = math.sin(phi1), math.cos(phi1), math.tan(phi1)
+    c1 = _EP2 * cos1 * cos1
+    t1 = tan1 * tan1
+    n1 = _A / math.sqrt(1 - _E2 * sin1 * sin1)
+    r1 = _A * (1 - _E2) / (1 - _E2 * sin1 * sin1) ** 1.5
+    d = x / (n1 * _K0)
+    lat = phi1 - (n1 * tan1 / r1) * (
+        d * d / 2
+        - (5 + 3 * t1 + 10 * c1 - 4 * c1 * c1 - 9 * _EP2) * d ** 4 / 24
+        + (61 + 90 * t1 + 298 * c1 + 45 * t1 * t1 - 252 * _EP2 - 3 * c1 * c1) * d ** 6 / 720
+    )
+    lon = (
+        d - (1 + 2 * t1 + c1) * d ** 3 / 6
+        + (5 - 2 * c1 + 28 * t1 - 3 * c1 * c1 + 8 * _EP2 + 24 * t1 * t1) * d ** 5 / 120
+    ) / cos1
+    return math.degrees(lat), (zone - 1) * 6 - 180 + 3 + math.degrees(lon)
+
+
+def pixel_cell(image_id: str, lat: float, lon: float) -> Tuple[int, int]:
+    """Coluna/linha do pixel de 10 m da cena que contem o ponto."""
+    zone, south = utm_zone_for(image_id, lat, lon)
+    easting, northing = latlon_to_utm(lat, lon, zone, south)
+    return math.floor(easting / PIXEL_SIZE_M), math.floor(northing / PIXEL_SIZE_M)
+
+
+def points_ahead(lat: float, lon: float, prev_lat: float, prev_lon: float,
+                 count: int = 2) -> List[Tuple[float, float]]:
+    """Proximos ``count`` pontos na direcao ``prev -> atual`` (prefetch).
+
+    O passo e o deslocamento desde o ponto anterior (velocidade do cursor),
+    com minimo de um pixel; sem movimento util retorna lista vazia.
+    """
+    m_per_deg = 111_320.0
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dy = (lat - prev_lat) * m_per_deg
+    dx = (lon - prev_lon) * m_per_deg * cos_lat
+    moved = math.hypot(dx, dy)
+    if moved < PIXEL_SIZE_M / 2:
+        return []
+    step = max(moved, PIXEL_SIZE_M)
+    uy, ux = dy / moved, dx / moved
+    return [
+        (round(lat + k * step * uy / m_per_deg, 6),
+         round(lon + k * step * ux / (m_per_deg * cos_lat), 6))
+        for k in range(1, count + 1)
+    ]
+
+
+def is_ahead(lat: float, lon: float, origin_lat: float, origin_lon: float,
+             toward_lat: float, toward_lon: float) -> bool:
+    """True se o ponto esta a frente de ``origin`` na direcao ``origin -> toward``."""
+    cos_lat = max(math.cos(math.radians(origin_lat)), 1e-6)
+    dot = ((lat - origin_lat) * (toward_lat - origin_lat)
+           + (lon - origin_lon) * (toward_lon - origin_lon) * cos_lat ** 2)
+    return dot > 0
+
+
+class PixelIndexCache:
+    """Indices por ``(image_id, pixel)`` em sqlite com despejo LRU.
+
+    ``path=":memory:"`` mantem o cache apenas durante a sessao. Usado na
+    thread principal (callbacks do HttpClient); o lock protege a conexao
+    unica caso seja compartilhada.
+    """
+
+    def __init__(self, path: str = ":memory:", max_entries: int = 100_000):
+        self._max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = self._connect(path)
+        self._expire()
+
+    def lookup(self, image_ids: List[str], lat: float,
+               lon: float) -> Dict[str, Optional[SceneIndexes]]:
+        """``{image_id: SceneIndexes | None}`` das cenas em cache.
+
+        Cenas ausentes do dict nao estao em cache; ``None`` indica cena
+        consultada que nao tem dado no ponto (ha menos de
+        ``NO_DATA_MAX_AGE_DAYS``).
+        """
+        found = {}
+        now = time.time()
+        no_data_cutoff = now - NO_DATA_MAX_AGE_DAYS * 86400
+        with self._lock:
+            for image_id in image_ids:
+                cx, cy = pixel_cell(image_id, lat, lon)
+                row = self._conn.execute(
+                    "SELECT payload, fetched_at FROM pixels WHERE image_id = ? "
+                    "AND cell_x = ? AND cell_y = ?",
+                    (image_id, cx, cy),
+                ).fetchone()
+                if row is None or (row[0] is None and row[1] < no_data_cutoff):
+                    continue
+                try:
+                    found[image_id] = (
+                        SceneIndexes(**json.loads(row[0])) if row[0] else None
+                    )
+                except (TypeError, ValueError):
+                    continue  # payload de versao anterior: consulta de novo
+                self._conn.execute(
+                    "UPDATE pixels SET last_access = ? WHERE image_id = ? "
+                    "AND cell_x = ? AND cell_y = ?",
+                    (now, image_id, cx, cy),
+                )
+            if found:
+                self._conn.commit()
+        return found
+
+    def store(self, image_ids: List[str], lat: float, lon: float,
+              scenes: List[SceneIndexes]):
+        """Grava a resposta da API para cada cena consultada."""
+        by_id = {s.id_imagem: s for s in scenes}
+        # Se a API devolveu ids diferentes dos pedidos, ausencia nao prova
+        # que a cena nao cobre o ponto: grava apenas os acertos
+        record_misses = set(by_id) <= set(image_ids)
+        now = time.time()
+        rows = []
+        for image_id in image_ids:
+            scene = by_id.get(image_id)
+            if scene is None and not record_misses:
+                continue
+            cx, cy = pixel_cell(image_id, lat, lon)
+            payload = json.dumps(asdict(scene)) if scene is not None else None
+            rows.append((image_id, cx, cy, payload, now, now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pixels "
+                "(image_id, cell_x, cell_y, payload, last_access, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._writes += len(rows)
+            if self._writes >= _EVICT_EVERY:
+                self._writes = 0
+                self._evict()
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM pixels")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pixels").fetchone()[0]
+
+    def _expire(self):
+        """Descarta registros "sem dado" vencidos (a cena volta a ser consultada)."""
+        cutoff = time.time() - NO_DATA_MAX_AGE_DAYS * 86400
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM pixels WHERE payload IS NULL AND fetched_at < ?",
+                (cutoff,),
+            )
+            self._conn.commit()
+
+    def _evict(self):
+        excess = (
+            self._conn.execute("SELECT COUNT(*) FROM pixels").fetchone()[0]
+            - self._max_entries
+        )
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM pixels WHERE rowid IN (SELECT rowid FROM pixels "
+                "ORDER BY last_access LIMIT ?)",
+                (excess,),
+            )
+
+    @staticmethod
+    def _connect(path: str):
+        conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        except sqlite3.DatabaseError:
+            # Arquivo corrompido: cache e descartavel
+            conn.close()
+            os.remove(path)
+            conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+            version = 0
+        if version != SCHEMA_VERSION:
+            conn.executescript(
+                "DROP TABLE IF EXISTS pixels;"
+                "CREATE TABLE pixels (image_id TEXT, cell_x INTEGER, "
+                "cell_y INTEGER, payload TEXT, last_access REAL, fetched_at REAL, "
+                "PRIMARY KEY (image_id, cell_x, cell_y));"
+                "CREATE INDEX pixels_access ON pixels (last_access);"
+                f"PRAGMA user_version = {SCHEMA_VERSION};"
+            )
+        return conn
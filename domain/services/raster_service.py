@@ -21,8 +21,10 @@ Para customizacao de visualizacao, o endpoint direto pode ser usado:
     https://jobs.snirh.gov.br/tiles/s2/{image_id}/{z}/{x}/{y}?band={index}
 """
 
+import json
 import re
 from collections import defaultdict
+from dataclasses import asdict
 from typing import List
 
 from ..models.raster import (
@@ -34,6 +36,9 @@ from ..models.raster import (
 )
 
 
+_URL_IMAGE_ID_RE = re.compile(r"/tiles/s2/([^/]+)/")
+_IMAGE_DATE_RE = re.compile(r"(\d{4})(\d{2})(\d{2})T")
+
 # URL base do servidor de tiles (para customizacao de visualizacao)
 _JOBS_BASE = "https://jobs.snirh.gov.br/tiles/s2"
 
@@ -127,6 +132,25 @@ def get_default_vis_params(band: str, sidecar: dict = None) -> VisParams:
         return VisParams(band=band)
 
 
+class VisParamsSnapshot:
+    """VisParams por banda resolvidos uma vez por construcao de hierarquia.
+
+    ``get_default_vis_params`` consulta sidecar/QgsSettings a cada chamada;
+    o snapshot resolve cada banda na primeira vez e reaproveita o mesmo
+    objeto para todas as cenas (os configs nao alteram ``vis_params``).
+    """
+
+    def __init__(self, sidecar: dict = None):
+        self._sidecar = sidecar
+        self._by_band = {}
+
+    def get(self, band: str) -> VisParams:
+        params = self._by_band.get(band)
+        if params is None:
+            params = self._by_band[band] = get_default_vis_params(band, self._sidecar)
+        return params
+
+
 def build_xyz_url(image_id: str, vis_params: VisParams) -> str:
     """URL XYZ com parametros de visualizacao customizados.
 
@@ -200,9 +224,11 @@ def build_raster_hierarchy(tile_data, metodo_apply: str,
         date_iso = _extract_date(item)
         by_date[date_iso].append(item)
 
+    vis = VisParamsSnapshot(sidecar)
+
     # Camadas de diferenca (URLs ja prontas com operator=SUBTRACT),
     # deduplicadas por URL e indexadas pela data da primeira imagem do par.
-    diff_layers = _collect_diff_layers(tile_data, sidecar)
+    diff_layers = _collect_diff_layers(tile_data, vis)
 
     # Garante que datas de diffs ausentes em tiles (raro) ainda apareçam.
     # Ordena datas (mais recente primeiro); "" vai ao final
@@ -223,11 +249,10 @@ def build_raster_hierarchy(tile_data, metodo_apply: str,
 
             if image_id:
                 # Acesso direto: gera URL com params de visualizacao
-                _build_direct_layers(bands_map, image_id, tile_name, sidecar)
+                _build_direct_layers(bands_map, image_id, tile_name, vis)
             else:
                 # Legado: usa URLs pre-construidas da API
-                _build_legacy_layers(bands_map, tile_item, tile_name, image_id,
-                                     sidecar)
+                _build_legacy_layers(bands_map, tile_item, tile_name, image_id, vis)
 
         # Anexa camadas de diferenca desta data (ja deduplicadas)
         for band_key, config in diff_layers.get(date_iso, {}).items():
@@ -257,7 +282,7 @@ def build_raster_hierarchy(tile_data, metodo_apply: str,
 
 
 def _build_direct_layers(bands_map: dict, image_id: str, tile_name: str,
-                         sidecar: dict = None):
+                         vis: VisParamsSnapshot):
     """Gera layers para TODAS as bandas via URL direta (tiles com image_id).
 
     Usa configuracao de visualizacao (sidecar > global > hardcoded) para
@@ -277,7 +302,7 @@ def _build_direct_layers(bands_map: dict, image_id: str, tile_name: str,
             continue
         display_name, layer_type, default_visible = info
 
-        vis_params = get_default_vis_params(band_key, sidecar)
+        vis_params = vis.get(band_key)
         # Gera URL com params customizados se houver config; senão URL simples
         xyz_url = build_xyz_url(image_id, vis_params)
 
@@ -296,7 +321,7 @@ def _build_direct_layers(bands_map: dict, image_id: str, tile_name: str,
 
 def _build_legacy_layers(bands_map: dict, tile_item: dict,
                          tile_name: str, image_id: str,
-                         sidecar: dict = None):
+                         vis: VisParamsSnapshot):
     """Gera layers para tiles legados (sem image_id) usando URLs da API.
 
     RGB vem do campo ``url``; indices espectrais de ``url_indices``
@@ -312,7 +337,7 @@ def _build_legacy_layers(bands_map: dict, tile_item: dict,
                 layer_type="RGB",
                 tile=tile_name,
                 image_id=image_id,
-                vis_params=get_default_vis_params("original", sidecar),
+                vis_params=vis.get("original"),
                 is_visible=True,
             )
         )
@@ -334,7 +359,7 @@ def _build_legacy_layers(bands_map: dict, tile_item: dict,
                 layer_type=layer_type,
                 tile=tile_name,
                 image_id=image_id,
-                vis_params=get_default_vis_params(band_key, sidecar),
+                vis_params=vis.get(band_key),
                 is_visible=default_visible,
             )
         )
@@ -357,7 +382,7 @@ def _resolve_band_name(band_key: str) -> str:
     return name or band_key
 
 
-def _collect_diff_layers(tile_data: list, sidecar: dict = None) -> dict:
+def _collect_diff_layers(tile_data: list, vis: VisParamsSnapshot) -> dict:
     """Extrai camadas de diferenca (NDVI/NDWI/albedo diff) dos method responses.
 
     As URLs de diferenca ja vem prontas com operator=SUBTRACT e image_id
@@ -392,7 +417,7 @@ def _collect_diff_layers(tile_data: list, sidecar: dict = None) -> dict:
                     layer_type=layer_type,
                     tile="",
                     image_id=compound_id,
-                    vis_params=get_default_vis_params(band_key, sidecar),
+                    vis_params=vis.get(band_key),
                     is_visible=False,
                 )
     return out
@@ -400,7 +425,7 @@ def _collect_diff_layers(tile_data: list, sidecar: dict = None) -> dict:
 
 def _extract_image_id_from_url(url: str) -> str:
     """Extrai segmento de image_id (possivelmente composto) de uma URL de tiles."""
-    m = re.search(r"/tiles/s2/([^/]+)/", url)
+    m = _URL_IMAGE_ID_RE.search(url)
     return m.group(1) if m else ""
 
 
@@ -412,7 +437,7 @@ def _extract_date_from_image_id(compound_id: str) -> str:
     if not compound_id:
         return ""
     first = compound_id.split("-", 1)[0]
-    m = re.match(r"(\d{4})(\d{2})(\d{2})T", first)
+    m = _IMAGE_DATE_RE.match(first)
     return f"{m.group(1)}-{m.group(2)}-{m.group(3)}" if m else ""
 
 
@@ -468,6 +493,45 @@ def _extract_tile_name(image_id: str) -> str:
     return ""
 
 
+# ----------------------------------------------------------------
+# Serializacao de datas (materializacao sob demanda na arvore)
+# ----------------------------------------------------------------
+
+def date_group_to_json(date_group: DateGroup) -> str:
+    """Serializa um DateGroup para guardar no no da arvore (custom property)."""
+    return json.dumps(asdict(date_group), separators=(",", ":"))
+
+
+def date_group_from_json(payload: str) -> DateGroup:
+    """Reconstroi o DateGroup salvo por ``date_group_to_json``."""
+    data = json.loads(payload)
+    return DateGroup(
+        date_label=data["date_label"], date_iso=data["date_iso"],
+        bands=[_band_group_from_dict(band) for band in data.get("bands", [])],
+    )
+
+
+def band_group_to_json(band_group: BandGroup) -> str:
+    """Serializa um BandGroup (cenas de uma camada mosaico)."""
+    return json.dumps(asdict(band_group), separators=(",", ":"))
+
+
+def band_group_from_json(payload: str) -> BandGroup:
+    """Reconstroi o BandGroup salvo por ``band_group_to_json``."""
+    return _band_group_from_dict(json.loads(payload))
+
+
+def _band_group_from_dict(band: dict) -> BandGroup:
+    layers = []
+    for layer in band.get("layers", []):
+        layer = dict(layer)
+        layer["vis_params"] = VisParams(**(layer.get("vis_params") or {}))
+        layers.append(RasterLayerConfig(**layer))
+    return BandGroup(
+        band_name=band["band_name"], band_key=band["band_key"], layers=layers,
+    )
+
+
 # ----------------------------------------------------------------
 # Compatibilidade com codigo legado
 # ----------------------------------------------------------------
@@ -0,0 +1,55 @@
+"""Parsers de payloads da API — funcoes puras, seguras para worker thread.
+
+Recebem o body bruto (bytes) e devolvem modelos de dominio prontos para a
+UI. Nao tocam em objetos Qt; podem rodar via ``ResponseDecoder`` fora da
+main thread.
+"""
+
+import json
+from typing import List, Tuple
+
+from ..models.zonal import CatalogoItem
+from ..models.upload_batch import UploadHistoryItem
+
+
+def parse_json_body(body):
+    """Decodifica body JSON (bytes ou str). Body vazio vira ``{}``."""
+    if not body:
+        return {}
+    if isinstance(body, (bytes, bytearray)):
+        body = bytes(body).decode("utf-8")
+    return json.loads(body)
+
+
+def parse_catalogo_page(body) -> Tuple[List[CatalogoItem], dict]:
+    """Catalogo zonal paginado -> (itens, pagination).
+
+    Aceita tanto o envelope ``{data|content, pagination}`` quanto um array
+    simples (sem paginacao).
+    """
+    data = parse_json_body(body)
+    if isinstance(data, list):
+        items_raw = data
+        pagination = {}
+    else:
+        items_raw = data.get("data") or data.get("content") or []
+        pagination = data.get("pagination") or {}
+    return [CatalogoItem.from_dict(item) for item in items_raw], pagination
+
+
+def parse_upload_history_page(body) -> Tuple[List[UploadHistoryItem], dict]:
+    """Historico de uploads paginado -> (itens, pagination)."""
+    data = parse_json_body(body)
+    items_raw = data.get("data") or []
+    pagination = data.get("pagination") or {}
+    return [UploadHistoryItem.from_dict(item) for item in items_raw], pagination
+
+
+def parse_overlay_data(body) -> dict:
+    """Overlay-data de um zonal -> ``{geomId: {...}}``.
+
+    A API pode retornar ``{data: {geomId: {...}}}`` ou diretamente
+    ``{geomId: {...}}``.
+    """
+    data = parse_json_body(body)
+    return data.get("data", data) if isinstance(data, dict) else {}
@@ -0,0 +1,152 @@
+"""Footprint das cenas Sentinel-2 a partir do tile MGRS do image_id.
+
+Cada tile Sentinel-2 e um quadrado de 109,8 km no UTM da sua zona, com o
+canto superior esquerdo no canto superior esquerdo do quadrado MGRS de
+100 km (``T24MXT`` -> zona 24, banda M, coluna X, linha T). O footprint e
+derivado so do nome, sem consulta ao servidor.
+
+``FootprintIndex`` guarda os footprints num hash espacial por zona UTM e
+celula de 100 km: a consulta projeta o ponto uma vez por zona presente e
+testa so as cenas da celula.
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .pixel_index_cache import latlon_to_utm, utm_to_latlon
+
+S2_TILE_SIZE_M = 109_800
+_SQUARE_M = 100_000
+# Tiles de borda passam ~1 grau da zona; alem disso o ponto e descartado
+_MAX_ZONE_DISTANCE_DEG = 9
+# Folga da extensao lon/lat (bordas UTM sao curvas em graus)
+_BBOX_MARGIN_DEG = 0.001
+
+# "..._T24MXT_..." / "..._T23LKC"
+_TILE_RE = re.compile(r"(?:^|_)T(\d{2})([C-HJ-NP-X])([A-HJ-NP-Z])([A-HJ-NP-V])(?:_|$)")
+
+_BANDS = "CDEFGHJKLMNPQRSTUVWX"   # bandas de 8 graus a partir de 80S
+_COL_SETS = ("ABCDEFGH", "JKLMNPQR", "STUVWXYZ")
+_ROWS = "ABCDEFGHJKLMNPQRSTUV"
+
+
+# (zona, sul, e_min, n_min, e_max, n_max) em metros UTM
+Footprint = Tuple[int, bool, float, float, float, float]
+
+
+def mgrs_tile(image_id: str) -> str:
+    """Tile MGRS do image_id (``"24MXT"``); vazio se nao houver."""
+    m = _TILE_RE.search(image_id or "")
+    return "".join(m.groups()) if m else ""
+
+
+def tile_footprint(tile: str) -> Optional[Footprint]:
+    """Extensao UTM do tile Sentinel-2 ``tile`` (ex: ``"23LKC"``)."""
+    m = _TILE_RE.match(f"T{tile}")
+    if not m:
+        return None
+    zone = int(m.group(1))
+    band, col, row = m.group(2), m.group(3), m.group(4)
+    if not 1 <= zone <= 60:
+        return None
+    col_set = _COL_SETS[(zone - 1) % 3]
+    if col not in col_set:
+        return None
+    south = band < "N"
+    east = (col_set.index(col) + 1) * _SQUARE_M
+
+    # Letras de linha repetem a cada 2.000 km (deslocadas em zonas pares);
+    # a banda de latitude escolhe a repeticao certa
+    row_offset = 5 if zone % 2 == 0 else 0
+    north_mod = ((_ROWS.index(row) - row_offset) % 20) * _SQUARE_M
+    band_center = -80 + _BANDS.index(band) * 8 + 4
+    _e, center_n = latlon_to_utm(band_center, (zone - 1) * 6 - 180 + 3, zone, south)
+    cycles = round((center_n - _SQUARE_M / 2 - north_mod) / 2_000_000)
+    north = north_mod + cycles * 2_000_000
+
+    top = north + _SQUARE_M
+    return (zone, south, float(east), float(top - S2_TILE_SIZE_M),
+            float(east + S2_TILE_SIZE_M), float(top))
+
+
+def footprint_bbox(image_id: str) -> Optional[List[float]]:
+    """``[minx, miny, maxx, maxy]`` (graus) que contem o footprint da cena.
+
+    Cantos e pontos medios das bordas do quadrado UTM, com folga de
+    ``_BBOX_MARGIN_DEG``. None se o image_id nao tem tile MGRS.
+    """
+    fp = tile_footprint(mgrs_tile(image_id))
+    if fp is None:
+        return None
+    zone, south, e_min, n_min, e_max, n_max = fp
+    points = [
+        utm_to_latlon(e, n, zone, south)
+        for e in (e_min, (e_min + e_max) / 2, e_max)
+        for n in (n_min, (n_min + n_max) / 2, n_max)
+    ]
+    lats = [p[0] for p in points]
+    lons = [p[1] for p in points]
+    return [min(lons) - _BBOX_MARGIN_DEG, min(lats) - _BBOX_MARGIN_DEG,
+            max(lons) + _BBOX_MARGIN_DEG, max(lats) + _BBOX_MARGIN_DEG]
+
+
+class FootprintIndex:
+    """Indice espacial de footprints de cena por zona UTM / celula de 100 km.
+
+    Cenas sem tile MGRS reconhecivel nao tem footprint e sao sempre
+    consideradas candidatas em ``covering``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._footprints: Dict[str, Optional[Footprint]] = {}
+        # (zona, sul) -> {(col, lin): [image_id]}
+        self._cells: Dict[Tuple[int, bool], Dict[Tuple[int, int], List[str]]] = {}
+
+    def add(self, image_ids: Iterable[str]):
+        """Indexa ``image_ids`` (idempotente)."""
+        with self._lock:
+            for image_id in image_ids:
+                if image_id in self._footprints:
+                    continue
+                fp = tile_footprint(mgrs_tile(image_id))
+                self._footprints[image_id] = fp
+                if fp is None:
+                    continue
+                zone, south, e_min, n_min, e_max, n_max = fp
+                cells = self._cells.setdefault((zone, south), {})
+                for cx in range(int(e_min // _SQUARE_M), int(e_max // _SQUARE_M) + 1):
+                    for cy in range(int(n_min // _SQUARE_M), int(n_max // _SQUARE_M) + 1):
+                        cells.setdefault((cx, cy), []).append(image_id)
+
+    def covering(self, lat: float, lon: float,
+                 image_ids: Optional[Iterable[str]] = None) -> List[str]:
+        """Cenas que cobrem o ponto, na ordem de ``image_ids``.
+
+        Sem ``image_ids``, considera todas as cenas indexadas. Ids ainda
+        nao indexados sao indexados antes da consulta.
+        """
+        candidates = list(self._footprints if image_ids is None else image_ids)
+        self.add(candidates)
+        hits = set()
+        with self._lock:
+            for (zone, south), cells in self._cells.items():
+                # Longe da zona a projecao diverge (e nenhum tile chega la)
+                central = (zone - 1) * 6 - 180 + 3
+                if abs((lon - central + 180) % 360 - 180) > _MAX_ZONE_DISTANCE_DEG:
+                    continue
+                easting, northing = latlon_to_utm(lat, lon, zone, south)
+                cell = (int(easting // _SQUARE_M), int(northing // _SQUARE_M))
+                for image_id in cells.get(cell, ()):
+                    _z, _s, e_min, n_min, e_max, n_max = self._footprints[image_id]
+                    if e_min <= easting <= e_max and n_min <= northing <= n_max:
+                        hits.add(image_id)
+            return [
+                i for i in candidates
+                if i in hits or self._footprints.get(i) is None
+            ]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._footprints)
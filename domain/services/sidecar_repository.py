@@ -0,0 +1,178 @@
+"""Acesso aos sidecars ``.satirriga.json`` com cache e gravacao atomica.
+
+O mesmo sidecar e lido varias vezes por operacao (listagem, loader de
+rasters, renovacao de token, tasks de download/upload). ``SidecarRepository``
+mantem o JSON em memoria validado por ``(mtime_ns, size)`` do arquivo, de
+modo que leituras repetidas custam um ``stat``.
+
+Gravacoes vao para um arquivo temporario na mesma pasta, com ``fsync``, e
+substituem o sidecar por ``os.replace`` — uma queda no meio da escrita
+deixa o arquivo anterior intacto, nunca um JSON truncado.
+
+``update`` aplica alteracoes parciais (leitura-modificacao-escrita) sob
+lock. Gravacoes concorrentes do mesmo sidecar (tasks em threads
+distintas) sao agrupadas: enquanto uma thread grava, as demais enfileiram
+suas alteracoes — ou o conteudo completo, no caso de ``write`` — e a
+thread que esta gravando as aplica num unico ciclo.
+
+O arquivo gravado mantem o modo do sidecar anterior (``0o644`` se novo);
+``mkstemp`` criaria o temporario com ``0o600``.
+"""
+
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+
+# mtimes mais novos que isto (ns) nao sao considerados estaveis (ver
+# gpkg_catalog): leitura de disco recente nao e cacheada
+_RACY_WINDOW_NS = 2_000_000_000
+
+# Modo de sidecars novos (mkstemp cria o temporario com 0o600)
+_DEFAULT_MODE = 0o644
+
+
+def _stat_key(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class SidecarRepository:
+    """Cache thread-safe de sidecars JSON indexado pelo caminho do arquivo."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._cache = {}     # path -> ((mtime_ns, size), dados)
+        self._pending = {}   # path -> (substitui?, alteracoes) aguardando gravacao
+        self._queued = {}    # path -> numero do ultimo lote enfileirado
+        self._written = {}   # path -> numero do ultimo lote gravado
+        self._writing = set()
+
+    def read(self, path: str) -> dict:
+        """Conteudo do sidecar ({} se ausente ou invalido); copia do cache."""
+        key = _stat_key(path)
+        if key is None:
+            with self._lock:
+                self._cache.pop(path, None)
+            return {}
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached is not None and cached[0] == key:
+                return copy.deepcopy(cached[1])
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        if time.time_ns() - key[0] > _RACY_WINDOW_NS:
+            with self._lock:
+                self._cache[path] = (key, copy.deepcopy(data))
+        return data
+
+    def write(self, path: str, data: dict):
+        """Substitui o sidecar inteiro (gravacao atomica).
+
+        Passa pela mesma fila de ``update``: alteracoes parciais ainda nao
+        gravadas sao descartadas (a gravacao completa prevalece) e as
+        posteriores sao aplicadas sobre ``data``.
+        """
+        self._submit(path, data, replace=True)
+
+    def update(self, path: str, changes: dict) -> dict:
+        """Aplica ``changes`` ao sidecar atual e grava; retorna o resultado.
+
+        Se outra thread ja esta gravando o mesmo sidecar, as alteracoes sao
+        entregues a ela e esta chamada aguarda o lote ser gravado.
+        """
+        return self._submit(path, changes, replace=False)
+
+    def _submit(self, path: str, changes: dict, replace: bool) -> dict:
+        with self._lock:
+            pending = self._pending.get(path)
+            if replace or pending is None:
+                # Lote substituido: quem aguardava e atendido pelo novo
+                # lote, que tem numero maior
+                self._pending[path] = (replace, copy.deepcopy(changes))
+            else:
+                pending[1].update(copy.deepcopy(changes))
+            ticket = self._queued[path] = self._queued.get(path, 0) + 1
+            delegated = path in self._writing
+            if delegated:
+                while self._written.get(path, 0) < ticket and path in self._writing:
+                    self._flushed.wait()
+                if self._written.get(path, 0) < ticket:
+                    raise OSError(f"Falha ao gravar sidecar {path}")
+            else:
+                self._writing.add(path)
+        if delegated:
+            return self.read(path)
+
+        data = {}
+        while True:
+            with self._lock:
+                batch = self._pending.pop(path, None)
+                if batch is None:
+                    self._writing.discard(path)
+                    self._flushed.notify_all()
+                    return data
+                upto = self._queued[path]
+            try:
+                replace, batch_changes = batch
+                data = {} if replace else self.read(path)
+                data.update(batch_changes)
+                self._store(path, data)
+            except Exception:
+                with self._lock:
+                    self._pending.pop(path, None)
+                    self._writing.discard(path)
+                    self._flushed.notify_all()
+                raise
+            with self._lock:
+                self._written[path] = upto
+                self._flushed.notify_all()
+
+    def invalidate(self, path: str = None):
+        """Descarta o cache de um sidecar (ou de todos)."""
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(path, None)
+
+    def _store(self, path: str, data: dict):
+        folder = os.path.dirname(path) or "."
+        fd, tmp = tempfile.mkstemp(
+            dir=folder, prefix=".satirriga.", suffix=".tmp",
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                mode = os.stat(path).st_mode & 0o777
+            except OSError:
+                mode = _DEFAULT_MODE
+            os.chmod(tmp, mode)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        key = _stat_key(path)
+        with self._lock:
+            if key is not None:
+                self._cache[path] = (key, copy.deepcopy(data))
+            else:
+                self._cache.pop(path, None)
@@ -0,0 +1,383 @@
+"""Cache local de tiles XYZ em MBTiles (um arquivo por fonte).
+
+Cada fonte e um template de URL XYZ (``.../{z}/{x}/{y}?band=...``); como o
+template ja carrega ``image_id`` e os parametros de visualizacao, a chave
+da fonte e ``{image_id}_{hash(template)}`` e cada combinacao imagem +
+visualizacao fica em ``{cache_dir}/{chave}.mbtiles`` (schema MBTiles 1.3,
+linhas em TMS).
+
+Um indice (``index.sqlite``) guarda, por fonte, o template original, o
+total de bytes e o ultimo acesso. Quando o total passa de ``max_bytes``
+as fontes acessadas ha mais tempo sao removidas inteiras — revisitar as
+cenas de um zonal recente continua servido do disco, inclusive offline.
+Fontes protegidas (``protect``, ex.: as de um prefetch em andamento) nao
+sao despejadas ate serem liberadas (``release``).
+
+Mosaicos (todas as cenas de uma data + banda numa unica camada) sao
+fontes como as outras: a chave e ``mosaic_{hash(templates)}`` e o indice
+guarda ``mosaic:[templates...]`` no lugar do template; o ``TileProxy``
+compoe o tile a partir das fontes componentes e grava so o resultado.
+
+Somente sqlite3/os: usado pelas threads do ``TileProxy`` e por tasks.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+INDEX_FILENAME = "index.sqlite"
+SCHEMA_VERSION = 2
+
+# Ultimo acesso e persistido no indice no maximo a cada N segundos por fonte
+_TOUCH_INTERVAL_S = 60
+
+MOSAIC_PREFIX = "mosaic:"
+
+_IMAGE_ID_RE = re.compile(r"/tiles/s2/([^/]+)/")
+_UNSAFE_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def tile_source_key(url_template: str) -> str:
+    """Chave estavel de uma fonte XYZ: ``{image_id}_{sha1[:12]}``."""
+    digest = hashlib.sha1(url_template.encode("utf-8")).hexdigest()[:12]
+    m = _IMAGE_ID_RE.search(url_template)
+    prefix = _UNSAFE_RE.sub("-", m.group(1))[:48] if m else "xyz"
+    return f"{prefix}_{digest}"
+
+
+def mosaic_source_key(url_templates) -> str:
+    """Chave estavel de um mosaico (a ordem dos templates faz parte dela)."""
+    joined = "\n".join(url_templates)
+    return f"mosaic_{hashlib.sha1(joined.encode('utf-8')).hexdigest()[:12]}"
+
+
+def tile_format(data: bytes) -> str:
+    """Formato MBTiles (``png``/``jpg``/``webp``) pelos bytes iniciais."""
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if data[:3] == b"\xff\xd8\xff":
+        return "jpg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return "png"
+
+
+class TileCache:
+    """Tiles XYZ em MBTiles por fonte, com despejo LRU limitado por tamanho."""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self._dir = os.path.abspath(cache_dir)
+        self._index_path = os.path.join(self._dir, INDEX_FILENAME)
+        self._max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._touched = {}  # chave -> ultimo touch persistido (time.time)
+        self._protected = {}  # chave -> protecoes ativas (fora do despejo)
+        os.makedirs(self._dir, exist_ok=True)
+        with closing(self._connect_index()):
+            pass
+
+    @property
+    def cache_dir(self) -> str:
+        return self._dir
+
+    @staticmethod
+    def mime_type(data: bytes) -> str:
+        """Content-Type de um tile gravado."""
+        return {"png": "image/png", "jpg": "image/jpeg", "webp": "image/webp"}[
+            tile_format(data)
+        ]
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    def set_max_bytes(self, max_bytes: int):
+        self._max_bytes = max(0, int(max_bytes))
+        with self._lock:
+            self._evict(keep=None)
+
+    def protect(self, keys):
+        """Impede o despejo das fontes ``keys`` ate ``release`` (cumulativo)."""
+        with self._lock:
+            for key in keys:
+                self._protected[key] = self._protected.get(key, 0) + 1
+
+    def release(self, keys):
+        """Desfaz um ``protect`` e reaplica o limite de tamanho."""
+        with self._lock:
+            for key in keys:
+                count = self._protected.get(key, 0) - 1
+                if count > 0:
+                    self._protected[key] = count
+                else:
+                    self._protected.pop(key, None)
+            self._evict(keep=None)
+
+    # ------------------------------------------------------------------
+    # Fontes
+    # ------------------------------------------------------------------
+
+    def register(self, url_template: str) -> str:
+        """Registra a fonte (idempotente) e retorna sua chave."""
+        key = tile_source_key(url_template)
+        with self._lock, closing(self._connect_index()) as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO sources (key, url_template, bytes, tiles, "
+                "last_access) VALUES (?, ?, 0, 0, ?)",
+                (key, url_template, time.time()),
+            )
+            conn.commit()
+        return key
+
+    def register_mosaic(self, url_templates) -> str:
+        """Registra um mosaico das fontes ``url_templates``; retorna sua chave.
+
+        A ordem dos templates define a ordem de desenho (o primeiro fica
+        por baixo).
+        """
+        templates = list(url_templates)
+        key = mosaic_source_key(templates)
+        with self._lock, closing(self._connect_index()) as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO sources (key, url_template, bytes, tiles, "
+                "last_access) VALUES (?, ?, 0, 0, ?)",
+                (key, MOSAIC_PREFIX + json.dumps(templates), time.time()),
+            )
+            conn.commit()
+        return key
+
+    @staticmethod
+    def source_key(url_template: str) -> str:
+        """Chave de uma fonte sem registra-la (leitura de componentes)."""
+        return tile_source_key(url_template)
+
+    @staticmethod
+    def mosaic_components(upstream: str):
+        """Templates componentes se ``upstream`` e de um mosaico, senao None."""
+        if not upstream or not upstream.startswith(MOSAIC_PREFIX):
+            return None
+        return json.loads(upstream[len(MOSAIC_PREFIX):])
+
+    def upstream(self, key: str):
+        """Template de URL original da fonte ou None se desconhecida."""
+        with closing(self._connect_index()) as conn:
+            row = conn.execute(
+                "SELECT url_template FROM sources WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    # ------------------------------------------------------------------
+    # Tiles
+    # ------------------------------------------------------------------
+
+    def get(self, key: str, z: int, x: int, y: int):
+        """Bytes do tile XYZ ou None se ausente."""
+        path = self._mbtiles_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with closing(sqlite3.connect(path, timeout=5)) as conn:
+                row = conn.execute(
+                    "SELECT tile_data FROM tiles WHERE zoom_level = ? "
+                    "AND tile_column = ? AND tile_row = ?",
+                    (z, x, _tms_row(z, y)),
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        self._touch(key)
+        return bytes(row[0])
+
+    def has(self, key: str, z: int, x: int, y: int) -> bool:
+        path = self._mbtiles_path(key)
+        if not os.path.exists(path):
+            return False
+        try:
+            with closing(sqlite3.connect(path, timeout=5)) as conn:
+                return conn.execute(
+                    "SELECT 1 FROM tiles WHERE zoom_level = ? "
+                    "AND tile_column = ? AND tile_row = ?",
+                    (z, x, _tms_row(z, y)),
+                ).fetchone() is not None
+        except sqlite3.Error:
+            return False
+
+    def put(self, key: str, z: int, x: int, y: int, data: bytes):
+        """Grava um tile e aplica o limite de tamanho do cache."""
+        self.put_many(key, [(z, x, y, data)])
+
+    def put_many(self, key: str, tiles):
+        """Grava ``[(z, x, y, bytes)]`` numa transacao (prefetch em lote)."""
+        tiles = list(tiles)
+        if not tiles:
+            return
+        with self._lock:
+            path = self._mbtiles_path(key)
+            with closing(self._connect_mbtiles(path, key, tiles[0][3])) as conn:
+                delta = 0
+                added = 0
+                for z, x, y, data in tiles:
+                    old = conn.execute(
+                        "SELECT length(tile_data) FROM tiles WHERE zoom_level = ? "
+                        "AND tile_column = ? AND tile_row = ?",
+                        (z, x, _tms_row(z, y)),
+                    ).fetchone()
+                    conn.execute(
+                        "INSERT OR REPLACE INTO tiles "
+                        "(zoom_level, tile_column, tile_row, tile_data) "
+                        "VALUES (?, ?, ?, ?)",
+                        (z, x, _tms_row(z, y), sqlite3.Binary(data)),
+                    )
+                    delta += len(data) - (old[0] if old else 0)
+                    added += 0 if old else 1
+                conn.commit()
+            now = time.time()
+            with closing(self._connect_index()) as conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO sources (key, url_template, bytes, tiles, "
+                    "last_access) VALUES (?, '', 0, 0, ?)",
+                    (key, now),
+                )
+                conn.execute(
+                    "UPDATE sources SET bytes = MAX(0, bytes + ?), "
+                    "tiles = tiles + ?, last_access = ? WHERE key = ?",
+                    (delta, added, now, key),
+                )
+                conn.commit()
+            self._touched[key] = now
+            self._evict(keep=key)
+
+    # ------------------------------------------------------------------
+    # Manutencao
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        """``{"sources", "tiles", "bytes", "max_bytes"}`` do cache."""
+        with closing(self._connect_index()) as conn:
+            n, tiles, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tiles), 0), COALESCE(SUM(bytes), 0) "
+                "FROM sources"
+            ).fetchone()
+        return {"sources": n, "tiles": tiles, "bytes": total,
+                "max_bytes": self._max_bytes}
+
+    def average_tile_bytes(self):
+        """Tamanho medio dos tiles gravados (None sem amostras)."""
+        stats = self.stats()
+        return stats["bytes"] / stats["tiles"] if stats["tiles"] else None
+
+    def clear(self):
+        """Remove todos os tiles (mantem o indice de fontes zerado)."""
+        with self._lock, closing(self._connect_index()) as conn:
+            for (key,) in conn.execute("SELECT key FROM sources").fetchall():
+                _remove_file(self._mbtiles_path(key))
+            conn.execute("UPDATE sources SET bytes = 0, tiles = 0")
+            conn.commit()
+            self._touched.clear()
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _mbtiles_path(self, key: str) -> str:
+        return os.path.join(self._dir, f"{key}.mbtiles")
+
+    def _connect_index(self):
+        conn = sqlite3.connect(self._index_path, timeout=5)
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        except sqlite3.DatabaseError:
+            # Indice corrompido: os .mbtiles sao recontados do zero
+            conn.close()
+            os.remove(self._index_path)
+            conn = sqlite3.connect(self._index_path, timeout=5)
+            version = 0
+        if version == 1:
+            # v2: contagem de tiles por fonte (estimativa do prefetch)
+            conn.executescript(
+                "ALTER TABLE sources ADD COLUMN tiles INTEGER DEFAULT 0;"
+                f"PRAGMA user_version = {SCHEMA_VERSION};"
+            )
+        elif version != SCHEMA_VERSION:
+            conn.executescript(
+                "DROP TABLE IF EXISTS sources;"
+                "CREATE TABLE sources (key TEXT PRIMARY KEY, url_template TEXT, "
+                "bytes INTEGER, tiles INTEGER DEFAULT 0, last_access REAL);"
+                f"PRAGMA user_version = {SCHEMA_VERSION};"
+            )
+        return conn
+
+    def _connect_mbtiles(self, path: str, key: str, sample: bytes):
+        conn = sqlite3.connect(path, timeout=5)
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);"
+            "CREATE TABLE IF NOT EXISTS tiles (zoom_level INTEGER, "
+            "tile_column INTEGER, tile_row INTEGER, tile_data BLOB, "
+            "PRIMARY KEY (zoom_level, tile_column, tile_row));"
+        )
+        if conn.execute("SELECT COUNT(*) FROM metadata").fetchone()[0] == 0:
+            conn.executemany(
+                "INSERT INTO metadata VALUES (?, ?)",
+                [("name", key), ("type", "overlay"), ("version", "1"),
+                 ("format", tile_format(sample)),
+                 ("description", "Cache de tiles SatIrriga")],
+            )
+        return conn
+
+    def _touch(self, key: str):
+        now = time.time()
+        if now - self._touched.get(key, 0) < _TOUCH_INTERVAL_S:
+            return
+        self._touched[key] = now
+        try:
+            with closing(self._connect_index()) as conn:
+                conn.execute(
+                    "UPDATE sources SET last_access = ? WHERE key = ?", (now, key),
+                )
+                conn.commit()
+        except sqlite3.Error:
+            pass  # ultimo acesso e apenas uma dica para o despejo
+
+    def _evict(self, keep):
+        """Remove fontes menos recentes ate caber em ``max_bytes`` (com lock)."""
+        with closing(self._connect_index()) as conn:
+            rows = conn.execute(
+                "SELECT key, bytes FROM sources ORDER BY last_access DESC"
+            ).fetchall()
+            total = sum(b or 0 for _k, b in rows)
+            removed = []
+            for key, size in reversed(rows):
+                if total <= self._max_bytes:
+                    break
+                if key == keep or key in self._protected or not size:
+                    continue
+                _remove_file(self._mbtiles_path(key))
+                removed.append(key)
+                total -= size
+            if removed:
+                conn.executemany(
+                    "UPDATE sources SET bytes = 0, tiles = 0 WHERE key = ?",
+                    [(k,) for k in removed],
+                )
+                conn.commit()
+            for key in removed:
+                self._touched.pop(key, None)
+
+
+def _tms_row(z: int, y: int) -> int:
+    """Linha TMS (origem no sul, usada pelo MBTiles) a partir do y XYZ."""
+    return (1 << z) - 1 - y
+
+
+def _remove_file(path: str):
+    for suffix in ("", "-journal", "-wal", "-shm"):
+        try:
+            os.remove(path + suffix)
+        except OSError:
+            pass
@@ -1,7 +1,9 @@
 """Servico de inspecao pontual de indices espectrais.
 
 Encapsula a chamada POST /api/mapeamento/tiles/get/indexs/images com
-cache LRU em memoria por (lat, lon, image_ids).
+cache por cena e pixel de 10 m (``PixelIndexCache``): consultas repetidas
+no mesmo pixel sao servidas do cache e, com outro conjunto de cenas, so
+as cenas ainda nao vistas vao a API.
 
 A API roteia o request para o jobs-server upstream que calcula os
 indices (NDVI, NDWI, EVI, SAVI, MNDWI, Albedo) sobre o pixel solicitado.
@@ -11,24 +13,22 @@ client web Angular: layer-indexes-panel).
 """
 
 import json
-from collections import OrderedDict
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from ..models.pixel_indexes import SceneIndexes, parse_scene_list
+from .pixel_index_cache import PixelIndexCache
 
 
 _ENDPOINT_PATH = "/mapeamento/tiles/get/indexs/images"
-_CACHE_MAX = 64
-_COORD_PRECISION = 6  # decimais de lat/lon usados como chave de cache
 
 
 class TileIndexesService:
     """Cliente assincrono para consulta de indices espectrais por ponto."""
 
-    def __init__(self, http_client, config_repo):
+    def __init__(self, http_client, config_repo, cache: PixelIndexCache = None):
         self._http = http_client
         self._config = config_repo
-        self._cache: "OrderedDict[tuple, List[SceneIndexes]]" = OrderedDict()
+        self._cache = cache if cache is not None else PixelIndexCache()
 
     def request(self, image_ids: List[str], lat: float, lon: float) -> str:
         """Dispara POST. Retorna request_id do HttpClient.
@@ -43,14 +43,20 @@ class TileIndexesService:
         }).encode("utf-8")
         return self._http.post_json(url, payload)
 
-    def parse_response(self, body: bytes) -> List[SceneIndexes]:
-        """Decodifica body do HTTP em lista de SceneIndexes."""
+    def parse_response(self, body: bytes) -> Optional[List[SceneIndexes]]:
+        """Decodifica body do HTTP em lista de SceneIndexes.
+
+        ``None`` quando o body vem vazio ou nao e JSON de cenas: a resposta
+        nao diz nada sobre a cobertura e nao deve ir ao cache.
+        """
         if not body:
-            return []
+            return None
         try:
             data = json.loads(body)
         except (ValueError, TypeError):
-            return []
+            return None
+        if not isinstance(data, (list, dict)):
+            return None
         return parse_scene_list(data)
 
     # ------------------------------------------------------------------
@@ -59,26 +65,39 @@ class TileIndexesService:
 
     def cached_for(self, image_ids: List[str], lat: float,
                    lon: float) -> Optional[List[SceneIndexes]]:
-        """Retorna resultado do cache se houver hit."""
-        key = self._cache_key(image_ids, lat, lon)
-        if key not in self._cache:
-            return None
-        # Move para o final (LRU)
-        value = self._cache.pop(key)
-        self._cache[key] = value
-        return value
+        """Retorna resultado do cache se todas as cenas tiverem hit."""
+        hits, missing = self.split_cached(image_ids, lat, lon)
+        return None if missing else hits
+
+    def split_cached(self, image_ids: List[str], lat: float,
+                     lon: float) -> Tuple[List[SceneIndexes], List[str]]:
+        """``(cenas em cache, image_ids a consultar)`` para o ponto."""
+        found = self._cache.lookup(image_ids, lat, lon)
+        hits = [found[i] for i in image_ids if found.get(i) is not None]
+        missing = [i for i in image_ids if i not in found]
+        return hits, missing
 
     def store(self, image_ids: List[str], lat: float, lon: float,
               scenes: List[SceneIndexes]):
-        """Insere resultado no cache LRU."""
-        key = self._cache_key(image_ids, lat, lon)
-        self._cache[key] = scenes
-        while len(self._cache) > _CACHE_MAX:
-            self._cache.popitem(last=False)
+        """Grava o resultado por cena (cenas sem retorno ficam como vazias)."""
+        self._cache.store(image_ids, lat, lon, scenes)
+
+    @staticmethod
+    def merge(image_ids: List[str], *scene_lists) -> List[SceneIndexes]:
+        """Une resultados (cache + API) na ordem de ``image_ids``."""
+        order = {image_id: i for i, image_id in enumerate(image_ids)}
+        merged = {}
+        for scenes in scene_lists:
+            for scene in scenes:
+                merged.setdefault(scene.id_imagem, scene)
+        return sorted(merged.values(), key=lambda s: order.get(s.id_imagem, len(order)))
 
     def clear_cache(self):
         self._cache.clear()
 
+    def close(self):
+        self._cache.close()
+
     # ------------------------------------------------------------------
     # Internals
     # ------------------------------------------------------------------
@@ -86,12 +105,3 @@ class TileIndexesService:
     def _build_url(self) -> str:
         base = (self._config.get("api_base_url") or "").rstrip("/")
         return f"{base}{_ENDPOINT_PATH}"
-
-    @staticmethod
-    def _cache_key(image_ids, lat, lon) -> tuple:
-        ids = tuple(sorted(str(i) for i in image_ids))
-        return (
-            round(float(lat), _COORD_PRECISION),
-            round(float(lon), _COORD_PRECISION),
-            ids,
-        )
@@ -0,0 +1,168 @@
+"""Planejamento de prefetch de tiles XYZ para uso offline.
+
+Converte a extensao de um zonal (lon/lat) e uma faixa de zoom nos tiles
+XYZ (Web Mercator) necessarios para cada fonte escolhida da
+``RasterHierarchy`` (datas x bandas), e estima o volume antes do
+download. Cada fonte de cena so pede os tiles dentro do footprint da
+cena (tile MGRS do image_id): fora dele o servidor responde "sem tile".
+O download em si fica em ``TilePrefetchTask``.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .scene_footprints import footprint_bbox
+
+# Limite de latitude do Web Mercator
+_MAX_LAT = 85.05112878
+
+# Tamanho medio de tile (PNG 256px de indice) quando o cache ainda nao
+# tem amostras para estimar
+DEFAULT_TILE_BYTES = 30 * 1024
+
+# Protecao contra pedidos acidentais (ex.: zoom 18 num estado inteiro)
+MAX_PREFETCH_TILES = 50_000
+
+
+@dataclass
+class PrefetchPlan:
+    """Tiles a baixar: ``[(url_template, z, x, y)]`` + resumo."""
+    tiles: List[tuple] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)
+    zmin: int = 0
+    zmax: int = 0
+    truncated: bool = False
+
+    @property
+    def tile_count(self) -> int:
+        return len(self.tiles)
+
+    def estimated_bytes(self, avg_tile_bytes: Optional[float] = None) -> int:
+        return int(self.tile_count * (avg_tile_bytes or DEFAULT_TILE_BYTES))
+
+
+def lonlat_to_tile(lon: float, lat: float, z: int):
+    """Tile XYZ ``(x, y)`` que contem o ponto no zoom ``z``."""
+    lat = max(-_MAX_LAT, min(_MAX_LAT, lat))
+    n = 1 << z
+    x = int((lon + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tiles_for_bbox(bbox, z: int):
+    """Tiles ``(z, x, y)`` que cobrem ``bbox = [minx, miny, maxx, maxy]`` (graus)."""
+    minx, miny, maxx, maxy = bbox
+    x0, y0 = lonlat_to_tile(minx, maxy, z)  # canto noroeste
+    x1, y1 = lonlat_to_tile(maxx, miny, z)  # canto sudeste
+    for x in range(x0, x1 + 1):
+        for y in range(y0, y1 + 1):
+            yield z, x, y
+
+
+def count_tiles_for_bbox(bbox, zmin: int, zmax: int) -> int:
+    """Quantidade de tiles por fonte, sem materializar a lista."""
+    minx, miny, maxx, maxy = bbox
+    total = 0
+    for z in range(zmin, zmax + 1):
+        x0, y0 = lonlat_to_tile(minx, maxy, z)
+        x1, y1 = lonlat_to_tile(maxx, miny, z)
+        total += (x1 - x0 + 1) * (y1 - y0 + 1)
+    return total
+
+
+def clip_bbox(bbox, other) -> Optional[list]:
+    """Intersecao de duas extensoes ``[minx, miny, maxx, maxy]``; None se vazia."""
+    minx, miny = max(bbox[0], other[0]), max(bbox[1], other[1])
+    maxx, maxy = min(bbox[2], other[2]), min(bbox[3], other[3])
+    if minx > maxx or miny > maxy:
+        return None
+    return [minx, miny, maxx, maxy]
+
+
+def source_bbox(bbox, template: str, extents: Optional[Dict[str, list]] = None):
+    """Extensao a baixar de ``template``: ``bbox`` recortado pela cena."""
+    extent = (extents or {}).get(template)
+    return bbox if extent is None else clip_bbox(bbox, extent)
+
+
+def count_plan_tiles(bbox, templates, zmin: int, zmax: int,
+                     extents: Optional[Dict[str, list]] = None) -> int:
+    """Total de tiles do plano (todas as fontes), sem materializar a lista."""
+    total = 0
+    for template in templates:
+        clipped = source_bbox(bbox, template, extents)
+        if clipped is not None:
+            total += count_tiles_for_bbox(clipped, zmin, zmax)
+    return total
+
+
+def template_extents(hierarchy) -> Dict[str, list]:
+    """``{xyz_url: extensao lon/lat do footprint}`` das cenas com tile MGRS."""
+    extents = {}
+    for date_group in hierarchy.dates:
+        for band_group in date_group.bands:
+            for config in band_group.layers:
+                if not config.xyz_url or config.xyz_url in extents:
+                    continue
+                extent = footprint_bbox(config.image_id)
+                if extent is not None:
+                    extents[config.xyz_url] = extent
+    return extents
+
+
+def hierarchy_templates(hierarchy, dates=None, bands=None) -> List[str]:
+    """Templates XYZ da hierarquia filtrados por ``date_iso`` e ``band_key``.
+
+    ``None`` seleciona todos. Templates repetidos aparecem uma vez.
+    """
+    seen, templates = set(), []
+    for date_group in hierarchy.dates:
+        if dates is not None and date_group.date_iso not in dates:
+            continue
+        for band_group in date_group.bands:
+            if bands is not None and band_group.band_key not in bands:
+                continue
+            for config in band_group.layers:
+                if config.xyz_url and config.xyz_url not in seen:
+                    seen.add(config.xyz_url)
+                    templates.append(config.xyz_url)
+    return templates
+
+
+def build_prefetch_plan(bbox, templates, zmin: int, zmax: int,
+                        max_tiles: int = MAX_PREFETCH_TILES,
+                        extents: Optional[Dict[str, list]] = None) -> PrefetchPlan:
+    """Plano de prefetch (zoom baixo primeiro; corta em ``max_tiles``).
+
+    ``extents`` (``template_extents``) limita cada fonte ao footprint da
+    sua cena; fontes sem extensao usam ``bbox`` inteiro.
+    """
+    zmin, zmax = min(zmin, zmax), max(zmin, zmax)
+    plan = PrefetchPlan(sources=list(templates), zmin=zmin, zmax=zmax)
+    clipped = {t: source_bbox(bbox, t, extents) for t in templates}
+    for z in range(zmin, zmax + 1):
+        coords = {}  # extensao -> tiles (fontes da mesma cena compartilham)
+        for template in templates:
+            extent = clipped[template]
+            if extent is None:
+                continue
+            if tuple(extent) not in coords:
+                coords[tuple(extent)] = list(tiles_for_bbox(extent, z))
+            for _z, x, y in coords[tuple(extent)]:
+                if len(plan.tiles) >= max_tiles:
+                    plan.truncated = True
+                    return plan
+                plan.tiles.append((template, z, x, y))
+    return plan
+
+
+def format_bytes(n: int) -> str:
+    """``"12.3 MB"``/``"850 KB"`` para exibicao."""
+    if n >= 1024 * 1024 * 1024:
+        return f"{n / (1024 ** 3):.1f} GB"
+    if n >= 1024 * 1024:
+        return f"{n / (1024 ** 2):.1f} MB"
+    return f"{n / 1024:.0f} KB"
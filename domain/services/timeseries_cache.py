@@ -0,0 +1,209 @@
+"""Cache persistente de series temporais por ponto e data.
+
+Pontos sao ajustados a uma grade de ``SNAP_DECIMALS`` casas decimais
+(~11 m): cliques proximos reaproveitam a mesma serie. Para cada ponto o
+cache guarda os valores por dia (``series``) e os intervalos ja
+consultados (``coverage``), alem do label que a API deu ao ponto
+(``labels``); uma consulta so precisa buscar as lacunas
+(``gaps``) e a resposta e unida ao que ja existe.
+
+Dias recentes (``RECENT_DAYS``) nao entram na cobertura — novas cenas
+ainda podem chegar — e coberturas com mais de ``MAX_AGE_DAYS`` sao
+descartadas ao abrir, para acompanhar reprocessamentos no servidor.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+from ..models.timeseries import TimeSeriesDataset
+
+SNAP_DECIMALS = 4
+RECENT_DAYS = 5
+MAX_AGE_DAYS = 30
+SCHEMA_VERSION = 2
+
+_VALUE_FIELDS = ("evi", "evi_original", "ndvi", "ndvi_original", "precipitation")
+
+Interval = Tuple[str, str]  # (inicio, fim) ISO, inclusivo
+
+
+def snap_key(lat: float, lon: float) -> str:
+    """Chave do ponto na grade do cache."""
+    return f"{round(lat, SNAP_DECIMALS):.{SNAP_DECIMALS}f},{round(lon, SNAP_DECIMALS):.{SNAP_DECIMALS}f}"
+
+
+def _day(iso: str) -> date:
+    return date.fromisoformat(iso[:10])
+
+
+def merge_intervals(intervals: List[Interval]) -> List[Interval]:
+    """Une intervalos sobrepostos ou adjacentes (dia seguinte)."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and _day(start) <= _day(merged[-1][1]) + timedelta(days=1):
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(start: str, end: str, covered: List[Interval]) -> List[Interval]:
+    """Partes de ``[start, end]`` fora dos intervalos ``covered``."""
+    gaps: List[Interval] = []
+    cursor = _day(start)
+    last = _day(end)
+    for c_start, c_end in merge_intervals(covered):
+        c0, c1 = _day(c_start), _day(c_end)
+        if c1 < cursor:
+            continue
+        if c0 > last:
+            break
+        if c0 > cursor:
+            gaps.append((cursor.isoformat(), (c0 - timedelta(days=1)).isoformat()))
+        cursor = max(cursor, c1 + timedelta(days=1))
+        if cursor > last:
+            break
+    if cursor <= last:
+        gaps.append((cursor.isoformat(), last.isoformat()))
+    return gaps
+
+
+class TimeSeriesCache:
+    """Series por ``(ponto, dia)`` em sqlite com intervalos de cobertura.
+
+    ``path=":memory:"`` mantem o cache apenas durante a sessao.
+    """
+
+    def __init__(self, path: str = ":memory:", today: Optional[date] = None):
+        self._today = today
+        self._lock = threading.Lock()
+        self._conn = self._connect(path)
+        self._expire()
+
+    def gaps(self, key: str, start: str, end: str) -> List[Interval]:
+        """Intervalos de ``[start, end]`` ainda nao consultados para o ponto."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day_start, day_end FROM coverage WHERE point = ?", (key,),
+            ).fetchall()
+        return subtract_intervals(start, end, [tuple(r) for r in rows])
+
+    def store(self, key: str, start: str, end: str, dataset: TimeSeriesDataset,
+              label: str = ""):
+        """Grava a resposta de ``[start, end]`` e marca o intervalo coberto."""
+        rows = []
+        for i, raw_date in enumerate(dataset.dates):
+            if not raw_date or not start <= raw_date[:10] <= end:
+                continue
+            values = tuple(
+                _value_at(getattr(dataset, f), i) for f in _VALUE_FIELDS
+            )
+            rows.append((key, raw_date[:10], raw_date) + values)
+
+        # Dias recentes ficam fora da cobertura (podem ganhar dados)
+        limit = (self._current_day() - timedelta(days=RECENT_DAYS)).isoformat()
+        covered_end = min(end, limit)
+
+        with self._lock:
+            # O intervalo rebuscado substitui o que havia (dias removidos
+            # no servidor tambem somem daqui)
+            self._conn.execute(
+                "DELETE FROM series WHERE point = ? AND day BETWEEN ? AND ?",
+                (key, start, end),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO series VALUES "
+                f"({', '.join('?' * (3 + len(_VALUE_FIELDS)))})",
+                rows,
+            )
+            # Um registro por consulta (expira por conta propria); a uniao
+            # dos intervalos e feita na leitura (``gaps``)
+            if start <= covered_end:
+                self._conn.execute(
+                    "INSERT INTO coverage VALUES (?, ?, ?, ?)",
+                    (key, start, covered_end, time.time()),
+                )
+            if label:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO labels VALUES (?, ?)", (key, label),
+                )
+            self._conn.commit()
+
+    def label(self, key: str) -> str:
+        """Ultimo label devolvido pela API para o ponto (vazio se nenhum)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT label FROM labels WHERE point = ?", (key,),
+            ).fetchone()
+        return row[0] if row else ""
+
+    def dataset(self, key: str, start: str, end: str) -> TimeSeriesDataset:
+        """Serie do ponto em ``[start, end]``, ordenada por data."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date, " + ", ".join(_VALUE_FIELDS) + " FROM series "
+                "WHERE point = ? AND day BETWEEN ? AND ? ORDER BY day",
+                (key, start, end),
+            ).fetchall()
+        columns = list(zip(*rows)) if rows else [[] for _ in range(1 + len(_VALUE_FIELDS))]
+        return TimeSeriesDataset(
+            dates=list(columns[0]),
+            **{f: list(columns[i + 1]) for i, f in enumerate(_VALUE_FIELDS)},
+        )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM series")
+            self._conn.execute("DELETE FROM coverage")
+            self._conn.execute("DELETE FROM labels")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _current_day(self) -> date:
+        return self._today or date.today()
+
+    def _expire(self):
+        """Descarta coberturas antigas (os valores sao sobrescritos ao rebuscar)."""
+        cutoff = time.time() - MAX_AGE_DAYS * 86400
+        with self._lock:
+            self._conn.execute("DELETE FROM coverage WHERE fetched_at < ?", (cutoff,))
+            self._conn.commit()
+
+    @staticmethod
+    def _connect(path: str):
+        conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        except sqlite3.DatabaseError:
+            # Arquivo corrompido: cache e descartavel
+            conn.close()
+            os.remove(path)
+            conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+            version = 0
+        if version != SCHEMA_VERSION:
+            conn.executescript(
+                "DROP TABLE IF EXISTS series;"
+                "DROP TABLE IF EXISTS coverage;"
+                "DROP TABLE IF EXISTS labels;"
+                "CREATE TABLE series (point TEXT, day TEXT, date TEXT, "
+                + ", ".join(f"{f} REAL" for f in _VALUE_FIELDS)
+                + ", PRIMARY KEY (point, day));"
+                "CREATE TABLE coverage (point TEXT, day_start TEXT, day_end TEXT, "
+                "fetched_at REAL);"
+                "CREATE INDEX coverage_point ON coverage (point);"
+                "CREATE TABLE labels (point TEXT PRIMARY KEY, label TEXT);"
+                f"PRAGMA user_version = {SCHEMA_VERSION};"
+            )
+        return conn
+
+
+def _value_at(values, i):
+    return values[i] if values and i < len(values) else None
@@ -5,9 +5,15 @@ Dois níveis de configuração:
 2. Por mapeamento (sidecar .satirriga.json) — sobrepõe a global
 
 Parâmetros por banda: min, max, gamma, palette.
+
+A configuracao global e lida do QgsSettings uma vez por banda e mantida
+em memoria ate ``invalidate_vis_cache`` (chamado ao salvar/restaurar e
+em ``config_changed``).
 """
 
 import json
+import threading
+from dataclasses import replace
 
 from qgis.core import QgsSettings
 
@@ -32,12 +38,33 @@ CONFIGURABLE_BANDS = [
 ]
 
 
+# Configuracao global resolvida por banda (leituras de QgsSettings)
+_global_cache = {}
+_global_lock = threading.Lock()
+
+
+def invalidate_vis_cache():
+    """Descarta a configuracao global em memoria (releitura do QgsSettings)."""
+    with _global_lock:
+        _global_cache.clear()
+
+
 def get_global_vis_params(band: str) -> VisParams:
     """Retorna VisParams da configuração global (QgsSettings).
 
     Fallback para defaults hardcoded se nenhuma configuração foi salva.
     Aplica regra GEE: gamma e palette sao mutuamente exclusivos.
     """
+    with _global_lock:
+        cached = _global_cache.get(band)
+    if cached is None:
+        cached = _read_global_vis_params(band)
+        with _global_lock:
+            _global_cache[band] = cached
+    return replace(cached)
+
+
+def _read_global_vis_params(band: str) -> VisParams:
     settings = QgsSettings()
     key = f"{_SETTINGS_PREFIX}{band}"
     raw = settings.value(key)
@@ -92,6 +119,7 @@ def save_global_vis_params(band: str, params: VisParams):
     if params.bias is not None:
         data["bias"] = params.bias
     settings.setValue(key, json.dumps(data))
+    invalidate_vis_cache()
 
 
 def restore_global_defaults():
@@ -100,6 +128,7 @@ def restore_global_defaults():
     for band, _ in CONFIGURABLE_BANDS:
         key = f"{_SETTINGS_PREFIX}{band}"
         settings.remove(key)
+    invalidate_vis_cache()
 
 
 def get_mapeamento_vis_params(sidecar: dict, band: str) -> VisParams:
@@ -0,0 +1,308 @@
+"""Polling de status de zonais — lotes, agenda adaptativa e parse.
+
+``GET /zonal/status?ids=1,2,3`` substitui N chamadas a
+``GET /zonal/{id}/status`` no polling. Cada zonal tem seu proprio
+horario da proxima consulta, derivado de ``polling_interval_ms`` e do
+status atual. Sem dependencia de Qt: o controller mantem o timer e
+roteia as respostas do HttpClient.
+"""
+
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Estados em que o zonal ainda esta sendo processado no servidor
+INTERMEDIATE_STATUSES = frozenset({"PROCESSING", "OVERLAID", "CREATED", "CONSOLIDATING"})
+
+# Estados de trabalho ativo no servidor — consultados no intervalo base
+FAST_STATUSES = frozenset({"PROCESSING", "CONSOLIDATING"})
+
+# Limite de ids por request (mantem a URL curta e o payload previsivel)
+BATCH_MAX_IDS = 100
+
+DEFAULT_INTERVAL_MS = 3000
+MIN_INTERVAL_MS = 500
+MAX_INTERVAL_MS = 60000
+
+
+def next_interval_ms(base_ms: int, status: Optional[str] = None,
+                     unchanged: int = 0, errors: int = 0) -> int:
+    """Intervalo ate a proxima consulta de um zonal.
+
+    - erros: backoff exponencial (base * 2^erros)
+    - PROCESSING/CONSOLIDATING: base; demais intermediarios: 2x base
+    - respostas repetidas (status inalterado): +50% por repeticao
+    Sempre limitado a ``MAX_INTERVAL_MS``.
+    """
+    if errors:
+        return int(min(base_ms * (2 ** errors), MAX_INTERVAL_MS))
+    factor = 1.0 if status in FAST_STATUSES else 2.0
+    factor *= 1.5 ** min(unchanged, 8)
+    return int(min(base_ms * factor, MAX_INTERVAL_MS))
+
+
+def chunk_ids(ids: Iterable[int], size: int = BATCH_MAX_IDS) -> List[List[int]]:
+    """Divide ``ids`` em lotes de no maximo ``size`` (ordem preservada)."""
+    ids = list(ids)
+    return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+
+def status_batch_path(ids: Iterable[int]) -> str:
+    """Path relativo a api_base_url para o lote informado."""
+    return "/zonal/status?ids=" + ",".join(str(int(i)) for i in ids)
+
+
+def parse_status_batch(data) -> Dict[int, str]:
+    """Normaliza a resposta do lote em ``{zonal_id: status}``.
+
+    Formatos aceitos:
+      - ``[{"id": 1, "status": "..."}]`` (ou ``zonalId``), opcionalmente
+        dentro de ``{"data": [...]}``
+      - ``{"1": "STATUS"}`` ou ``{"1": {"status": "..."}}``
+    Entradas sem id ou status sao ignoradas.
+    """
+    if isinstance(data, dict) and isinstance(data.get("data"), (list, dict)):
+        data = data["data"]
+
+    result = {}
+    if isinstance(data, list):
+        for entry in data:
+            if not isinstance(entry, dict):
+                continue
+            zid = entry.get("id", entry.get("zonalId"))
+            status = entry.get("status")
+            if zid is None or not status:
+                continue
+            try:
+                result[int(zid)] = status
+            except (TypeError, ValueError):
+                continue
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            status = value.get("status") if isinstance(value, dict) else value
+            if not status or not isinstance(status, str):
+                continue
+            try:
+                result[int(key)] = status
+            except (TypeError, ValueError):
+                continue
+    return result
+
+
+# Status HTTP que indicam ausencia do endpoint em lote no servidor.
+# 400 cobre backends que roteiam "status" como :id em /zonal/:id.
+_BATCH_UNSUPPORTED_CODES = frozenset({400, 404, 405, 501})
+
+
+class ZonalStatusPoller:
+    """Estado do polling de status de zonais (sem Qt).
+
+    O controller mantem o QTimer e chama ``poll()`` a cada ciclo; as
+    respostas do HttpClient sao roteadas para ``handle_response`` /
+    ``handle_failure``, que devolvem ``(updates, stopped)``:
+    ``updates`` = ``[(zonal_id, status)]`` a repassar para a UI e
+    ``stopped`` = ``[(zonal_id, motivo)]`` com motivo ``"terminal"`` ou
+    ``"errors"``.
+
+    Usa ``GET /zonal/status?ids=...`` (um request por lote); se o servidor
+    nao oferece o endpoint em lote, cai para ``GET /zonal/{id}/status``
+    com no maximo ``FALLBACK_MAX_PER_TICK`` requests por ciclo, em rodizio
+    (os excedentes sao adiados em intervalos base).
+
+    Cada zonal so entra no ciclo quando vence seu ``next_due`` (ver
+    ``next_interval_ms``); zonais que vencem dentro de meio intervalo base
+    sao adiantados para aproveitar o mesmo lote. ``next_due_in_ms()``
+    informa ao controller quando agendar o proximo ciclo.
+    """
+
+    MAX_CONSECUTIVE_ERRORS = 5
+    FALLBACK_MAX_PER_TICK = 4
+
+    def __init__(self, http_client, config_repo, clock=None):
+        self._http = http_client
+        self._config = config_repo
+        self._clock = clock or time.monotonic
+        # zonal_id -> {"request_id", "errors", "last_poll", "status",
+        #              "unchanged", "next_due"} (tempos em segundos do clock)
+        self._zonals: Dict[int, dict] = {}
+        self._pending_batch: Dict[str, List[int]] = {}
+        self._pending_single: Dict[str, int] = {}
+        self.batch_supported: Optional[bool] = None  # None = ainda nao testado
+
+    # ------------------------------------------------------------------
+    # Zonais observados
+    # ------------------------------------------------------------------
+
+    def start(self, zonal_id: int):
+        if zonal_id not in self._zonals:
+            self._zonals[zonal_id] = {
+                "request_id": None, "errors": 0, "last_poll": 0.0,
+                "status": None, "unchanged": 0, "next_due": self._clock(),
+            }
+
+    def stop(self, zonal_id: int):
+        # Requests em voo sao ignoradas na chegada (zonal nao esta mais aqui)
+        self._zonals.pop(zonal_id, None)
+
+    def is_polling(self, zonal_id: int) -> bool:
+        return zonal_id in self._zonals
+
+    @property
+    def has_watched(self) -> bool:
+        return bool(self._zonals)
+
+    def base_interval_ms(self) -> int:
+        """``polling_interval_ms`` da configuracao (com piso de seguranca)."""
+        try:
+            value = int(self._config.get("polling_interval_ms") or DEFAULT_INTERVAL_MS)
+        except (TypeError, ValueError):
+            value = DEFAULT_INTERVAL_MS
+        return max(value, MIN_INTERVAL_MS)
+
+    def next_due_in_ms(self) -> Optional[int]:
+        """Milissegundos ate o proximo zonal vencer; None se nada a agendar.
+
+        Zonais com request em voo nao contam — a resposta reagenda.
+        """
+        dues = [e["next_due"] for e in self._zonals.values() if e["request_id"] is None]
+        if not dues:
+            return None
+        return max(0, int((min(dues) - self._clock()) * 1000))
+
+    def owns(self, request_id: str) -> bool:
+        return request_id in self._pending_batch or request_id in self._pending_single
+
+    def clear(self):
+        self._zonals.clear()
+        self._pending_batch.clear()
+        self._pending_single.clear()
+
+    # ------------------------------------------------------------------
+    # Ciclo
+    # ------------------------------------------------------------------
+
+    def poll(self):
+        """Dispara as consultas dos zonais vencidos (sem request em voo)."""
+        horizon = self._clock() + self.base_interval_ms() / 2000.0
+        idle = [
+            zid for zid, e in self._zonals.items()
+            if e["request_id"] is None and e["next_due"] <= horizon
+        ]
+        if not idle:
+            return
+        if self.batch_supported is False:
+            self._poll_individually(idle)
+            return
+        for chunk in chunk_ids(sorted(idle)):
+            request_id = self._http.get(self._api_url(status_batch_path(chunk)))
+            self._pending_batch[request_id] = chunk
+            for zid in chunk:
+                self._zonals[zid]["request_id"] = request_id
+
+    def _poll_individually(self, zonal_ids):
+        # Rodizio: zonais consultados ha mais tempo primeiro
+        zonal_ids = sorted(zonal_ids, key=lambda z: self._zonals[z]["last_poll"])
+        now = self._clock()
+        cap = self.FALLBACK_MAX_PER_TICK
+        for zid in zonal_ids[:cap]:
+            request_id = self._http.get(self._api_url(f"/zonal/{zid}/status"))
+            entry = self._zonals[zid]
+            entry["request_id"] = request_id
+            entry["last_poll"] = now
+            self._pending_single[request_id] = zid
+        # Os que ficaram de fora sao reagendados em grupos de ``cap``, um
+        # grupo por intervalo base; sem isso continuam vencidos e o timer
+        # dispararia de novo no piso do controller
+        base_s = self.base_interval_ms() / 1000.0
+        for i, zid in enumerate(zonal_ids[cap:]):
+            self._zonals[zid]["next_due"] = now + (i // cap + 1) * base_s
+
+    # ------------------------------------------------------------------
+    # Respostas
+    # ------------------------------------------------------------------
+
+    def handle_response(self, request_id: str, body: bytes) -> Tuple[list, list]:
+        updates, stopped = [], []
+        if request_id in self._pending_batch:
+            zonal_ids = self._pending_batch.pop(request_id)
+            self.batch_supported = True
+            try:
+                statuses = parse_status_batch(json.loads(body))
+            except (ValueError, TypeError):
+                statuses = {}
+            for zid in zonal_ids:
+                if zid in statuses:
+                    self._on_status(zid, request_id, statuses[zid], updates, stopped)
+                else:
+                    # Zonal ausente da resposta (removido/sem acesso)
+                    self._on_error(zid, request_id, stopped)
+
+        elif request_id in self._pending_single:
+            zid = self._pending_single.pop(request_id)
+            try:
+                status = json.loads(body).get("status", "")
+            except (ValueError, TypeError, AttributeError):
+                self._on_error(zid, request_id, stopped)
+            else:
+                self._on_status(zid, request_id, status, updates, stopped)
+        return updates, stopped
+
+    def handle_failure(self, request_id: str, status_code: int) -> Tuple[list, list]:
+        stopped = []
+        if request_id in self._pending_batch:
+            zonal_ids = self._pending_batch.pop(request_id)
+            if (status_code in _BATCH_UNSUPPORTED_CODES
+                    and self.batch_supported is not True):
+                # Endpoint em lote indisponivel: libera os zonais para o fallback
+                self.batch_supported = False
+                now = self._clock()
+                for zid in zonal_ids:
+                    entry = self._zonals.get(zid)
+                    if entry is not None and entry["request_id"] == request_id:
+                        entry["request_id"] = None
+                        entry["next_due"] = now
+                return [], []
+            for zid in zonal_ids:
+                self._on_error(zid, request_id, stopped)
+
+        elif request_id in self._pending_single:
+            zid = self._pending_single.pop(request_id)
+            self._on_error(zid, request_id, stopped)
+        return [], stopped
+
+    def _on_status(self, zonal_id, request_id, status, updates, stopped):
+        entry = self._zonals.get(zonal_id)
+        if entry is None or entry["request_id"] != request_id:
+            return  # parou de observar (ou resposta obsoleta)
+        entry["request_id"] = None
+        entry["errors"] = 0
+        if status == entry["status"]:
+            entry["unchanged"] += 1
+        else:
+            entry["unchanged"] = 0
+            entry["status"] = status
+        entry["next_due"] = self._clock() + next_interval_ms(
+            self.base_interval_ms(), status, entry["unchanged"],
+        ) / 1000.0
+        updates.append((zonal_id, status))
+        if status not in INTERMEDIATE_STATUSES:
+            self.stop(zonal_id)
+            stopped.append((zonal_id, "terminal"))
+
+    def _on_error(self, zonal_id, request_id, stopped):
+        entry = self._zonals.get(zonal_id)
+        if entry is None or entry["request_id"] != request_id:
+            return
+        entry["request_id"] = None
+        entry["errors"] += 1
+        entry["next_due"] = self._clock() + next_interval_ms(
+            self.base_interval_ms(), errors=entry["errors"],
+        ) / 1000.0
+        if entry["errors"] >= self.MAX_CONSECUTIVE_ERRORS:
+            self.stop(zonal_id)
+            stopped.append((zonal_id, "errors"))
+
+    def _api_url(self, path):
+        base = (self._config.get("api_base_url") or "").rstrip("/")
+        return f"{base}{path}"
@@ -12,6 +12,8 @@ DEFAULTS = {
     "page_size": 15,
     "polling_interval_ms": 3000,
     "auto_zoom_on_load": True,
+    "tile_cache_max_mb": 1024,
+    "raster_mosaic": True,
     "log_level": "INFO",
 }
 
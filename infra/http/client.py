@@ -1,12 +1,15 @@
+import os
+import time
 import uuid
 
-from qgis.PyQt.QtCore import QObject, QUrl, QByteArray, pyqtSignal
+from qgis.PyQt.QtCore import QObject, QUrl, QByteArray, QTimer, pyqtSignal
 from qgis.PyQt.QtNetwork import QNetworkRequest
 from qgis.core import QgsNetworkAccessManager, QgsMessageLog, Qgis
 
-from ...infra.config.settings import PLUGIN_NAME
+from ..config.settings import PLUGIN_NAME
 from .auth_interceptor import AuthInterceptor
 from .errors import normalize_error
+from .metrics import get_metrics
 
 
 class HttpClient(QObject):
@@ -18,6 +21,8 @@ class HttpClient(QObject):
 
     request_finished = pyqtSignal(str, int, bytes)  # request_id, status_code, body
     request_error = pyqtSignal(str, str)             # request_id, error_msg
+    request_failed = pyqtSignal(str, int, str)       # request_id, status_code (0 = rede), error_msg
+    download_finished = pyqtSignal(str, int, str)    # request_id, status_code, file_path
 
     def __init__(self, auth_interceptor: AuthInterceptor = None, parent=None):
         super().__init__(parent)
@@ -25,6 +30,8 @@ class HttpClient(QObject):
         self._interceptor = auth_interceptor
         self._pending = {}  # request_id -> QNetworkReply
         self._request_urls = {}  # request_id -> url (para logging)
+        self._request_meta = {}  # request_id -> (method, url, t0, bytes_out) p/ metricas
+        self._downloads = {}  # request_id -> (file handle, dest_path, bytes escritos)
 
     def _make_request(self, url: str, method: str = "GET",
                       data: bytes = None, content_type: str = None) -> str:
@@ -64,13 +71,31 @@ class HttpClient(QObject):
 
         self._pending[request_id] = reply
         self._request_urls[request_id] = url
+        self._request_meta[request_id] = (
+            method, url, time.monotonic(), len(data or b""),
+        )
         reply.finished.connect(lambda: self._on_finished(request_id, reply))
 
         return request_id
 
+    def _record_metrics(self, request_id: str, status_code: int, bytes_in: int):
+        meta = self._request_meta.pop(request_id, None)
+        if meta is None:
+            return
+        method, url, t0, bytes_out = meta
+        get_metrics().record(
+            method, url, status_code, (time.monotonic() - t0) * 1000.0,
+            bytes_in=bytes_in, bytes_out=bytes_out,
+        )
+
     def _on_finished(self, request_id: str, reply):
         """Processa resposta do NAM."""
-        self._pending.pop(request_id, None)
+        if self._pending.pop(request_id, None) is None:
+            # Cancelado via cancel(): abort() ainda dispara finished, mas o
+            # caller ja descartou o request (sem log/sinal de erro de rede)
+            self._request_urls.pop(request_id, None)
+            reply.deleteLater()
+            return
         req_url = self._request_urls.pop(request_id, "?")
 
         error = reply.error()
@@ -80,6 +105,7 @@ class HttpClient(QObject):
             status_code = 0
 
         body = bytes(reply.readAll())
+        self._record_metrics(request_id, status_code, len(body))
 
         # Captura errorString ANTES de deleteLater (evita acesso a C++ deletado)
         error_msg = reply.errorString() if error else ""
@@ -90,6 +116,7 @@ class HttpClient(QObject):
                 f"[HTTP] ERRO DE REDE {req_url} -> {error_msg}",
                 PLUGIN_NAME, Qgis.Warning,
             )
+            self.request_failed.emit(request_id, 0, f"Erro de rede: {error_msg}")
             self.request_error.emit(request_id, f"Erro de rede: {error_msg}")
             return
 
@@ -106,8 +133,84 @@ class HttpClient(QObject):
                 f"[HTTP] {status_code} {req_url} -> {api_error.message}\n{body_preview}",
                 PLUGIN_NAME, Qgis.Warning,
             )
+            self.request_failed.emit(request_id, status_code, api_error.message)
             self.request_error.emit(request_id, api_error.message)
 
+    # ----------------------------------------------------------------
+    # Download para arquivo (respostas binarias grandes)
+    # ----------------------------------------------------------------
+
+    def _on_download_ready_read(self, request_id: str, reply):
+        """Drena o buffer do reply direto para o arquivo de destino."""
+        entry = self._downloads.get(request_id)
+        if entry is None:
+            return
+        fh, dest_path, written = entry
+        chunk = bytes(reply.readAll())
+        if chunk:
+            fh.write(chunk)
+            self._downloads[request_id] = (fh, dest_path, written + len(chunk))
+
+    def _on_download_finished(self, request_id: str, reply):
+        """Fecha o arquivo e emite ``download_finished`` (ou ``request_error``)."""
+        self._pending.pop(request_id, None)
+        req_url = self._request_urls.pop(request_id, "?")
+        entry = self._downloads.pop(request_id, None)
+        if entry is None:
+            reply.deleteLater()
+            return
+
+        fh, dest_path, written = entry
+        tail = bytes(reply.readAll())
+        if tail:
+            fh.write(tail)
+            written += len(tail)
+        fh.close()
+
+        error = reply.error()
+        status_code = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        if status_code is None:
+            status_code = 0
+        error_msg = reply.errorString() if error else ""
+        reply.deleteLater()
+        self._record_metrics(request_id, status_code, written)
+
+        if 200 <= status_code < 300 and not error:
+            QgsMessageLog.logMessage(
+                f"[HTTP] {status_code} {req_url} ({written} bytes -> {dest_path})",
+                PLUGIN_NAME, Qgis.Info,
+            )
+            self.download_finished.emit(request_id, status_code, dest_path)
+            return
+
+        # Erro: o body (JSON curto da API) foi parar no arquivo — le para
+        # normalizar a mensagem e descarta o arquivo.
+        body = b""
+        try:
+            with open(dest_path, "rb") as f:
+                body = f.read(64 * 1024)
+        except OSError:
+            pass
+        _remove_quietly(dest_path)
+
+        if status_code == 0:
+            QgsMessageLog.logMessage(
+                f"[HTTP] ERRO DE REDE {req_url} -> {error_msg}",
+                PLUGIN_NAME, Qgis.Warning,
+            )
+            self.request_failed.emit(request_id, 0, f"Erro de rede: {error_msg}")
+            self.request_error.emit(request_id, f"Erro de rede: {error_msg}")
+            return
+
+        api_error = normalize_error(status_code, body)
+        body_preview = body[:500].decode("utf-8", errors="replace") if body else ""
+        QgsMessageLog.logMessage(
+            f"[HTTP] {status_code} {req_url} -> {api_error.message}\n{body_preview}",
+            PLUGIN_NAME, Qgis.Warning,
+        )
+        self.request_failed.emit(request_id, status_code, api_error.message)
+        self.request_error.emit(request_id, api_error.message)
+
     # ----------------------------------------------------------------
     # Public API
     # ----------------------------------------------------------------
@@ -140,10 +243,58 @@ class HttpClient(QObject):
         multipart.setParent(reply)
 
         self._pending[request_id] = reply
+        # Tamanho do multipart nao e conhecido a priori (bytes_out = 0)
+        self._request_meta[request_id] = ("POST", url, time.monotonic(), 0)
         reply.finished.connect(lambda: self._on_finished(request_id, reply))
 
         return request_id
 
+    def download_to_file(self, url: str, dest_path: str) -> str:
+        """GET com o body gravado em ``dest_path`` a cada ``readyRead``.
+
+        Para respostas binarias grandes (GeoPackage de comparacao etc.): o
+        body nunca e materializado inteiro em memoria nem trafega por
+        signal. Sucesso chega via ``download_finished`` com o caminho do
+        arquivo; falhas via ``request_error`` (arquivo removido).
+        """
+        request_id = str(uuid.uuid4())
+
+        req = QNetworkRequest(QUrl(url))
+        req.setRawHeader(b"Accept", b"application/json")
+
+        has_token = False
+        if self._interceptor:
+            req = self._interceptor.intercept(req)
+            has_token = bool(req.rawHeader(b"Authorization"))
+
+        try:
+            fh = open(dest_path, "wb")
+        except OSError as e:
+            # Adiado como uma falha de rede: o caller so conhece o
+            # request_id depois do retorno
+            msg = f"Falha ao criar arquivo de download: {e}"
+            QTimer.singleShot(0, lambda: self.request_error.emit(request_id, msg))
+            return request_id
+
+        QgsMessageLog.logMessage(
+            f"[HTTP] GET {url} (auth={has_token}, -> arquivo)",
+            PLUGIN_NAME, Qgis.Info,
+        )
+
+        reply = self._nam.get(req)
+        self._pending[request_id] = reply
+        self._request_urls[request_id] = url
+        self._downloads[request_id] = (fh, dest_path, 0)
+        self._request_meta[request_id] = ("GET", url, time.monotonic(), 0)
+        reply.readyRead.connect(
+            lambda: self._on_download_ready_read(request_id, reply)
+        )
+        reply.finished.connect(
+            lambda: self._on_download_finished(request_id, reply)
+        )
+
+        return request_id
+
     def patch(self, url: str, payload: bytes = b"{}") -> str:
         return self._make_request(
             url, "PATCH", data=payload, content_type="application/json"
@@ -155,5 +306,18 @@ class HttpClient(QObject):
     def cancel(self, request_id: str):
         reply = self._pending.pop(request_id, None)
         self._request_urls.pop(request_id, None)
+        self._request_meta.pop(request_id, None)
+        download = self._downloads.pop(request_id, None)
         if reply:
             reply.abort()
+        if download:
+            fh, dest_path, _ = download
+            fh.close()
+            _remove_quietly(dest_path)
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,47 @@
+"""Decodificacao de respostas HTTP com offload de bodies grandes.
+
+``HttpClient`` entrega o body inteiro na main thread. Para payloads de
+varios MB (overlay-data, camadas-base, tilesMetodos) o ``json.loads`` e a
+construcao dos modelos de dominio congelam o canvas; acima de
+``OFFLOAD_THRESHOLD_BYTES`` o parse e delegado ao ``WorkerPool`` e o
+resultado volta via signal enfileirado. Bodies pequenos continuam sendo
+decodificados inline (sem custo de troca de thread).
+"""
+
+from ..tasks.worker_pool import WorkerPool
+
+
+OFFLOAD_THRESHOLD_BYTES = 256 * 1024
+
+
+class ResponseDecoder:
+    """Aplica um parser ao body, inline ou em worker thread conforme o tamanho."""
+
+    def __init__(self, pool: WorkerPool = None,
+                 threshold: int = OFFLOAD_THRESHOLD_BYTES):
+        self._pool = pool
+        self._threshold = threshold
+
+    def decode(self, body: bytes, parser, on_done, on_error):
+        """Executa ``parser(body)`` e entrega o resultado em ``on_done``.
+
+        ``parser`` deve ser thread-safe (json + dataclasses do dominio).
+        Falhas do parser chegam em ``on_error(msg)``; ambos os callbacks
+        rodam na main thread.
+        """
+        if len(body or b"") < self._threshold:
+            try:
+                result = parser(body)
+            except Exception as e:  # noqa: BLE001
+                on_error(str(e) or e.__class__.__name__)
+                return
+            on_done(result)
+            return
+
+        if self._pool is None:
+            self._pool = WorkerPool(max_workers=2, name="satirriga-decode")
+        self._pool.submit(parser, body, on_done=on_done, on_error=on_error)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
@@ -0,0 +1,199 @@
+"""Telemetria HTTP por endpoint — latencia, bytes, status e retries.
+
+Alimentado pelo ``HttpClient`` (main thread) e pelas chamadas ``requests``
+dos ``SatIrrigaTask`` (worker threads); por isso o coletor e protegido por
+lock. As URLs sao agregadas por template (``GET /zonal/{id}/status``) para
+que ids e uuids nao explodam a cardinalidade.
+
+Latencias de downloads em streaming (``requests`` com ``stream=True``)
+medem o tempo ate os cabecalhos; os bytes vem do ``Content-Length``.
+"""
+
+import csv
+import io
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter, deque
+from urllib.parse import urlparse
+
+
+# Amostras de latencia mantidas por endpoint (janela deslizante)
+MAX_SAMPLES = 1000
+
+_UUID_RE = re.compile(
+    r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+)
+_INT_RE = re.compile(r"^\d+$")
+_HASH_RE = re.compile(r"^[0-9a-fA-F]{24,}$")
+
+
+def endpoint_template(method: str, url: str) -> str:
+    """Normaliza ``url`` em ``METODO /caminho/{id}`` (sem host, prefixo /api e query)."""
+    path = urlparse(url).path or "/"
+    segments = [s for s in path.split("/") if s]
+    if segments and segments[0] == "api":
+        segments = segments[1:]
+
+    normalized = []
+    for seg in segments:
+        if _INT_RE.match(seg):
+            normalized.append("{id}")
+        elif _UUID_RE.match(seg):
+            normalized.append("{uuid}")
+        elif _HASH_RE.match(seg):
+            normalized.append("{hash}")
+        else:
+            normalized.append(seg)
+    return f"{method.upper()} /" + "/".join(normalized)
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    """Percentil por nearest-rank sobre lista ja ordenada."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class _EndpointStats:
+    __slots__ = (
+        "count", "errors", "retries", "bytes_in", "bytes_out",
+        "latencies", "statuses",
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latencies = deque(maxlen=MAX_SAMPLES)
+        self.statuses = Counter()
+
+
+class HttpMetrics:
+    """Coletor thread-safe de metricas HTTP agregadas por endpoint."""
+
+    COLUMNS = (
+        "endpoint", "count", "p50_ms", "p95_ms", "p99_ms", "error_rate",
+        "bytes_in", "bytes_out", "retries", "statuses",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}  # template -> _EndpointStats
+        self._since = time.time()
+
+    def record(self, method: str, url: str, status_code: int,
+               elapsed_ms: float, bytes_in: int = 0, bytes_out: int = 0,
+               retry: bool = False):
+        """Registra uma requisicao concluida. ``status_code`` 0 = erro de rede."""
+        key = endpoint_template(method, url)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _EndpointStats()
+            stats.count += 1
+            stats.latencies.append(float(elapsed_ms))
+            stats.bytes_in += int(bytes_in or 0)
+            stats.bytes_out += int(bytes_out or 0)
+            stats.statuses[int(status_code or 0)] += 1
+            if not status_code or status_code >= 400:
+                stats.errors += 1
+            if retry:
+                stats.retries += 1
+
+    def snapshot(self) -> list:
+        """Lista de dicts (uma linha por endpoint), mais chamados primeiro."""
+        with self._lock:
+            items = [
+                (key, s.count, s.errors, s.retries, s.bytes_in, s.bytes_out,
+                 sorted(s.latencies), dict(s.statuses))
+                for key, s in self._stats.items()
+            ]
+
+        rows = []
+        for key, count, errors, retries, b_in, b_out, lat, statuses in items:
+            rows.append({
+                "endpoint": key,
+                "count": count,
+                "p50_ms": round(_percentile(lat, 50), 1),
+                "p95_ms": round(_percentile(lat, 95), 1),
+                "p99_ms": round(_percentile(lat, 99), 1),
+                "error_rate": round(errors / count, 4) if count else 0.0,
+                "bytes_in": b_in,
+                "bytes_out": b_out,
+                "retries": retries,
+                "statuses": {str(k): v for k, v in sorted(statuses.items())},
+            })
+        rows.sort(key=lambda r: (-r["count"], r["endpoint"]))
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._since = time.time()
+
+    @property
+    def since(self) -> float:
+        """Epoch do inicio da coleta (ultimo reset)."""
+        return self._since
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"since": self._since, "endpoints": self.snapshot()},
+            indent=2, ensure_ascii=False,
+        )
+
+    def to_csv(self) -> str:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(self.COLUMNS)
+        for row in self.snapshot():
+            statuses = " ".join(f"{k}:{v}" for k, v in row["statuses"].items())
+            writer.writerow(
+                [row[c] for c in self.COLUMNS[:-1]] + [statuses]
+            )
+        return buf.getvalue()
+
+
+_metrics = HttpMetrics()
+
+
+def get_metrics() -> HttpMetrics:
+    """Coletor global do plugin (compartilhado entre HttpClient e tasks)."""
+    return _metrics
+
+
+def timed_request(method: str, fn, url: str, *, bytes_out: int = 0,
+                  retry: bool = False, **kwargs):
+    """Executa ``fn(url, **kwargs)`` (ex.: ``requests.get``) registrando metricas.
+
+    Excecoes de rede sao registradas com status 0 e re-levantadas.
+    """
+    start = time.monotonic()
+    try:
+        resp = fn(url, **kwargs)
+    except Exception:
+        _metrics.record(
+            method, url, 0, (time.monotonic() - start) * 1000.0,
+            bytes_out=bytes_out, retry=retry,
+        )
+        raise
+
+    elapsed_ms = (time.monotonic() - start) * 1000.0
+    if kwargs.get("stream"):
+        try:
+            bytes_in = int(resp.headers.get("content-length") or 0)
+        except (TypeError, ValueError):
+            bytes_in = 0
+    else:
+        bytes_in = len(resp.content or b"")
+    _metrics.record(
+        method, url, resp.status_code, elapsed_ms,
+        bytes_in=bytes_in, bytes_out=bytes_out, retry=retry,
+    )
+    return resp
@@ -0,0 +1,321 @@
+"""Proxy HTTP local que serve tiles XYZ a partir do ``TileCache``.
+
+As camadas raster apontam para ``http://127.0.0.1:{porta}/tiles/{chave}/
+{z}/{x}/{y}`` em vez do servidor de tiles. O handler procura o tile no
+MBTiles da fonte; na falta, busca no template original, grava no cache e
+responde. Sem rede, tiles ja vistos continuam sendo servidos.
+
+"Sem tile" (404/204 do servidor) e "falha" (5xx, timeout, offline) sao
+distintos: o primeiro vira 404 (o provider desenha vazio), o segundo 502
+sem cache HTTP, para o tile ser pedido de novo no proximo render.
+
+Mosaicos (``local_mosaic_template``) servem todas as cenas de uma data +
+banda numa unica camada: o handler busca o tile de cada cena em paralelo
+(cache da cena primeiro, ex.: prefetch), compoe por ordem com
+``QPainter`` e grava apenas o tile composto — e so quando nenhuma cena
+falhou; um composto parcial e servido uma vez, sem gravar.
+
+Mesmo padrao do loopback de ``OidcPkceFlow``: ``HTTPServer`` em thread
+daemon, porta numa faixa fixa (URIs gravadas no projeto continuam validas
+entre sessoes enquanto a mesma porta estiver livre).
+"""
+
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from qgis.core import QgsMessageLog, Qgis
+
+from ..config.settings import PLUGIN_NAME
+from .metrics import timed_request
+
+# Faixa de portas do proxy (fora da faixa do callback OIDC, 8400-8410)
+_PORT_RANGE = range(8420, 8431)
+
+_PATH_RE = re.compile(r"^/tiles/([A-Za-z0-9_.-]+)/(\d+)/(\d+)/(\d+)$")
+
+_UPSTREAM_TIMEOUT_S = 20
+
+# Buscas simultaneas de cenas componentes de mosaicos (todas as threads
+# do servidor compartilham o pool)
+_MOSAIC_WORKERS = 8
+
+
+class _UpstreamError(Exception):
+    """Falha ao buscar o tile (rede, timeout, erro do servidor)."""
+
+
+# Resultado de cena componente cuja busca falhou (distinto de "sem tile")
+_FAILED = object()
+
+
+class _TileHandler(BaseHTTPRequestHandler):
+    """GET /tiles/{chave}/{z}/{x}/{y} — cache primeiro, upstream na falta."""
+
+    def do_GET(self):
+        proxy = self.server.tile_proxy
+        m = _PATH_RE.match(self.path.split("?", 1)[0])
+        if not m:
+            self._reply(404)
+            return
+        key = m.group(1)
+        z, x, y = (int(v) for v in m.groups()[1:])
+
+        data, complete = proxy.cache.get(key, z, x, y), True
+        if data is None:
+            data, complete = proxy.fetch_upstream(key, z, x, y)
+        if data is None:
+            # 404 faz o provider desenhar vazio (sem repetir a requisicao);
+            # falha do servidor nao pode ficar gravada como tile vazio
+            self._reply(404 if complete else 502)
+            return
+        self._reply(200, data, proxy.cache.mime_type(data), cacheable=complete)
+
+    def _reply(self, status, data=b"", mime=None, cacheable=True):
+        try:
+            self.send_response(status)
+            if data:
+                self.send_header("Content-Type", mime)
+            if data and cacheable:
+                # Tiles de uma fonte sao imutaveis (chave inclui os params)
+                self.send_header("Cache-Control", "max-age=604800")
+            elif status != 404:
+                self.send_header("Cache-Control", "no-store")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            if data:
+                self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # QGIS cancelou o tile (pan/zoom)
+
+    def log_message(self, format, *args):
+        """Suprime logs do HTTPServer."""
+
+
+class _TileServer(ThreadingHTTPServer):
+    # Sem SO_REUSEADDR: no Windows ele permitiria duas instancias do QGIS
+    # na mesma porta
+    allow_reuse_address = False
+    daemon_threads = True
+
+
+class TileProxy:
+    """Servidor loopback de tiles com cache MBTiles.
+
+    ``local_template(url)`` registra a fonte no cache e devolve o template
+    local equivalente; ``upstream_template(url)`` faz o caminho inverso
+    (para restaurar a URL original das camadas no unload).
+    """
+
+    def __init__(self, cache):
+        self._cache = cache
+        self._server = None
+        self._thread = None
+        self._upstreams = {}  # chave -> template original (memo do indice)
+        # Session compartilhada pelas threads do servidor (pool de conexoes)
+        self._session = requests.Session()
+        self._session.mount(
+            "https://", requests.adapters.HTTPAdapter(pool_maxsize=8),
+        )
+        self._mosaic_pool = None
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @property
+    def port(self):
+        return self._server.server_address[1] if self._server else None
+
+    @property
+    def is_running(self) -> bool:
+        return self._server is not None
+
+    def start(self) -> bool:
+        """Sobe o servidor na primeira porta livre da faixa; False se nenhuma."""
+        if self._server is not None:
+            return True
+        for port in _PORT_RANGE:
+            try:
+                server = _TileServer(("127.0.0.1", port), _TileHandler)
+            except OSError:
+                continue
+            server.tile_proxy = self
+            self._server = server
+            # Criado aqui (main thread): as threads do servidor so usam
+            self._mosaic_pool = ThreadPoolExecutor(
+                max_workers=_MOSAIC_WORKERS, thread_name_prefix="satirriga-mosaic",
+            )
+            self._thread = threading.Thread(
+                target=server.serve_forever, name="satirriga-tiles", daemon=True,
+            )
+            self._thread.start()
+            return True
+        QgsMessageLog.logMessage(
+            "[Tiles] Nenhuma porta livre para o cache de tiles; usando URLs diretas",
+            PLUGIN_NAME, Qgis.Warning,
+        )
+        return False
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+        self._mosaic_pool.shutdown(wait=False)
+        self._mosaic_pool = None
+        self._session.close()
+
+    # ------------------------------------------------------------------
+    # Templates
+    # ------------------------------------------------------------------
+
+    def local_template(self, url_template: str) -> str:
+        """Template local para ``url_template`` (o original se parado)."""
+        if self._server is None:
+            return url_template
+        key = self._cache.register(url_template)
+        self._upstreams[key] = url_template
+        return f"http://127.0.0.1:{self.port}/tiles/{key}/{{z}}/{{x}}/{{y}}"
+
+    def local_mosaic_template(self, url_templates):
+        """Template local de um mosaico das fontes (None se parado)."""
+        if self._server is None:
+            return None
+        key = self._cache.register_mosaic(url_templates)
+        return f"http://127.0.0.1:{self.port}/tiles/{key}/{{z}}/{{x}}/{{y}}"
+
+    def upstream_template(self, url_template: str) -> str:
+        """Template original de um template local (outros passam intactos)."""
+        m = re.match(
+            r"^http://127\.0\.0\.1:\d+/tiles/([A-Za-z0-9_.-]+)/\{z\}/\{x\}/\{y\}$",
+            url_template,
+        )
+        if not m:
+            return url_template
+        upstream = self._upstream(m.group(1))
+        if not upstream or self._cache.mosaic_components(upstream) is not None:
+            # Mosaico nao tem template unico no servidor
+            return url_template
+        return upstream
+
+    # ------------------------------------------------------------------
+    # Upstream (threads do servidor)
+    # ------------------------------------------------------------------
+
+    def fetch_upstream(self, key, z, x, y):
+        """Busca o tile no servidor original: ``(bytes ou None, completo)``.
+
+        ``completo`` e False quando alguma busca falhou: sem bytes, e
+        falha (nao "sem tile"); com bytes, e um mosaico parcial. So tiles
+        completos sao gravados no cache.
+        """
+        template = self._upstream(key)
+        if not template:
+            return None, True
+        components = self._cache.mosaic_components(template)
+        try:
+            if components is not None:
+                data, complete = self._fetch_mosaic(components, z, x, y)
+            else:
+                data, complete = self._download(template, z, x, y), True
+        except _UpstreamError:
+            return None, False
+        if data is None or not complete:
+            return data, complete
+        try:
+            self._cache.put(key, z, x, y, data)
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                f"[Tiles] Falha ao gravar tile no cache: {e}",
+                PLUGIN_NAME, Qgis.Warning,
+            )
+        return data, True
+
+    def _fetch_mosaic(self, components, z, x, y):
+        """``(tile composto, completo)``; cenas sem dados no tile sao ignoradas.
+
+        Se todas as cenas falharem levanta ``_UpstreamError``.
+        """
+        results = list(self._mosaic_pool.map(
+            lambda t: self._component_tile(t, z, x, y), components,
+        ))
+        failed = sum(1 for r in results if r is _FAILED)
+        if failed == len(results):
+            raise _UpstreamError()
+        parts = [r for r in results if r and r is not _FAILED]
+        complete = failed == 0
+        if not parts:
+            return None, complete
+        if len(parts) == 1:
+            # tile dentro de uma unica cena: sem recomposicao
+            return parts[0], complete
+        return _compose_tiles(parts), complete
+
+    def _component_tile(self, template, z, x, y):
+        """Bytes da cena, None (sem tile) ou ``_FAILED``."""
+        data = self._cache.get(self._cache.source_key(template), z, x, y)
+        if data is None:
+            try:
+                data = self._download(template, z, x, y)
+            except _UpstreamError:
+                return _FAILED
+        return data
+
+    def _download(self, template, z, x, y):
+        """Bytes do tile; None se o servidor nao tem o tile.
+
+        Levanta ``_UpstreamError`` em falha de rede, timeout ou resposta
+        de erro.
+        """
+        url = (template.replace("{z}", str(z))
+               .replace("{x}", str(x)).replace("{y}", str(y)))
+        try:
+            resp = timed_request(
+                "GET", self._session.get, url, timeout=_UPSTREAM_TIMEOUT_S,
+            )
+        except requests.RequestException as e:
+            raise _UpstreamError(str(e)) from e
+        if resp.status_code in (204, 404):
+            return None
+        if resp.status_code != 200:
+            raise _UpstreamError(f"HTTP {resp.status_code}")
+        if not resp.content:
+            return None
+        if not resp.headers.get("Content-Type", "image").startswith("image"):
+            raise _UpstreamError(resp.headers.get("Content-Type", ""))
+        return resp.content
+
+    def _upstream(self, key):
+        template = self._upstreams.get(key)
+        if template is None:
+            template = self._cache.upstream(key)
+            if template:
+                self._upstreams[key] = template
+        return template
+
+
+def _compose_tiles(parts):
+    """Desenha os tiles em ordem (alpha) e devolve o PNG resultante."""
+    from qgis.PyQt.QtCore import QBuffer, QByteArray, QIODevice
+    from qgis.PyQt.QtGui import QImage, QPainter
+
+    images = [img for img in (QImage.fromData(p) for p in parts) if not img.isNull()]
+    if not images:
+        return parts[0]
+    canvas = QImage(images[0].size(), QImage.Format_ARGB32_Premultiplied)
+    canvas.fill(0)
+    painter = QPainter(canvas)
+    for img in images:
+        painter.drawImage(canvas.rect(), img)
+    painter.end()
+    buf = QByteArray()
+    device = QBuffer(buf)
+    device.open(QIODevice.WriteOnly)
+    canvas.save(device, "PNG")
+    device.close()
+    return bytes(buf)
@@ -2,13 +2,16 @@
 
 Encapsula GET /api/bases/:layer?bbox=... e re-emite o resultado parseado
 via sinais especificos por camada. Usa HttpClient (que ja injeta Bearer
-token via AuthInterceptor) e nao bloqueia a thread principal.
+token via AuthInterceptor) e nao bloqueia a thread principal. FeatureCollections
+grandes (municipios em zoom aberto) sao decodificadas via ResponseDecoder.
 """
 
 import json
 
 from qgis.PyQt.QtCore import QObject, pyqtSignal
 
+from ..http.decoder import ResponseDecoder
+
 
 _VALID_LAYERS = ("municipios", "bacias", "empreendimentos")
 
@@ -19,10 +22,11 @@ class BasesService(QObject):
     layer_loaded = pyqtSignal(str, dict)   # layer_id, feature_collection_dict
     layer_failed = pyqtSignal(str, str)    # layer_id, error_message
 
-    def __init__(self, http_client, config_repo, parent=None):
+    def __init__(self, http_client, config_repo, decoder=None, parent=None):
         super().__init__(parent)
         self._http_client = http_client
         self._config_repo = config_repo
+        self._decoder = decoder or ResponseDecoder()
         self._pending = {}  # request_id -> layer_id
 
         http_client.request_finished.connect(self._on_finished)
@@ -58,26 +62,12 @@ class BasesService(QObject):
         if layer_id is None:
             return  # Resposta nao pertence a este servico
 
-        try:
-            if isinstance(body, bytes):
-                body = body.decode("utf-8")
-            payload = json.loads(body) if body else {}
-        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
-            self.layer_failed.emit(
-                layer_id, f"Resposta invalida do servidor: {exc}"
-            )
-            return
-
-        if (
-            not isinstance(payload, dict)
-            or payload.get("type") != "FeatureCollection"
-        ):
-            self.layer_failed.emit(
-                layer_id, "Formato inesperado: esperava FeatureCollection."
-            )
-            return
-
-        self.layer_loaded.emit(layer_id, payload)
+        self._decoder.decode(
+            body,
+            _parse_feature_collection,
+            lambda payload: self.layer_loaded.emit(layer_id, payload),
+            lambda error_msg: self.layer_failed.emit(layer_id, error_msg),
+        )
 
     def _on_error(self, request_id: str, error_msg: str):
         layer_id = self._pending.pop(request_id, None)
@@ -103,3 +93,23 @@ class BasesService(QObject):
         except (TypeError, RuntimeError):
             pass
         self._pending.clear()
+
+
+def _parse_feature_collection(body) -> dict:
+    """Decodifica o body e valida o envelope GeoJSON (thread-safe).
+
+    Levanta ``ValueError`` com a mensagem exibida ao usuario.
+    """
+    try:
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        payload = json.loads(body) if body else {}
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError(f"Resposta invalida do servidor: {exc}") from exc
+
+    if (
+        not isinstance(payload, dict)
+        or payload.get("type") != "FeatureCollection"
+    ):
+        raise ValueError("Formato inesperado: esperava FeatureCollection.")
+    return payload
@@ -14,8 +14,12 @@ from datetime import datetime, timezone
 import requests
 
 from .base_task import SatIrrigaTask
+from ..http.metrics import timed_request
 from ...domain.models.enums import DownloadOrigin
-from ...domain.services.gpkg_service import read_sidecar, write_sidecar
+from ...domain.services.gpkg_catalog import index_gpkg
+from ...domain.services.gpkg_service import (
+    read_sidecar, update_sidecar, write_sidecar,
+)
 
 
 _GPKG_MAGIC = b"SQLite format 3\x00"
@@ -88,20 +92,20 @@ class DownloadMapeamentoHomologadoTask(SatIrrigaTask):
             self.setProgress(5)
             self._log(f"[HTTP] GET {self._download_url} (auth=True)")
 
-            dl_resp = requests.get(
+            dl_resp = timed_request(
+                "GET", requests.get,
                 self._download_url, headers=headers,
                 stream=True, timeout=120,
             )
             self._log(f"[HTTP] {dl_resp.status_code} {self._download_url}")
 
             if dl_resp.status_code == 304 and has_valid_cached_gpkg:
-                sidecar_data = existing_sidecar.copy()
-                sidecar_data["downloadedAt"] = (
-                    datetime.now(timezone.utc).isoformat()
-                )
-                sidecar_data["origin"] = DownloadOrigin.HOMOLOGACAO.value
-                sidecar_data["readOnly"] = True
-                write_sidecar(self._gpkg_path, sidecar_data)
+                update_sidecar(self._gpkg_path, {
+                    "downloadedAt": datetime.now(timezone.utc).isoformat(),
+                    "origin": DownloadOrigin.HOMOLOGACAO.value,
+                    "readOnly": True,
+                })
+                index_gpkg(self._gpkg_path)
                 self.setProgress(100)
                 self.signals.status_message.emit("Download concluido (cache)!")
                 return True
@@ -205,6 +209,7 @@ class DownloadMapeamentoHomologadoTask(SatIrrigaTask):
                 "downloadedAt": datetime.now(timezone.utc).isoformat(),
             })
             write_sidecar(self._gpkg_path, sidecar_data)
+            index_gpkg(self._gpkg_path)
 
             self.setProgress(100)
             self.signals.status_message.emit("Download concluido!")
@@ -14,8 +14,14 @@ import requests
 from qgis.core import Qgis
 
 from .base_task import SatIrrigaTask
+from ..http.metrics import timed_request
 from ...domain.models.enums import SyncStatusEnum, DownloadOrigin
-from ...domain.services.gpkg_service import SYNC_FIELDS_V2, write_sidecar, read_sidecar
+from ...domain.services.change_journal import change_journal_statements
+from ...domain.services.gpkg_catalog import index_gpkg
+from ...domain.services.gpkg_service import (
+    SYNC_FIELDS_V2, read_sidecar, sync_index_statements, update_sidecar,
+    write_sidecar,
+)
 
 
 class DownloadZonalTask(SatIrrigaTask):
@@ -102,7 +108,8 @@ class DownloadZonalTask(SatIrrigaTask):
                 self.setProgress(5)
 
                 self._log(f"[HTTP] POST {self._checkout_url} (auth=True)")
-                checkout_resp = requests.post(
+                checkout_resp = timed_request(
+                    "POST", requests.post,
                     self._checkout_url, headers=headers, timeout=30,
                 )
                 self._log(
@@ -171,7 +178,8 @@ class DownloadZonalTask(SatIrrigaTask):
                 dl_headers["If-None-Match"] = existing_etag
 
             self._log(f"[HTTP] GET {self._download_url} (auth=True)")
-            dl_resp = requests.get(
+            dl_resp = timed_request(
+                "GET", requests.get,
                 self._download_url, headers=dl_headers,
                 stream=True, timeout=120,
             )
@@ -189,8 +197,7 @@ class DownloadZonalTask(SatIrrigaTask):
                     self.signals.status_message.emit(
                         "Dados em cache, atualizando checkout..."
                     )
-                    sidecar_data = existing_sidecar.copy()
-                    sidecar_data.update({
+                    update_sidecar(self._gpkg_path, {
                         "editToken": edit_token,
                         "zonalVersion": zonal_version,
                         "snapshotHash": snapshot_hash,
@@ -198,7 +205,7 @@ class DownloadZonalTask(SatIrrigaTask):
                         "downloadedAt": datetime.now(timezone.utc).isoformat(),
                         "origin": self._origin,
                     })
-                    write_sidecar(self._gpkg_path, sidecar_data)
+                    index_gpkg(self._gpkg_path)
                     self.setProgress(100)
                     self.signals.status_message.emit(
                         "Download concluido (cache)!"
@@ -212,9 +219,10 @@ class DownloadZonalTask(SatIrrigaTask):
                     "Cache invalido, baixando novamente..."
                 )
                 dl_headers.pop("If-None-Match", None)
-                dl_resp = requests.get(
+                dl_resp = timed_request(
+                    "GET", requests.get,
                     self._download_url, headers=dl_headers,
-                    stream=True, timeout=120,
+                    stream=True, timeout=120, retry=True,
                 )
                 self._log(
                     f"[HTTP] {dl_resp.status_code} {self._download_url} "
@@ -345,6 +353,13 @@ class DownloadZonalTask(SatIrrigaTask):
                 raise
 
             dst_lyr.CommitTransaction()
+            # Indices dos campos de sync (deteccao de NEW sem full scan) e
+            # journal de alteracoes (triggers instalados apos a normalizacao
+            # para que os SetFeature acima nao marquem MODIFIED)
+            for stmt in sync_index_statements(dst_lyr.GetName()):
+                dst_ds.ExecuteSQL(stmt)
+            for stmt in change_journal_statements(dst_lyr.GetName()):
+                dst_ds.ExecuteSQL(stmt)
             # Flush e fecha GPKG antes de mover para o caminho final
             dst_ds = None
 
@@ -388,6 +403,7 @@ class DownloadZonalTask(SatIrrigaTask):
             if self._catalogo_meta:
                 sidecar_data.update(self._catalogo_meta)
             write_sidecar(self._gpkg_path, sidecar_data)
+            index_gpkg(self._gpkg_path)
 
             self.setProgress(100)
             self.signals.status_message.emit("Download concluido!")
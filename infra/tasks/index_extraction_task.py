@@ -0,0 +1,187 @@
+"""Task de extracao em lote de indices espectrais das feicoes de um zonal.
+
+Para cada ponto (uma feicao) so entram as cenas cujo footprint MGRS
+contem o ponto; as ja presentes no cache de pixels (``PixelIndexCache``,
+o mesmo da inspecao pontual) sao aproveitadas e as demais vao ao
+endpoint de indices em lotes de ate 10 cenas, com um numero limitado de
+requisicoes simultaneas. O resultado e gravado na tabela ``indices`` ao
+lado do GPKG (uma linha por feicao x cena). A gravacao vai para a
+tabela de preparo e so substitui a extracao anterior quando a task
+conclui; cancelada ou com falha, a anterior continua valendo.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from .base_task import SatIrrigaTask
+from ..http.metrics import timed_request
+from ...domain.models.pixel_indexes import parse_scene_list
+from ...domain.services.index_extraction import (
+    MAX_SCENES_PER_REQUEST, STAGING_TABLE, begin_extraction, chunked,
+    commit_extraction, discard_extraction, write_index_batch,
+)
+from ...domain.services.pixel_index_cache import PixelIndexCache
+from ...domain.services.scene_footprints import FootprintIndex
+
+# Requisicoes simultaneas ao endpoint de indices (cada uma roda no
+# jobs-server; o limite evita saturar o backend)
+_MAX_WORKERS = 4
+# Pontos acumulados antes de gravar na tabela de indices
+_WRITE_BATCH = 100
+_TIMEOUT_S = 60
+
+
+class IndexExtractionTask(SatIrrigaTask):
+    """Extrai indices de ``points`` x ``image_ids`` para ``output_path``."""
+
+    def __init__(self, indexes_url, access_token, points, image_ids,
+                 output_path, cache_path=None):
+        super().__init__(f"Extraindo índices de {len(points)} feições")
+        self._url = indexes_url
+        self._token = access_token
+        self._points = list(points)
+        self._image_ids = list(image_ids)
+        self._output_path = output_path
+        self._cache_path = cache_path
+        self.rows_written = 0
+        self.cache_hits = 0
+        self.requests_done = 0
+        self.requests_failed = 0
+
+    @property
+    def output_path(self):
+        return self._output_path
+
+    def run(self):
+        cache = PixelIndexCache(self._cache_path or ":memory:")
+        footprints = FootprintIndex()
+        footprints.add(self._image_ids)
+        session = requests.Session()
+        session.headers["Authorization"] = f"Bearer {self._token}"
+        session.mount(
+            "https://", requests.adapters.HTTPAdapter(pool_maxsize=_MAX_WORKERS),
+        )
+        committed = False
+        try:
+            begin_extraction(self._output_path)
+
+            # Resultados por ponto: cache primeiro, faltantes viram jobs
+            results = {}  # indice do ponto -> [SceneIndexes]
+            remaining = {}  # indice do ponto -> jobs pendentes
+            jobs = []
+            for i, point in enumerate(self._points):
+                image_ids = footprints.covering(point.lat, point.lon, self._image_ids)
+                found = cache.lookup(image_ids, point.lat, point.lon)
+                self.cache_hits += len(found)
+                results[i] = [s for s in found.values() if s is not None]
+                missing = [x for x in image_ids if x not in found]
+                chunks = chunked(missing, MAX_SCENES_PER_REQUEST)
+                remaining[i] = len(chunks)
+                jobs.extend((i, chunk) for chunk in chunks)
+
+            total = len(jobs)
+            self.signals.status_message.emit(
+                f"{total} requisições de índices ({self.cache_hits} cenas em cache)"
+            )
+            # Pontos resolvidos so pelo cache ja podem ser gravados
+            ready = [i for i, n in remaining.items() if n == 0]
+
+            with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+                futures = {
+                    pool.submit(self._post, session, self._points[i], chunk): (i, chunk)
+                    for i, chunk in jobs
+                }
+                for future in as_completed(futures):
+                    if self.isCanceled():
+                        for f in futures:
+                            f.cancel()
+                        break
+                    i, chunk = futures[future]
+                    scenes = future.result()
+                    if scenes is None:
+                        self.requests_failed += 1
+                    else:
+                        point = self._points[i]
+                        cache.store(chunk, point.lat, point.lon, scenes)
+                        results[i].extend(scenes)
+                    self.requests_done += 1
+                    remaining[i] -= 1
+                    if remaining[i] == 0:
+                        ready.append(i)
+                    if len(ready) >= _WRITE_BATCH:
+                        self._flush(ready, results)
+                    self.setProgress(self.requests_done * 100 / (total or 1))
+            self._flush(ready, results)
+
+            if self.isCanceled():
+                return False
+            if total and self.requests_failed == total:
+                self._exception = RuntimeError(
+                    "Nenhuma requisição de índices foi concluída"
+                )
+                return False
+            commit_extraction(self._output_path)
+            committed = True
+            self._log(
+                f"[Indices] {self.rows_written} linhas gravadas em "
+                f"{self._output_path} ({self.requests_done} requisicoes, "
+                f"{self.requests_failed} falhas, {self.cache_hits} do cache)"
+            )
+            return True
+
+        except Exception as e:
+            self._exception = e
+            return False
+        finally:
+            session.close()
+            cache.close()
+            if not committed:
+                try:
+                    discard_extraction(self._output_path)
+                except Exception:
+                    pass  # tabela de preparo e recriada na proxima extracao
+
+    def _flush(self, ready, results):
+        if ready:
+            self.rows_written += write_index_batch(
+                self._output_path, [(self._points[i], results.pop(i)) for i in ready],
+                table=STAGING_TABLE,
+            )
+            ready.clear()
+
+    def _post(self, session, point, image_ids):
+        """Indices de ``image_ids`` no ponto; None se a requisicao falhar."""
+        if self.isCanceled():
+            return None
+        payload = {"id_imagens": image_ids, "lat": point.lat, "lon": point.lon}
+        try:
+            resp = timed_request(
+                "POST", session.post, self._url,
+                data=json.dumps(payload),
+                headers={"Content-Type": "application/json"},
+                timeout=_TIMEOUT_S,
+            )
+        except requests.RequestException:
+            return None
+        if resp.status_code != 200:
+            return None
+        try:
+            data = resp.json()
+        except ValueError:
+            return None
+        if not isinstance(data, (list, dict)):
+            return None
+        return parse_scene_list(data)
+
+    def finished(self, result):
+        if result:
+            msg = f"{self.rows_written} valores de índices gravados"
+            if self.requests_failed:
+                msg += f" ({self.requests_failed} requisições falharam)"
+            self.signals.completed.emit(True, msg)
+        elif self.isCanceled():
+            self.signals.completed.emit(False, "Cancelado pelo usuário")
+        else:
+            super().finished(result)
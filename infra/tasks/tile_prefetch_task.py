@@ -0,0 +1,146 @@
+"""Task de prefetch de tiles XYZ para o cache local (uso offline em campo).
+
+Recebe um ``PrefetchPlan`` (tiles por fonte e zoom) e baixa os tiles que
+ainda nao estao no ``TileCache`` com um pool limitado de conexoes. Os
+tiles sao gravados em lotes por fonte (uma transacao MBTiles por lote);
+as fontes do plano ficam protegidas do despejo LRU enquanto a task roda,
+para um lote novo nao apagar o que o proprio prefetch acabou de gravar.
+Respostas "sem tile" (204/404/body vazio, como em ``TileProxy``) contam
+como ``empty`` e nao como falha.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from .base_task import SatIrrigaTask
+from ..http.metrics import timed_request
+
+# Conexoes simultaneas ao servidor de tiles
+_MAX_WORKERS = 6
+# Tiles acumulados por fonte antes de gravar no MBTiles
+_BATCH_SIZE = 64
+_TIMEOUT_S = 20
+# Erro de rede/HTTP (distinto de None = servidor nao tem o tile)
+_FAILED = object()
+
+
+class TilePrefetchTask(SatIrrigaTask):
+    """Baixa os tiles de um ``PrefetchPlan`` para o ``TileCache``."""
+
+    def __init__(self, cache, plan, description="Preparando imagens para uso offline"):
+        super().__init__(description)
+        self._cache = cache
+        self._plan = plan
+        self.fetched = 0
+        self.skipped = 0
+        self.empty = 0
+        self.failed = 0
+        self.bytes_fetched = 0
+
+    def run(self):
+        session = requests.Session()
+        session.mount(
+            "https://", requests.adapters.HTTPAdapter(pool_maxsize=_MAX_WORKERS),
+        )
+        pending = {}  # chave -> [(z, x, y, bytes)]
+        keys = {}
+        try:
+            keys = {t: self._cache.register(t) for t in self._plan.sources}
+            self._cache.protect(keys.values())
+
+            # Tiles ja cacheados nao sao baixados de novo
+            todo = []
+            for template, z, x, y in self._plan.tiles:
+                if self._cache.has(keys[template], z, x, y):
+                    self.skipped += 1
+                else:
+                    todo.append((template, z, x, y))
+            total = len(self._plan.tiles) or 1
+            self.setProgress(self.skipped * 100 / total)
+            self.signals.status_message.emit(
+                f"{len(todo)} tiles a baixar ({self.skipped} já em cache)"
+            )
+
+            with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+                futures = {
+                    pool.submit(self._fetch, session, template, z, x, y): (template, z, x, y)
+                    for template, z, x, y in todo
+                }
+                for future in as_completed(futures):
+                    if self.isCanceled():
+                        for f in futures:
+                            f.cancel()
+                        break
+                    template, z, x, y = futures[future]
+                    data = future.result()
+                    if data is _FAILED:
+                        self.failed += 1
+                    elif data is None:
+                        self.empty += 1
+                    else:
+                        self.fetched += 1
+                        self.bytes_fetched += len(data)
+                        batch = pending.setdefault(keys[template], [])
+                        batch.append((z, x, y, data))
+                        if len(batch) >= _BATCH_SIZE:
+                            self._cache.put_many(keys[template], batch)
+                            pending[keys[template]] = []
+                    done = self.skipped + self.fetched + self.empty + self.failed
+                    self.setProgress(done * 100 / total)
+
+            for key, batch in pending.items():
+                self._cache.put_many(key, batch)
+
+            if self.isCanceled():
+                self._log(
+                    f"[Prefetch] Cancelado: {self.fetched} tiles baixados "
+                    f"antes do cancelamento"
+                )
+                return False
+            self._log(
+                f"[Prefetch] {self.fetched} tiles baixados, {self.skipped} em cache, "
+                f"{self.empty} sem imagem, {self.failed} falhas "
+                f"({self.bytes_fetched / (1024 * 1024):.1f} MB)"
+            )
+            return True
+
+        except Exception as e:
+            self._exception = e
+            return False
+        finally:
+            session.close()
+            self._cache.release(keys.values())
+
+    def _fetch(self, session, template, z, x, y):
+        """Bytes do tile, None (sem tile) ou ``_FAILED``; roda nas threads do pool."""
+        if self.isCanceled():
+            return _FAILED
+        url = (template.replace("{z}", str(z))
+               .replace("{x}", str(x)).replace("{y}", str(y)))
+        try:
+            resp = timed_request("GET", session.get, url, timeout=_TIMEOUT_S)
+        except requests.RequestException:
+            return _FAILED
+        if resp.status_code in (204, 404):
+            return None
+        if resp.status_code != 200:
+            return _FAILED
+        if not resp.content:
+            return None
+        if not resp.headers.get("Content-Type", "image").startswith("image"):
+            return _FAILED
+        return resp.content
+
+    def finished(self, result):
+        if result:
+            msg = f"{self.fetched} tiles baixados, {self.skipped} já em cache"
+            if self.empty:
+                msg += f", {self.empty} sem imagem"
+            if self.failed:
+                msg += f", {self.failed} falhas"
+            self.signals.completed.emit(True, msg)
+        elif self.isCanceled():
+            self.signals.completed.emit(False, "Cancelado pelo usuário")
+        else:
+            super().finished(result)
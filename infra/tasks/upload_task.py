@@ -17,7 +17,11 @@ import requests
 from qgis.core import Qgis
 
 from .base_task import SatIrrigaTask
-from ...domain.models.enums import UploadBatchStatusEnum
+from ..http.metrics import timed_request
+from ...domain.models.enums import SyncStatusEnum, UploadBatchStatusEnum
+from ...domain.services.change_journal import read_tombstones
+from ...domain.services.gpkg_catalog import index_gpkg
+from ...domain.services.gpkg_service import mark_uploaded
 
 
 class UploadZonalTask(SatIrrigaTask):
@@ -38,6 +42,11 @@ class UploadZonalTask(SatIrrigaTask):
         self._conflict_strategy = conflict_strategy
         self._zonal_status_url = zonal_status_url
         self._batch_uuid = None
+        # O que foi exportado: so isso muda de status apos o upload
+        self._exported_table = None
+        self._exported_features = []   # [(fid, _sync_timestamp)] MODIFIED/NEW
+        self._exported_deleted = []    # fids de linhas DELETED legadas
+        self._exported_tombstones = []  # original_fid dos tombstones do journal
 
     @property
     def batch_uuid(self):
@@ -46,13 +55,12 @@ class UploadZonalTask(SatIrrigaTask):
     def _update_sidecar(self, checkout_data):
         """Atualiza sidecar com token fresco do re-checkout."""
         try:
-            from ...domain.services.gpkg_service import read_sidecar, write_sidecar
-            sidecar = read_sidecar(self._source_path)
-            sidecar["editToken"] = checkout_data["editToken"]
-            sidecar["zonalVersion"] = checkout_data.get("zonalVersion", sidecar.get("zonalVersion"))
-            sidecar["snapshotHash"] = checkout_data.get("snapshotHash", sidecar.get("snapshotHash"))
-            sidecar["expiresAt"] = checkout_data.get("expiresAt", sidecar.get("expiresAt"))
-            write_sidecar(self._source_path, sidecar)
+            from ...domain.services.gpkg_service import update_sidecar
+            changes = {"editToken": checkout_data["editToken"]}
+            for key in ("zonalVersion", "snapshotHash", "expiresAt"):
+                if key in checkout_data:
+                    changes[key] = checkout_data[key]
+            update_sidecar(self._source_path, changes)
         except Exception as e:
             self._log(f"[Upload] Erro ao atualizar sidecar: {e}")
 
@@ -116,6 +124,10 @@ class UploadZonalTask(SatIrrigaTask):
 
             dst_defn = dst_lyr.GetLayerDefn()
             total_features = src_lyr.GetFeatureCount()
+            src_status_idx = src_defn.GetFieldIndex("_sync_status")
+            src_ts_idx = src_defn.GetFieldIndex("_sync_timestamp")
+            pending = (SyncStatusEnum.MODIFIED.value, SyncStatusEnum.NEW.value)
+            self._exported_table = src_lyr.GetName()
             dst_lyr.StartTransaction()
 
             for i, src_feat in enumerate(src_lyr):
@@ -131,9 +143,31 @@ class UploadZonalTask(SatIrrigaTask):
                 for new_idx, (old_idx, _) in enumerate(field_mapping):
                     dst_feat.SetField(new_idx, src_feat.GetField(old_idx))
                 dst_lyr.CreateFeature(dst_feat)
+                status = (src_feat.GetField(src_status_idx)
+                          if src_status_idx >= 0 else None)
+                if status in pending:
+                    ts = src_feat.GetField(src_ts_idx) if src_ts_idx >= 0 else None
+                    self._exported_features.append((src_feat.GetFID(), ts))
+                elif status == SyncStatusEnum.DELETED.value:
+                    self._exported_deleted.append(src_feat.GetFID())
                 if total_features > 0:
                     self.setProgress(min(25, int((i + 1) * 25 / total_features)))
 
+            # Tombstones do journal (GPKG com triggers): exportados como
+            # features sem geometria com _sync_status=DELETED, o mesmo
+            # formato dos tombstones legados gravados na propria tabela
+            tombstones = read_tombstones(self._source_path, src_lyr.GetName())
+            status_idx = dst_defn.GetFieldIndex("_sync_status")
+            ofid_idx = dst_defn.GetFieldIndex("_original_fid")
+            if tombstones and status_idx >= 0 and ofid_idx >= 0:
+                for original_fid, _ in tombstones:
+                    dst_feat = ogr.Feature(dst_defn)
+                    dst_feat.SetField(status_idx, SyncStatusEnum.DELETED.value)
+                    dst_feat.SetField(ofid_idx, original_fid)
+                    dst_lyr.CreateFeature(dst_feat)
+                    self._exported_tombstones.append(original_fid)
+                self._log(f"[Upload] {len(tombstones)} tombstones do journal exportados")
+
             dst_lyr.CommitTransaction()
             src_ds = None
             dst_ds = None
@@ -162,7 +196,8 @@ class UploadZonalTask(SatIrrigaTask):
 
             self._log(f"[HTTP] POST {self._checkout_url} (re-checkout)")
             try:
-                checkout_resp = requests.post(
+                checkout_resp = timed_request(
+                    "POST", requests.post,
                     self._checkout_url, headers=headers, timeout=30,
                 )
                 self._log(f"[HTTP] {checkout_resp.status_code} {self._checkout_url}")
@@ -216,9 +251,11 @@ class UploadZonalTask(SatIrrigaTask):
                     "expectedVersion": str(self._expected_version),
                     "conflictStrategy": self._conflict_strategy,
                 }
-                response = requests.post(
+                response = timed_request(
+                    "POST", requests.post,
                     self._url, headers=headers,
                     files=files, data=data, timeout=300,
+                    bytes_out=os.path.getsize(temp_zip),
                 )
             self._log(f"[HTTP] {response.status_code} {self._url}")
 
@@ -285,7 +322,8 @@ class UploadZonalTask(SatIrrigaTask):
                 time.sleep(2)
                 poll_count += 1
 
-                poll_resp = requests.get(
+                poll_resp = timed_request(
+                    "GET", requests.get,
                     poll_url, headers=headers, timeout=30,
                 )
                 poll_resp.raise_for_status()
@@ -337,6 +375,9 @@ class UploadZonalTask(SatIrrigaTask):
 
             if batch_status == UploadBatchStatusEnum.COMPLETED.value:
                 self._log(f"Upload zonal {self._zonal_id} concluido: batch {self._batch_uuid}")
+                # Status de sync local atualizado aqui (worker thread); o
+                # controller apenas recarrega as camadas ao concluir
+                self._mark_local_uploaded()
 
                 # Fase 2: monitorar reprocessamento (overlay + zonal stats)
                 if self._zonal_status_url:
@@ -373,6 +414,34 @@ class UploadZonalTask(SatIrrigaTask):
                 except Exception:
                     pass
 
+    def _mark_local_uploaded(self):
+        """MODIFIED/NEW -> UPLOADED e remocao de tombstones no GPKG local.
+
+        Restrito ao que foi exportado: edicoes e delecoes feitas durante o
+        upload/reprocessamento continuam pendentes para o proximo envio.
+        """
+        if not self._exported_table:
+            return
+        try:
+            mark_uploaded(
+                self._source_path, self._exported_table,
+                self._exported_features, self._exported_deleted,
+                self._exported_tombstones,
+            )
+        except Exception as e:
+            self._log(
+                f"[Upload] Falha ao atualizar status de sync local: {e}",
+                Qgis.Warning,
+            )
+            return
+        self._log(
+            f"[Upload] GPKG local: {len(self._exported_features)} "
+            f"features -> UPLOADED, "
+            f"{len(self._exported_deleted) + len(self._exported_tombstones)} "
+            f"tombstones removidos"
+        )
+        index_gpkg(self._source_path)
+
     def _poll_reprocessing(self, headers):
         """Monitora reprocessamento pos-upload (overlay + zonal stats).
 
@@ -400,7 +469,8 @@ class UploadZonalTask(SatIrrigaTask):
             poll_count += 1
 
             try:
-                resp = requests.get(
+                resp = timed_request(
+                    "GET", requests.get,
                     self._zonal_status_url, headers=headers, timeout=30,
                 )
                 if resp.status_code != 200:
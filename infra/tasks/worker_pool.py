@@ -0,0 +1,88 @@
+"""Pool de threads para trabalho curto fora da main thread.
+
+Complementa ``SatIrrigaTask`` (QgsTask) em operacoes rapidas que nao
+devem aparecer no gerenciador de tarefas do QGIS (parse de JSON grande,
+leitura de metadados de GPKG etc.).
+
+O trabalho roda em ``ThreadPoolExecutor``; o resultado volta a main
+thread via signal — emit cross-thread usa QueuedConnection
+automaticamente, pois o WorkerPool tem afinidade com a main thread
+(mesmo padrao de ``OidcPkceFlow._wait_for_callback``).
+"""
+
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+from qgis.PyQt.QtCore import QObject, pyqtSignal
+
+
+class WorkerPool(QObject):
+    """Executa callables em worker threads e entrega o resultado na main thread.
+
+    As funcoes submetidas NAO devem tocar em objetos Qt com afinidade de
+    thread (widgets, QgsVectorLayer, QgsProject). Devem ser puras ou usar
+    apenas I/O thread-safe (json, sqlite3, osgeo.ogr).
+    """
+
+    job_finished = pyqtSignal(int, object)   # job_id, resultado
+    job_failed = pyqtSignal(int, str)        # job_id, mensagem de erro
+
+    def __init__(self, max_workers=2, name="satirriga-worker", parent=None):
+        super().__init__(parent)
+        self._max_workers = max_workers
+        self._name = name
+        self._executor = None  # criado sob demanda no primeiro submit
+        self._ids = itertools.count(1)
+        self._callbacks = {}   # job_id -> (on_done, on_error)
+
+        self.job_finished.connect(self._dispatch_finished)
+        self.job_failed.connect(self._dispatch_failed)
+
+    def submit(self, fn, *args, on_done=None, on_error=None) -> int:
+        """Agenda ``fn(*args)`` em worker thread. Retorna job_id.
+
+        ``on_done(result)`` e ``on_error(msg)`` sao chamados na main thread.
+        """
+        job_id = next(self._ids)
+        self._callbacks[job_id] = (on_done, on_error)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix=self._name,
+            )
+        self._executor.submit(self._run, job_id, fn, args)
+        return job_id
+
+    def discard(self, job_id: int):
+        """Descarta callbacks de um job (resultado sera ignorado)."""
+        self._callbacks.pop(job_id, None)
+
+    def shutdown(self):
+        """Encerra o pool sem aguardar jobs em andamento (unload do plugin)."""
+        self._callbacks.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _run(self, job_id, fn, args):
+        """Roda em worker thread."""
+        try:
+            result = fn(*args)
+        except Exception as e:  # noqa: BLE001 — repassado a main thread
+            self.job_failed.emit(job_id, str(e) or e.__class__.__name__)
+            return
+        self.job_finished.emit(job_id, result)
+
+    def _dispatch_finished(self, job_id, result):
+        on_done, _ = self._callbacks.pop(job_id, (None, None))
+        if on_done is not None:
+            on_done(result)
+
+    def _dispatch_failed(self, job_id, error_msg):
+        _, on_error = self._callbacks.pop(job_id, (None, None))
+        if on_error is not None:
+            on_error(error_msg)
@@ -1,9 +1,10 @@
 import os
 import traceback
+import uuid
 
 from qgis.PyQt.QtCore import QSettings, QTranslator, QCoreApplication, Qt, QTimer
 from qgis.PyQt.QtGui import QColor, QIcon
-from qgis.PyQt.QtWidgets import QAction
+from qgis.PyQt.QtWidgets import QAction, QApplication
 from qgis.core import QgsMessageLog, Qgis
 
 from . import resources  # noqa: F401 — registra icone no Qt Resource System
@@ -41,6 +42,9 @@ class SatIrrigaPlugin:
         self._auth_controller = None
         self._auth_interceptor = None
         self._http_client = None
+        self._response_decoder = None      # Parse de bodies grandes em worker thread
+        self._gpkg_inspector = None        # Leituras de GPKG locais em worker thread
+        self._tile_proxy = None            # Cache MBTiles + proxy loopback de tiles
         self._mapeamento_controller = None
         self._timeseries_controller = None
         self._timeseries_map_tool = None
@@ -50,10 +54,15 @@ class SatIrrigaPlugin:
         self._config_controller = None
         self._camadas_tab = None
         self._upload_history_tab = None
-        self._camadas_badge_original_refresh = None
         self._signal_connections = []  # [(signal, slot), ...] para cleanup
         self._pending_raster_group = None  # Grupo-alvo para rasters do download
         self._vis_action = None            # Acao de contexto "Ajustar visualizacao"
+        self._prefetch_action = None       # Acao de contexto "Baixar para uso offline"
+        self._raster_hierarchies = {}      # satirriga/raster_key -> RasterHierarchy
+        self._prefetch_tasks = []          # TilePrefetchTask em execucao
+        self._indices_action = None        # Acao de contexto "Extrair indices espectrais"
+        self._pending_indices_groups = {}  # indices_path -> grupo do zonal
+        self._pixel_cache_path = None      # Cache de indices por pixel (sqlite)
         self._tile_auth_set = False        # Preprocessor de auth para tiles base
         self._tile_auth_processor_id = None  # ID do preprocessor (QGIS >=3.26)
         self._tile_auth_api_host = None    # Host alvo do preprocessor
@@ -69,6 +78,9 @@ class SatIrrigaPlugin:
         from .infra.config.repository import ConfigRepository
         from .infra.http.auth_interceptor import AuthInterceptor
         from .infra.http.client import HttpClient
+        from .infra.http.decoder import ResponseDecoder
+        from .infra.tasks.worker_pool import WorkerPool
+        from .domain.services.gpkg_inspector import GpkgInspector
         from .app.state.store import AppState
         from .app.controllers.auth_controller import AuthController
         from .app.controllers.mapeamento_controller import MapeamentoController
@@ -84,12 +96,18 @@ class SatIrrigaPlugin:
         self._http_client = HttpClient(
             auth_interceptor=self._auth_interceptor,
         )
+        self._response_decoder = ResponseDecoder()
+        self._gpkg_inspector = GpkgInspector(
+            WorkerPool(max_workers=2, name="satirriga-gpkg"),
+        )
 
         self._mapeamento_controller = MapeamentoController(
             state=self._state,
             http_client=self._http_client,
             config_repo=self._config_repo,
             token_provider=self._auth_controller.get_access_token,
+            decoder=self._response_decoder,
+            gpkg_inspector=self._gpkg_inspector,
         )
 
         self._config_controller = ConfigController(
@@ -98,16 +116,22 @@ class SatIrrigaPlugin:
         )
         self._state.config_changed.connect(self._on_config_changed)
 
+        from qgis.core import QgsApplication
         from .app.controllers.timeseries_controller import TimeSeriesController
         self._timeseries_controller = TimeSeriesController(
             http_client=self._http_client,
             config_repo=self._config_repo,
+            cache_path=os.path.join(
+                QgsApplication.qgisSettingsDirPath(), "satirriga_cache",
+                "timeseries.sqlite",
+            ),
         )
 
         from .infra.services.bases_service import BasesService
         self._bases_service = BasesService(
             http_client=self._http_client,
             config_repo=self._config_repo,
+            decoder=self._response_decoder,
             parent=None,
         )
         self._bases_service.layer_loaded.connect(self._on_base_layer_loaded)
@@ -170,6 +194,14 @@ class SatIrrigaPlugin:
             # causou SIGSEGV em QGIS 3.34.4 por reentrancia no network manager.
             self._setup_tile_auth()
 
+            # Cache local de tiles das cenas (camadas do projeto passam pelo proxy)
+            self._setup_tile_cache()
+            from qgis.core import QgsProject
+            self._connect(
+                QgsProject.instance().readProject,
+                lambda *_: self._rebind_raster_tile_sources(),
+            )
+
             # Adia restauracao de sessao para apos o QGIS finalizar o startup
             QTimer.singleShot(500, self._auth_controller.try_restore_session)
         except Exception as e:
@@ -184,6 +216,15 @@ class SatIrrigaPlugin:
     def unload(self):
         self._disconnect_all_signals()
 
+        # Camadas voltam para as URLs originais antes de parar o proxy
+        if self._tile_proxy:
+            try:
+                self._rebind_raster_tile_sources(use_proxy=False)
+            except RuntimeError:
+                pass
+            self._tile_proxy.stop()
+            self._tile_proxy = None
+
         for action in self.actions:
             self.iface.removePluginMenu(self.tr("&SatIrriga"), action)
             self.iface.removeToolBarIcon(action)
@@ -220,6 +261,26 @@ class SatIrrigaPlugin:
             except (RuntimeError, TypeError):
                 pass
             self._vis_action = None
+        if self._prefetch_action:
+            try:
+                self.iface.removeCustomActionForLayerType(self._prefetch_action)
+            except (RuntimeError, TypeError):
+                pass
+            self._prefetch_action = None
+        for task in self._prefetch_tasks:
+            try:
+                task.cancel()
+            except RuntimeError:
+                pass
+        self._prefetch_tasks = []
+        self._raster_hierarchies.clear()
+        if self._indices_action:
+            try:
+                self.iface.removeCustomActionForLayerType(self._indices_action)
+            except (RuntimeError, TypeError):
+                pass
+            self._indices_action = None
+        self._pending_indices_groups.clear()
 
         # Cleanup map tool de serie temporal
         if self._timeseries_map_tool:
@@ -229,6 +290,12 @@ class SatIrrigaPlugin:
                 pass
             self._timeseries_map_tool = None
         self._timeseries_tab = None
+        if self._timeseries_controller:
+            try:
+                self._timeseries_controller.cleanup()
+            except (RuntimeError, AttributeError):
+                pass
+            self._timeseries_controller = None
 
         # Cleanup inspecao pontual de indices
         if self._pixel_inspect_controller:
@@ -279,6 +346,14 @@ class SatIrrigaPlugin:
             self._bases_service = None
         self._base_layers.clear()
 
+        # Encerra worker threads de decodificacao (jobs pendentes sao descartados)
+        if self._response_decoder:
+            self._response_decoder.shutdown()
+            self._response_decoder = None
+        if self._gpkg_inspector:
+            self._gpkg_inspector.shutdown()
+            self._gpkg_inspector = None
+
         # Remove interceptor de tiles base
         # QGIS >=3.26: removeRequestPreprocessor(id). QGIS <=3.24: passar None.
         if self._tile_auth_set:
@@ -367,6 +442,16 @@ class SatIrrigaPlugin:
         from .ui.dialogs.error_dialog import ErrorDialog
         ErrorDialog.show_error(operation, message, parent=self.dock)
 
+    def _on_dock_visibility_changed(self, visible):
+        if self._mapeamento_controller:
+            self._mapeamento_controller.set_polling_paused("dock_hidden", not visible)
+
+    def _on_application_state_changed(self, app_state):
+        if self._mapeamento_controller:
+            self._mapeamento_controller.set_polling_paused(
+                "app_inactive", app_state != Qt.ApplicationActive,
+            )
+
     def _wire_controllers(self):
         """Conecta controllers aos widgets do dock."""
         from .ui.dock import SatIrrigaDock
@@ -408,10 +493,17 @@ class SatIrrigaPlugin:
         from .app.controllers.pixel_inspect_controller import PixelInspectController
         from .ui.dialogs.pixel_inspect_dialog import PixelInspectDialog
 
+        from qgis.core import QgsApplication
+
+        self._pixel_cache_path = os.path.join(
+            QgsApplication.qgisSettingsDirPath(), "satirriga_cache",
+            "pixel_indexes.sqlite",
+        )
         self._pixel_inspect_controller = PixelInspectController(
             canvas=self.iface.mapCanvas(),
             http_client=self._http_client,
             config_repo=self._config_repo,
+            cache_path=self._pixel_cache_path,
         )
         self._pixel_inspect_dialog = PixelInspectDialog(
             parent=self.iface.mainWindow(),
@@ -419,6 +511,10 @@ class SatIrrigaPlugin:
         self._pixel_inspect_dialog.bind_clear_marker(
             self._pixel_inspect_controller.clear_marker
         )
+        self._connect(
+            self._pixel_inspect_dialog.hover_toggled,
+            self._pixel_inspect_controller.set_hover_enabled,
+        )
         self._connect(
             self._mapeamentos_tab.inspect_toggled,
             self._on_pixel_inspect_toggled,
@@ -532,6 +628,12 @@ class SatIrrigaPlugin:
         # Raster: criar camadas XYZ quando prontas
         self._connect(self._state.raster_layers_ready, self._on_raster_layers_ready)
 
+        # Extracao de indices em lote -> tabela ao lado do GPKG
+        self._connect(
+            self._mapeamento_controller.index_extraction_completed,
+            self._on_index_extraction_completed,
+        )
+
         # Mascara/ROI: criar camada vetorial quando geometria chegar
         self._pending_mascara_groups = {}
         self._connect(self._state.mascara_layer_ready, self._on_mascara_layer_ready)
@@ -547,6 +649,7 @@ class SatIrrigaPlugin:
 
         # Acao de contexto: "Ajustar visualização..." em camadas raster SatIrriga
         self._setup_raster_context_action()
+        self._setup_lazy_raster_dates()
 
         # Badge de camadas modificadas
         self._connect_camadas_badge(self._camadas_tab)
@@ -566,6 +669,13 @@ class SatIrrigaPlugin:
             lambda _zid, data: self._attribute_controller.set_overlay_data(data),
         )
 
+        # Polling de status pausa com dock oculto ou QGIS em segundo plano
+        self._connect(self.dock.visibilityChanged, self._on_dock_visibility_changed)
+        self._connect(
+            QApplication.instance().applicationStateChanged,
+            self._on_application_state_changed,
+        )
+
         # Reconecta edit tracking de camadas SatIrriga já presentes no projeto
         self._reconnect_existing_layers()
 
@@ -577,48 +687,71 @@ class SatIrrigaPlugin:
 
         Ao reabrir um projeto QGIS, camadas vetoriais e GPKGs são restauradas
         nativamente, mas os signals de edit tracking precisam ser reconectados.
+        Sidecar e contagens de sync são lidos no ``GpkgInspector``; a camada
+        é reconectada quando a leitura volta, se ainda estiver no projeto.
         """
         from qgis.core import QgsProject, QgsVectorLayer
-        from .domain.services.gpkg_service import read_sidecar, sidecar_path, count_features_by_sync_status
-        import os
-
-        pending_count = 0
-        reconnected = 0
 
+        candidates = []
         for layer in QgsProject.instance().mapLayers().values():
             if not isinstance(layer, QgsVectorLayer):
                 continue
             source = layer.source().split("|")[0]
-            if not source.endswith(".gpkg"):
-                continue
-            sc_path = sidecar_path(source)
-            if not os.path.exists(sc_path):
-                continue
-            meta = read_sidecar(source)
+            if source.endswith(".gpkg"):
+                candidates.append((layer.id(), source))
+        if not candidates:
+            return
+
+        summary = {"remaining": len(candidates), "reconnected": 0, "pending": 0}
+
+        def finish_one():
+            summary["remaining"] -= 1
+            if summary["remaining"] > 0:
+                return
+            if summary["pending"] > 0:
+                self._log(
+                    f"{summary['pending']} camada(s) com edicoes pendentes detectada(s)",
+                    Qgis.Info,
+                )
+            if summary["reconnected"] > 0:
+                self._log(
+                    f"Reconexao de {summary['reconnected']} camada(s) SatIrriga concluida"
+                )
+
+        def on_counts(counts):
+            pending = (counts.get("MODIFIED", 0)
+                       + counts.get("NEW", 0)
+                       + counts.get("DELETED", 0))
+            if pending > 0:
+                summary["pending"] += 1
+            finish_one()
+
+        def on_sidecar(layer_id, source, meta):
             zonal_id = meta.get("zonalId")
-            if not zonal_id:
-                continue
+            layer = QgsProject.instance().mapLayer(layer_id)
+            if not zonal_id or layer is None or self._mapeamento_controller is None:
+                finish_one()
+                return
 
             self._mapeamento_controller.connect_edit_tracking(
                 layer, zonal_id=zonal_id,
             )
             self._mapeamento_controller.fetch_overlay_data(zonal_id)
-            reconnected += 1
+            summary["reconnected"] += 1
 
-            counts = count_features_by_sync_status(source)
-            pending = (counts.get("MODIFIED", 0)
-                       + counts.get("NEW", 0)
-                       + counts.get("DELETED", 0))
-            if pending > 0:
-                pending_count += 1
+            # Uma conferencia por sessao: contadores do journal x GROUP BY
+            self._gpkg_inspector.sync_counts(
+                source, verify=True, on_done=on_counts,
+                on_error=lambda _msg: finish_one(),
+            )
 
-        if pending_count > 0:
-            self._log(
-                f"{pending_count} camada(s) com edicoes pendentes detectada(s)",
-                Qgis.Info,
+        for layer_id, source in candidates:
+            self._gpkg_inspector.sidecar(
+                source,
+                on_done=lambda meta, lid=layer_id, src=source: on_sidecar(lid, src, meta),
+                # Falha na leitura nao pode travar o resumo da reconexao
+                on_error=lambda _msg: finish_one(),
             )
-        if reconnected > 0:
-            self._log(f"Reconexao de {reconnected} camada(s) SatIrriga concluida")
 
     def _connect_camadas_badge(self, camadas_tab):
         """Atualiza badge na NavButton de Camadas quando ha features modificadas."""
@@ -626,20 +759,17 @@ class SatIrrigaPlugin:
         if not camadas_btn:
             return
 
-        original_refresh = camadas_tab._refresh_list
-        self._camadas_badge_original_refresh = original_refresh
-
-        def refresh_with_badge():
-            original_refresh()
+        def update_badge():
             modified_total = sum(
                 entry.get("sync_counts", {}).get("MODIFIED", 0)
                 + entry.get("sync_counts", {}).get("NEW", 0)
                 + entry.get("sync_counts", {}).get("DELETED", 0)
-                for entry in camadas_tab._gpkg_list
+                for entry in camadas_tab.gpkg_entries()
             )
             camadas_btn.set_badge(modified_total)
 
-        camadas_tab._refresh_list = refresh_with_badge
+        # Atualizacoes incrementais da lista tambem atualizam o badge
+        self._connect(camadas_tab.gpkg_list_changed, update_badge)
 
     def _setup_raster_context_action(self):
         """Registra acao 'Ajustar visualizacao' no menu de contexto da layer tree.
@@ -663,6 +793,30 @@ class SatIrrigaPlugin:
             allLayers=True,
         )
 
+        self._prefetch_action = QAction(
+            "Baixar imagens para uso offline...", self.iface.mainWindow()
+        )
+        self._prefetch_action.setEnabled(False)
+        self._prefetch_action.triggered.connect(self._on_prefetch_action_triggered)
+        self.iface.addCustomActionForLayerType(
+            self._prefetch_action,
+            "",
+            QgsMapLayerType.RasterLayer,
+            allLayers=True,
+        )
+
+        self._indices_action = QAction(
+            "Extrair índices espectrais das feições...", self.iface.mainWindow()
+        )
+        self._indices_action.setEnabled(False)
+        self._indices_action.triggered.connect(self._on_indices_action_triggered)
+        self.iface.addCustomActionForLayerType(
+            self._indices_action,
+            "",
+            QgsMapLayerType.VectorLayer,
+            allLayers=True,
+        )
+
         # Habilita acao apenas quando camada ativa e raster SatIrriga
         self._connect(
             self.iface.layerTreeView().currentLayerChanged,
@@ -676,6 +830,20 @@ class SatIrrigaPlugin:
             and layer.customProperty("satirriga/image_id")
         )
         self._vis_action.setEnabled(bool(is_satirriga_raster))
+        if self._prefetch_action:
+            self._prefetch_action.setEnabled(bool(
+                layer is not None
+                and (layer.customProperty("satirriga/tile_url")
+                     or layer.customProperty("satirriga/mosaic_urls"))
+                and self._tile_proxy
+                and self._tile_proxy.is_running
+            ))
+        if self._indices_action:
+            self._indices_action.setEnabled(bool(
+                layer is not None
+                and hasattr(layer, "fields")
+                and layer.fields().indexOf("_original_fid") >= 0
+            ))
 
     def _on_vis_action_triggered(self):
         """Handler da acao de contexto — identifica layer ativa e abre dialogo."""
@@ -684,6 +852,321 @@ class SatIrrigaPlugin:
             return
         self.customize_raster_vis(layer)
 
+    # ------------------------------------------------------------------
+    # Prefetch de tiles (uso offline)
+    # ------------------------------------------------------------------
+
+    def _on_prefetch_action_triggered(self):
+        """Abre o dialogo de prefetch para as cenas do grupo da camada ativa."""
+        from qgis.core import QgsApplication, QgsProject
+        from .domain.services.tile_prefetch import (
+            DEFAULT_TILE_BYTES, build_prefetch_plan, hierarchy_templates,
+            template_extents,
+        )
+        from .infra.tasks.tile_prefetch_task import TilePrefetchTask
+        from .ui.dialogs.tile_prefetch_dialog import TilePrefetchDialog
+
+        layer = self.iface.activeLayer()
+        if not layer or not (layer.customProperty("satirriga/tile_url")
+                             or layer.customProperty("satirriga/mosaic_urls")):
+            return
+        if not self._tile_proxy or not self._tile_proxy.is_running:
+            return
+
+        node = QgsProject.instance().layerTreeRoot().findLayer(layer.id())
+        cenas = node.parent() if node else None
+        while cenas is not None and cenas.name() != "Cenas":
+            cenas = cenas.parent()
+        if cenas is None:
+            return
+
+        hierarchy = self._raster_hierarchies.get(
+            cenas.customProperty("satirriga/raster_key")
+        ) or self._hierarchy_from_tree(cenas)
+        bbox = self._zonal_extent_lonlat(cenas.parent())
+        if not hierarchy.dates or bbox is None:
+            self.iface.messageBar().pushWarning(
+                PLUGIN_NAME, "Não foi possível determinar a área das cenas",
+            )
+            return
+
+        dates = [(dg.date_iso, dg.date_label) for dg in hierarchy.dates]
+        bands = []
+        for dg in hierarchy.dates:
+            for bg in dg.bands:
+                if bg.band_key not in [k for k, _ in bands]:
+                    bands.append((bg.band_key, bg.band_name))
+
+        cache = self._tile_proxy.cache
+        extents = template_extents(hierarchy)
+        dialog = TilePrefetchDialog(
+            bbox, dates, bands,
+            lambda d, b: hierarchy_templates(hierarchy, d, b),
+            cache.average_tile_bytes() or DEFAULT_TILE_BYTES,
+            cache.max_bytes,
+            extents=extents,
+            parent=self.dock,
+        )
+        if dialog.exec_() != TilePrefetchDialog.Accepted:
+            return
+
+        zmin, zmax = dialog.zoom_range()
+        templates = hierarchy_templates(
+            hierarchy, dialog.selected_dates(), dialog.selected_bands(),
+        )
+        plan = build_prefetch_plan(bbox, templates, zmin, zmax, extents=extents)
+        if not plan.tiles:
+            return
+
+        task = TilePrefetchTask(cache, plan)
+        task.signals.completed.connect(
+            lambda ok, msg, t=task: self._on_prefetch_completed(t, ok, msg)
+        )
+        self._prefetch_tasks.append(task)
+        QgsApplication.taskManager().addTask(task)
+        self._log(
+            f"[Prefetch] {plan.tile_count} tiles de {len(plan.sources)} fontes, "
+            f"zoom {plan.zmin}-{plan.zmax}"
+        )
+
+    def _on_prefetch_completed(self, task, success, message):
+        if task in self._prefetch_tasks:
+            self._prefetch_tasks.remove(task)
+        if success:
+            self.iface.messageBar().pushSuccess(
+                PLUGIN_NAME, f"Imagens disponíveis offline: {message}",
+            )
+        else:
+            self.iface.messageBar().pushWarning(
+                PLUGIN_NAME, f"Download de imagens interrompido: {message}",
+            )
+
+    @staticmethod
+    def _hierarchy_from_tree(cenas_group):
+        """Reconstroi a hierarquia a partir das camadas carregadas no grupo.
+
+        Usado quando o projeto foi reaberto (a hierarquia completa vive so
+        em memoria): datas materializadas vem das camadas, as pendentes do
+        JSON em ``satirriga/lazy_date``.
+        """
+        import json as _json
+        from qgis.core import QgsLayerTreeGroup
+        from .domain.models.raster import (
+            BandGroup, DateGroup, RasterHierarchy, RasterLayerConfig,
+        )
+        from .domain.services.raster_service import date_group_from_json
+
+        hierarchy = RasterHierarchy()
+        for date_node in cenas_group.children():
+            if not isinstance(date_node, QgsLayerTreeGroup):
+                continue
+            payload = date_node.customProperty("satirriga/lazy_date")
+            if payload:
+                # Data ainda nao materializada: configuracoes ficam no no
+                try:
+                    hierarchy.dates.append(date_group_from_json(payload))
+                except (ValueError, KeyError, TypeError):
+                    pass
+                continue
+            date_group = DateGroup(date_label=date_node.name(), date_iso=date_node.name())
+            for band_node in date_node.children():
+                if not isinstance(band_node, QgsLayerTreeGroup):
+                    continue
+                band_group = None
+                for leaf in band_node.findLayers():
+                    layer = leaf.layer()
+                    if layer is None:
+                        continue
+                    mosaic = layer.customProperty("satirriga/mosaic_urls")
+                    urls = (_json.loads(mosaic) if mosaic
+                            else [layer.customProperty("satirriga/tile_url")])
+                    urls = [u for u in urls if u]
+                    if not urls:
+                        continue
+                    if band_group is None:
+                        band_group = BandGroup(
+                            band_name=band_node.name(),
+                            band_key=layer.customProperty("satirriga/band_key")
+                            or band_node.name(),
+                        )
+                    ids = (_json.loads(layer.customProperty("satirriga/mosaic_image_ids") or "[]")
+                           if mosaic else [layer.customProperty("satirriga/image_id") or ""])
+                    if len(ids) != len(urls):
+                        ids = [""] * len(urls)
+                    band_group.layers.extend(
+                        RasterLayerConfig(
+                            name=layer.name(), xyz_url=u, layer_type="", image_id=i,
+                        )
+                        for u, i in zip(urls, ids)
+                    )
+                if band_group is not None:
+                    date_group.bands.append(band_group)
+            if date_group.bands:
+                hierarchy.dates.append(date_group)
+        return hierarchy
+
+    def _zonal_extent_lonlat(self, group):
+        """Extensao (EPSG:4326) das camadas vetoriais do grupo do zonal.
+
+        Sem vetor no grupo (rasters avulsos), usa a extensao do canvas.
+        """
+        from qgis.core import (
+            QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsProject,
+            QgsRectangle, QgsVectorLayer,
+        )
+
+        wgs84 = QgsCoordinateReferenceSystem("EPSG:4326")
+        project = QgsProject.instance()
+        extent = QgsRectangle()
+        layers = [
+            leaf.layer() for leaf in (group.findLayers() if group else [])
+            if isinstance(leaf.layer(), QgsVectorLayer)
+        ]
+        for layer in layers:
+            transform = QgsCoordinateTransform(layer.crs(), wgs84, project)
+            extent.combineExtentWith(transform.transformBoundingBox(layer.extent()))
+        if extent.isEmpty():
+            canvas = self.iface.mapCanvas()
+            transform = QgsCoordinateTransform(
+                canvas.mapSettings().destinationCrs(), wgs84, project,
+            )
+            extent = transform.transformBoundingBox(canvas.extent())
+        if extent.isEmpty():
+            return None
+        return [extent.xMinimum(), extent.yMinimum(),
+                extent.xMaximum(), extent.yMaximum()]
+
+    # ------------------------------------------------------------------
+    # Extracao de indices espectrais em lote
+    # ------------------------------------------------------------------
+
+    def _on_indices_action_triggered(self):
+        """Extrai indices de todas as feicoes da camada ativa x cenas do zonal.
+
+        Cada feicao e amostrada no ponto na superficie do poligono; as cenas
+        sao as do grupo "Cenas" do mesmo zonal (todas as datas).
+        """
+        from qgis.PyQt.QtWidgets import QMessageBox
+        from qgis.core import QgsLayerTreeGroup, QgsProject
+        from .domain.services.index_extraction import (
+            request_count, scene_image_ids,
+        )
+
+        layer = self.iface.activeLayer()
+        if not layer or layer.fields().indexOf("_original_fid") < 0:
+            return
+        gpkg_path = layer.source().split("|")[0]
+
+        node = QgsProject.instance().layerTreeRoot().findLayer(layer.id())
+        group = node.parent() if node else None
+        cenas = None
+        for child in (group.children() if group else []):
+            if isinstance(child, QgsLayerTreeGroup) and child.name() == "Cenas":
+                cenas = child
+                break
+        if cenas is None:
+            self.iface.messageBar().pushWarning(
+                PLUGIN_NAME, "Carregue as imagens do zonal antes de extrair índices",
+            )
+            return
+
+        hierarchy = self._raster_hierarchies.get(
+            cenas.customProperty("satirriga/raster_key")
+        ) or self._hierarchy_from_tree(cenas)
+        image_ids = scene_image_ids(hierarchy)
+        points = self._feature_points(layer)
+        if not image_ids or not points:
+            self.iface.messageBar().pushWarning(
+                PLUGIN_NAME, "Nenhuma cena ou feição para extrair índices",
+            )
+            return
+
+        total = request_count(len(points), len(image_ids))
+        answer = QMessageBox.question(
+            self.iface.mainWindow(), PLUGIN_NAME,
+            f"Extrair índices de {len(points)} feições em {len(image_ids)} "
+            f"cenas?\n\nAté {total} requisições (pixels já consultados "
+            f"vêm do cache).",
+        )
+        if answer != QMessageBox.Yes:
+            return
+
+        from .domain.services.gpkg_service import indices_path
+        self._pending_indices_groups[indices_path(gpkg_path)] = group
+        self._mapeamento_controller.extract_zonal_indexes(
+            gpkg_path, points, image_ids, cache_path=self._pixel_cache_path,
+        )
+        self._log(
+            f"[Indices] {len(points)} feicoes x {len(image_ids)} cenas "
+            f"({total} requisicoes no maximo)"
+        )
+
+    @staticmethod
+    def _feature_points(layer):
+        """``FeaturePoint`` (EPSG:4326) no ponto na superficie de cada feicao.
+
+        Feicoes novas (``_original_fid`` vazio ou <= 0) ficam de fora: sem
+        id no servidor nao ha chave estavel para unir a tabela de indices.
+        """
+        from qgis.core import (
+            QgsCoordinateReferenceSystem, QgsCoordinateTransform,
+            QgsFeatureRequest, QgsProject,
+        )
+        from .domain.services.index_extraction import FeaturePoint
+
+        transform = QgsCoordinateTransform(
+            layer.crs(), QgsCoordinateReferenceSystem("EPSG:4326"),
+            QgsProject.instance(),
+        )
+        request = QgsFeatureRequest().setSubsetOfAttributes(
+            ["_original_fid"], layer.fields(),
+        )
+        points = []
+        for feature in layer.getFeatures(request):
+            geom = feature.geometry()
+            fid = feature["_original_fid"]
+            if geom is None or geom.isEmpty() or not fid or int(fid) <= 0:
+                continue
+            point = transform.transform(geom.pointOnSurface().asPoint())
+            points.append(FeaturePoint(int(fid), point.y(), point.x()))
+        return points
+
+    def _on_index_extraction_completed(self, success, message, output_path):
+        """Adiciona (ou recarrega) a tabela de indices no grupo do zonal."""
+        from qgis.core import QgsProject, QgsVectorLayer
+
+        group = self._pending_indices_groups.pop(output_path, None)
+        if not success:
+            self.iface.messageBar().pushWarning(
+                PLUGIN_NAME, f"Extração de índices interrompida: {message}",
+            )
+            return
+
+        project = QgsProject.instance()
+        existing = [
+            lyr for lyr in project.mapLayers().values()
+            if lyr.customProperty("satirriga/indices_path") == output_path
+        ]
+        for lyr in existing:
+            lyr.reload()
+        if not existing:
+            from .domain.services.index_extraction import INDICES_TABLE
+            table = QgsVectorLayer(
+                f"{output_path}|layername={INDICES_TABLE}",
+                "Índices espectrais", "ogr",
+            )
+            if table.isValid():
+                table.setCustomProperty("satirriga/indices_path", output_path)
+                project.addMapLayer(table, False)
+                try:
+                    (group or project.layerTreeRoot()).addLayer(table)
+                except RuntimeError:
+                    project.layerTreeRoot().addLayer(table)
+        self.iface.messageBar().pushSuccess(
+            PLUGIN_NAME,
+            f"{message} — una às feições por _original_fid",
+        )
+
     # ------------------------------------------------------------------
     # Camadas Base (Google Satellite + Vector Tiles MVT)
     # ------------------------------------------------------------------
@@ -704,6 +1187,12 @@ class SatIrrigaPlugin:
         (SessionManager ativo, camadas ja adicionadas ao projeto) exigem
         logout/relogin e remocao manual das camadas — avisa o usuario.
         """
+        from .domain.services.vis_config_service import invalidate_vis_cache
+        invalidate_vis_cache()
+
+        if "tile_cache_max_mb" in changed_keys:
+            self._apply_tile_cache_limit()
+
         url_keys = {"api_base_url", "sso_base_url"}
         if not (changed_keys & url_keys):
             return
@@ -792,6 +1281,114 @@ class SatIrrigaPlugin:
             # Nunca propagar excecao para a thread de rede do Qt
             pass
 
+    def _setup_tile_cache(self):
+        """Cria o cache MBTiles e sobe o proxy loopback (limite 0 desativa)."""
+        import sqlite3
+        from qgis.core import QgsApplication
+        from .domain.services.tile_cache import TileCache
+        from .infra.http.tile_proxy import TileProxy
+
+        max_mb = self._config_repo.get("tile_cache_max_mb")
+        cache_dir = os.path.join(
+            QgsApplication.qgisSettingsDirPath(), "satirriga_cache", "tiles",
+        )
+        try:
+            cache = TileCache(cache_dir, max_mb * 1024 * 1024)
+        except (OSError, sqlite3.Error) as e:
+            self._log(f"[Tiles] Cache de tiles indisponivel: {e}", Qgis.Warning)
+            return
+        self._tile_proxy = TileProxy(cache)
+        if max_mb > 0:
+            self._tile_proxy.start()
+        self._rebind_raster_tile_sources()
+
+    def _apply_tile_cache_limit(self):
+        """Aplica novo limite do cache; 0 para o proxy e usa URLs diretas."""
+        if not self._tile_proxy:
+            return
+        max_mb = self._config_repo.get("tile_cache_max_mb")
+        self._tile_proxy.cache.set_max_bytes(max_mb * 1024 * 1024)
+        if max_mb > 0 and not self._tile_proxy.is_running:
+            self._tile_proxy.start()
+            self._rebind_raster_tile_sources()
+        elif max_mb <= 0 and self._tile_proxy.is_running:
+            self._rebind_raster_tile_sources(use_proxy=False)
+            self._tile_proxy.stop()
+
+    def _raster_tile_uri(self, xyz_url, use_proxy=True):
+        """URI do provider ``wms`` para uma URL XYZ (via proxy se ativo)."""
+        url = xyz_url
+        if use_proxy and self._tile_proxy:
+            url = self._tile_proxy.local_template(xyz_url)
+        # Escapa & na URL do tile para que o WMS provider
+        # não confunda params do tile com params do provider
+        safe_url = url.replace("&", "%26")
+        return f"type=xyz&url={safe_url}&zmin=0&zmax=18"
+
+    def _raster_mosaic_uri(self, xyz_urls):
+        """URI ``wms`` do mosaico local de ``xyz_urls`` (proxy deve estar ativo)."""
+        url = self._tile_proxy.local_mosaic_template(xyz_urls)
+        return f"type=xyz&url={url}&zmin=0&zmax=18"
+
+    def _rebind_raster_tile_sources(self, use_proxy=True):
+        """Aponta camadas de cenas do projeto para o proxy (ou de volta ao upstream).
+
+        A URL original fica em ``satirriga/tile_url``; a porta do proxy pode
+        mudar entre sessoes, entao a fonte e recalculada ao abrir o projeto.
+        Mosaicos so existem no proxy: sem ele viram camadas por cena.
+        """
+        import json as _json
+        from qgis.core import QgsProject, QgsRasterLayer
+
+        for layer in QgsProject.instance().mapLayers().values():
+            if not isinstance(layer, QgsRasterLayer):
+                continue
+            mosaic = layer.customProperty("satirriga/mosaic_urls")
+            if mosaic:
+                if use_proxy and self._tile_proxy and self._tile_proxy.is_running:
+                    uri = self._raster_mosaic_uri(_json.loads(mosaic))
+                    if layer.source() != uri:
+                        layer.setDataSource(uri, layer.name(), "wms")
+                else:
+                    self._split_band_mosaic(layer)
+                continue
+            xyz_url = layer.customProperty("satirriga/tile_url")
+            if not xyz_url:
+                continue
+            uri = self._raster_tile_uri(xyz_url, use_proxy=use_proxy)
+            if layer.source() != uri:
+                layer.setDataSource(uri, layer.name(), "wms")
+
+    def _split_band_mosaic(self, layer):
+        """Troca uma camada mosaico pelas camadas das cenas (URLs diretas).
+
+        Sem o proxy o template local do mosaico aponta para uma porta
+        morta; as cenas da banda (``satirriga/mosaic_band``) sao recriadas
+        no mesmo grupo. Mosaicos sem essa informacao ficam como estao e o
+        usuario e avisado.
+        """
+        from qgis.core import QgsProject
+        from .domain.services.raster_service import band_group_from_json
+
+        project = QgsProject.instance()
+        node = project.layerTreeRoot().findLayer(layer.id())
+        payload = layer.customProperty("satirriga/mosaic_band")
+        if node is None or node.parent() is None or not payload:
+            self.iface.messageBar().pushWarning(
+                PLUGIN_NAME,
+                f"A camada \"{layer.name()}\" depende do cache de tiles e ficará "
+                "vazia até ele ser reativado",
+            )
+            return
+        band_node = node.parent()
+        visible = node.itemVisibilityChecked()
+        self._add_band_layers(
+            band_node, band_group_from_json(payload), use_proxy=False,
+        )
+        if not visible:
+            band_node.setItemVisibilityChecked(False)
+        project.removeMapLayer(layer.id())
+
     def _setup_tile_auth(self):
         """Registra interceptor global para injetar Bearer token em tiles base.
 
@@ -1054,18 +1651,34 @@ class SatIrrigaPlugin:
         a cada redownload. Origens distintas (Mapeamentos vs Homologacao)
         sao mantidas lado a lado.
         """
+        # Origem: prioridade meta do download, fallback para sidecar no disco
+        # (lido em worker thread; falha cai na origem padrao)
+        origin_raw = (catalogo_meta or {}).get("origin")
+        if origin_raw:
+            self._load_downloaded_zonal(
+                gpkg_path, zonal_id, catalogo_meta, camadas_tab, origin_raw,
+            )
+            return
+        self._gpkg_inspector.sidecar(
+            gpkg_path,
+            on_done=lambda meta: self._load_downloaded_zonal(
+                gpkg_path, zonal_id, catalogo_meta, camadas_tab,
+                (meta or {}).get("origin"),
+            ),
+            on_error=lambda _msg: self._load_downloaded_zonal(
+                gpkg_path, zonal_id, catalogo_meta, camadas_tab, None,
+            ),
+        )
+
+    def _load_downloaded_zonal(self, gpkg_path, zonal_id, catalogo_meta,
+                               camadas_tab, origin_raw):
         from qgis.core import QgsProject, QgsVectorLayer
         from .domain.services.gpkg_service import (
             SATIRRIGA_ROOT_GROUP,
             origin_group_label,
-            read_sidecar,
         )
         from .domain.models.enums import DownloadOrigin
 
-        # Origem: prioridade meta do download, fallback para sidecar no disco
-        origin_raw = (catalogo_meta or {}).get("origin")
-        if not origin_raw:
-            origin_raw = read_sidecar(gpkg_path).get("origin")
         origin_enum = DownloadOrigin.coerce(origin_raw)
         origin_key = origin_enum.value
         origin_label = origin_group_label(origin_key)
@@ -1349,10 +1962,15 @@ class SatIrrigaPlugin:
         """Cria arvore hierarquica de camadas raster XYZ no QGIS.
 
         Hierarquia: Datas > Bandas > Cenas (tiles individuais).
+
+        Somente a data mais recente ganha ``QgsRasterLayer`` de imediato; as
+        demais entram como grupos Data > Banda vazios, desmarcados, com as
+        configuracoes serializadas em ``satirriga/lazy_date``. As camadas
+        sao criadas quando o grupo e expandido ou marcado
+        (``_on_raster_tree_node_changed``).
         """
-        import json as _json
-        from dataclasses import asdict
-        from qgis.core import QgsProject, QgsRasterLayer
+        from qgis.core import QgsProject
+        from .domain.services.raster_service import date_group_to_json
 
         if not hierarchy or not hierarchy.dates:
             return
@@ -1369,55 +1987,174 @@ class SatIrrigaPlugin:
                 group = root.insertGroup(0, group_name)
 
         dates_group = group.addGroup("Cenas")
-
-        # Carrega apenas a data mais recente (dates[0]): hierarchy.dates é
-        # ordenado desc por data em raster_service._build_hierarchy.
-        for date_group in hierarchy.dates[:1]:
+        # Hierarquia completa (todas as datas) fica disponivel para o prefetch
+        raster_key = uuid.uuid4().hex[:12]
+        dates_group.setCustomProperty("satirriga/raster_key", raster_key)
+        self._raster_hierarchies[raster_key] = hierarchy
+
+        # hierarchy.dates é ordenado desc por data em
+        # raster_service._build_hierarchy: dates[0] é a mais recente.
+        for i, date_group in enumerate(hierarchy.dates):
             date_node = dates_group.addGroup(date_group.date_label)
-
             for band_group in date_group.bands:
                 band_node = date_node.addGroup(band_group.band_name)
-                band_has_visible = False
-
-                for config in band_group.layers:
-                    # Escapa & na URL do tile para que o WMS provider
-                    # não confunda params do tile com params do provider
-                    safe_url = config.xyz_url.replace("&", "%26")
-                    uri = f"type=xyz&url={safe_url}&zmin=0&zmax=18"
-                    layer = QgsRasterLayer(uri, config.name, "wms")
-
-                    if not layer.isValid():
-                        self._log(
-                            f"Camada raster invalida: {config.name}",
-                            Qgis.Warning,
-                        )
-                        continue
+                band_node.setCustomProperty("satirriga/band_key", band_group.band_key)
+                if i == 0:
+                    self._add_band_layers(band_node, band_group)
+                else:
+                    band_node.setExpanded(False)
+            if i > 0:
+                date_node.setCustomProperty(
+                    "satirriga/lazy_date", date_group_to_json(date_group),
+                )
+                date_node.setItemVisibilityChecked(False)
+                date_node.setExpanded(False)
 
-                    # Persiste contexto como custom properties para customizacao posterior
-                    if config.image_id:
-                        layer.setCustomProperty("satirriga/image_id", config.image_id)
-                        layer.setCustomProperty(
-                            "satirriga/vis_params",
-                            _json.dumps(asdict(config.vis_params)),
-                        )
-                        layer.setCustomProperty("satirriga/band_key", band_group.band_key)
+        if self._pixel_inspect_controller:
+            from .domain.services.index_extraction import scene_image_ids
+            self._pixel_inspect_controller.index_scenes(scene_image_ids(hierarchy))
 
-                    QgsProject.instance().addMapLayer(layer, False)
-                    band_node.addLayer(layer)
+        latest = hierarchy.dates[0]
+        self._log(
+            f"Arvore raster criada: {len(latest.bands)} bandas da data mais "
+            f"recente ({len(hierarchy.dates) - 1} datas sob demanda)"
+        )
 
-                    if config.is_visible:
-                        band_has_visible = True
+    def _add_band_layers(self, band_node, band_group, use_proxy=True):
+        """Cria as ``QgsRasterLayer`` de uma banda dentro de ``band_node``."""
+        import json as _json
+        from dataclasses import asdict
+        from qgis.core import QgsProject, QgsRasterLayer
 
-                # Grupo de banda invisivel por padrao se nenhuma camada e visivel
-                if not band_has_visible:
-                    band_node.setItemVisibilityChecked(False)
+        if use_proxy and self._add_band_mosaic(band_node, band_group):
+            return
 
-        loaded_dates = hierarchy.dates[:1]
-        self._log(
-            f"Arvore raster criada: {len(loaded_dates)} data, "
-            f"{sum(len(dg.bands) for dg in loaded_dates)} bandas "
-            f"(de {len(hierarchy.dates)} datas disponiveis)"
+        band_has_visible = False
+        for config in band_group.layers:
+            uri = self._raster_tile_uri(config.xyz_url, use_proxy=use_proxy)
+            layer = QgsRasterLayer(uri, config.name, "wms")
+
+            if not layer.isValid():
+                self._log(
+                    f"Camada raster invalida: {config.name}",
+                    Qgis.Warning,
+                )
+                continue
+
+            # Persiste contexto como custom properties para customizacao posterior
+            layer.setCustomProperty("satirriga/tile_url", config.xyz_url)
+            if config.image_id:
+                layer.setCustomProperty("satirriga/image_id", config.image_id)
+                layer.setCustomProperty(
+                    "satirriga/vis_params",
+                    _json.dumps(asdict(config.vis_params)),
+                )
+                layer.setCustomProperty("satirriga/band_key", band_group.band_key)
+
+            QgsProject.instance().addMapLayer(layer, False)
+            band_node.addLayer(layer)
+
+            if config.is_visible:
+                band_has_visible = True
+
+        # Grupo de banda invisivel por padrao se nenhuma camada e visivel
+        if not band_has_visible:
+            band_node.setItemVisibilityChecked(False)
+
+    def _add_band_mosaic(self, band_node, band_group):
+        """Uma unica camada com todas as cenas da banda (via proxy de tiles).
+
+        Retorna False quando o modo mosaico nao se aplica (desligado, proxy
+        parado ou cena unica) e as camadas devem ser criadas uma a uma.
+        """
+        import json as _json
+        from qgis.core import QgsProject, QgsRasterLayer
+        from .domain.services.raster_service import band_group_to_json
+
+        urls = [c.xyz_url for c in band_group.layers if c.xyz_url]
+        if (len(urls) < 2 or not self._config_repo.get("raster_mosaic")
+                or not self._tile_proxy or not self._tile_proxy.is_running):
+            return False
+
+        uri = self._raster_mosaic_uri(urls)
+        layer = QgsRasterLayer(uri, f"{band_group.band_name} (mosaico)", "wms")
+        if not layer.isValid():
+            self._log(
+                f"Mosaico raster invalido: {band_group.band_name}", Qgis.Warning,
+            )
+            return False
+
+        layer.setCustomProperty("satirriga/mosaic_urls", _json.dumps(urls))
+        layer.setCustomProperty(
+            "satirriga/mosaic_image_ids",
+            _json.dumps([c.image_id for c in band_group.layers if c.image_id]),
         )
+        layer.setCustomProperty("satirriga/band_key", band_group.band_key)
+        # Cenas da banda para voltar a camadas por cena sem o proxy
+        layer.setCustomProperty("satirriga/mosaic_band", band_group_to_json(band_group))
+        QgsProject.instance().addMapLayer(layer, False)
+        band_node.addLayer(layer)
+        if not any(c.is_visible for c in band_group.layers):
+            band_node.setItemVisibilityChecked(False)
+        return True
+
+    def _setup_lazy_raster_dates(self):
+        """Observa a arvore de camadas para materializar datas sob demanda.
+
+        Sinais de nos filhos sao repassados ate a raiz, entao uma conexao
+        na raiz cobre todos os grupos de cenas (inclusive de projetos
+        abertos depois — a raiz e a mesma instancia).
+        """
+        from qgis.core import QgsProject
+
+        root = QgsProject.instance().layerTreeRoot()
+        self._connect(root.expandedChanged, self._on_raster_tree_node_changed)
+        self._connect(root.visibilityChanged, self._on_raster_tree_node_changed)
+
+    def _on_raster_tree_node_changed(self, node, expanded=None):
+        """Expandir ou marcar uma data (ou banda) pendente cria suas camadas."""
+        if expanded is False:
+            return
+        if expanded is None and not node.itemVisibilityChecked():
+            return
+        date_node = node
+        if not date_node.customProperty("satirriga/lazy_date"):
+            date_node = node.parent()
+            if date_node is None or not date_node.customProperty("satirriga/lazy_date"):
+                return
+        # Fora do emit: alterar a arvore dentro do sinal reentra no modelo
+        QTimer.singleShot(0, lambda: self._materialize_raster_date(date_node))
+
+    def _materialize_raster_date(self, date_node):
+        """Cria as camadas de uma data pendente (idempotente)."""
+        from qgis.core import QgsLayerTreeGroup
+        from .domain.services.raster_service import date_group_from_json
+
+        try:
+            payload = date_node.customProperty("satirriga/lazy_date")
+        except RuntimeError:
+            return  # grupo removido antes do timer
+        if not payload:
+            return
+        date_node.removeCustomProperty("satirriga/lazy_date")
+        try:
+            date_group = date_group_from_json(payload)
+        except (ValueError, KeyError, TypeError) as e:
+            self._log(f"Data raster pendente invalida: {e}", Qgis.Warning)
+            return
+
+        band_nodes = {
+            child.customProperty("satirriga/band_key"): child
+            for child in date_node.children()
+            if isinstance(child, QgsLayerTreeGroup)
+        }
+        for band_group in date_group.bands:
+            band_node = band_nodes.get(band_group.band_key)
+            if band_node is None:
+                band_node = date_node.addGroup(band_group.band_name)
+                band_node.setCustomProperty("satirriga/band_key", band_group.band_key)
+            self._add_band_layers(band_node, band_group)
+        self._log(f"Camadas raster criadas para {date_group.date_label}")
 
     @staticmethod
     def _format_metodo(metodo_apply):
@@ -1531,17 +2268,15 @@ class SatIrrigaPlugin:
         # Remove layer antigo
         QgsProject.instance().removeMapLayer(old_layer.id())
 
-        # Cria novo layer — encoda & como %26 na URL para evitar que o
-        # parser de URI do QGIS (WMS data provider) confunda query params
-        # da URL do tile com parametros do proprio URI
-        safe_url = new_url.replace("&", "%26")
-        uri = f"type=xyz&url={safe_url}&zmin=0&zmax=18"
+        # Cria novo layer (via proxy de tiles quando ativo)
+        uri = self._raster_tile_uri(new_url)
         new_layer = QgsRasterLayer(uri, layer_name, "wms")
         if not new_layer.isValid():
             self._log(f"Falha ao recriar camada raster: {layer_name}", Qgis.Warning)
             return
 
         # Custom properties
+        new_layer.setCustomProperty("satirriga/tile_url", new_url)
         if image_id:
             new_layer.setCustomProperty("satirriga/image_id", image_id)
         new_layer.setCustomProperty(
@@ -0,0 +1,266 @@
+"""Testes unitarios para change_journal — triggers de sync executados no sqlite3."""
+
+import sqlite3
+from unittest.mock import patch, MagicMock
+
+with patch.dict("sys.modules", {
+    "qgis": MagicMock(),
+    "qgis.core": MagicMock(),
+}):
+    from domain.services.change_journal import (
+        TOMBSTONE_TABLE,
+        change_journal_statements,
+        has_change_journal,
+        read_sync_counts,
+        read_tombstones,
+        tables_missing_journal,
+    )
+
+
+TABLE = "zonal_1"
+
+
+def _make_gpkg(path, rows=()):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE gpkg_contents (table_name TEXT, data_type TEXT)")
+    conn.execute(f"INSERT INTO gpkg_contents VALUES ('{TABLE}', 'features')")
+    conn.execute(
+        f'CREATE TABLE "{TABLE}" (fid INTEGER PRIMARY KEY, nome TEXT, '
+        "_original_fid INTEGER, _sync_status TEXT, _sync_timestamp TEXT)"
+    )
+    conn.executemany(
+        f'INSERT INTO "{TABLE}" (fid, nome, _original_fid, _sync_status, '
+        "_sync_timestamp) VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    return conn
+
+
+def _install(conn, migrate=False):
+    for stmt in change_journal_statements(TABLE, migrate=migrate):
+        conn.execute(stmt)
+    conn.commit()
+
+
+def _status(conn, fid):
+    return conn.execute(
+        f'SELECT _sync_status FROM "{TABLE}" WHERE fid = ?', (fid,)
+    ).fetchone()[0]
+
+
+def _server_rows():
+    return [
+        (1, "a", 101, "DOWNLOADED", "t0"),
+        (2, "b", 102, "DOWNLOADED", "t0"),
+        (3, "c", 103, "UPLOADED", "t0"),
+    ]
+
+
+class TestTriggers:
+    def test_insert_without_status_becomes_new(self, tmp_path):
+        conn = _make_gpkg(str(tmp_path / "z.gpkg"), _server_rows())
+        _install(conn)
+        conn.execute(f'INSERT INTO "{TABLE}" (fid, nome) VALUES (10, ?)', ("nova",))
+        assert _status(conn, 10) == "NEW"
+
+    def test_insert_remembered_status_without_original_fid_becomes_new(self, tmp_path):
+        conn = _make_gpkg(str(tmp_path / "z.gpkg"), _server_rows())
+        _install(conn)
+        conn.execute(
+            f'INSERT INTO "{TABLE}" (fid, _original_fid, _sync_status) '
+            "VALUES (11, 0, 'DOWNLOADED')"
+        )
+        assert _status(conn, 11) == "NEW"
+
+    def test_update_marks_modified_and_keeps_new(self, tmp_path):
+        conn = _make_gpkg(str(tmp_path / "z.gpkg"), _server_rows())
+        _install(conn)
+        conn.execute(f'INSERT INTO "{TABLE}" (fid, nome) VALUES (10, ?)', ("nova",))
+        conn.execute(f'UPDATE "{TABLE}" SET nome = ? WHERE fid IN (1, 3, 10)', ("x",))
+        assert _status(conn, 1) == "MODIFIED"
+        assert _status(conn, 2) == "DOWNLOADED"
+        assert _status(conn, 3) == "MODIFIED"
+        assert _status(conn, 10) == "NEW"
+
+    def test_plugin_status_transition_not_overridden(self, tmp_path):
+        conn = _make_gpkg(str(tmp_path / "z.gpkg"), _server_rows())
+        _install(conn)
+        conn.execute(f'UPDATE "{TABLE}" SET nome = ? WHERE fid = 1', ("x",))
+        conn.execute(
+            f"UPDATE \"{TABLE}\" SET _sync_status = 'UPLOADED', "
+            "_sync_timestamp = 't1' WHERE fid = 1"
+        )
+        assert _status(conn, 1) == "UPLOADED"
+
+    def test_delete_server_feature_creates_tombstone(self, tmp_path):
+        path = str(tmp_path / "z.gpkg")
+        conn = _make_gpkg(path, _server_rows())
+        _install(conn)
+        conn.execute(f'INSERT INTO "{TABLE}" (fid, nome) VALUES (10, ?)', ("nova",))
+        conn.execute(f'DELETE FROM "{TABLE}" WHERE fid IN (2, 10)')
+        conn.commit()
+        assert [fid for fid, _ in read_tombstones(path)] == [102]
+
+    def test_read_tombstones_without_journal(self, tmp_path):
+        path = str(tmp_path / "z.gpkg")
+        _make_gpkg(path, _server_rows()).close()
+        assert read_tombstones(path) == []
+
+
+class TestMigration:
+    def test_legacy_tombstone_rows_moved(self, tmp_path):
+        path = str(tmp_path / "z.gpkg")
+        rows = _server_rows() + [(4, None, 104, "DELETED", "t2")]
+        conn = _make_gpkg(path, rows)
+        _install(conn, migrate=True)
+        remaining = conn.execute(f'SELECT COUNT(*) FROM "{TABLE}"').fetchone()[0]
+        conn.close()
+        assert remaining == 3
+        assert read_tombstones(path, TABLE) == [(104, "t2")]
+
+    def test_missing_and_installed_detection(self, tmp_path):
+        path = str(tmp_path / "z.gpkg")
+        conn = _make_gpkg(path, _server_rows())
+        assert tables_missing_journal(path) == [TABLE]
+        assert has_change_journal(path) is False
+        _install(conn)
+        conn.close()
+        assert tables_missing_journal(path) == []
+        assert has_change_journal(path) is True
+
+    def test_statements_idempotent(self, tmp_path):
+        conn = _make_gpkg(str(tmp_path / "z.gpkg"), _server_rows())
+        _install(conn, migrate=True)
+        _install(conn, migrate=True)
+        count = conn.execute(
+            f"SELECT COUNT(*) FROM sqlite_master WHERE name = '{TOMBSTONE_TABLE}'"
+        ).fetchone()[0]
+        assert count == 1
+
+
+class TestSyncCounters:
+    def _counts(self, path):
+        from domain.services.gpkg_service import count_sync_status_grouped
+        return read_sync_counts(path), count_sync_status_grouped(path)
+
+    def test_seeded_on_install(self, tmp_path):
+        path = str(tmp_path / "z.gpkg")
+        conn = _make_gpkg(path, _server_rows())
+        _install(conn)
+        conn.close()
+        counters, grouped = self._counts(path)
+        assert counters == grouped
+        assert counters["DOWNLOADED"] == 2
+        assert counters["UPLOADED"] == 1
+        assert counters["total"] == 3
+
+    def test_maintained_by_edits(self, tmp_path):
+        path = str(tmp_path / "z.gpkg")
+        conn = _make_gpkg(path, _server_rows())
+        _install(conn)
+        conn.execute(f'INSERT INTO "{TABLE}" (fid, nome) VALUES (10, ?)', ("nova",))
+        conn.execute(f'UPDATE "{TABLE}" SET nome = ? WHERE fid = 1', ("x",))
+        conn.execute(f'DELETE FROM "{TABLE}" WHERE fid = 2')
+        conn.execute(
+            f"UPDATE \"{TABLE}\" SET _sync_status = 'UPLOADED' WHERE fid = 10"
+        )
+        conn.commit()
+        conn.close()
+        counters, grouped = self._counts(path)
+        assert counters == grouped
+        assert counters["MODIFIED"] == 1
+        assert counters["UPLOADED"] == 2
+        assert counters["NEW"] == 0
+        assert counters["DELETED"] == 1  # tombstone
+        assert counters["total"] == 4
+
+    def test_none_without_journal(self, tmp_path):
+        path = str(tmp_path / "z.gpkg")
+        _make_gpkg(path, _server_rows()).close()
+        counters, grouped = self._counts(path)
+        assert counters is None
+        assert grouped["DOWNLOADED"] == 2
+
+
+def _exported(conn):
+    """``(features, tombstones)`` como o UploadZonalTask registra no export."""
+    features = conn.execute(
+        f'SELECT fid, _sync_timestamp FROM "{TABLE}" '
+        "WHERE _sync_status IN ('MODIFIED', 'NEW')"
+    ).fetchall()
+    tombstones = [
+        row[0] for row in conn.execute(f'SELECT original_fid FROM "{TOMBSTONE_TABLE}"')
+    ]
+    return features, tombstones
+
+
+class TestMarkUploadedStatements:
+    def test_transition_and_tombstone_cleanup(self, tmp_path):
+        from domain.services.gpkg_service import mark_uploaded_statements
+
+        path = str(tmp_path / "z.gpkg")
+        conn = _make_gpkg(path, _server_rows())
+        _install(conn)
+        conn.execute(f'INSERT INTO "{TABLE}" (fid, nome) VALUES (10, ?)', ("nova",))
+        conn.execute(f'UPDATE "{TABLE}" SET nome = ? WHERE fid = 1', ("x",))
+        conn.execute(f'DELETE FROM "{TABLE}" WHERE fid = 2')
+        features, tombstones = _exported(conn)
+        for stmt in mark_uploaded_statements(
+            TABLE, "t9", features, tombstone_fids=tombstones,
+        ):
+            conn.execute(stmt)
+        conn.commit()
+
+        assert _status(conn, 1) == "UPLOADED"
+        assert _status(conn, 10) == "UPLOADED"
+        ts = conn.execute(
+            f'SELECT _sync_timestamp FROM "{TABLE}" WHERE fid = 1'
+        ).fetchone()[0]
+        conn.close()
+        assert ts == "t9"
+        assert read_tombstones(path) == []
+        counters = read_sync_counts(path)
+        assert counters["UPLOADED"] == 3
+        assert counters["MODIFIED"] == counters["NEW"] == counters["DELETED"] == 0
+
+    def test_edits_after_export_stay_pending(self, tmp_path):
+        from domain.services.gpkg_service import mark_uploaded_statements
+
+        path = str(tmp_path / "z.gpkg")
+        conn = _make_gpkg(path, _server_rows())
+        _install(conn)
+        conn.execute(f'UPDATE "{TABLE}" SET nome = ? WHERE fid = 1', ("x",))
+        conn.execute(f'DELETE FROM "{TABLE}" WHERE fid = 3')
+        features, tombstones = _exported(conn)
+        # Durante o upload: fid 1 editada de novo, fid 4 criada e fid 2
+        # editada e removida
+        conn.execute(
+            f'UPDATE "{TABLE}" SET nome = ?, _sync_timestamp = ? WHERE fid = 1',
+            ("y", "depois"),
+        )
+        conn.execute(f'UPDATE "{TABLE}" SET nome = ? WHERE fid = 2', ("z",))
+        conn.execute(f'INSERT INTO "{TABLE}" (fid, nome) VALUES (4, ?)', ("nova",))
+        conn.execute(f'DELETE FROM "{TABLE}" WHERE fid = 2')
+        for stmt in mark_uploaded_statements(
+            TABLE, "t9", features, tombstone_fids=tombstones,
+        ):
+            conn.execute(stmt)
+        conn.commit()
+
+        assert _status(conn, 1) == "MODIFIED"
+        assert _status(conn, 4) == "NEW"
+        conn.close()
+        # Tombstone enviado (fid 3) sai; o criado durante o upload fica
+        assert [fid for fid, _ in read_tombstones(path)] == [102]
+
+    def test_legacy_tombstone_rows_removed(self, tmp_path):
+        from domain.services.gpkg_service import mark_uploaded_statements
+
+        rows = _server_rows() + [(4, None, 104, "DELETED", "t2"),
+                                 (5, None, 105, "DELETED", "t3")]
+        conn = _make_gpkg(str(tmp_path / "z.gpkg"), rows)
+        for stmt in mark_uploaded_statements(TABLE, "t9", deleted_fids=[4]):
+            conn.execute(stmt)
+        remaining = [r[0] for r in conn.execute(f'SELECT fid FROM "{TABLE}" ORDER BY fid')]
+        assert remaining == [1, 2, 3, 5]
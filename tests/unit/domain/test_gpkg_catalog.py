@@ -0,0 +1,151 @@
+"""Testes unitarios para gpkg_catalog — indice persistente dos GPKGs locais."""
+
+import json
+import os
+from unittest.mock import patch, MagicMock
+
+with patch.dict("sys.modules", {
+    "qgis": MagicMock(),
+    "qgis.core": MagicMock(),
+}):
+    from domain.services import gpkg_catalog
+    from domain.services.gpkg_catalog import (
+        CATALOG_DIRNAME,
+        GpkgCatalog,
+        diff_entries,
+        index_gpkg,
+    )
+
+
+def _make_zonal(base, zonal_id, origin="edicao", sidecar=None):
+    folder = os.path.join(base, origin, f"zonal_{zonal_id}")
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"zonal_{zonal_id}.gpkg")
+    with open(path, "wb") as f:
+        f.write(b"gpkg")
+    if sidecar is not None:
+        with open(os.path.join(folder, ".satirriga.json"), "w") as f:
+            json.dump(sidecar, f)
+    return path
+
+
+def _age(path, seconds=10):
+    """Recua o mtime para fora da janela de mtime recente (cacheavel)."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 1_000_000_000))
+
+
+def _age_tree(base):
+    for root, dirs, files in os.walk(base):
+        if CATALOG_DIRNAME in root:
+            continue
+        for name in files:
+            _age(os.path.join(root, name))
+        _age(root)
+
+
+class TestGpkgCatalog:
+    def test_lists_entries_with_sidecar_fields(self, tmp_path):
+        base = str(tmp_path)
+        path = _make_zonal(base, 7, sidecar={"descricao": "Zonal 7", "expiresAt": "2030-01-01T00:00:00Z"})
+        entries = GpkgCatalog(base).entries()
+        assert len(entries) == 1
+        assert entries[0]["path"] == path
+        assert entries[0]["zonal_id"] == 7
+        assert entries[0]["descricao"] == "Zonal 7"
+        assert entries[0]["expires_at"] == "2030-01-01T00:00:00Z"
+        assert os.path.isdir(os.path.join(base, CATALOG_DIRNAME))
+
+    def test_unchanged_files_not_reparsed(self, tmp_path):
+        base = str(tmp_path)
+        _make_zonal(base, 1, sidecar={"descricao": "A"})
+        _make_zonal(base, 2, sidecar={"descricao": "B"})
+        catalog = GpkgCatalog(base)
+        catalog.entries()  # cria o indice (altera o mtime da base)
+        _age_tree(base)
+        catalog.entries()
+
+        with patch.object(gpkg_catalog, "build_gpkg_entry") as build, \
+                patch.object(gpkg_catalog.os, "scandir") as scandir:
+            entries = catalog.entries()
+        build.assert_not_called()
+        scandir.assert_not_called()
+        assert sorted(e["descricao"] for e in entries) == ["A", "B"]
+
+    def test_sidecar_change_invalidates_entry(self, tmp_path):
+        base = str(tmp_path)
+        path = _make_zonal(base, 1, sidecar={"descricao": "Antiga"})
+        _age_tree(base)
+        catalog = GpkgCatalog(base)
+        catalog.entries()
+
+        with open(os.path.join(os.path.dirname(path), ".satirriga.json"), "w") as f:
+            json.dump({"descricao": "Nova"}, f)
+        assert catalog.entries()[0]["descricao"] == "Nova"
+
+    def test_new_and_removed_files_detected(self, tmp_path):
+        base = str(tmp_path)
+        first = _make_zonal(base, 1)
+        _age_tree(base)
+        catalog = GpkgCatalog(base)
+        assert len(catalog.entries()) == 1
+
+        _make_zonal(base, 2)
+        os.remove(first)
+        entries = catalog.entries()
+        assert [e["zonal_id"] for e in entries] == [2]
+
+    def test_sync_counts_cached_by_mtime(self, tmp_path):
+        base = str(tmp_path)
+        _make_zonal(base, 1)
+        _age_tree(base)
+        catalog = GpkgCatalog(base)
+        counts = {"DOWNLOADED": 3, "MODIFIED": 1, "UPLOADED": 0, "NEW": 0,
+                  "DELETED": 0, "total": 4}
+        with patch.object(gpkg_catalog, "count_features_by_sync_status",
+                          return_value=counts) as count:
+            catalog.entries(with_sync_counts=True)
+            entries = catalog.entries(with_sync_counts=True)
+        assert count.call_count == 1
+        assert entries[0]["sync_counts"] == counts
+
+    def test_index_gpkg_updates_existing_catalog(self, tmp_path):
+        base = str(tmp_path)
+        path = _make_zonal(base, 1, sidecar={"descricao": "A"})
+        _age_tree(base)
+        catalog = GpkgCatalog(base)
+        catalog.entries()
+
+        with open(os.path.join(os.path.dirname(path), ".satirriga.json"), "w") as f:
+            json.dump({"descricao": "B"}, f)
+        index_gpkg(path, with_sync_counts=False)
+        assert GpkgCatalog.for_gpkg(path) is not None
+        assert catalog.entries()[0]["descricao"] == "B"
+
+    def test_corrupt_catalog_rebuilt(self, tmp_path):
+        base = str(tmp_path)
+        _make_zonal(base, 1)
+        os.makedirs(os.path.join(base, CATALOG_DIRNAME))
+        with open(os.path.join(base, CATALOG_DIRNAME, "catalog.sqlite"), "wb") as f:
+            f.write(b"isto nao e sqlite" * 100)
+        assert len(GpkgCatalog(base).entries()) == 1
+
+
+class TestDiffEntries:
+    def test_inserted_updated_removed(self):
+        previous = {
+            "/a.gpkg": {"path": "/a.gpkg", "sync_counts": {"MODIFIED": 0}},
+            "/b.gpkg": {"path": "/b.gpkg", "sync_counts": {"MODIFIED": 0}},
+        }
+        current = [
+            {"path": "/a.gpkg", "sync_counts": {"MODIFIED": 2}},
+            {"path": "/c.gpkg", "sync_counts": {}},
+        ]
+        inserted, updated, removed = diff_entries(previous, current)
+        assert [e["path"] for e in inserted] == ["/c.gpkg"]
+        assert [e["path"] for e in updated] == ["/a.gpkg"]
+        assert removed == ["/b.gpkg"]
+
+    def test_unchanged_list_yields_nothing(self):
+        entry = {"path": "/a.gpkg", "descricao": "A"}
+        assert diff_entries({"/a.gpkg": dict(entry)}, [entry]) == ([], [], [])
@@ -0,0 +1,103 @@
+"""Testes unitarios para gpkg_inspector — helpers executados nas worker threads."""
+
+import json
+import os
+from datetime import datetime, timezone
+from unittest.mock import patch, MagicMock
+
+with patch.dict("sys.modules", {
+    "qgis": MagicMock(),
+    "qgis.core": MagicMock(),
+    "qgis.PyQt": MagicMock(),
+    "qgis.PyQt.QtCore": MagicMock(),
+}):
+    from domain.services.gpkg_inspector import (
+        RequestCoalescer,
+        expiring_edit_tokens,
+        local_gpkg_status,
+    )
+
+
+_NOW = datetime(2026, 1, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def _make_zonal(base, zonal_id, sidecar=None):
+    folder = os.path.join(base, "edicao", f"zonal_{zonal_id}")
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"zonal_{zonal_id}.gpkg")
+    with open(path, "wb") as f:
+        f.write(b"gpkg-bytes")
+    if sidecar is not None:
+        with open(os.path.join(folder, ".satirriga.json"), "w") as f:
+            json.dump(sidecar, f)
+    return path
+
+
+class TestRequestCoalescer:
+    def test_first_request_starts_job(self):
+        c = RequestCoalescer()
+        assert c.add(("sidecar", "a.gpkg"), lambda r: None) is True
+        assert c.add(("sidecar", "a.gpkg"), lambda r: None) is False
+        assert c.add(("sidecar", "b.gpkg"), lambda r: None) is True
+
+    def test_resolve_returns_all_callbacks(self):
+        c = RequestCoalescer()
+        received = []
+        c.add("k", lambda r: received.append(("a", r)))
+        c.add("k", lambda r: received.append(("b", r)))
+        c.add("k")  # pedido sem callback
+        for cb in c.resolve("k"):
+            cb(42)
+        assert received == [("a", 42), ("b", 42)]
+        assert not c.is_pending("k")
+        assert c.add("k") is True
+
+    def test_reject_returns_error_callbacks(self):
+        c = RequestCoalescer()
+        errors = []
+        c.add("k", lambda r: None, lambda msg: errors.append(("a", msg)))
+        c.add("k", lambda r: None)  # pedido sem on_error
+        c.add("k", on_error=lambda msg: errors.append(("b", msg)))
+        for errback in c.reject("k"):
+            errback("falhou")
+        assert errors == [("a", "falhou"), ("b", "falhou")]
+        assert not c.is_pending("k")
+        assert c.resolve("k") == []
+
+    def test_clear_discards_pending(self):
+        c = RequestCoalescer()
+        c.add("k", lambda r: None)
+        c.clear()
+        assert c.resolve("k") == []
+
+
+class TestLocalGpkgStatus:
+    def test_missing_file(self, tmp_path):
+        assert local_gpkg_status(str(tmp_path / "nao_existe.gpkg")) == {"exists": False}
+
+    def test_existing_with_sidecar(self, tmp_path):
+        path = _make_zonal(str(tmp_path), 3, sidecar={"zonalId": 3, "editToken": "t"})
+        status = local_gpkg_status(path)
+        assert status["exists"] is True
+        assert status["size_bytes"] == len(b"gpkg-bytes")
+        assert status["sidecar"]["editToken"] == "t"
+
+
+class TestExpiringEditTokens:
+    def test_selects_only_tokens_expiring_within_threshold(self, tmp_path):
+        base = str(tmp_path)
+        soon = _make_zonal(base, 1, sidecar={
+            "zonalId": 1, "editToken": "tok1", "expiresAt": "2026-01-10T20:00:00Z",
+        })
+        _make_zonal(base, 2, sidecar={
+            "zonalId": 2, "editToken": "tok2", "expiresAt": "2026-01-20T00:00:00Z",
+        })
+        _make_zonal(base, 3, sidecar={
+            "zonalId": 3, "editToken": "tok3", "expiresAt": "2026-01-09T00:00:00Z",
+        })
+        _make_zonal(base, 4, sidecar={"zonalId": 4, "expiresAt": "2026-01-10T13:00:00Z"})
+
+        assert expiring_edit_tokens(base, now=_NOW) == [(1, "tok1", soon)]
+
+    def test_missing_base_dir(self, tmp_path):
+        assert expiring_edit_tokens(str(tmp_path / "nao_existe"), now=_NOW) == []
@@ -21,6 +21,10 @@ with patch.dict("sys.modules", {
         layer_group_name,
         layer_name,
         list_local_gpkgs,
+        is_new_feature,
+        missing_sync_indexes,
+        new_feature_filter_expression,
+        sync_index_statements,
         SYNC_FIELDS,
         SYNC_FIELDS_V2,
         SIDECAR_FILENAME,
@@ -322,3 +326,172 @@ class TestListLocalGpkgs:
 
             result = list_local_gpkgs(tmpdir)
             assert len(result) == 1
+
+
+class TestSyncIndexes:
+    """Indices de _sync_status/_original_fid (deteccao de NEW sem full scan)."""
+
+    def _make_gpkg(self, path, with_index=False):
+        import sqlite3
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE gpkg_contents (table_name TEXT, data_type TEXT)"
+        )
+        conn.execute("INSERT INTO gpkg_contents VALUES ('zonal_1', 'features')")
+        conn.execute(
+            'CREATE TABLE "zonal_1" (fid INTEGER PRIMARY KEY, '
+            "_sync_status TEXT, _original_fid INTEGER)"
+        )
+        if with_index:
+            for stmt in sync_index_statements("zonal_1"):
+                conn.execute(stmt)
+        conn.commit()
+        conn.close()
+
+    def test_statements_are_idempotent(self):
+        stmts = sync_index_statements("zonal_1")
+        assert len(stmts) == 2
+        assert all("IF NOT EXISTS" in s for s in stmts)
+        assert '"_sync_status"' in stmts[0]
+
+    def test_missing_indexes_detected(self, tmp_path):
+        path = str(tmp_path / "z.gpkg")
+        self._make_gpkg(path)
+        assert missing_sync_indexes(path) == sync_index_statements("zonal_1")
+
+    def test_no_missing_after_creation(self, tmp_path):
+        path = str(tmp_path / "z.gpkg")
+        self._make_gpkg(path, with_index=True)
+        assert missing_sync_indexes(path) == []
+
+    def test_missing_file(self, tmp_path):
+        assert missing_sync_indexes(str(tmp_path / "nao_existe.gpkg")) == []
+
+    def test_filter_expression_selects_new_features(self, tmp_path):
+        """Candidatas da expressao (SQL) + criterio Python = features novas."""
+        import sqlite3
+        path = str(tmp_path / "z.gpkg")
+        self._make_gpkg(path, with_index=True)
+        conn = sqlite3.connect(path)
+        rows = [
+            (1, "DOWNLOADED", 10),   # servidor, intocada
+            (2, None, None),         # nova
+            (3, "", None),           # nova (status vazio)
+            (4, "DOWNLOADED", None), # nova ("Remember values")
+            (5, "NEW", None),        # ja marcada
+            (6, "MODIFIED", 0),      # ja rastreada
+            (7, "DELETED", 12),      # tombstone
+        ]
+        conn.executemany('INSERT INTO "zonal_1" VALUES (?, ?, ?)', rows)
+        expr = new_feature_filter_expression()
+        candidates = conn.execute(
+            f'SELECT fid, _sync_status, _original_fid FROM "zonal_1" '
+            f"WHERE {expr} ORDER BY fid"
+        ).fetchall()
+        conn.close()
+        assert [fid for fid, status, ofid in candidates if is_new_feature(status, ofid)] == [2, 3, 4]
+        # Todas as features novas estao entre as candidatas
+        assert {fid for fid, status, ofid in rows if is_new_feature(status, ofid)} == {2, 3, 4}
+
+    def test_filter_expression_uses_sync_indexes(self, tmp_path):
+        import sqlite3
+        path = str(tmp_path / "z.gpkg")
+        self._make_gpkg(path, with_index=True)
+        conn = sqlite3.connect(path)
+        plan = " ".join(
+            row[3] for row in conn.execute(
+                'EXPLAIN QUERY PLAN SELECT fid FROM "zonal_1" '
+                f"WHERE {new_feature_filter_expression()}"
+            )
+        )
+        conn.close()
+        assert "SCAN" not in plan
+
+
+class TestDetectGpkgVersion:
+    """Versao do schema lida via sqlite3 (segura fora da main thread)."""
+
+    def _make_gpkg(self, path, columns):
+        import sqlite3
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE gpkg_contents (table_name TEXT, data_type TEXT)"
+        )
+        conn.execute("INSERT INTO gpkg_contents VALUES ('camada', 'features')")
+        conn.execute(f'CREATE TABLE "camada" (fid INTEGER PRIMARY KEY, {columns})')
+        conn.commit()
+        conn.close()
+
+    def test_v2_by_zonal_id(self, tmp_path):
+        from domain.services.gpkg_service import detect_gpkg_version
+        path = str(tmp_path / "z.gpkg")
+        self._make_gpkg(path, "_zonal_id INTEGER, _sync_status TEXT")
+        assert detect_gpkg_version(path) == 2
+
+    def test_v1_by_mapeamento_id(self, tmp_path):
+        from domain.services.gpkg_service import detect_gpkg_version
+        path = str(tmp_path / "m.gpkg")
+        self._make_gpkg(path, "_mapeamento_id INTEGER")
+        assert detect_gpkg_version(path) == 1
+
+    def test_unknown_schema_and_missing_file(self, tmp_path):
+        from domain.services.gpkg_service import detect_gpkg_version
+        path = str(tmp_path / "x.gpkg")
+        self._make_gpkg(path, "nome TEXT")
+        assert detect_gpkg_version(path) == 0
+        assert detect_gpkg_version(str(tmp_path / "nao_existe.gpkg")) == 0
+
+    def test_memoized_until_file_changes(self, tmp_path):
+        from domain.services import gpkg_service
+        path = str(tmp_path / "z.gpkg")
+        self._make_gpkg(path, "_zonal_id INTEGER")
+        with patch.object(gpkg_service, "_read_gpkg_version",
+                          wraps=gpkg_service._read_gpkg_version) as read:
+            assert gpkg_service.detect_gpkg_version(path) == 2
+            assert gpkg_service.detect_gpkg_version(path) == 2
+            assert read.call_count == 1
+
+            st = os.stat(path)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            assert gpkg_service.detect_gpkg_version(path) == 2
+            assert read.call_count == 2
+
+    def test_bulk_variant(self, tmp_path):
+        from domain.services.gpkg_service import detect_gpkg_versions
+        v2 = str(tmp_path / "a.gpkg")
+        v1 = str(tmp_path / "b.gpkg")
+        self._make_gpkg(v2, "_zonal_id INTEGER")
+        self._make_gpkg(v1, "_mapeamento_id INTEGER")
+        missing = str(tmp_path / "c.gpkg")
+        assert detect_gpkg_versions([v2, v1, missing]) == {v2: 2, v1: 1, missing: 0}
+
+    def test_renamed_zonal_listed_as_v2(self, tmp_path):
+        path = str(tmp_path / "copia.gpkg")
+        self._make_gpkg(path, "_zonal_id INTEGER")
+        write_sidecar(path, {"zonalId": 42})
+        entries = list_local_gpkgs(str(tmp_path))
+        assert entries[0]["type"] == "v2"
+        assert entries[0]["zonal_id"] == 42
+
+
+class TestCountWithoutSyncFields:
+    def test_total_only_when_no_sync_column(self, tmp_path):
+        import sqlite3
+        from domain.services.gpkg_service import count_features_by_sync_status
+        path = str(tmp_path / "plain.gpkg")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE gpkg_contents (table_name TEXT, data_type TEXT)")
+        conn.execute("INSERT INTO gpkg_contents VALUES ('camada', 'features')")
+        conn.execute('CREATE TABLE "camada" (fid INTEGER PRIMARY KEY, nome TEXT)')
+        conn.executemany('INSERT INTO "camada" (nome) VALUES (?)', [("a",), ("b",)])
+        conn.commit()
+        conn.close()
+        counts = count_features_by_sync_status(path)
+        assert counts["total"] == 2
+        assert counts["MODIFIED"] == 0
+
+    def test_unreadable_file_returns_empty_counts(self, tmp_path):
+        from domain.services.gpkg_service import count_features_by_sync_status
+        path = tmp_path / "lixo.gpkg"
+        path.write_bytes(b"nao e sqlite")
+        assert count_features_by_sync_status(str(path))["total"] == 0
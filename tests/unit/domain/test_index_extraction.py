@@ -0,0 +1,109 @@
+"""Testes unitarios para index_extraction — lotes e tabela de indices."""
+
+import sqlite3
+
+from domain.models.pixel_indexes import SceneIndexes
+from domain.models.raster import (
+    BandGroup, DateGroup, RasterHierarchy, RasterLayerConfig,
+)
+from domain.services.gpkg_service import indices_path
+from domain.services.index_extraction import (
+    STAGING_TABLE, FeaturePoint, begin_extraction, chunked, commit_extraction,
+    discard_extraction, request_count, scene_image_ids, write_index_batch,
+)
+
+
+def _scene(image_id, ndvi=0.5):
+    return SceneIndexes(id_imagem=image_id, tile="24MXT", data_formatada="22/10/2025", ndvi=ndvi)
+
+
+def _config(image_id):
+    return RasterLayerConfig(name=image_id, xyz_url=f"http://x/{image_id}", layer_type="NDVI", image_id=image_id)
+
+
+class TestBatching:
+    def test_chunked(self):
+        assert chunked(list(range(23)), 10) == [
+            list(range(10)), list(range(10, 20)), [20, 21, 22],
+        ]
+        assert chunked([], 10) == []
+
+    def test_request_count(self):
+        assert request_count(100, 23) == 300
+        assert request_count(100, 10) == 100
+        assert request_count(100, 0) == 0
+
+
+class TestSceneImageIds:
+    def test_unique_ids_without_diffs(self):
+        hierarchy = RasterHierarchy(dates=[
+            DateGroup(date_label="d1", date_iso="2025-10-22", bands=[
+                BandGroup(band_name="NDVI", band_key="NDVI", layers=[_config("A"), _config("B")]),
+                BandGroup(band_name="RGB", band_key="original", layers=[_config("A")]),
+                BandGroup(band_name="Dif", band_key="DIF_IMG", layers=[_config("A-C")]),
+            ]),
+            DateGroup(date_label="d2", date_iso="2025-10-15", bands=[
+                BandGroup(band_name="NDVI", band_key="NDVI", layers=[_config("C"), _config("")]),
+            ]),
+        ])
+        assert scene_image_ids(hierarchy) == ["A", "B", "C"]
+
+
+class TestWriteIndexBatch:
+    def test_rows_joinable_by_original_fid(self, tmp_path):
+        path = indices_path(str(tmp_path / "zonal.gpkg"))
+        written = write_index_batch(path, [
+            (FeaturePoint(7, -5.0, -39.0), [_scene("A", 0.7), _scene("B", 0.2)]),
+            (FeaturePoint(8, -5.1, -39.1), []),
+        ])
+        assert written == 2
+        with sqlite3.connect(path) as conn:
+            rows = conn.execute(
+                "SELECT _original_fid, id_imagem, ndvi FROM indices ORDER BY id_imagem"
+            ).fetchall()
+        assert rows == [(7, "A", 0.7), (7, "B", 0.2)]
+
+    def test_rerun_replaces_rows(self, tmp_path):
+        path = str(tmp_path / "indices.sqlite")
+        point = FeaturePoint(7, -5.0, -39.0)
+        write_index_batch(path, [(point, [_scene("A", 0.7)])])
+        write_index_batch(path, [(point, [_scene("A", 0.9)])])
+        with sqlite3.connect(path) as conn:
+            rows = conn.execute("SELECT ndvi FROM indices").fetchall()
+        assert rows == [(0.9,)]
+
+    def test_staging_replaces_previous_extraction(self, tmp_path):
+        path = str(tmp_path / "indices.sqlite")
+        write_index_batch(path, [(FeaturePoint(7, -5.0, -39.0), [_scene("A")])])
+        begin_extraction(path)
+        write_index_batch(
+            path, [(FeaturePoint(8, -5.1, -39.1), [_scene("B")])], table=STAGING_TABLE,
+        )
+        with sqlite3.connect(path) as conn:
+            # Extracao anterior continua visivel ate a troca
+            assert conn.execute("SELECT _original_fid FROM indices").fetchall() == [(7,)]
+        commit_extraction(path)
+        begin_extraction(path)  # extracao seguinte: indice recriado sem conflito
+        commit_extraction(path)
+        with sqlite3.connect(path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM indices").fetchone() == (0,)
+            indexes = {r[0] for r in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'indices'"
+            )}
+        assert "indices_fid" in indexes
+
+    def test_discard_keeps_previous_extraction(self, tmp_path):
+        path = str(tmp_path / "indices.sqlite")
+        write_index_batch(path, [(FeaturePoint(7, -5.0, -39.0), [_scene("A")])])
+        begin_extraction(path)
+        write_index_batch(
+            path, [(FeaturePoint(8, -5.1, -39.1), [_scene("B")])], table=STAGING_TABLE,
+        )
+        discard_extraction(path)
+        with sqlite3.connect(path) as conn:
+            rows = conn.execute("SELECT _original_fid, id_imagem FROM indices").fetchall()
+            tables = {r[0] for r in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )}
+        assert rows == [(7, "A")]
+        assert STAGING_TABLE not in tables
@@ -0,0 +1,133 @@
+"""Testes unitarios para pixel_index_cache — cache por cena e pixel de 10 m."""
+
+from domain.models.pixel_indexes import SceneIndexes
+from domain.services.pixel_index_cache import (
+    PixelIndexCache, is_ahead, latlon_to_utm, pixel_cell, points_ahead,
+    utm_to_latlon, utm_zone_for,
+)
+
+_IMG = "S2A_MSIL2A_20251022T132231_N0511_R038_T24MXT_20251022T172030"
+_IMG_B = "20251015T125321_20251015T125323_T24MXU"
+
+
+def _scene(image_id, ndvi=0.5):
+    return SceneIndexes(id_imagem=image_id, tile="24MXT", data_formatada="22/10/2025", ndvi=ndvi)
+
+
+class TestPointsAhead:
+    def test_extrapolates_along_movement(self):
+        # ~111 m para leste por amostra
+        ahead = points_ahead(-5.0, -39.0, -5.0, -39.001, count=2)
+        assert len(ahead) == 2
+        (lat1, lon1), (lat2, lon2) = ahead
+        assert lat1 == lat2 == -5.0
+        assert abs(lon1 - (-38.999)) < 2e-6
+        assert abs(lon2 - (-38.998)) < 2e-6
+
+    def test_minimum_step_is_one_pixel(self):
+        # Movimento de ~6 m: passo sobe para 10 m (pixel vizinho)
+        lat, lon = points_ahead(-5.00005, -39.0, -5.0, -39.0, count=1)[0]
+        assert abs((-5.00005 - lat) * 111_320 - 10) < 0.1
+        assert lon == -39.0
+
+    def test_no_movement(self):
+        assert points_ahead(-5.0, -39.0, -5.0, -39.0) == []
+
+    def test_is_ahead(self):
+        # Cursor em (-5, -39) indo para leste
+        assert is_ahead(-5.0, -38.998, -5.0, -39.0, -5.0, -38.999)
+        assert is_ahead(-5.0005, -38.999, -5.0, -39.0, -5.0, -38.999)
+        # Atras ou perpendicular ao movimento
+        assert not is_ahead(-5.0, -39.001, -5.0, -39.0, -5.0, -38.999)
+        assert not is_ahead(-4.999, -39.0, -5.0, -39.0, -5.0, -38.999)
+
+
+class TestUtmGrid:
+    def test_zone_from_mgrs_tile(self):
+        assert utm_zone_for(_IMG, 0, 0) == (24, True)
+        assert utm_zone_for("X_T31UDQ", 0, 0) == (31, False)
+        # Sem tile: zona pelo ponto
+        assert utm_zone_for("sem-tile", -15.5, -48.2) == (22, True)
+
+    def test_projection(self):
+        e, n = latlon_to_utm(48.858370, 2.294481, 31, False)  # Torre Eiffel
+        assert abs(e - 448251) < 2
+        assert abs(n - 5411950) < 5
+        e, n = latlon_to_utm(-10.0, -39.0, 24, True)  # meridiano central
+        assert abs(e - 500000) < 1e-6
+        _e, n_north = latlon_to_utm(10.0, -39.0, 24, False)
+        assert abs((10000000 - n) - n_north) < 1e-6
+
+    def test_inverse_projection(self):
+        for lat, lon, zone, south in [(48.858370, 2.294481, 31, False),
+                                      (-12.15, -45.05, 23, True)]:
+            e, n = latlon_to_utm(lat, lon, zone, south)
+            lat2, lon2 = utm_to_latlon(e, n, zone, south)
+            assert abs(lat2 - lat) < 1e-7 and abs(lon2 - lon) < 1e-7
+
+    def test_same_pixel_for_nearby_clicks(self):
+        x, y = pixel_cell(_IMG, -5.0, -39.0)
+        # ~1 m de distancia: mesmo pixel (ou vizinho, se na borda)
+        x2, y2 = pixel_cell(_IMG, -5.0 + 0.00001, -39.0 + 0.00001)
+        assert abs(x2 - x) <= 1 and abs(y2 - y) <= 1
+        # ~100 m: outro pixel
+        assert pixel_cell(_IMG, -5.0 + 0.001, -39.0) != (x, y)
+
+
+class TestPixelIndexCache:
+    def test_hit_within_pixel(self):
+        cache = PixelIndexCache()
+        cache.store([_IMG], -5.0, -39.0, [_scene(_IMG)])
+        # Outro clique ~30 cm ao lado, dentro do mesmo pixel de 10 m
+        lat, lon = next(
+            (-5.0 + dy, -39.0 + dx)
+            for dy in (3e-6, -3e-6) for dx in (3e-6, -3e-6)
+            if pixel_cell(_IMG, -5.0 + dy, -39.0 + dx) == pixel_cell(_IMG, -5.0, -39.0)
+        )
+        found = cache.lookup([_IMG], lat, lon)
+        assert found[_IMG].ndvi == 0.5
+
+    def test_partial_hits_and_misses(self):
+        cache = PixelIndexCache()
+        cache.store([_IMG, _IMG_B], -5.0, -39.0, [_scene(_IMG)])
+        found = cache.lookup([_IMG, _IMG_B, "outra"], -5.0, -39.0)
+        assert found[_IMG].id_imagem == _IMG
+        assert found[_IMG_B] is None  # consultada, sem dado no ponto
+        assert "outra" not in found
+
+    def test_no_data_records_expire(self, tmp_path, monkeypatch):
+        from domain.services import pixel_index_cache
+        path = str(tmp_path / "pixels.sqlite")
+        cache = PixelIndexCache(path)
+        cache.store([_IMG, _IMG_B], -5.0, -39.0, [_scene(_IMG)])
+        later = pixel_index_cache.time.time() + (
+            pixel_index_cache.NO_DATA_MAX_AGE_DAYS * 86400 + 1
+        )
+        monkeypatch.setattr(pixel_index_cache.time, "time", lambda: later)
+        # Cena sem dado volta a ser consultada; valores continuam validos
+        found = cache.lookup([_IMG, _IMG_B], -5.0, -39.0)
+        assert _IMG in found and _IMG_B not in found
+        cache.close()
+        reopened = PixelIndexCache(path)
+        assert len(reopened) == 1
+
+    def test_unexpected_ids_do_not_record_misses(self):
+        cache = PixelIndexCache()
+        cache.store([_IMG], -5.0, -39.0, [_scene("id-diferente")])
+        assert cache.lookup([_IMG], -5.0, -39.0) == {}
+
+    def test_persistent_and_lru(self, tmp_path, monkeypatch):
+        from domain.services import pixel_index_cache
+        monkeypatch.setattr(pixel_index_cache, "_EVICT_EVERY", 1)
+        path = str(tmp_path / "pixels.sqlite")
+        cache = PixelIndexCache(path, max_entries=2)
+        cache.store([_IMG], -5.0, -39.0, [_scene(_IMG)])
+        cache.store([_IMG], -5.1, -39.0, [_scene(_IMG)])
+        cache.lookup([_IMG], -5.0, -39.0)  # mais recente que -5.1
+        cache.store([_IMG], -5.2, -39.0, [_scene(_IMG)])
+        cache.close()
+
+        reopened = PixelIndexCache(path, max_entries=2)
+        assert len(reopened) == 2
+        assert reopened.lookup([_IMG], -5.1, -39.0) == {}
+        assert _IMG in reopened.lookup([_IMG], -5.0, -39.0)
@@ -5,6 +5,10 @@ from domain.services.raster_service import (
     build_raster_hierarchy,
     build_raster_configs,
     build_xyz_url,
+    band_group_from_json,
+    band_group_to_json,
+    date_group_from_json,
+    date_group_to_json,
     get_default_vis_params,
     get_tile_url,
     _JOBS_BASE,
@@ -402,6 +406,52 @@ class TestBuildXyzUrl:
         assert "gain=" not in url
 
 
+# ----------------------------------------------------------------
+# Snapshot de parametros de visualizacao
+# ----------------------------------------------------------------
+
+class TestVisParamsSnapshot:
+
+    def test_resolves_each_band_once_per_build(self):
+        from unittest.mock import patch
+        from domain.services import raster_service
+
+        tile_data = [
+            _make_tile(image_id=f"IMG_{i}", tile=f"24MX{i}") for i in range(20)
+        ]
+        with patch.object(
+            raster_service, "get_default_vis_params",
+            side_effect=lambda band, sidecar=None: VisParams(band=band),
+        ) as resolve:
+            hierarchy = build_raster_hierarchy(tile_data, "METODO_1")
+        assert resolve.call_count == len(BASE_BAND_KEYS)
+        assert sum(len(b.layers) for b in hierarchy.dates[0].bands) == 20 * 4
+
+
+# ----------------------------------------------------------------
+# Serializacao de datas (arvore sob demanda)
+# ----------------------------------------------------------------
+
+class TestDateGroupJson:
+
+    def test_roundtrip(self):
+        hierarchy = build_raster_hierarchy(
+            [_make_tile(), _make_tile(data="2025-10-07", image_id="IMG_OLD")],
+            "METODO_1",
+        )
+        for date_group in hierarchy.dates:
+            restored = date_group_from_json(date_group_to_json(date_group))
+            assert restored == date_group
+            assert isinstance(restored.bands[0].layers[0].vis_params, VisParams)
+
+    def test_band_group_roundtrip(self):
+        hierarchy = build_raster_hierarchy([_make_tile()], "METODO_1")
+        band_group = hierarchy.dates[0].bands[0]
+        restored = band_group_from_json(band_group_to_json(band_group))
+        assert restored == band_group
+        assert isinstance(restored.layers[0].vis_params, VisParams)
+
+
 # ----------------------------------------------------------------
 # Backward compatibility
 # ----------------------------------------------------------------
@@ -0,0 +1,100 @@
+"""Testes unitarios para domain.services.response_parsers e ResponseDecoder."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from domain.services.response_parsers import (
+    parse_catalogo_page,
+    parse_json_body,
+    parse_overlay_data,
+    parse_upload_history_page,
+)
+from infra.http.decoder import ResponseDecoder
+
+
+def _body(obj) -> bytes:
+    return json.dumps(obj).encode("utf-8")
+
+
+class TestParseJsonBody:
+    def test_empty_body_is_empty_dict(self):
+        assert parse_json_body(b"") == {}
+
+    def test_accepts_str(self):
+        assert parse_json_body('{"a": 1}') == {"a": 1}
+
+    def test_invalid_json_raises(self):
+        with pytest.raises(ValueError):
+            parse_json_body(b"{nao e json")
+
+
+class TestParseCatalogoPage:
+    def test_envelope_with_pagination(self):
+        items, pagination = parse_catalogo_page(_body({
+            "data": [{"id": 1, "descricao": "Z1"}],
+            "pagination": {"page": 1, "totalPages": 3},
+        }))
+        assert len(items) == 1
+        assert items[0].id == 1
+        assert pagination["totalPages"] == 3
+
+    def test_content_envelope(self):
+        items, _ = parse_catalogo_page(_body({"content": [{"id": 7}]}))
+        assert [i.id for i in items] == [7]
+
+    def test_plain_list_has_no_pagination(self):
+        items, pagination = parse_catalogo_page(_body([{"id": 2}, {"id": 3}]))
+        assert len(items) == 2
+        assert pagination == {}
+
+
+class TestParseUploadHistoryPage:
+    def test_builds_items(self):
+        items, pagination = parse_upload_history_page(_body({
+            "data": [{"batchUuid": "b-1", "status": "COMPLETED"}],
+            "pagination": {"total": 1},
+        }))
+        assert items[0].batch_uuid == "b-1"
+        assert pagination == {"total": 1}
+
+
+class TestParseOverlayData:
+    def test_unwraps_data_key(self):
+        assert parse_overlay_data(_body({"data": {"10": {"x": 1}}})) == {"10": {"x": 1}}
+
+    def test_plain_dict(self):
+        assert parse_overlay_data(_body({"10": {"x": 1}})) == {"10": {"x": 1}}
+
+    def test_non_dict_is_empty(self):
+        assert parse_overlay_data(_body([1, 2])) == {}
+
+
+class TestResponseDecoder:
+    def test_small_body_decoded_inline(self):
+        pool = MagicMock()
+        decoder = ResponseDecoder(pool=pool, threshold=1024)
+        on_done, on_error = MagicMock(), MagicMock()
+        decoder.decode(b'{"a": 1}', parse_json_body, on_done, on_error)
+        on_done.assert_called_once_with({"a": 1})
+        on_error.assert_not_called()
+        pool.submit.assert_not_called()
+
+    def test_inline_parser_error_goes_to_on_error(self):
+        decoder = ResponseDecoder(pool=MagicMock(), threshold=1024)
+        on_done, on_error = MagicMock(), MagicMock()
+        decoder.decode(b"{quebrado", parse_json_body, on_done, on_error)
+        on_done.assert_not_called()
+        on_error.assert_called_once()
+
+    def test_large_body_submitted_to_pool(self):
+        pool = MagicMock()
+        decoder = ResponseDecoder(pool=pool, threshold=4)
+        on_done, on_error = MagicMock(), MagicMock()
+        body = _body({"grande": "x" * 100})
+        decoder.decode(body, parse_json_body, on_done, on_error)
+        pool.submit.assert_called_once_with(
+            parse_json_body, body, on_done=on_done, on_error=on_error,
+        )
+        on_done.assert_not_called()
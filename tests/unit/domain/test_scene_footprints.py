@@ -0,0 +1,64 @@
+"""Testes unitarios para scene_footprints — footprint MGRS e indice espacial."""
+
+from domain.services.scene_footprints import (
+    FootprintIndex, footprint_bbox, mgrs_tile, tile_footprint,
+)
+
+_IMG_MXT = "S2A_MSIL2A_20251022T132231_N0511_R038_T24MXT_20251022T172030"
+_IMG_LKC = "20240101T133231_T23LKC"
+_IMG_UDQ = "S2B_MSIL2A_20240610T105619_N0510_R094_T31UDQ_20240610T134530"
+
+
+class TestTileFootprint:
+    def test_tile_from_image_id(self):
+        assert mgrs_tile(_IMG_MXT) == "24MXT"
+        assert mgrs_tile(_IMG_LKC) == "23LKC"
+        assert mgrs_tile("sem-tile") == ""
+
+    def test_northern_tile(self):
+        # 31UDQ (Paris): quadrado 400-500 km E / 5400-5500 km N
+        assert tile_footprint("31UDQ") == (31, False, 400000.0, 5390200.0, 509800.0, 5500000.0)
+
+    def test_southern_tiles(self):
+        assert tile_footprint("23LKC") == (23, True, 200000.0, 8190200.0, 309800.0, 8300000.0)
+        # Zona par: letras de linha deslocadas
+        assert tile_footprint("24MXT") == (24, True, 600000.0, 9190200.0, 709800.0, 9300000.0)
+
+    def test_footprint_bbox_contains_covered_points(self):
+        minx, miny, maxx, maxy = footprint_bbox(_IMG_LKC)
+        assert minx < -47.0 < maxx and miny < -15.8 < maxy
+        assert not minx < -45.0 < maxx
+        assert footprint_bbox("sem-tile") is None
+
+    def test_invalid_column_for_zone(self):
+        # Zona 24 usa colunas S-Z
+        assert tile_footprint("24MAT") is None
+
+
+class TestFootprintIndex:
+    def test_covering_filters_by_point(self):
+        index = FootprintIndex()
+        ids = [_IMG_MXT, _IMG_LKC, _IMG_UDQ]
+        index.add(ids)
+        assert index.covering(-15.8, -47.0, ids) == [_IMG_LKC]
+        assert index.covering(48.85, 2.35, ids) == [_IMG_UDQ]
+        assert index.covering(-6.8, -37.6, ids) == [_IMG_MXT]
+        assert index.covering(-10.0, -60.0, ids) == []
+
+    def test_overlap_between_neighbour_tiles(self):
+        # Tiles vizinhos se sobrepoem em 9,8 km: ponto na faixa cai nos dois
+        index = FootprintIndex()
+        west, east = "A_T23LKC", "A_T23LLC"
+        # ~305 km E na zona 23 (dentro de KC ate 309,8 km e de LC a partir de 300 km)
+        assert index.covering(-16.0, -46.85, [west, east]) == [west, east]
+
+    def test_unknown_tile_is_always_candidate(self):
+        index = FootprintIndex()
+        assert index.covering(-10.0, -60.0, ["sem-tile", _IMG_LKC]) == ["sem-tile"]
+
+    def test_indexes_lazily_and_keeps_order(self):
+        index = FootprintIndex()
+        other_date = "20240201T133231_T23LKC"
+        assert index.covering(-15.8, -47.0, [other_date, _IMG_LKC]) == [other_date, _IMG_LKC]
+        assert len(index) == 2
+        assert index.covering(-15.8, -47.0) == [other_date, _IMG_LKC]
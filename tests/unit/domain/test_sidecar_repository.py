@@ -0,0 +1,148 @@
+"""Testes unitarios para sidecar_repository — cache e gravacao atomica."""
+
+import json
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from domain.services import sidecar_repository
+from domain.services.sidecar_repository import SidecarRepository
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+def _age(path, seconds=10):
+    """Recua o mtime para fora da janela de mtime recente (cacheavel)."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 1_000_000_000))
+
+
+class TestRead:
+    def test_missing_file(self, tmp_path):
+        assert SidecarRepository().read(str(tmp_path / "x.json")) == {}
+
+    def test_invalid_json(self, tmp_path):
+        path = tmp_path / "x.json"
+        path.write_text("[1, 2")
+        assert SidecarRepository().read(str(path)) == {}
+
+    def test_cached_until_file_changes(self, tmp_path):
+        path = str(tmp_path / "x.json")
+        with open(path, "w") as f:
+            json.dump({"a": 1}, f)
+        _age(path)
+        repo = SidecarRepository()
+        assert repo.read(path) == {"a": 1}
+
+        with patch.object(sidecar_repository.json, "load") as load:
+            assert repo.read(path) == {"a": 1}
+            load.assert_not_called()
+
+        with open(path, "w") as f:
+            json.dump({"a": 22}, f)
+        assert repo.read(path) == {"a": 22}
+
+    def test_returns_copies(self, tmp_path):
+        path = str(tmp_path / "x.json")
+        repo = SidecarRepository()
+        repo.write(path, {"meta": {"a": 1}})
+        repo.read(path)["meta"]["a"] = 99
+        assert repo.read(path) == {"meta": {"a": 1}}
+
+
+class TestWrite:
+    def test_atomic_write_leaves_no_temp_files(self, tmp_path):
+        path = str(tmp_path / ".satirriga.json")
+        repo = SidecarRepository()
+        repo.write(path, {"descricao": "Zonal — 2024"})
+        assert os.listdir(tmp_path) == [".satirriga.json"]
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f) == {"descricao": "Zonal — 2024"}
+
+    def test_failed_write_keeps_previous_content(self, tmp_path):
+        path = str(tmp_path / ".satirriga.json")
+        repo = SidecarRepository()
+        repo.write(path, {"editToken": "old"})
+        with patch.object(sidecar_repository.json, "dump", side_effect=OSError("disco cheio")):
+            with pytest.raises(OSError):
+                repo.write(path, {"editToken": "new"})
+        assert os.listdir(tmp_path) == [".satirriga.json"]
+        assert SidecarRepository().read(path) == {"editToken": "old"}
+
+    def test_update_merges_fields(self, tmp_path):
+        path = str(tmp_path / ".satirriga.json")
+        repo = SidecarRepository()
+        repo.write(path, {"zonalId": 1, "expiresAt": "a"})
+        result = repo.update(path, {"expiresAt": "b"})
+        assert result == {"zonalId": 1, "expiresAt": "b"}
+        assert SidecarRepository().read(path) == result
+
+    def test_concurrent_updates_are_all_applied(self, tmp_path):
+        path = str(tmp_path / ".satirriga.json")
+        repo = SidecarRepository()
+        repo.write(path, {})
+        threads = [
+            threading.Thread(target=repo.update, args=(path, {f"k{i}": i}))
+            for i in range(16)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert SidecarRepository().read(path) == {f"k{i}": i for i in range(16)}
+
+    def test_write_during_update_replaces_queued_changes(self, tmp_path):
+        path = str(tmp_path / ".satirriga.json")
+        repo = SidecarRepository()
+        repo.write(path, {})
+        release = threading.Event()
+        store = repo._store
+
+        def slow_store(p, data):
+            release.wait(5)
+            store(p, data)
+
+        errors = []
+
+        def run(fn, *args):
+            try:
+                fn(*args)
+            except OSError as e:
+                errors.append(e)
+
+        with patch.object(repo, "_store", side_effect=slow_store):
+            first = threading.Thread(target=run, args=(repo.update, path, {"x": 1}))
+            first.start()
+            assert _wait_until(lambda: path in repo._writing)
+            queued = threading.Thread(target=run, args=(repo.update, path, {"a": 1}))
+            queued.start()
+            assert _wait_until(lambda: repo._queued[path] >= 3)
+            replace = threading.Thread(target=run, args=(repo.write, path, {"a": 9}))
+            replace.start()
+            queued_all = _wait_until(lambda: repo._queued[path] >= 4)
+            release.set()
+            for t in (first, queued, replace):
+                t.join(5)
+        assert queued_all
+        assert errors == []
+        assert SidecarRepository().read(path) == {"a": 9}
+
+    @pytest.mark.skipif(os.name == "nt", reason="modo POSIX")
+    def test_keeps_file_mode(self, tmp_path):
+        path = str(tmp_path / ".satirriga.json")
+        repo = SidecarRepository()
+        repo.write(path, {"a": 1})
+        assert os.stat(path).st_mode & 0o777 == 0o644
+        os.chmod(path, 0o664)
+        repo.update(path, {"b": 2})
+        assert os.stat(path).st_mode & 0o777 == 0o664
@@ -0,0 +1,137 @@
+"""Testes unitarios para tile_cache — MBTiles por fonte com despejo LRU."""
+
+import os
+import sqlite3
+import time
+from unittest.mock import patch
+
+from domain.services import tile_cache
+from domain.services.tile_cache import TileCache, tile_format, tile_source_key
+
+_PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+_TEMPLATE = (
+    "https://jobs.snirh.gov.br/tiles/s2/20240101T133231_T23LKC/"
+    "{z}/{x}/{y}?band=NDVI&min=0&max=0.8&palette=RDYLGN"
+)
+
+
+class TestSourceKey:
+    def test_key_has_image_id_and_is_stable(self):
+        key = tile_source_key(_TEMPLATE)
+        assert key.startswith("20240101T133231_T23LKC_")
+        assert key == tile_source_key(_TEMPLATE)
+
+    def test_vis_params_change_key(self):
+        other = _TEMPLATE.replace("max=0.8", "max=0.9")
+        assert tile_source_key(other) != tile_source_key(_TEMPLATE)
+
+    def test_unknown_url_uses_generic_prefix(self):
+        assert tile_source_key("https://example.com/{z}/{x}/{y}.png").startswith("xyz_")
+
+
+class TestTileFormat:
+    def test_detects_formats(self):
+        assert tile_format(_PNG) == "png"
+        assert tile_format(b"\xff\xd8\xff\xe0rest") == "jpg"
+        assert tile_format(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "webp"
+        assert TileCache.mime_type(b"\xff\xd8\xff\xe0") == "image/jpeg"
+
+
+class TestTileCache:
+    def test_put_get_roundtrip(self, tmp_path):
+        cache = TileCache(str(tmp_path), 10 * 1024 * 1024)
+        key = cache.register(_TEMPLATE)
+        assert cache.get(key, 12, 1500, 2200) is None
+        cache.put(key, 12, 1500, 2200, _PNG)
+        assert cache.get(key, 12, 1500, 2200) == _PNG
+        assert cache.has(key, 12, 1500, 2200)
+        assert cache.upstream(key) == _TEMPLATE
+
+    def test_mbtiles_layout_uses_tms_rows(self, tmp_path):
+        cache = TileCache(str(tmp_path), 10 * 1024 * 1024)
+        key = cache.register(_TEMPLATE)
+        cache.put(key, 3, 2, 1, _PNG)
+        conn = sqlite3.connect(os.path.join(str(tmp_path), f"{key}.mbtiles"))
+        row = conn.execute("SELECT zoom_level, tile_column, tile_row FROM tiles").fetchone()
+        fmt = conn.execute("SELECT value FROM metadata WHERE name = 'format'").fetchone()
+        conn.close()
+        assert row == (3, 2, 6)  # 2^3 - 1 - 1
+        assert fmt == ("png",)
+
+    def test_stats_count_replaced_tiles_once(self, tmp_path):
+        cache = TileCache(str(tmp_path), 10 * 1024 * 1024)
+        key = cache.register(_TEMPLATE)
+        cache.put_many(key, [(5, 1, 1, _PNG), (5, 1, 2, _PNG)])
+        cache.put(key, 5, 1, 1, _PNG)
+        assert cache.stats()["bytes"] == 2 * len(_PNG)
+
+    def test_evicts_least_recently_used_source(self, tmp_path):
+        cache = TileCache(str(tmp_path), 3 * len(_PNG))
+        old = cache.register(_TEMPLATE)
+        new = cache.register(_TEMPLATE.replace("NDVI", "NDWI"))
+        cache.put_many(old, [(5, 0, 0, _PNG), (5, 0, 1, _PNG)])
+        with patch.object(
+            tile_cache.time, "time", return_value=time.time() + 100,
+        ):
+            cache.put_many(new, [(5, 0, 0, _PNG), (5, 0, 1, _PNG)])
+        assert cache.get(old, 5, 0, 0) is None
+        assert cache.get(new, 5, 0, 0) == _PNG
+        # Fonte despejada continua registrada (template para religar camadas)
+        assert cache.upstream(old) == _TEMPLATE
+        assert cache.stats()["bytes"] == 2 * len(_PNG)
+
+    def test_protected_sources_are_not_evicted(self, tmp_path):
+        cache = TileCache(str(tmp_path), 3 * len(_PNG))
+        first = cache.register(_TEMPLATE)
+        second = cache.register(_TEMPLATE.replace("NDVI", "NDWI"))
+        cache.protect([first, second])
+        cache.put_many(first, [(5, 0, 0, _PNG), (5, 0, 1, _PNG)])
+        with patch.object(
+            tile_cache.time, "time", return_value=time.time() + 100,
+        ):
+            cache.put_many(second, [(5, 0, 0, _PNG), (5, 0, 1, _PNG)])
+        assert cache.get(first, 5, 0, 0) == _PNG
+        # Liberada a protecao, o limite volta a valer (LRU)
+        cache.release([first, second])
+        assert cache.get(first, 5, 0, 0) is None
+        assert cache.get(second, 5, 0, 0) == _PNG
+
+    def test_clear(self, tmp_path):
+        cache = TileCache(str(tmp_path), 10 * 1024 * 1024)
+        key = cache.register(_TEMPLATE)
+        cache.put(key, 1, 0, 0, _PNG)
+        cache.clear()
+        assert cache.get(key, 1, 0, 0) is None
+        assert cache.stats()["bytes"] == 0
+
+    def test_average_tile_bytes(self, tmp_path):
+        cache = TileCache(str(tmp_path), 10 * 1024 * 1024)
+        assert cache.average_tile_bytes() is None
+        key = cache.register(_TEMPLATE)
+        cache.put_many(key, [(5, 1, 1, _PNG), (5, 1, 2, _PNG + b"\x00" * 10)])
+        cache.put(key, 5, 1, 1, _PNG)
+        assert cache.stats()["tiles"] == 2
+        assert cache.average_tile_bytes() == len(_PNG) + 5
+
+    def test_migrates_v1_index(self, tmp_path):
+        conn = sqlite3.connect(os.path.join(str(tmp_path), tile_cache.INDEX_FILENAME))
+        conn.executescript(
+            "CREATE TABLE sources (key TEXT PRIMARY KEY, url_template TEXT, "
+            "bytes INTEGER, last_access REAL);"
+            "INSERT INTO sources VALUES ('k', 'https://x/{z}/{x}/{y}', 10, 0);"
+            "PRAGMA user_version = 1;"
+        )
+        conn.close()
+        cache = TileCache(str(tmp_path), 10 * 1024 * 1024)
+        assert cache.upstream("k") == "https://x/{z}/{x}/{y}"
+        assert cache.stats()["tiles"] == 0
+
+    def test_register_mosaic(self, tmp_path):
+        cache = TileCache(str(tmp_path), 10 * 1024 * 1024)
+        other = _TEMPLATE.replace("T23LKC", "T23LKD")
+        key = cache.register_mosaic([_TEMPLATE, other])
+        assert key.startswith("mosaic_")
+        assert key == cache.register_mosaic([_TEMPLATE, other])
+        assert key != cache.register_mosaic([other, _TEMPLATE])
+        assert TileCache.mosaic_components(cache.upstream(key)) == [_TEMPLATE, other]
+        assert TileCache.mosaic_components(_TEMPLATE) is None
@@ -3,6 +3,7 @@
 import json
 from unittest.mock import MagicMock
 
+from domain.models.pixel_indexes import SceneIndexes
 from domain.services.tile_indexes_service import TileIndexesService
 
 
@@ -55,53 +56,57 @@ class TestParseResponse:
         assert len(scenes) == 1
         assert scenes[0].ndvi == 0.5
 
-    def test_empty_body_returns_empty(self):
+    def test_empty_array_returns_empty(self):
         service, _ = _make_service()
-        assert service.parse_response(b"") == []
+        assert service.parse_response(b"[]") == []
 
-    def test_invalid_json_returns_empty(self):
+    def test_empty_body_returns_none(self):
         service, _ = _make_service()
-        assert service.parse_response(b"not-json") == []
+        assert service.parse_response(b"") is None
+
+    def test_invalid_json_returns_none(self):
+        service, _ = _make_service()
+        assert service.parse_response(b"not-json") is None
+
+    def test_non_scene_json_returns_none(self):
+        service, _ = _make_service()
+        assert service.parse_response(b'"ok"') is None
 
 
 class TestCache:
+    _IMG_A = "S2A_MSIL2A_20251022T132231_N0511_R038_T24MXT_20251022T172030"
+    _IMG_B = "S2B_MSIL2A_20251015T132231_N0511_R038_T24MXT_20251015T172030"
+
+    def _scene(self, image_id):
+        return SceneIndexes(id_imagem=image_id, tile="24MXT", data_formatada="", ndvi=0.3)
+
     def test_store_and_retrieve(self):
         service, _ = _make_service()
-        scenes = [
-            type("S", (), {"id_imagem": "X"})(),
-        ]
-        service.store(["A"], -15.5, -48.2, scenes)
-        cached = service.cached_for(["A"], -15.5, -48.2)
-        assert cached is scenes
+        service.store([self._IMG_A], -5.0, -39.0, [self._scene(self._IMG_A)])
+        cached = service.cached_for([self._IMG_A], -5.0, -39.0)
+        assert [s.id_imagem for s in cached] == [self._IMG_A]
 
     def test_miss_returns_none(self):
         service, _ = _make_service()
         assert service.cached_for(["A"], -15.5, -48.2) is None
 
-    def test_key_is_order_insensitive(self):
-        service, _ = _make_service()
-        sentinel = ["dummy"]
-        service.store(["A", "B"], 1.0, 2.0, sentinel)
-        assert service.cached_for(["B", "A"], 1.0, 2.0) is sentinel
-
-    def test_key_rounds_coordinates(self):
+    def test_cached_per_image(self):
         service, _ = _make_service()
-        sentinel = ["dummy"]
-        service.store(["A"], -15.1234567, -48.9876543, sentinel)
-        # Mesmo ponto truncado a 6 casas
-        assert service.cached_for(["A"], -15.1234567, -48.9876543) is sentinel
+        service.store([self._IMG_A], -5.0, -39.0, [self._scene(self._IMG_A)])
+        hits, missing = service.split_cached([self._IMG_B, self._IMG_A], -5.0, -39.0)
+        assert [s.id_imagem for s in hits] == [self._IMG_A]
+        assert missing == [self._IMG_B]
 
-    def test_lru_eviction(self):
+    def test_merge_keeps_request_order(self):
         service, _ = _make_service()
-        # _CACHE_MAX default 64 — for tests, insere 70 e confirma cap
-        for i in range(70):
-            service.store([f"id-{i}"], float(i), 0.0, [f"val-{i}"])
-        # Primeiros 6 devem ter sido evictados
-        assert service.cached_for(["id-0"], 0.0, 0.0) is None
-        assert service.cached_for(["id-69"], 69.0, 0.0) == ["val-69"]
+        merged = service.merge(
+            [self._IMG_B, self._IMG_A],
+            [self._scene(self._IMG_A)], [self._scene(self._IMG_B)],
+        )
+        assert [s.id_imagem for s in merged] == [self._IMG_B, self._IMG_A]
 
     def test_clear_cache(self):
         service, _ = _make_service()
-        service.store(["A"], 0.0, 0.0, ["x"])
+        service.store([self._IMG_A], -5.0, -39.0, [self._scene(self._IMG_A)])
         service.clear_cache()
-        assert service.cached_for(["A"], 0.0, 0.0) is None
+        assert service.cached_for([self._IMG_A], -5.0, -39.0) is None
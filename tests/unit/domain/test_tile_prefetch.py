@@ -0,0 +1,92 @@
+"""Testes unitarios para tile_prefetch — tiles XYZ de uma extensao."""
+
+from domain.models.raster import (
+    BandGroup, DateGroup, RasterHierarchy, RasterLayerConfig,
+)
+from domain.services.tile_prefetch import (
+    build_prefetch_plan, count_plan_tiles, count_tiles_for_bbox, format_bytes,
+    hierarchy_templates, lonlat_to_tile, template_extents, tiles_for_bbox,
+)
+
+# Extensao pequena no oeste da Bahia
+_BBOX = [-45.10, -12.20, -45.00, -12.10]
+
+
+def _hierarchy():
+    def band(key, *urls):
+        return BandGroup(
+            band_name=key, band_key=key,
+            layers=[RasterLayerConfig(name=u, xyz_url=u, layer_type=key) for u in urls],
+        )
+    return RasterHierarchy(dates=[
+        DateGroup("02/01/2024", "2024-01-02", [band("NDVI", "a-ndvi", "b-ndvi"), band("original", "a-rgb")]),
+        DateGroup("01/01/2024", "2024-01-01", [band("NDVI", "c-ndvi")]),
+    ])
+
+
+class TestTileMath:
+    def test_lonlat_to_tile(self):
+        assert lonlat_to_tile(0, 0, 1) == (1, 1)
+        assert lonlat_to_tile(-180, 85.1, 2) == (0, 0)
+        assert lonlat_to_tile(180, -90, 2) == (3, 3)
+
+    def test_tiles_cover_bbox(self):
+        tiles = list(tiles_for_bbox(_BBOX, 12))
+        assert all(z == 12 for z, _x, _y in tiles)
+        x0, y0 = lonlat_to_tile(_BBOX[0], _BBOX[3], 12)
+        x1, y1 = lonlat_to_tile(_BBOX[2], _BBOX[1], 12)
+        assert len(tiles) == (x1 - x0 + 1) * (y1 - y0 + 1)
+
+    def test_count_matches_enumeration(self):
+        expected = sum(len(list(tiles_for_bbox(_BBOX, z))) for z in range(10, 15))
+        assert count_tiles_for_bbox(_BBOX, 10, 14) == expected
+
+
+class TestHierarchyTemplates:
+    def test_all(self):
+        assert hierarchy_templates(_hierarchy()) == ["a-ndvi", "b-ndvi", "a-rgb", "c-ndvi"]
+
+    def test_filters_dates_and_bands(self):
+        assert hierarchy_templates(_hierarchy(), ["2024-01-02"], ["NDVI"]) == ["a-ndvi", "b-ndvi"]
+        assert hierarchy_templates(_hierarchy(), [], None) == []
+
+
+class TestPrefetchPlan:
+    def test_low_zoom_first(self):
+        plan = build_prefetch_plan(_BBOX, ["a", "b"], 12, 10)
+        assert (plan.zmin, plan.zmax) == (10, 12)
+        assert plan.tile_count == 2 * count_tiles_for_bbox(_BBOX, 10, 12)
+        zooms = [z for _t, z, _x, _y in plan.tiles]
+        assert zooms == sorted(zooms)
+        assert not plan.truncated
+
+    def test_truncates_at_limit(self):
+        plan = build_prefetch_plan(_BBOX, ["a"], 10, 16, max_tiles=5)
+        assert plan.tile_count == 5
+        assert plan.truncated
+
+    def test_sources_clipped_to_scene_footprint(self):
+        hierarchy = RasterHierarchy(dates=[DateGroup("02/01/2024", "2024-01-02", [
+            BandGroup(band_name="NDVI", band_key="NDVI", layers=[
+                RasterLayerConfig(name="lmg", xyz_url="lmg", layer_type="NDVI",
+                                  image_id="S2A_X_T23LMG_Y"),
+                RasterLayerConfig(name="lkc", xyz_url="lkc", layer_type="NDVI",
+                                  image_id="S2A_X_T23LKC_Y"),
+                RasterLayerConfig(name="mosaico", xyz_url="mosaico", layer_type="NDVI"),
+            ]),
+        ])])
+        extents = template_extents(hierarchy)
+        assert set(extents) == {"lmg", "lkc"}
+        templates = ["lmg", "lkc", "mosaico"]
+        plan = build_prefetch_plan(_BBOX, templates, 10, 12, extents=extents)
+        sources = {t for t, _z, _x, _y in plan.tiles}
+        # 23LKC nao cobre a extensao: nenhum tile dela e pedido
+        assert sources == {"lmg", "mosaico"}
+        assert plan.tile_count == 2 * count_tiles_for_bbox(_BBOX, 10, 12)
+        assert count_plan_tiles(_BBOX, templates, 10, 12, extents) == plan.tile_count
+
+    def test_estimate_and_format(self):
+        plan = build_prefetch_plan(_BBOX, ["a"], 12, 12)
+        assert plan.estimated_bytes(1000) == plan.tile_count * 1000
+        assert format_bytes(512 * 1024) == "512 KB"
+        assert format_bytes(3 * 1024 * 1024) == "3.0 MB"
@@ -0,0 +1,109 @@
+"""Testes unitarios para timeseries_cache — lacunas por ponto e data."""
+
+from datetime import date
+
+from domain.models.timeseries import TimeSeriesDataset
+from domain.services.timeseries_cache import (
+    TimeSeriesCache, merge_intervals, snap_key, subtract_intervals,
+)
+
+_TODAY = date(2025, 6, 30)
+
+
+def _dataset(dates, ndvi):
+    return TimeSeriesDataset(
+        dates=[f"{d}T00:00:00Z" for d in dates],
+        ndvi=list(ndvi),
+        precipitation=[1.0] * len(dates),
+    )
+
+
+class TestIntervals:
+    def test_merge_overlapping_and_adjacent(self):
+        assert merge_intervals([
+            ("2025-03-01", "2025-03-31"),
+            ("2025-01-01", "2025-01-31"),
+            ("2025-02-01", "2025-02-10"),   # adjacente a janeiro
+        ]) == [("2025-01-01", "2025-02-10"), ("2025-03-01", "2025-03-31")]
+
+    def test_subtract(self):
+        covered = [("2025-01-10", "2025-01-20"), ("2025-02-01", "2025-02-28")]
+        assert subtract_intervals("2025-01-01", "2025-03-15", covered) == [
+            ("2025-01-01", "2025-01-09"),
+            ("2025-01-21", "2025-01-31"),
+            ("2025-03-01", "2025-03-15"),
+        ]
+        assert subtract_intervals("2025-01-12", "2025-01-15", covered) == []
+        assert subtract_intervals("2025-01-01", "2025-01-05", []) == [
+            ("2025-01-01", "2025-01-05"),
+        ]
+
+    def test_snap_key(self):
+        assert snap_key(-15.123449, -47.98765) == snap_key(-15.12341, -47.98769)
+        assert snap_key(-15.1234, -47.9876) != snap_key(-15.1236, -47.9876)
+
+
+class TestTimeSeriesCache:
+    def test_extending_end_date_only_fetches_the_new_month(self):
+        cache = TimeSeriesCache(today=_TODAY)
+        key = snap_key(-15.8, -47.9)
+        assert cache.gaps(key, "2025-01-01", "2025-03-31") == [("2025-01-01", "2025-03-31")]
+
+        cache.store(key, "2025-01-01", "2025-03-31",
+                    _dataset(["2025-01-05", "2025-02-10", "2025-03-20"], [0.1, 0.2, 0.3]))
+        assert cache.gaps(key, "2025-01-01", "2025-04-30") == [("2025-04-01", "2025-04-30")]
+
+        cache.store(key, "2025-04-01", "2025-04-30", _dataset(["2025-04-15"], [0.4]))
+        assert cache.gaps(key, "2025-01-01", "2025-04-30") == []
+
+        merged = cache.dataset(key, "2025-01-01", "2025-04-30")
+        assert merged.dates == [
+            "2025-01-05T00:00:00Z", "2025-02-10T00:00:00Z",
+            "2025-03-20T00:00:00Z", "2025-04-15T00:00:00Z",
+        ]
+        assert merged.ndvi == [0.1, 0.2, 0.3, 0.4]
+        assert merged.evi == [None] * 4
+        # Subintervalo vem do cache
+        assert cache.dataset(key, "2025-02-01", "2025-02-28").ndvi == [0.2]
+
+    def test_recent_days_are_not_marked_covered(self):
+        cache = TimeSeriesCache(today=_TODAY)
+        key = snap_key(-15.8, -47.9)
+        cache.store(key, "2025-06-01", "2025-06-30", _dataset(["2025-06-10"], [0.5]))
+        assert cache.gaps(key, "2025-06-01", "2025-06-30") == [("2025-06-26", "2025-06-30")]
+
+    def test_refetch_replaces_interval(self):
+        cache = TimeSeriesCache(today=_TODAY)
+        key = snap_key(-15.8, -47.9)
+        cache.store(key, "2025-01-01", "2025-01-31",
+                    _dataset(["2025-01-05", "2025-01-20"], [0.1, 0.2]))
+        cache.store(key, "2025-01-01", "2025-01-31", _dataset(["2025-01-05"], [0.15]))
+        assert cache.dataset(key, "2025-01-01", "2025-01-31").ndvi == [0.15]
+
+    def test_persists_across_sessions(self, tmp_path):
+        path = str(tmp_path / "timeseries.sqlite")
+        key = snap_key(-15.8, -47.9)
+        cache = TimeSeriesCache(path, today=_TODAY)
+        cache.store(key, "2025-01-01", "2025-01-31", _dataset(["2025-01-05"], [0.1]))
+        cache.close()
+
+        reopened = TimeSeriesCache(path, today=_TODAY)
+        assert reopened.gaps(key, "2025-01-01", "2025-01-31") == []
+        assert reopened.dataset(key, "2025-01-01", "2025-01-31").ndvi == [0.1]
+
+    def test_label_persists_by_point(self, tmp_path):
+        path = str(tmp_path / "timeseries.sqlite")
+        key = snap_key(-15.8, -47.9)
+        cache = TimeSeriesCache(path, today=_TODAY)
+        cache.store(key, "2025-01-01", "2025-01-31", _dataset([], []), label="Pivo 3")
+        cache.store(key, "2025-02-01", "2025-02-28", _dataset([], []))
+        cache.close()
+
+        reopened = TimeSeriesCache(path, today=_TODAY)
+        assert reopened.label(key) == "Pivo 3"
+        assert reopened.label(snap_key(0, 0)) == ""
+
+    def test_empty_dataset(self):
+        cache = TimeSeriesCache(today=_TODAY)
+        empty = cache.dataset(snap_key(0, 0), "2025-01-01", "2025-01-31")
+        assert empty.dates == [] and empty.ndvi == []
@@ -0,0 +1,62 @@
+"""Testes unitarios para vis_config_service — cache da configuracao global."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+with patch.dict("sys.modules", {
+    "qgis": MagicMock(),
+    "qgis.core": MagicMock(),
+}):
+    from domain.models.raster import VisParams
+    from domain.services import vis_config_service
+
+
+class _Settings:
+    """QgsSettings em memoria com contador de leituras."""
+    store = {}
+    reads = 0
+
+    def value(self, key, default=None):
+        type(self).reads += 1
+        return self.store.get(key, default)
+
+    def setValue(self, key, value):
+        self.store[key] = value
+
+    def remove(self, key):
+        self.store.pop(key, None)
+
+
+@pytest.fixture(autouse=True)
+def settings():
+    _Settings.store, _Settings.reads = {}, 0
+    vis_config_service.invalidate_vis_cache()
+    with patch.object(vis_config_service, "QgsSettings", _Settings):
+        yield _Settings
+    vis_config_service.invalidate_vis_cache()
+
+
+class TestGlobalVisCache:
+    def test_reads_settings_once_per_band(self, settings):
+        first = vis_config_service.get_global_vis_params("NDVI")
+        first.min_val = 99  # copia: nao contamina o cache
+        again = vis_config_service.get_global_vis_params("NDVI")
+        assert again.min_val == 0
+        assert settings.reads == 1
+
+    def test_save_and_restore_invalidate(self, settings):
+        vis_config_service.get_global_vis_params("NDVI")
+        vis_config_service.save_global_vis_params(
+            "NDVI", VisParams(band="NDVI", min_val=0.1, max_val=0.9, palette="VIRIDIS"),
+        )
+        assert vis_config_service.get_global_vis_params("NDVI").palette == "VIRIDIS"
+        vis_config_service.restore_global_defaults()
+        assert vis_config_service.get_global_vis_params("NDVI").palette == "RDYLGN"
+
+    def test_external_change_needs_invalidate(self, settings):
+        vis_config_service.get_global_vis_params("NDWI")
+        settings.store["SatIrriga/vis/NDWI"] = '{"min": -1, "max": 1}'
+        assert vis_config_service.get_global_vis_params("NDWI").min_val == -0.7
+        vis_config_service.invalidate_vis_cache()
+        assert vis_config_service.get_global_vis_params("NDWI").min_val == -1
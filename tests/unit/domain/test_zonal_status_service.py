@@ -0,0 +1,358 @@
+"""Testes unitarios para domain.services.zonal_status_service."""
+
+import json
+from urllib.parse import parse_qs, urlparse
+
+from domain.services.zonal_status_service import (
+    MAX_INTERVAL_MS,
+    ZonalStatusPoller,
+    chunk_ids,
+    next_interval_ms,
+    parse_status_batch,
+    status_batch_path,
+)
+
+
+class _FakeConfig:
+    def __init__(self, interval_ms=None):
+        self._interval = interval_ms
+
+    def get(self, key):
+        if key == "api_base_url":
+            return "https://api.test/api/"
+        if key == "polling_interval_ms":
+            return self._interval
+        return None
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FakeStatusServer:
+    """Stand-in local do HttpClient + API de status.
+
+    ``get()`` apenas enfileira; ``deliver()`` responde tudo que esta em voo
+    e roteia para o poller, como o controller faz com os signals.
+    """
+
+    def __init__(self, statuses, batch_enabled=True):
+        self.statuses = dict(statuses)
+        self.batch_enabled = batch_enabled
+        self.fail_with = None  # status HTTP para forcar erro
+        self.urls = []
+        self._queue = []
+
+    def get(self, url):
+        self.urls.append(url)
+        request_id = f"req-{len(self.urls)}"
+        self._queue.append((request_id, url))
+        return request_id
+
+    def deliver(self, poller):
+        updates, stopped = [], []
+        queue, self._queue = self._queue, []
+        for request_id, url in queue:
+            if self.fail_with is not None:
+                u, s = poller.handle_failure(request_id, self.fail_with)
+            else:
+                code, body = self._respond(url)
+                if code == 200:
+                    u, s = poller.handle_response(request_id, body)
+                else:
+                    u, s = poller.handle_failure(request_id, code)
+            updates += u
+            stopped += s
+        return updates, stopped
+
+    def _respond(self, url):
+        parsed = urlparse(url)
+        if parsed.path.endswith("/zonal/status"):
+            if not self.batch_enabled:
+                return 404, b""
+            ids = parse_qs(parsed.query)["ids"][0].split(",")
+            data = [
+                {"id": int(i), "status": self.statuses[int(i)]}
+                for i in ids if int(i) in self.statuses
+            ]
+            return 200, json.dumps({"data": data}).encode()
+        zid = int(parsed.path.rstrip("/").split("/")[-2])
+        return 200, json.dumps({"status": self.statuses[zid]}).encode()
+
+
+def _poller(server, clock=None, interval_ms=None):
+    return ZonalStatusPoller(server, _FakeConfig(interval_ms), clock=clock or FakeClock())
+
+
+def _next_cycle(poller):
+    """Avanca o relogio alem de qualquer intervalo e dispara o ciclo."""
+    poller._clock.advance(MAX_INTERVAL_MS / 1000.0 + 1)
+    poller.poll()
+
+
+class TestHelpers:
+    def test_chunk_ids(self):
+        assert chunk_ids([1, 2, 3, 4, 5], size=2) == [[1, 2], [3, 4], [5]]
+
+    def test_status_batch_path(self):
+        assert status_batch_path([3, 1]) == "/zonal/status?ids=3,1"
+
+    def test_parse_list_and_envelope(self):
+        assert parse_status_batch(
+            {"data": [{"id": 1, "status": "PROCESSING"}, {"zonalId": "2", "status": "DONE"}]}
+        ) == {1: "PROCESSING", 2: "DONE"}
+
+    def test_parse_mapping(self):
+        assert parse_status_batch(
+            {"1": "PROCESSING", "2": {"status": "DONE"}, "x": "IGNORED"}
+        ) == {1: "PROCESSING", 2: "DONE"}
+
+    def test_parse_ignores_incomplete_entries(self):
+        assert parse_status_batch([{"id": 1}, {"status": "X"}, "lixo"]) == {}
+
+
+class TestBatchPolling:
+    def test_single_request_for_all_zonals(self):
+        server = FakeStatusServer({i: "PROCESSING" for i in range(1, 81)})
+        poller = _poller(server)
+        for zid in range(1, 81):
+            poller.start(zid)
+
+        poller.poll()
+        assert len(server.urls) == 1
+        assert server.urls[0].startswith("https://api.test/api/zonal/status?ids=1,2,3")
+
+        updates, stopped = server.deliver(poller)
+        assert len(updates) == 80
+        assert stopped == []
+        assert poller.batch_supported is True
+
+    def test_no_new_request_while_batch_in_flight(self):
+        server = FakeStatusServer({1: "PROCESSING"})
+        poller = _poller(server)
+        poller.start(1)
+        poller.poll()
+        poller.poll()
+        assert len(server.urls) == 1
+
+    def test_terminal_status_stops_polling(self):
+        server = FakeStatusServer({1: "PROCESSING", 2: "CONSOLIDATED"})
+        poller = _poller(server)
+        poller.start(1)
+        poller.start(2)
+        poller.poll()
+        updates, stopped = server.deliver(poller)
+        assert sorted(updates) == [(1, "PROCESSING"), (2, "CONSOLIDATED")]
+        assert stopped == [(2, "terminal")]
+        assert poller.is_polling(1)
+        assert not poller.is_polling(2)
+
+    def test_missing_zonal_counts_as_error(self):
+        server = FakeStatusServer({1: "PROCESSING"})
+        poller = _poller(server)
+        poller.start(99)
+        stopped = []
+        for _ in range(ZonalStatusPoller.MAX_CONSECUTIVE_ERRORS):
+            _next_cycle(poller)
+            stopped += server.deliver(poller)[1]
+        assert stopped == [(99, "errors")]
+        assert not poller.has_watched
+
+    def test_server_error_does_not_disable_batch(self):
+        server = FakeStatusServer({1: "PROCESSING"})
+        poller = _poller(server)
+        poller.start(1)
+        poller.poll()
+        server.deliver(poller)  # batch confirmado
+        server.fail_with = 503
+        _next_cycle(poller)
+        server.deliver(poller)
+        assert poller.batch_supported is True
+
+    def test_stopped_zonal_response_ignored(self):
+        server = FakeStatusServer({1: "PROCESSING"})
+        poller = _poller(server)
+        poller.start(1)
+        poller.poll()
+        poller.stop(1)
+        assert server.deliver(poller) == ([], [])
+
+
+class TestFallback:
+    def test_falls_back_to_rate_limited_individual_polling(self):
+        statuses = {i: "PROCESSING" for i in range(1, 11)}
+        server = FakeStatusServer(statuses, batch_enabled=False)
+        poller = _poller(server)
+        for zid in statuses:
+            poller.start(zid)
+
+        poller.poll()
+        assert server.deliver(poller) == ([], [])
+        assert poller.batch_supported is False
+
+        poller.poll()
+        individual = server.urls[1:]
+        assert len(individual) == ZonalStatusPoller.FALLBACK_MAX_PER_TICK
+        assert all("/zonal/status?" not in u for u in individual)
+        updates, _ = server.deliver(poller)
+        assert len(updates) == ZonalStatusPoller.FALLBACK_MAX_PER_TICK
+
+    def test_round_robin_covers_all_zonals(self):
+        statuses = {i: "PROCESSING" for i in range(1, 9)}
+        server = FakeStatusServer(statuses, batch_enabled=False)
+        poller = _poller(server)
+        for zid in statuses:
+            poller.start(zid)
+        poller.poll()
+        server.deliver(poller)
+
+        seen = set()
+        for _ in range(2):
+            _next_cycle(poller)
+            seen.update(z for z, _ in server.deliver(poller)[0])
+        assert seen == set(statuses)
+
+    def test_fallback_rate_with_many_zonals(self):
+        """80 zonais sem endpoint em lote: o cap vale por intervalo, nao por tick."""
+        clock = FakeClock()
+        statuses = {i: "PROCESSING" for i in range(1, 81)}
+        server = FakeStatusServer(statuses, batch_enabled=False)
+        poller = _poller(server, clock)
+        for zid in statuses:
+            poller.start(zid)
+        poller.poll()
+        server.deliver(poller)
+        batch_urls = len(server.urls)
+
+        # Simula o timer do controller (piso de 100 ms) por 30 s
+        elapsed, per_second = 0.0, {}
+        while elapsed < 30:
+            before = len(server.urls)
+            poller.poll()
+            per_second[int(elapsed)] = (
+                per_second.get(int(elapsed), 0) + len(server.urls) - before
+            )
+            server.deliver(poller)
+            delay = max(poller.next_due_in_ms() or 1000, 100) / 1000.0
+            clock.advance(delay)
+            elapsed += delay
+
+        individual = len(server.urls) - batch_urls
+        assert per_second[0] <= ZonalStatusPoller.FALLBACK_MAX_PER_TICK
+        # Intervalo base de 3 s: no maximo 2 ciclos (cap cada) por intervalo
+        assert individual <= 2 * ZonalStatusPoller.FALLBACK_MAX_PER_TICK * 30 / 3
+        assert max(per_second.values()) <= 2 * ZonalStatusPoller.FALLBACK_MAX_PER_TICK
+
+    def test_skipped_zonals_are_not_due_immediately(self):
+        clock = FakeClock()
+        statuses = {i: "PROCESSING" for i in range(1, 21)}
+        server = FakeStatusServer(statuses, batch_enabled=False)
+        poller = _poller(server, clock)
+        for zid in statuses:
+            poller.start(zid)
+        poller.poll()
+        server.deliver(poller)
+
+        poller.poll()
+        assert poller.next_due_in_ms() >= poller.base_interval_ms() - 1
+
+
+class TestAdaptiveSchedule:
+    def test_interval_by_status(self):
+        assert next_interval_ms(3000, "PROCESSING") == 3000
+        assert next_interval_ms(3000, "CONSOLIDATING") == 3000
+        assert next_interval_ms(3000, "OVERLAID") == 6000
+
+    def test_backoff_on_unchanged_and_errors(self):
+        assert next_interval_ms(3000, "PROCESSING", unchanged=2) == 6750
+        assert next_interval_ms(3000, errors=1) == 6000
+        assert next_interval_ms(3000, errors=3) == 24000
+        assert next_interval_ms(3000, "CREATED", unchanged=50) == MAX_INTERVAL_MS
+
+    def test_configured_interval_is_used(self):
+        clock = FakeClock()
+        server = FakeStatusServer({1: "PROCESSING"})
+        poller = _poller(server, clock, interval_ms=5000)
+        poller.start(1)
+        assert poller.next_due_in_ms() == 0
+        poller.poll()
+        assert poller.next_due_in_ms() is None  # request em voo
+        server.deliver(poller)
+        assert poller.next_due_in_ms() == 5000
+
+    def test_not_due_zonal_is_not_polled(self):
+        clock = FakeClock()
+        server = FakeStatusServer({1: "PROCESSING"})
+        poller = _poller(server, clock)
+        poller.start(1)
+        poller.poll()
+        server.deliver(poller)
+        clock.advance(1.0)
+        poller.poll()
+        assert len(server.urls) == 1
+        clock.advance(2.0)
+        poller.poll()
+        assert len(server.urls) == 2
+
+    def test_unchanged_responses_back_off(self):
+        clock = FakeClock()
+        server = FakeStatusServer({1: "PROCESSING"})
+        poller = _poller(server, clock, interval_ms=1000)
+        poller.start(1)
+        delays = []
+        for _ in range(4):
+            poller.poll()
+            server.deliver(poller)
+            delay = poller.next_due_in_ms()
+            delays.append(delay)
+            clock.advance(delay / 1000.0)
+        assert delays == [1000, 1500, 2250, 3375]
+
+    def test_status_change_resets_backoff(self):
+        clock = FakeClock()
+        server = FakeStatusServer({1: "PROCESSING"})
+        poller = _poller(server, clock, interval_ms=1000)
+        poller.start(1)
+        for _ in range(3):
+            _next_cycle(poller)
+            server.deliver(poller)
+        server.statuses[1] = "CONSOLIDATING"
+        _next_cycle(poller)
+        server.deliver(poller)
+        assert poller.next_due_in_ms() == 1000
+
+    def test_zonals_due_soon_join_the_same_batch(self):
+        clock = FakeClock()
+        server = FakeStatusServer({1: "PROCESSING", 2: "PROCESSING"})
+        poller = _poller(server, clock)
+        poller.start(1)
+        clock.advance(1.0)  # zonal 2 vence 1 s depois (< meio intervalo base)
+        poller.start(2)
+        clock.advance(-1.0)
+        poller.poll()
+        assert len(server.urls) == 1
+        assert server.urls[0].endswith("ids=1,2")
+
+    def test_steady_state_volume_drops(self):
+        """80 zonais PROCESSING inalterados por 5 min: poucos requests."""
+        clock = FakeClock()
+        server = FakeStatusServer({i: "PROCESSING" for i in range(1, 81)})
+        poller = _poller(server, clock)
+        for zid in range(1, 81):
+            poller.start(zid)
+        elapsed = 0.0
+        while elapsed < 300:
+            poller.poll()
+            server.deliver(poller)
+            delay = (poller.next_due_in_ms() or 1000) / 1000.0
+            clock.advance(delay)
+            elapsed += delay
+        # Antes: 80 zonais x 300 ciclos de 1 s = 24000 requests
+        assert len(server.urls) < 40
@@ -0,0 +1,184 @@
+"""Testes unitarios para HttpClient.download_to_file (streaming em disco)."""
+
+import json
+import os
+import sys
+from unittest.mock import MagicMock
+
+
+class MockQObject:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+class MockSignal:
+    def __init__(self, *args):
+        self._callbacks = []
+        self.emit = MagicMock()
+
+    def connect(self, slot):
+        self._callbacks.append(slot)
+
+    def disconnect(self, slot=None):
+        pass
+
+
+qgis_mocks = {
+    "qgis": MagicMock(),
+    "qgis.PyQt": MagicMock(),
+    "qgis.PyQt.QtCore": MagicMock(),
+    "qgis.PyQt.QtNetwork": MagicMock(),
+    "qgis.core": MagicMock(),
+}
+qgis_mocks["qgis.PyQt.QtCore"].QObject = MockQObject
+qgis_mocks["qgis.PyQt.QtCore"].pyqtSignal = MockSignal
+for mod, mock in qgis_mocks.items():
+    sys.modules[mod] = mock
+
+from infra.http.client import HttpClient  # noqa: E402
+
+
+class FakeReply:
+    """QNetworkReply minimo: entrega o body em chunks via readyRead."""
+
+    def __init__(self, status_code, chunks, error=0, error_string=""):
+        self.readyRead = MockSignal()
+        self.finished = MockSignal()
+        self._status = status_code
+        self._chunks = list(chunks)
+        self._buffer = b""
+        self._error = error
+        self._error_string = error_string
+        self.aborted = False
+
+    def feed(self):
+        """Simula a chegada do proximo chunk."""
+        self._buffer += self._chunks.pop(0)
+        for cb in self.readyRead._callbacks:
+            cb()
+
+    def finish(self):
+        while self._chunks:
+            self._buffer += self._chunks.pop(0)
+        for cb in self.finished._callbacks:
+            cb()
+
+    def readAll(self):
+        data, self._buffer = self._buffer, b""
+        return data
+
+    def attribute(self, _attr):
+        return self._status
+
+    def error(self):
+        return self._error
+
+    def errorString(self):
+        return self._error_string
+
+    def deleteLater(self):
+        pass
+
+    def abort(self):
+        self.aborted = True
+
+
+def _client(reply):
+    client = HttpClient()
+    client._nam = MagicMock()
+    client._nam.get.return_value = reply
+    client.download_finished = MockSignal()
+    client.request_error = MockSignal()
+    return client
+
+
+class TestDownloadToFile:
+    def test_chunks_written_to_disk_and_path_emitted(self, tmp_path):
+        dest = str(tmp_path / "out.gpkg")
+        reply = FakeReply(200, [b"abc", b"def", b"gh"])
+        client = _client(reply)
+
+        rid = client.download_to_file("https://api/x", dest)
+        reply.feed()
+        reply.feed()
+        reply.finish()
+
+        client.download_finished.emit.assert_called_once_with(rid, 200, dest)
+        client.request_error.emit.assert_not_called()
+        with open(dest, "rb") as f:
+            assert f.read() == b"abcdefgh"
+        assert rid not in client._downloads
+        assert rid not in client._pending
+
+    def test_http_error_removes_file_and_emits_error(self, tmp_path):
+        dest = str(tmp_path / "out.gpkg")
+        body = json.dumps({"message": "Batch nao encontrado"}).encode()
+        reply = FakeReply(404, [body], error=203)
+        client = _client(reply)
+
+        rid = client.download_to_file("https://api/x", dest)
+        reply.finish()
+
+        client.download_finished.emit.assert_not_called()
+        client.request_error.emit.assert_called_once()
+        assert client.request_error.emit.call_args[0][0] == rid
+        assert not os.path.exists(dest)
+
+    def test_network_error(self, tmp_path):
+        dest = str(tmp_path / "out.gpkg")
+        reply = FakeReply(None, [], error=99, error_string="timeout")
+        client = _client(reply)
+
+        rid = client.download_to_file("https://api/x", dest)
+        reply.finish()
+
+        client.request_error.emit.assert_called_once_with(
+            rid, "Erro de rede: timeout"
+        )
+        assert not os.path.exists(dest)
+
+    def test_cancel_aborts_and_removes_partial_file(self, tmp_path):
+        dest = str(tmp_path / "out.gpkg")
+        reply = FakeReply(200, [b"parcial", b"resto"])
+        client = _client(reply)
+
+        rid = client.download_to_file("https://api/x", dest)
+        reply.feed()
+        client.cancel(rid)
+
+        assert reply.aborted
+        assert not os.path.exists(dest)
+        assert rid not in client._downloads
+
+
+class TestCancel:
+    def test_cancelled_request_finishes_silently(self):
+        reply = FakeReply(None, [], error=5, error_string="Operation canceled")
+        client = _client(reply)
+        client._nam.post.return_value = reply
+        client.request_finished = MockSignal()
+
+        rid = client.post_json("https://api/x", b"{}")
+        client.cancel(rid)
+        reply.finish()
+
+        assert reply.aborted
+        client.request_error.emit.assert_not_called()
+        client.request_finished.emit.assert_not_called()
+
+
+class TestDownloadOpenFailure:
+    def test_error_is_emitted_after_returning_request_id(self, tmp_path):
+        from unittest.mock import patch
+        import infra.http.client as client_mod
+
+        client = _client(FakeReply(200, []))
+        dest = str(tmp_path / "nao_existe" / "out.gpkg")
+        with patch.object(client_mod, "QTimer") as timer:
+            rid = client.download_to_file("https://api/x", dest)
+            client.request_error.emit.assert_not_called()
+            timer.singleShot.call_args[0][1]()
+
+        client.request_error.emit.assert_called_once()
+        assert client.request_error.emit.call_args[0][0] == rid
+        client._nam.get.assert_not_called()
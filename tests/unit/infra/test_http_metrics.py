@@ -0,0 +1,110 @@
+"""Testes unitarios para infra.http.metrics."""
+
+import csv
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from infra.http import metrics as metrics_mod
+from infra.http.metrics import HttpMetrics, endpoint_template, timed_request
+
+
+class TestEndpointTemplate:
+    def test_numeric_ids_replaced(self):
+        assert endpoint_template(
+            "get", "https://api.test/api/zonal/123/status"
+        ) == "GET /zonal/{id}/status"
+
+    def test_uuid_and_query_stripped(self):
+        url = (
+            "https://api.test/api/upload/"
+            "0f8fad5b-d9cb-469f-a165-70867728950e/status?x=1"
+        )
+        assert endpoint_template("GET", url) == "GET /upload/{uuid}/status"
+
+    def test_path_without_api_prefix(self):
+        assert endpoint_template("POST", "https://h/zonal/7/checkout") == (
+            "POST /zonal/{id}/checkout"
+        )
+
+
+class TestHttpMetrics:
+    def test_aggregates_by_template(self):
+        m = HttpMetrics()
+        for i, ms in enumerate([10, 20, 30, 40, 100]):
+            m.record("GET", f"https://h/api/zonal/{i}/status", 200, ms,
+                     bytes_in=100)
+        m.record("GET", "https://h/api/zonal/9/status", 500, 5)
+
+        (row,) = m.snapshot()
+        assert row["endpoint"] == "GET /zonal/{id}/status"
+        assert row["count"] == 6
+        assert row["bytes_in"] == 500
+        assert row["statuses"] == {"200": 5, "500": 1}
+        assert row["error_rate"] == pytest.approx(1 / 6, abs=1e-4)
+        assert row["p50_ms"] == 20
+        assert row["p99_ms"] == 100
+
+    def test_network_error_and_retry(self):
+        m = HttpMetrics()
+        m.record("GET", "https://h/x", 0, 1, retry=True)
+        (row,) = m.snapshot()
+        assert row["error_rate"] == 1.0
+        assert row["retries"] == 1
+        assert row["statuses"] == {"0": 1}
+
+    def test_sorted_by_count(self):
+        m = HttpMetrics()
+        m.record("GET", "https://h/a", 200, 1)
+        m.record("GET", "https://h/b", 200, 1)
+        m.record("GET", "https://h/b", 200, 1)
+        assert [r["endpoint"] for r in m.snapshot()] == ["GET /b", "GET /a"]
+
+    def test_reset(self):
+        m = HttpMetrics()
+        m.record("GET", "https://h/a", 200, 1)
+        m.reset()
+        assert m.snapshot() == []
+
+    def test_exports(self):
+        m = HttpMetrics()
+        m.record("GET", "https://h/a", 200, 12, bytes_in=3, bytes_out=4)
+        data = json.loads(m.to_json())
+        assert data["endpoints"][0]["bytes_out"] == 4
+
+        rows = list(csv.reader(io.StringIO(m.to_csv())))
+        assert rows[0] == list(HttpMetrics.COLUMNS)
+        assert rows[1][0] == "GET /a"
+        assert rows[1][-1] == "200:1"
+
+
+class TestTimedRequest:
+    @pytest.fixture(autouse=True)
+    def _fresh_metrics(self, monkeypatch):
+        monkeypatch.setattr(metrics_mod, "_metrics", HttpMetrics())
+
+    def test_records_response(self):
+        resp = SimpleNamespace(status_code=201, content=b"12345", headers={})
+        fn = lambda url, **kw: resp  # noqa: E731
+        assert timed_request("POST", fn, "https://h/api/x", bytes_out=7) is resp
+        (row,) = metrics_mod._metrics.snapshot()
+        assert row["bytes_in"] == 5
+        assert row["bytes_out"] == 7
+        assert row["statuses"] == {"201": 1}
+
+    def test_stream_uses_content_length(self):
+        resp = SimpleNamespace(
+            status_code=200, content=None, headers={"content-length": "2048"},
+        )
+        timed_request("GET", lambda url, **kw: resp, "https://h/f", stream=True)
+        assert metrics_mod._metrics.snapshot()[0]["bytes_in"] == 2048
+
+    def test_exception_recorded_and_reraised(self):
+        def boom(url, **kw):
+            raise ConnectionError("down")
+
+        with pytest.raises(ConnectionError):
+            timed_request("GET", boom, "https://h/x")
+        assert metrics_mod._metrics.snapshot()[0]["statuses"] == {"0": 1}
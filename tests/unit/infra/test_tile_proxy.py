@@ -0,0 +1,148 @@
+"""Testes unitarios para TileProxy — loopback HTTP servindo o cache de tiles."""
+
+import urllib.error
+import urllib.request
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+pytest.importorskip("requests")
+
+with patch.dict("sys.modules", {
+    "qgis": MagicMock(),
+    "qgis.core": MagicMock(),
+}):
+    from domain.services.tile_cache import TileCache
+    from infra.http import tile_proxy
+    from infra.http.tile_proxy import TileProxy
+
+_PNG = b"\x89PNG\r\n\x1a\n" + b"\x01" * 64
+_TEMPLATE = "https://jobs.snirh.gov.br/tiles/s2/IMG_1/{z}/{x}/{y}?band=NDVI&min=0"
+
+
+def _upstream_response(status=200, content=_PNG, content_type="image/png"):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.content = content
+    resp.headers = {"Content-Type": content_type}
+    return resp
+
+
+@pytest.fixture
+def proxy(tmp_path):
+    p = TileProxy(TileCache(str(tmp_path), 10 * 1024 * 1024))
+    assert p.start()
+    yield p
+    p.stop()
+
+
+def _get(url):
+    return urllib.request.urlopen(url, timeout=5)
+
+
+class TestTileProxy:
+    def test_local_template_roundtrip(self, proxy):
+        local = proxy.local_template(_TEMPLATE)
+        assert local.startswith(f"http://127.0.0.1:{proxy.port}/tiles/")
+        assert local.endswith("/{z}/{x}/{y}")
+        assert proxy.upstream_template(local) == _TEMPLATE
+        assert proxy.upstream_template(_TEMPLATE) == _TEMPLATE
+
+    def test_miss_fetches_upstream_then_serves_from_cache(self, proxy):
+        local = proxy.local_template(_TEMPLATE)
+        url = local.replace("{z}", "10").replace("{x}", "380").replace("{y}", "560")
+        with patch.object(proxy._session, "get", return_value=_upstream_response()) as get:
+            with _get(url) as resp:
+                assert resp.read() == _PNG
+                assert resp.headers["Content-Type"] == "image/png"
+            with _get(url) as resp:
+                assert resp.read() == _PNG
+        get.assert_called_once()
+        assert get.call_args[0][0] == (
+            "https://jobs.snirh.gov.br/tiles/s2/IMG_1/10/380/560?band=NDVI&min=0"
+        )
+
+    def test_missing_upstream_tile_returns_404(self, proxy):
+        local = proxy.local_template(_TEMPLATE)
+        url = local.replace("{z}", "1").replace("{x}", "0").replace("{y}", "0")
+        with patch.object(proxy._session, "get",
+                          return_value=_upstream_response(404, b"")):
+            with pytest.raises(urllib.error.HTTPError) as exc:
+                _get(url)
+        assert exc.value.code == 404
+
+    def test_upstream_failure_returns_502(self, proxy):
+        local = proxy.local_template(_TEMPLATE)
+        url = local.replace("{z}", "1").replace("{x}", "0").replace("{y}", "0")
+        with patch.object(proxy._session, "get",
+                          return_value=_upstream_response(500, b"erro", "text/plain")):
+            with pytest.raises(urllib.error.HTTPError) as exc:
+                _get(url)
+        assert exc.value.code == 502
+        assert exc.value.headers["Cache-Control"] == "no-store"
+        assert proxy.cache.stats()["bytes"] == 0
+
+    def test_network_error_returns_502(self, proxy):
+        local = proxy.local_template(_TEMPLATE)
+        url = local.replace("{z}", "1").replace("{x}", "0").replace("{y}", "0")
+        with patch.object(proxy._session, "get",
+                          side_effect=tile_proxy.requests.ConnectionError("offline")):
+            with pytest.raises(urllib.error.HTTPError) as exc:
+                _get(url)
+        assert exc.value.code == 502
+
+    def test_stopped_proxy_keeps_direct_urls(self, tmp_path):
+        p = TileProxy(TileCache(str(tmp_path), 1024))
+        assert p.local_template(_TEMPLATE) == _TEMPLATE
+
+
+class TestMosaic:
+    _OTHER = _TEMPLATE.replace("IMG_1", "IMG_2")
+
+    def _url(self, proxy):
+        local = proxy.local_mosaic_template([_TEMPLATE, self._OTHER])
+        assert proxy.upstream_template(local) == local
+        return local.replace("{z}", "10").replace("{x}", "380").replace("{y}", "560")
+
+    def test_single_scene_tile_passes_through(self, proxy):
+        def get(url, **kwargs):
+            return _upstream_response() if "IMG_1" in url else _upstream_response(404, b"")
+
+        with patch.object(proxy._session, "get", side_effect=get), \
+                patch.object(tile_proxy, "_compose_tiles") as compose:
+            with _get(self._url(proxy)) as resp:
+                assert resp.read() == _PNG
+        compose.assert_not_called()
+
+    def test_overlapping_scenes_are_composed_and_cached(self, proxy):
+        prefetched = b"\x89PNG\r\n\x1a\n" + b"\x02" * 64
+        proxy.cache.put(proxy.cache.register(self._OTHER), 10, 380, 560, prefetched)
+        with patch.object(proxy._session, "get", return_value=_upstream_response()) as get, \
+                patch.object(tile_proxy, "_compose_tiles", return_value=b"composto") as compose:
+            with _get(self._url(proxy)) as resp:
+                assert resp.read() == b"composto"
+            with _get(self._url(proxy)) as resp:
+                assert resp.read() == b"composto"
+        # Cena ja em cache (prefetch) nao vai ao servidor; composto e cacheado
+        get.assert_called_once()
+        compose.assert_called_once_with([_PNG, prefetched])
+
+    def test_partial_mosaic_is_served_but_not_cached(self, proxy):
+        def get(url, **kwargs):
+            if "IMG_1" in url:
+                return _upstream_response()
+            return _upstream_response(503, b"erro", "text/plain")
+
+        with patch.object(proxy._session, "get", side_effect=get) as upstream:
+            with _get(self._url(proxy)) as resp:
+                assert resp.read() == _PNG
+                assert resp.headers["Cache-Control"] == "no-store"
+            with _get(self._url(proxy)) as resp:
+                assert resp.read() == _PNG
+        # Nada gravado: a segunda requisicao volta ao servidor
+        assert upstream.call_count == 4
+        assert proxy.cache.stats()["bytes"] == 0
+
+    def test_stopped_proxy_has_no_mosaic(self, tmp_path):
+        p = TileProxy(TileCache(str(tmp_path), 1024))
+        assert p.local_mosaic_template([_TEMPLATE, self._OTHER]) is None
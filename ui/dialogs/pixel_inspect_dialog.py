@@ -6,8 +6,9 @@ cliques no canvas, atualizando o conteudo em vez de reabrir.
 
 from typing import List, Optional
 
-from qgis.PyQt.QtCore import Qt
+from qgis.PyQt.QtCore import Qt, pyqtSignal
 from qgis.PyQt.QtWidgets import (
+    QCheckBox,
     QComboBox,
     QDialog,
     QFrame,
@@ -68,6 +69,8 @@ def _severity_color(key: str, value: Optional[float]) -> str:
 class PixelInspectDialog(QDialog):
     """Painel flutuante com 6 indices espectrais por ponto."""
 
+    hover_toggled = pyqtSignal(bool)  # consulta continua sob o cursor
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._scenes: List[SceneIndexes] = []
@@ -157,6 +160,14 @@ class PixelInspectDialog(QDialog):
         )
         actions_row.addWidget(self._btn_clear)
 
+        self._hover_check = QCheckBox("Seguir cursor")
+        self._hover_check.setToolTip(
+            "Consulta os índices continuamente sob o cursor, sem clicar"
+        )
+        self._hover_check.setStyleSheet("font-size: 11px;")
+        self._hover_check.toggled.connect(self.hover_toggled.emit)
+        actions_row.addWidget(self._hover_check)
+
         actions_row.addStretch()
 
         self._btn_close = QPushButton("Fechar")
@@ -235,12 +246,17 @@ class PixelInspectDialog(QDialog):
             "font-size: 10px; color: #1976D2; border: none; background: transparent;"
         )
         self._message_label.setVisible(False)
-        self._grid_frame.setEnabled(False)
-        self._reset_values()
+        # Seguindo o cursor, mantem os ultimos valores ate a resposta
+        # (evita piscar a cada pixel)
+        if not self._hover_check.isChecked():
+            self._grid_frame.setEnabled(False)
+            self._reset_values()
         self._show_and_raise()
 
     def show_results(self, lat: float, lon: float, scenes: List[SceneIndexes]):
         self._coords_label.setText(self._format_coords(lat, lon))
+        previous = (self._scenes[self._current_index].id_imagem
+                    if 0 <= self._current_index < len(self._scenes) else None)
         self._scenes = list(scenes)
         self._grid_frame.setEnabled(True)
 
@@ -255,17 +271,20 @@ class PixelInspectDialog(QDialog):
             self._show_and_raise()
             return
 
-        # Popula dropdown se houver mais de uma cena
+        # Popula dropdown se houver mais de uma cena; mantem a cena escolhida
+        # entre pontos consultados
+        ids = [scene.id_imagem for scene in self._scenes]
+        current = ids.index(previous) if previous in ids else 0
         self._scene_combo.blockSignals(True)
         self._scene_combo.clear()
         for scene in self._scenes:
             self._scene_combo.addItem(scene.display_label())
-        self._scene_combo.setCurrentIndex(0)
+        self._scene_combo.setCurrentIndex(current)
         self._scene_combo.blockSignals(False)
         self._scene_combo.setVisible(len(self._scenes) > 1)
 
-        self._current_index = 0
-        self._render_scene(self._scenes[0])
+        self._current_index = current
+        self._render_scene(self._scenes[current])
         self._status_label.setText(
             f"{len(self._scenes)} cena(s)"
         )
@@ -0,0 +1,118 @@
+"""Dialogo de prefetch de tiles (datas, bandas e zooms para uso offline)."""
+
+from qgis.PyQt.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
+    QLabel, QSpinBox, QCheckBox, QGroupBox, QDialogButtonBox,
+)
+
+from ...domain.services.tile_prefetch import (
+    MAX_PREFETCH_TILES, count_plan_tiles, format_bytes,
+)
+
+
+class TilePrefetchDialog(QDialog):
+    """Escolha de datas/bandas e faixa de zoom com estimativa de download.
+
+    ``dates`` e ``bands`` sao listas ``[(chave, rotulo)]``; a primeira data
+    vem marcada (a mesma carregada na arvore). ``templates_for(datas,
+    bandas)`` retorna os templates XYZ da selecao (uma fonte por cena);
+    ``extents`` (template -> extensao da cena) limita a estimativa ao
+    footprint de cada cena, como no plano de download.
+    Selecoes que nao cabem em ``max_cache_bytes`` (limite do cache de
+    tiles) nao podem ser baixadas: o proprio download despejaria tiles.
+    """
+
+    def __init__(self, bbox, dates, bands, templates_for, avg_tile_bytes,
+                 max_cache_bytes, extents=None, parent=None):
+        super().__init__(parent)
+        self._bbox = bbox
+        self._templates_for = templates_for
+        self._extents = extents or {}
+        self._avg_tile_bytes = avg_tile_bytes
+        self._max_cache_bytes = max_cache_bytes
+        self.setWindowTitle("Baixar imagens para uso offline")
+        self.setMinimumWidth(380)
+        self._build_ui(dates, bands)
+        self._update_estimate()
+
+    def _build_ui(self, dates, bands):
+        layout = QVBoxLayout(self)
+
+        self._date_checks = self._add_check_group(layout, "Datas", dates, first_only=True)
+        self._band_checks = self._add_check_group(layout, "Bandas", bands)
+
+        zoom_group = QGroupBox("Zoom")
+        zoom_form = QFormLayout(zoom_group)
+        self._spin_zmin = QSpinBox()
+        self._spin_zmin.setRange(0, 18)
+        self._spin_zmin.setValue(12)
+        zoom_form.addRow("Mínimo:", self._spin_zmin)
+        self._spin_zmax = QSpinBox()
+        self._spin_zmax.setRange(0, 18)
+        self._spin_zmax.setValue(16)
+        zoom_form.addRow("Máximo:", self._spin_zmax)
+        layout.addWidget(zoom_group)
+
+        self._spin_zmin.valueChanged.connect(self._update_estimate)
+        self._spin_zmax.valueChanged.connect(self._update_estimate)
+
+        self._estimate_label = QLabel()
+        self._estimate_label.setWordWrap(True)
+        layout.addWidget(self._estimate_label)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        self._button_box = QDialogButtonBox(
+            QDialogButtonBox.Ok | QDialogButtonBox.Cancel
+        )
+        self._button_box.button(QDialogButtonBox.Ok).setText("Baixar")
+        self._button_box.accepted.connect(self.accept)
+        self._button_box.rejected.connect(self.reject)
+        btn_layout.addWidget(self._button_box)
+        layout.addLayout(btn_layout)
+
+    def _add_check_group(self, layout, title, items, first_only=False):
+        group = QGroupBox(title)
+        group_layout = QVBoxLayout(group)
+        checks = []
+        for i, (key, label) in enumerate(items):
+            check = QCheckBox(label)
+            check.setProperty("key", key)
+            check.setChecked(i == 0 or not first_only)
+            check.toggled.connect(self._update_estimate)
+            group_layout.addWidget(check)
+            checks.append(check)
+        layout.addWidget(group)
+        return checks
+
+    def _update_estimate(self):
+        templates = self._templates_for(self.selected_dates(), self.selected_bands())
+        tiles = count_plan_tiles(
+            self._bbox, templates, self._spin_zmin.value(),
+            self._spin_zmax.value(), self._extents,
+        ) if self._spin_zmin.value() <= self._spin_zmax.value() else 0
+        estimated = int(tiles * self._avg_tile_bytes)
+        text = f"Estimativa: {tiles} tiles (~{format_bytes(estimated)})"
+        ok = 0 < tiles <= MAX_PREFETCH_TILES and estimated <= self._max_cache_bytes
+        if tiles > MAX_PREFETCH_TILES:
+            text += (
+                f"<br><span style='color:#c0392b'>Acima do limite de "
+                f"{MAX_PREFETCH_TILES} tiles — reduza o zoom máximo.</span>"
+            )
+        elif estimated > self._max_cache_bytes:
+            text += (
+                f"<br><span style='color:#c0392b'>Maior que o cache de tiles "
+                f"({format_bytes(self._max_cache_bytes)}) — reduza o zoom máximo "
+                f"ou aumente o limite nas configurações.</span>"
+            )
+        self._estimate_label.setText(text)
+        self._button_box.button(QDialogButtonBox.Ok).setEnabled(ok)
+
+    def selected_dates(self):
+        return [c.property("key") for c in self._date_checks if c.isChecked()]
+
+    def selected_bands(self):
+        return [c.property("key") for c in self._band_checks if c.isChecked()]
+
+    def zoom_range(self):
+        return self._spin_zmin.value(), self._spin_zmax.value()
@@ -3,6 +3,13 @@
 Captura clique no canvas, reprojeta o ponto para EPSG:4674 (CRS aceito
 pelo backend SatIrriga) e emite o sinal point_clicked(lat, lon).
 Mantem um unico QgsVertexMarker que segue o ultimo ponto consultado.
+
+No modo hover cada movimento passa primeiro pelo ``cache_probe`` (se
+configurado): ponto atendido sem rede (cache local) e entregue na hora.
+So os demais sao emitidos em point_hovered quando o mouse fica parado
+por ``_HOVER_DEBOUNCE_MS``; durante um movimento continuo sai no maximo
+uma amostra a cada ``_HOVER_SAMPLE_MS``. Cada ponto atendido leva os
+seguintes na direcao do movimento em prefetch_requested.
 """
 
 from qgis.PyQt.QtGui import QColor
@@ -11,40 +18,127 @@ from qgis.core import (
     QgsCoordinateTransform,
     QgsProject,
 )
-from qgis.PyQt.QtCore import pyqtSignal
+from qgis.PyQt.QtCore import QTimer, pyqtSignal
 from qgis.gui import QgsMapToolEmitPoint, QgsVertexMarker
 
+from ...domain.services.pixel_index_cache import points_ahead
+
 
 _CRS_4674 = QgsCoordinateReferenceSystem("EPSG:4674")
 _MARKER_COLOR = "#1976D2"
+# Pausa do cursor que dispara a consulta do hover
+_HOVER_DEBOUNCE_MS = 120
+# Amostra maxima durante movimento continuo (mais lenta que o debounce)
+_HOVER_SAMPLE_MS = 400
+_PREFETCH_POINTS = 2
 
 
 class PixelInspectMapTool(QgsMapToolEmitPoint):
     """Ferramenta de mapa para consulta de pixel/indice por ponto."""
 
     point_clicked = pyqtSignal(float, float)  # lat, lon (EPSG:4674)
+    point_hovered = pyqtSignal(float, float)  # lat, lon (EPSG:4674)
+    prefetch_requested = pyqtSignal(list)     # [(lat, lon)] a frente do cursor
 
     def __init__(self, canvas):
         super().__init__(canvas)
         self._canvas = canvas
         self._marker = None
+        self._hover_enabled = False
+        self._hover_point = None       # ultimo ponto do mouse (coords do mapa)
+        self._last_hovered = None      # (lat, lon) do ultimo ponto atendido
+        self._cache_probe = None       # (lat, lon) -> bool: atendido sem rede
+        self._hover_timer = QTimer()
+        self._hover_timer.setSingleShot(True)
+        self._hover_timer.setInterval(_HOVER_DEBOUNCE_MS)
+        self._hover_timer.timeout.connect(self._emit_hover)
+        self._sample_timer = QTimer()
+        self._sample_timer.setSingleShot(True)
+        self._sample_timer.setInterval(_HOVER_SAMPLE_MS)
+        self._sample_timer.timeout.connect(self._emit_hover)
+
+    def set_hover_enabled(self, enabled: bool):
+        self._hover_enabled = bool(enabled)
+        if not self._hover_enabled:
+            self._stop_hover_timers()
+            self._hover_point = None
+            self._last_hovered = None
+
+    @property
+    def hover_enabled(self) -> bool:
+        return self._hover_enabled
+
+    def set_cache_probe(self, probe):
+        """``probe(lat, lon) -> bool`` consultado a cada movimento do hover."""
+        self._cache_probe = probe
+
+    def canvasMoveEvent(self, event):
+        if not self._hover_enabled:
+            return
+        self._hover_point = self.toMapCoordinates(event.pos())
+        if self._cache_probe is not None:
+            lat, lon = self._to_4674(self._hover_point)
+            if (lat, lon) == self._last_hovered:
+                self._stop_hover_timers()
+                return
+            if self._cache_probe(lat, lon):
+                # Cache cobre o ponto: sem debounce (so a rede e limitada)
+                self._stop_hover_timers()
+                self._hovered(lat, lon)
+                return
+        # Debounce: reinicia a cada movimento, dispara quando o mouse para
+        self._hover_timer.start()
+        # Amostra nao e reiniciada: limita a taxa em movimento continuo
+        if not self._sample_timer.isActive():
+            self._sample_timer.start()
 
     def canvasReleaseEvent(self, event):
         map_point = self.toMapCoordinates(event.pos())
+        lat, lon = self._to_4674(map_point)
+
+        self._update_marker(map_point)
+
+        self.point_clicked.emit(lat, lon)
 
+    def deactivate(self):
+        self._stop_hover_timers()
+        self._last_hovered = None
+        super().deactivate()
+
+    def _stop_hover_timers(self):
+        self._hover_timer.stop()
+        self._sample_timer.stop()
+
+    def _emit_hover(self):
+        # Uma emissao atende os dois timers: a amostra recomeca no proximo
+        # movimento
+        self._sample_timer.stop()
+        if self._hover_point is None:
+            return
+        lat, lon = self._to_4674(self._hover_point)
+        if (lat, lon) == self._last_hovered:
+            return
+        self.point_hovered.emit(lat, lon)
+        self._hovered(lat, lon)
+
+    def _hovered(self, lat, lon):
+        """Marcador + prefetch a frente do ponto recem atendido."""
+        self._update_marker(self._hover_point)
+        if self._last_hovered is not None:
+            ahead = points_ahead(lat, lon, *self._last_hovered, count=_PREFETCH_POINTS)
+            if ahead:
+                self.prefetch_requested.emit(ahead)
+        self._last_hovered = (lat, lon)
+
+    @staticmethod
+    def _to_4674(map_point):
         transform = QgsCoordinateTransform(
             QgsProject.instance().crs(),
             _CRS_4674,
             QgsProject.instance(),
         )
         point_4674 = transform.transform(map_point)
-
-        self._update_marker(map_point)
-
-        self.point_clicked.emit(
-            round(point_4674.y(), 6),  # lat
-            round(point_4674.x(), 6),  # lon
-        )
+        return round(point_4674.y(), 6), round(point_4674.x(), 6)  # lat, lon
 
     def _update_marker(self, map_point):
         if self._marker is None:
@@ -62,4 +156,5 @@ class PixelInspectMapTool(QgsMapToolEmitPoint):
             self._marker = None
 
     def cleanup(self):
+        self._stop_hover_timers()
         self.clear_marker()
@@ -3,20 +3,20 @@
 import os
 from datetime import datetime
 
-from qgis.PyQt.QtCore import Qt, QSize
-from qgis.PyQt.QtGui import QColor, QFontMetrics, QIcon, QTextDocument
+from qgis.PyQt.QtCore import Qt, QSize, pyqtSignal
+from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QListWidget, QListWidgetItem, QSizePolicy, QMessageBox,
-    QGraphicsDropShadowEffect, QComboBox, QToolButton,
+    QMessageBox, QComboBox, QToolButton,
 )
 from qgis.core import QgsProject, QgsVectorLayer, QgsMessageLog, Qgis
 
 from ...domain.models.enums import SyncStatusEnum, ZonalStatusEnum
 from ...domain.services.mapeamento_service import format_metodo_label
+from ...app.state.local_gpkgs import LocalGpkgModel
 from ...infra.config.settings import PLUGIN_NAME
 from ..theme import SectionHeader
-from ..icon_utils import tinted_icon
+from .card_list import CardAction, CardBadge, CardLine, CardListView, CardSpec
 
 _ICONS_DIR = os.path.join(
     os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
@@ -36,7 +36,14 @@ _SYNC_COLORS = {
 
 
 class CamadasTab(QWidget):
-    """Lista GPKGs locais com status de sync e ações — layout em cards."""
+    """Lista GPKGs locais com status de sync e ações — layout em cards.
+
+    A lista é alimentada pelo ``LocalGpkgModel``: inserções, alterações e
+    remoções chegam por entrada e apenas a linha afetada é atualizada na
+    ``CardListView``.
+    """
+
+    gpkg_list_changed = pyqtSignal()  # lista/contagens de sync alteradas
 
     def __init__(self, state, mapeamento_controller, parent=None):
         super().__init__(parent)
@@ -44,7 +51,14 @@ class CamadasTab(QWidget):
         self._controller = mapeamento_controller
         self._gpkg_list = []
         self._active_batch_uuid = None
-        self._cards_by_zonal = {}        # (zonal_id, origin) -> card widget
+        self._queue_statuses = {}        # zonal_id -> ultimo status da fila
+        self._upload_busy = False
+        self._encerrar_block = None      # tooltip enquanto Encerrar bloqueado
+        self._model = LocalGpkgModel(
+            self._controller.get_gpkg_base_dir,
+            self._controller.gpkg_inspector,
+            self,
+        )
         self._intermediate_statuses = {
             "PROCESSING", "OVERLAID", "CREATED", "CONSOLIDATING",
         }
@@ -96,16 +110,8 @@ class CamadasTab(QWidget):
         layout.addLayout(sort_row)
 
         # Lista de cards
-        self._card_list = QListWidget()
-        self._card_list.setSelectionMode(QListWidget.NoSelection)
-        self._card_list.setFocusPolicy(Qt.NoFocus)
-        self._card_list.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self._card_list.setVerticalScrollMode(QListWidget.ScrollPerPixel)
-        self._card_list.setSpacing(4)
-        self._card_list.setStyleSheet(
-            "QListWidget { border: none; background: transparent; }"
-            "QListWidget::item { border: none; background: transparent; }"
-        )
+        self._card_list = CardListView(self._card_spec)
+        self._card_list.action_triggered.connect(self._on_card_action)
         layout.addWidget(self._card_list, 1)
 
         # Upload progress widget (inicialmente hidden)
@@ -129,86 +135,40 @@ class CamadasTab(QWidget):
         self._state.error_occurred.connect(self._on_error)
 
         self._controller.zonal_upload_completed.connect(self._on_zonal_upload_done)
-        self._controller.edit_tracking_done.connect(self._refresh_list)
+        self._controller.edit_tracking_done.connect(self._model.schedule_rescan)
+
+        self._model.entries_reset.connect(self._on_entries_reset)
+        self._model.entry_inserted.connect(self._on_entry_inserted)
+        self._model.entry_updated.connect(self._on_entry_updated)
+        self._model.entry_removed.connect(self._on_entry_removed)
         self._state.zonal_status_polled.connect(self._on_zonal_status_polled)
 
     # ================================================================
     # Card factory
     # ================================================================
 
-    def _create_card(self, gpkg_info, counts):
-        """Cria widget de card para um GPKG local."""
-        card = QWidget()
-        card.setAttribute(Qt.WA_StyledBackground, True)
-        card.setStyleSheet(
-            "QWidget#satirriga_card { border: 1px solid palette(mid); border-radius: 6px;"
-            " padding: 6px; background: palette(base); }"
-        )
-        card.setObjectName("satirriga_card")
-
-        shadow = QGraphicsDropShadowEffect(card)
-        shadow.setBlurRadius(8)
-        shadow.setOffset(0, 2)
-        shadow.setColor(QColor(0, 0, 0, 40))
-        card.setGraphicsEffect(shadow)
-
-        layout = QVBoxLayout()
-        layout.setContentsMargins(8, 6, 8, 6)
-        layout.setSpacing(3)
+    def _card_spec(self, gpkg_info):
+        """Monta o ``CardSpec`` de um GPKG local."""
+        from ...domain.models.enums import DownloadOrigin
 
+        counts = gpkg_info.get("sync_counts", {})
         zonal_id = gpkg_info.get("zonal_id")
-        path = gpkg_info.get("path", "")
         mid = gpkg_info.get("mapeamento_id")
 
-        # --- Linha 1: #ID + sync badge + ações ---
-        row1 = QHBoxLayout()
-        row1.setSpacing(6)
-
-        id_text = f"<b>#{mid}</b>" if mid else f"<b>Zonal {zonal_id or '?'}</b>"
-        id_label = QLabel(id_text)
-        id_label.setStyleSheet("font-size: 13px;")
-        row1.addWidget(id_label)
-
+        # --- Cabeçalho: #ID + origem + sync + fila + tamanho ---
         # Origin badge — distingue downloads da aba Mapeamentos vs Homologação
-        from ...domain.models.enums import DownloadOrigin
         origin_enum = DownloadOrigin.coerce(gpkg_info.get("origin"))
         origin_color = "#455A64" if origin_enum == DownloadOrigin.MAPEAMENTOS else "#6A1B9A"
-        origin_badge = QLabel(origin_enum.label)
-        origin_badge.setStyleSheet(
-            f"background-color: {origin_color}; color: white;"
-            " border-radius: 3px; padding: 1px 6px; font-size: 10px;"
-        )
-        origin_badge.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Fixed)
-        row1.addWidget(origin_badge)
-
-        # Sync status badge
         sync_text, sync_color = self._format_sync_status(counts)
-        badge = QLabel(sync_text)
-        badge.setStyleSheet(
-            f"background-color: {sync_color}; color: white;"
-            " border-radius: 3px; padding: 1px 6px; font-size: 10px; font-weight: bold;"
-        )
-        badge.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Fixed)
-        row1.addWidget(badge)
-
+        badges = [
+            CardBadge(origin_enum.label, origin_color),
+            CardBadge(sync_text, sync_color),
+        ]
         # Queue status badge (overlay/zonal) — visível somente durante polling
-        queue_badge = QLabel()
-        queue_badge.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Fixed)
-        queue_badge.setVisible(False)
-        row1.addWidget(queue_badge)
-        card._queue_badge = queue_badge
-
-        row1.addStretch()
+        if zonal_id in self._queue_statuses:
+            badges.append(self._queue_badge(self._queue_statuses[zonal_id]))
 
-        # Tamanho
-        size_mb = gpkg_info.get("size_mb", 0)
-        size_label = QLabel(f"{size_mb} MB")
-        size_label.setStyleSheet("font-size: 10px; color: #757575;")
-        row1.addWidget(size_label)
-
-        layout.addLayout(row1)
-
-        # --- Linha 2: data + método (espelha mapeamentos_tab._create_card) ---
+        # --- Linha 2: data + método (espelha mapeamentos_tab._card_spec) ---
         data_ref = "—"
         raw_date = gpkg_info.get("data_referencia")
         if raw_date:
@@ -217,140 +177,78 @@ class CamadasTab(QWidget):
                 data_ref = dt.strftime("%d/%m/%Y")
             except (ValueError, AttributeError):
                 data_ref = str(raw_date)[:10]
-
         metodo_label = format_metodo_label(gpkg_info.get("metodo_apply"))
-        meta = QLabel(f"{data_ref}  ·  {metodo_label}")
-        meta.setStyleSheet("font-size: 11px; color: #757575;")
-        layout.addWidget(meta)
-
-        # --- Linha 3: descrição (HTML, máx 3 linhas, com tooltip) ---
-        desc_label = QLabel()
-        desc_label.setTextFormat(Qt.RichText)
-        desc_label.setWordWrap(True)
-        desc_label.setStyleSheet("font-size: 11px; padding: 0;")
-        line_height = QFontMetrics(desc_label.font()).lineSpacing()
-        desc_label.setMaximumHeight(line_height * 3 + 4)
-
-        descricao_raw = gpkg_info.get("descricao") or ""
-        plain = ""
-        if descricao_raw:
-            doc = QTextDocument()
-            doc.setHtml(descricao_raw)
-            plain = doc.toPlainText().strip()
-
-        if plain:
-            fm = QFontMetrics(desc_label.font())
-            max_width = 400
-            displayed = []
-            for line in plain.split("\n"):
-                if len(displayed) >= 3:
-                    break
-                displayed.append(fm.elidedText(line, Qt.ElideRight, max_width))
-            desc_label.setText("<br>".join(displayed))
-            desc_label.setToolTip(plain)
-        else:
-            fallback = f"Zonal {zonal_id or '?'}"
-            desc_label.setText(f"<i style='color:#9E9E9E'>{fallback}</i>")
 
-        layout.addWidget(desc_label)
-
-        # --- Linha 3: ações ---
-        row3 = QHBoxLayout()
-        row3.setSpacing(4)
-        row3.addStretch()
+        lines = [
+            CardLine.text(f"{data_ref}  ·  {metodo_label}"),
+            # --- Linha 3: descrição (máx 3 linhas, com tooltip) ---
+            CardLine.description(
+                gpkg_info.get("descricao"), f"Zonal {zonal_id or '?'}",
+            ),
+        ]
 
+        # --- Ações ---
         modified = counts.get("MODIFIED", 0)
         new = counts.get("NEW", 0)
         deleted = counts.get("DELETED", 0)
-        has_changes = modified > 0 or new > 0 or deleted > 0
-
-        # Abrir
-        btn_open = QPushButton(tinted_icon(os.path.join(_ICONS_DIR, "action_folder_open.svg"), "#FFFFFF"), "Abrir")
-        btn_open.setIconSize(QSize(14, 14))
-        btn_open.setFixedWidth(65)
-        btn_open.setToolTip("Abrir GeoPackage como camada editável no QGIS")
-        btn_open.setStyleSheet(
-            "QPushButton { background-color: #1976D2; color: white;"
-            " border: none; padding: 3px 8px; border-radius: 3px; font-size: 11px; }"
-            "QPushButton:hover { background-color: #1565C0; }"
-        )
-        btn_open.clicked.connect(
-            lambda _, p=path, zid=zonal_id: self._open_gpkg(p, zid)
-        )
-        row3.addWidget(btn_open)
-
-        # Enviar
-        btn_upload = QPushButton(tinted_icon(os.path.join(_ICONS_DIR, "action_upload.svg"), "#FFFFFF"), "Enviar")
-        btn_upload.setIconSize(QSize(14, 14))
-        btn_upload.setFixedWidth(65)
-        if has_changes:
-            btn_upload.setEnabled(True)
-            btn_upload.setStyleSheet(
-                "QPushButton { background-color: #FF9800; color: white;"
-                " border: none; padding: 3px 8px; border-radius: 3px; font-size: 11px; }"
-                "QPushButton:hover { background-color: #F57C00; }"
-            )
-            btn_upload.setToolTip(f"{modified + new + deleted} feature(s) para enviar")
-            btn_upload.clicked.connect(
-                lambda _, p=path: self._upload_gpkg(p)
-            )
-        else:
-            btn_upload.setEnabled(False)
-            btn_upload.setStyleSheet(
-                "QPushButton { background-color: #E0E0E0; color: #9E9E9E;"
-                " border: none; padding: 3px 8px; border-radius: 3px; font-size: 11px; }"
-            )
-            btn_upload.setToolTip("Sem alterações para enviar")
-        row3.addWidget(btn_upload)
-
-        # Remover
-        btn_remove = QPushButton()
-        btn_remove.setIcon(QIcon(os.path.join(_ICONS_DIR, "action_remove.svg")))
-        btn_remove.setFixedWidth(28)
-        btn_remove.setStyleSheet(
-            "QPushButton { background-color: #F44336; color: white;"
-            " border: none; padding: 3px; border-radius: 3px; font-size: 11px; }"
-            "QPushButton:hover { background-color: #D32F2F; }"
-        )
-        btn_remove.setToolTip("Remover GeoPackage local")
-        btn_remove.clicked.connect(
-            lambda _, p=path, mod=modified + new: self._remove_gpkg(p, mod)
-        )
-        row3.addWidget(btn_remove)
+        pending = modified + new + deleted
+
+        actions = [
+            CardAction(
+                "open", "Abrir", "#1976D2", "#1565C0",
+                icon=os.path.join(_ICONS_DIR, "action_folder_open.svg"),
+                enabled=not self._upload_busy,
+                tooltip="Abrir GeoPackage como camada editável no QGIS",
+            ),
+            CardAction(
+                "upload", "Enviar", "#FF9800", "#F57C00",
+                icon=os.path.join(_ICONS_DIR, "action_upload.svg"),
+                enabled=pending > 0 and not self._upload_busy,
+                tooltip=(
+                    f"{pending} feature(s) para enviar" if pending
+                    else "Sem alterações para enviar"
+                ),
+            ),
+            CardAction(
+                "remove", "", "#F44336", "#D32F2F",
+                icon=os.path.join(_ICONS_DIR, "action_remove.svg"),
+                tooltip="Remover GeoPackage local",
+            ),
+        ]
 
         # Encerrar para Homologação (visível quando todo o sync está completo)
         uploaded = counts.get("UPLOADED", 0)
         total = sum(counts.values())
-        all_uploaded = uploaded > 0 and uploaded == total
-        btn_encerrar = None
-        if mid and all_uploaded:
-            btn_encerrar = QPushButton(
-                tinted_icon(
-                    os.path.join(_ICONS_DIR, "action_check.svg"), "#FFFFFF"
-                ),
-                "Encerrar",
-            )
-            btn_encerrar.setIconSize(QSize(14, 14))
-            btn_encerrar.setFixedWidth(75)
-            btn_encerrar.setToolTip("Encerrar mapeamento para homologação")
-            btn_encerrar.setStyleSheet(
-                "QPushButton { background-color: #FF9800; color: white;"
-                " border: none; padding: 3px 8px; border-radius: 3px; font-size: 11px; }"
-                "QPushButton:hover { background-color: #F57C00; }"
-                "QPushButton:disabled { background-color: #FFE0B2; color: #BDBDBD; }"
-            )
-            btn_encerrar.clicked.connect(
-                lambda _, m=mid: self._encerrar_mapeamento(m)
-            )
-            row3.addWidget(btn_encerrar)
-
-        layout.addLayout(row3)
+        if mid and uploaded > 0 and uploaded == total:
+            actions.append(CardAction(
+                "encerrar", "Encerrar", "#FF9800", "#F57C00",
+                icon=os.path.join(_ICONS_DIR, "action_check.svg"),
+                enabled=self._encerrar_block is None,
+                tooltip=self._encerrar_block or "Encerrar mapeamento para homologação",
+                disabled_color="#FFE0B2",
+            ))
+
+        return CardSpec(
+            title=f"#{mid}" if mid else f"Zonal {zonal_id or '?'}",
+            badges=badges,
+            right_text=f"{gpkg_info.get('size_mb', 0)} MB",
+            lines=lines,
+            action_rows=[actions],
+        )
 
-        card.setLayout(layout)
-        card._action_buttons = [btn_open, btn_upload]
-        card._btn_encerrar = btn_encerrar
-        card._zonal_id = zonal_id
-        return card
+    def _on_card_action(self, key, gpkg_info):
+        path = gpkg_info.get("path", "")
+        counts = gpkg_info.get("sync_counts", {})
+        if key == "open":
+            self._open_gpkg(path, gpkg_info.get("zonal_id"))
+        elif key == "upload":
+            self._upload_gpkg(path)
+        elif key == "remove":
+            self._remove_gpkg(
+                path, counts.get("MODIFIED", 0) + counts.get("NEW", 0),
+            )
+        elif key == "encerrar":
+            self._encerrar_mapeamento(gpkg_info.get("mapeamento_id"))
 
     @staticmethod
     def _format_sync_status(counts):
@@ -389,11 +287,8 @@ class CamadasTab(QWidget):
 
     def _on_loading_changed(self, operation, is_loading):
         if operation == "upload":
-            for row in range(self._card_list.count()):
-                widget = self._card_list.itemWidget(self._card_list.item(row))
-                if widget and hasattr(widget, "_action_buttons"):
-                    for btn in widget._action_buttons:
-                        btn.setEnabled(not is_loading)
+            self._upload_busy = is_loading
+            self._card_list.card_model.refresh()
 
     def _on_upload_progress(self, status_data):
         """Atualiza widget de progresso de upload."""
@@ -420,12 +315,8 @@ class CamadasTab(QWidget):
 
     def _set_encerrar_buttons_enabled(self, enabled, tooltip=None):
         """Habilita/desabilita botões Encerrar em todos os cards."""
-        for row in range(self._card_list.count()):
-            widget = self._card_list.itemWidget(self._card_list.item(row))
-            if widget and hasattr(widget, "_btn_encerrar") and widget._btn_encerrar:
-                widget._btn_encerrar.setEnabled(enabled)
-                if tooltip:
-                    widget._btn_encerrar.setToolTip(tooltip)
+        self._encerrar_block = None if enabled else (tooltip or "")
+        self._card_list.card_model.refresh()
 
     def _on_zonal_upload_done(self, gpkg_path, zonal_id):
         # Atualiza contagens de sync local. Sempre consulta o servidor para
@@ -457,16 +348,14 @@ class CamadasTab(QWidget):
 
     def _apply_queue_badge_all(self, zonal_id, status):
         """Aplica badge em todos os cards que referenciam o zonal (Mapeamentos/Homologação)."""
-        for (zid, _origin), card in self._cards_by_zonal.items():
-            if zid == zonal_id and hasattr(card, "_queue_badge"):
-                self._apply_queue_badge(card, status)
+        self._queue_statuses[zonal_id] = status
+        self._card_list.card_model.refresh(
+            lambda entry: entry.get("zonal_id") == zonal_id
+        )
 
     @staticmethod
-    def _apply_queue_badge(card, status):
-        """Atualiza texto/cor do badge de status da fila no card."""
-        badge = getattr(card, "_queue_badge", None)
-        if badge is None:
-            return
+    def _queue_badge(status):
+        """Badge de status da fila (texto/cor conforme ``ZonalStatusEnum``)."""
         try:
             enum = ZonalStatusEnum(status)
             label_text = enum.label
@@ -474,13 +363,10 @@ class CamadasTab(QWidget):
         except ValueError:
             label_text = status or "Processando"
             color = "#FF9800"
-        badge.setText(f"⚙ {label_text}")
-        badge.setToolTip("Andamento da fila de overlay/zonal no servidor")
-        badge.setStyleSheet(
-            f"background-color: {color}; color: white;"
-            " border-radius: 3px; padding: 1px 6px; font-size: 10px; font-weight: bold;"
+        return CardBadge(
+            f"⚙ {label_text}", color,
+            tooltip="Andamento da fila de overlay/zonal no servidor",
         )
-        badge.setVisible(True)
 
     def _on_upload_cancelled(self):
         QgsMessageLog.logMessage(
@@ -567,26 +453,41 @@ class CamadasTab(QWidget):
     # ================================================================
 
     def _refresh_list(self):
-        """Atualiza lista de GPKGs locais com status de sync."""
-        from ...domain.services.gpkg_service import (
-            list_local_gpkgs, count_features_by_sync_status,
-        )
-
-        try:
-            base_dir = self._controller.get_gpkg_base_dir()
-            raw_list = list_local_gpkgs(base_dir)
-            for entry in raw_list:
-                entry["sync_counts"] = count_features_by_sync_status(entry["path"])
-            self._gpkg_list = raw_list
-        except Exception as e:
-            QgsMessageLog.logMessage(
-                f"Erro ao listar GPKGs: {e}", PLUGIN_NAME, Qgis.Warning,
-            )
-            self._gpkg_list = []
+        """Relista GPKGs locais; só os cards que mudaram são recriados."""
+        self._model.rescan()
 
+    def _on_entries_reset(self, entries):
+        """Lista completa (primeira carga ou pasta base alterada)."""
+        self._gpkg_list = list(entries)
         self._sort_gpkg_list()
         self._render_cards()
         self._fetch_statuses_for_visible_cards()
+        self.gpkg_list_changed.emit()
+
+    def _on_entry_inserted(self, entry):
+        self._gpkg_list.append(entry)
+        self._sort_gpkg_list()
+        self._insert_card(entry)
+        self._update_status_label()
+        zid = entry.get("zonal_id")
+        if zid is not None and self._state.is_authenticated:
+            self._controller.start_polling_zonal(zid)
+        self.gpkg_list_changed.emit()
+
+    def _on_entry_updated(self, entry):
+        path = entry["path"]
+        self._take_card(path)
+        self._gpkg_list = [e for e in self._gpkg_list if e["path"] != path]
+        self._gpkg_list.append(entry)
+        self._sort_gpkg_list()
+        self._insert_card(entry)
+        self.gpkg_list_changed.emit()
+
+    def _on_entry_removed(self, path):
+        self._take_card(path)
+        self._gpkg_list = [e for e in self._gpkg_list if e["path"] != path]
+        self._update_status_label()
+        self.gpkg_list_changed.emit()
 
     def _fetch_statuses_for_visible_cards(self):
         """Inicia polling de status para cada zonal renderizado.
@@ -607,29 +508,30 @@ class CamadasTab(QWidget):
             self._controller.start_polling_zonal(zid)
 
     def _render_cards(self):
-        self._card_list.clear()
-        self._cards_by_zonal = {}
+        self._update_status_label()
+        self._card_list.card_model.set_items(self._gpkg_list)
 
+    def _update_status_label(self):
         if not self._gpkg_list:
             self._status_label.setText("Nenhuma camada local encontrada")
             self._status_label.setVisible(True)
-            return
-
-        self._status_label.setVisible(False)
-
-        for gpkg_info in self._gpkg_list:
-            counts = gpkg_info.get("sync_counts", {})
-            card = self._create_card(gpkg_info, counts)
+        else:
+            self._status_label.setVisible(False)
 
-            zid = gpkg_info.get("zonal_id")
-            origin_key = gpkg_info.get("origin") or "mapeamentos"
-            if zid is not None:
-                self._cards_by_zonal[(zid, origin_key)] = card
+    def _insert_card(self, gpkg_info):
+        """Insere o card na linha correspondente a ``_gpkg_list`` (já ordenada)."""
+        path = gpkg_info["path"]
+        row = next(
+            i for i, e in enumerate(self._gpkg_list) if e["path"] == path
+        )
+        self._card_list.card_model.insert_item(row, gpkg_info)
 
-            list_item = QListWidgetItem(self._card_list)
-            list_item.setSizeHint(card.sizeHint() + QSize(0, 8))
-            self._card_list.addItem(list_item)
-            self._card_list.setItemWidget(list_item, card)
+    def _take_card(self, path):
+        """Remove o card de ``path`` da lista (sem recriar os demais)."""
+        model = self._card_list.card_model
+        row = model.find_row(lambda entry: entry["path"] == path)
+        if row >= 0:
+            model.remove_row(row)
 
     # ================================================================
     # Actions
@@ -705,9 +607,11 @@ class CamadasTab(QWidget):
             os.remove(gpkg_path)
 
             from ...domain.services.gpkg_service import sidecar_path
+            from ...domain.services.gpkg_catalog import unindex_gpkg
             sc_path = sidecar_path(gpkg_path)
             if os.path.exists(sc_path):
                 os.remove(sc_path)
+            unindex_gpkg(gpkg_path)
 
             QgsMessageLog.logMessage(
                 f"GPKG removido: {gpkg_path}", PLUGIN_NAME, Qgis.Info,
@@ -730,6 +634,10 @@ class CamadasTab(QWidget):
         """Adiciona uma entrada de GPKG após download."""
         self._refresh_list()
 
+    def gpkg_entries(self):
+        """Entradas exibidas (com ``sync_counts``)."""
+        return list(self._gpkg_list)
+
     def cleanup(self):
         """Cleanup de recursos da aba de camadas."""
-        pass
+        self._model.cleanup()
@@ -0,0 +1,558 @@
+"""Lista de cards virtualizada (model/view) compartilhada pelas abas.
+
+Substitui ``QListWidget.setItemWidget`` — que criava um QWidget completo
+(labels, botões, sombra) por item — por um ``QAbstractListModel`` com os
+itens e um delegate que pinta somente as linhas visíveis.
+
+Cada aba descreve o card de um item como um ``CardSpec`` (título, badges,
+linhas de texto e ações). O spec é montado sob demanda, quando a linha é
+medida/pintada; o model guarda só a altura de cada linha e um número
+limitado de specs (LRU), de modo que a memória não cresce com a lista.
+Os botões de ação são apenas pintados: o clique é resolvido por hit-test
+no delegate e chega à aba por ``CardListView.action_triggered(chave, item)``.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from qgis.PyQt.QtCore import (
+    Qt, QAbstractListModel, QEvent, QModelIndex, QRect, QRectF, QSize,
+    pyqtSignal,
+)
+from qgis.PyQt.QtGui import QColor, QFont, QFontMetrics, QPainter, QPen, QTextDocument
+from qgis.PyQt.QtWidgets import QListView, QStyledItemDelegate, QToolTip
+
+from ..icon_utils import tinted_icon
+
+SpecRole = Qt.UserRole + 1
+ItemRole = Qt.UserRole + 2
+
+# Geometria do card (px) — espelha os antigos layouts de QWidget
+_PAD_X = 8
+_PAD_Y = 6
+_SPACING = 3
+_GAP = 6
+_BUTTON_H = 22
+_BADGE_H = 18
+_ICON = 14
+_RADIUS = 6
+_SHADOW = 2
+
+# Specs mantidos em memória (linhas visíveis + margem de rolagem)
+_SPEC_CACHE_SIZE = 200
+
+
+# ================================================================
+# Spec do card
+# ================================================================
+
+@dataclass
+class CardBadge:
+    """Etiqueta colorida no cabeçalho do card."""
+    text: str
+    color: str
+    tooltip: str = ""
+
+
+@dataclass
+class CardAction:
+    """Botão pintado no card; ``key`` identifica a ação no sinal de clique."""
+    key: str
+    label: str = ""
+    color: str = "#1976D2"
+    hover_color: str = ""
+    icon: str = ""                # caminho de SVG (pintado em branco)
+    enabled: bool = True
+    tooltip: str = ""
+    disabled_color: str = "#E0E0E0"
+
+
+@dataclass
+class CardLine:
+    """Linha de texto do card.
+
+    ``segments`` é uma lista de ``(texto, cor, negrito)`` desenhados em
+    sequência; o último segmento é truncado com reticências. Texto com
+    quebras de linha ocupa até ``max_lines`` linhas.
+    """
+    segments: list
+    size: int = 11
+    italic: bool = False
+    right: str = ""               # texto cinza alinhado à direita
+    max_lines: int = 1
+    tooltip: str = ""
+
+    @classmethod
+    def text(cls, text, color="#757575", bold=False, **kwargs):
+        return cls([(text, color, bold)], **kwargs)
+
+    @classmethod
+    def description(cls, html, empty_text, max_lines=3):
+        """Descrição HTML convertida em texto puro (até ``max_lines`` linhas)."""
+        plain = ""
+        if html:
+            doc = QTextDocument()
+            doc.setHtml(html)
+            plain = doc.toPlainText().strip()
+        if not plain:
+            return cls.text(empty_text, "#9E9E9E", italic=True)
+        lines = plain.split("\n")[:max_lines]
+        return cls.text(
+            "\n".join(lines), "palette", max_lines=max_lines, tooltip=plain,
+        )
+
+    @property
+    def line_count(self):
+        text = "".join(seg[0] for seg in self.segments)
+        return min(self.max_lines, text.count("\n") + 1)
+
+
+@dataclass
+class CardSpec:
+    """Descrição declarativa de um card."""
+    title: str
+    badges: List[CardBadge] = field(default_factory=list)
+    note: Optional[Tuple[str, str]] = None     # (texto, cor) em itálico
+    right_text: str = ""
+    header_actions: List[CardAction] = field(default_factory=list)
+    lines: List[CardLine] = field(default_factory=list)
+    action_rows: List[List[CardAction]] = field(default_factory=list)
+
+
+# ================================================================
+# Model
+# ================================================================
+
+class CardListModel(QAbstractListModel):
+    """Itens da lista + specs montados sob demanda por ``spec_builder``."""
+
+    def __init__(self, spec_builder: Callable, parent=None):
+        super().__init__(parent)
+        self._spec_builder = spec_builder
+        self._items = []
+        self._specs = []
+        self._heights = []
+        self._spec_rows = OrderedDict()   # LRU das linhas com spec em memória
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._items):
+            return None
+        if role == SpecRole:
+            return self.spec(index.row())
+        if role == ItemRole:
+            return self._items[index.row()]
+        return None
+
+    def spec(self, row):
+        spec = self._specs[row]
+        if spec is None:
+            spec = self._spec_builder(self._items[row])
+            self._specs[row] = spec
+            if len(self._spec_rows) >= _SPEC_CACHE_SIZE:
+                oldest, _ = self._spec_rows.popitem(last=False)
+                self._specs[oldest] = None
+        self._spec_rows[row] = None
+        self._spec_rows.move_to_end(row)
+        return spec
+
+    def height(self, row):
+        """Altura medida da linha (None se ainda não medida)."""
+        return self._heights[row]
+
+    def set_height(self, row, height):
+        self._heights[row] = height
+
+    def _forget(self, row):
+        self._specs[row] = None
+        self._heights[row] = None
+        self._spec_rows.pop(row, None)
+
+    def _shift_spec_rows(self, row, delta):
+        self._spec_rows = OrderedDict(
+            (r + delta if r >= row else r, None) for r in self._spec_rows
+        )
+
+    # --- Consulta ---
+
+    def items(self):
+        return list(self._items)
+
+    def item(self, row):
+        return self._items[row]
+
+    def find_row(self, predicate) -> int:
+        for row, item in enumerate(self._items):
+            if predicate(item):
+                return row
+        return -1
+
+    # --- Alteração ---
+
+    def set_items(self, items):
+        self.beginResetModel()
+        self._items = list(items)
+        self._specs = [None] * len(self._items)
+        self._heights = [None] * len(self._items)
+        self._spec_rows.clear()
+        self.endResetModel()
+
+    def clear(self):
+        self.set_items([])
+
+    def insert_item(self, row, item):
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._shift_spec_rows(row, 1)
+        self._items.insert(row, item)
+        self._specs.insert(row, None)
+        self._heights.insert(row, None)
+        self.endInsertRows()
+
+    def remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._spec_rows.pop(row, None)
+        self._shift_spec_rows(row + 1, -1)
+        del self._items[row]
+        del self._specs[row]
+        del self._heights[row]
+        self.endRemoveRows()
+
+    def refresh(self, predicate=None):
+        """Descarta o spec das linhas (todas ou as que casam) e repinta."""
+        for row, item in enumerate(self._items):
+            if predicate is None or predicate(item):
+                self._forget(row)
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+
+# ================================================================
+# Delegate
+# ================================================================
+
+def _font(base, size, bold=False, italic=False):
+    font = QFont(base)
+    font.setPixelSize(size)
+    font.setBold(bold)
+    font.setItalic(italic)
+    return font
+
+
+class CardDelegate(QStyledItemDelegate):
+    """Pinta ``CardSpec`` e resolve cliques/tooltips por hit-test."""
+
+    action_triggered = pyqtSignal(str, object)  # (chave da ação, item)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._icons = {}
+        self._hover = None   # (row, chave da ação)
+
+    # --- Medidas ---
+
+    def sizeHint(self, option, index):
+        model = index.model()
+        height = model.height(index.row())
+        if height is None:
+            spec = index.data(SpecRole)
+            if spec is None:
+                return QSize(0, 0)
+            height = _PAD_Y * 2 + self._header_height(option, spec) + _SHADOW
+            for line in spec.lines:
+                fm = QFontMetrics(_font(option.font, line.size))
+                height += _SPACING + fm.lineSpacing() * line.line_count
+            height += len(spec.action_rows) * (_SPACING + _BUTTON_H)
+            model.set_height(index.row(), height)
+        return QSize(option.rect.width(), height)
+
+    @staticmethod
+    def _header_height(option, spec):
+        fm = QFontMetrics(_font(option.font, 13, bold=True))
+        height = max(fm.height(), _BADGE_H)
+        if spec.header_actions:
+            height = max(height, _BUTTON_H)
+        return height
+
+    def _button_width(self, option, action):
+        if not action.label:
+            return 28
+        fm = QFontMetrics(_font(option.font, 11))
+        width = fm.horizontalAdvance(action.label) + 24
+        if action.icon:
+            width += _ICON + 4
+        return width
+
+    def _layout(self, option, spec):
+        """Elementos do card e seus retângulos: ``[(tipo, objeto, QRect)]``."""
+        rect = option.rect.adjusted(1, 0, -1, -_SHADOW)
+        inner = rect.adjusted(_PAD_X, _PAD_Y, -_PAD_X, -_PAD_Y)
+        parts = []
+
+        # Cabeçalho: título e badges à esquerda; nota, texto e ações à direita
+        header_h = self._header_height(option, spec)
+        y = inner.top()
+        right = inner.right()
+        for action in reversed(spec.header_actions):
+            width = self._button_width(option, action)
+            top = y + (header_h - _BUTTON_H) // 2
+            parts.append(("action", action, QRect(right - width + 1, top, width, _BUTTON_H)))
+            right -= width + 4
+        if spec.right_text:
+            fm = QFontMetrics(_font(option.font, 10))
+            width = fm.horizontalAdvance(spec.right_text)
+            parts.append(("right", spec.right_text, QRect(right - width + 1, y, width, header_h)))
+            right -= width + _GAP
+        if spec.note:
+            fm = QFontMetrics(_font(option.font, 10, italic=True))
+            width = fm.horizontalAdvance(spec.note[0]) + 12
+            parts.append(("note", spec.note, QRect(right - width + 1, y, width, header_h)))
+            right -= width + _GAP
+
+        fm = QFontMetrics(_font(option.font, 13, bold=True))
+        width = min(fm.horizontalAdvance(spec.title) + 2, max(0, right - inner.left()))
+        parts.append(("title", spec.title, QRect(inner.left(), y, width, header_h)))
+        x = inner.left() + width + _GAP
+        fm_badge = QFontMetrics(_font(option.font, 10, bold=True))
+        for badge in spec.badges:
+            width = min(fm_badge.horizontalAdvance(badge.text) + 12, max(0, right - x))
+            if width <= 12:
+                break
+            top = y + (header_h - _BADGE_H) // 2
+            parts.append(("badge", badge, QRect(x, top, width, _BADGE_H)))
+            x += width + _GAP
+        y += header_h
+
+        # Linhas de texto
+        for line in spec.lines:
+            fm = QFontMetrics(_font(option.font, line.size))
+            height = fm.lineSpacing() * line.line_count
+            y += _SPACING
+            parts.append(("line", line, QRect(inner.left(), y, inner.width(), height)))
+            y += height
+
+        # Linhas de ações (alinhadas à direita)
+        for row in spec.action_rows:
+            y += _SPACING
+            right = inner.right()
+            for action in reversed(row):
+                width = self._button_width(option, action)
+                parts.append(("action", action, QRect(right - width + 1, y, width, _BUTTON_H)))
+                right -= width + 4
+            y += _BUTTON_H
+
+        return rect, parts
+
+    def _hit(self, option, spec, pos):
+        _, parts = self._layout(option, spec)
+        for kind, obj, r in parts:
+            if r.contains(pos):
+                return kind, obj
+        return None, None
+
+    # --- Pintura ---
+
+    def paint(self, painter, option, index):
+        spec = index.data(SpecRole)
+        if spec is None:
+            return
+        rect, parts = self._layout(option, spec)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Sombra + fundo
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 40))
+        painter.drawRoundedRect(QRectF(rect.translated(0, _SHADOW)), _RADIUS, _RADIUS)
+        painter.setBrush(option.palette.base())
+        painter.setPen(QPen(option.palette.mid().color(), 1))
+        painter.drawRoundedRect(QRectF(rect).adjusted(0.5, 0.5, -0.5, -0.5), _RADIUS, _RADIUS)
+
+        text_color = option.palette.text().color()
+        for kind, obj, r in parts:
+            if kind == "title":
+                painter.setFont(_font(option.font, 13, bold=True))
+                painter.setPen(text_color)
+                painter.drawText(r, Qt.AlignVCenter | Qt.AlignLeft,
+                                 painter.fontMetrics().elidedText(obj, Qt.ElideRight, r.width()))
+            elif kind == "badge":
+                self._paint_pill(painter, r, obj.color)
+                painter.setFont(_font(option.font, 10, bold=True))
+                painter.setPen(QColor("white"))
+                painter.drawText(r.adjusted(6, 0, -6, 0), Qt.AlignCenter,
+                                 painter.fontMetrics().elidedText(obj.text, Qt.ElideRight, r.width() - 12))
+            elif kind == "note":
+                painter.setFont(_font(option.font, 10, italic=True))
+                painter.setPen(QColor(obj[1]))
+                painter.drawText(r, Qt.AlignVCenter | Qt.AlignRight, obj[0])
+            elif kind == "right":
+                painter.setFont(_font(option.font, 10))
+                painter.setPen(QColor("#757575"))
+                painter.drawText(r, Qt.AlignVCenter | Qt.AlignRight, obj)
+            elif kind == "line":
+                self._paint_line(painter, option, obj, r, text_color)
+            elif kind == "action":
+                hovered = self._hover == (index.row(), obj.key)
+                self._paint_button(painter, option, obj, r, hovered)
+
+        painter.restore()
+
+    @staticmethod
+    def _paint_pill(painter, rect, color):
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(color))
+        painter.drawRoundedRect(QRectF(rect), 3, 3)
+
+    def _paint_line(self, painter, option, line, rect, text_color):
+        fm_plain = QFontMetrics(_font(option.font, line.size, italic=line.italic))
+        available = rect.width()
+        if line.right:
+            painter.setFont(_font(option.font, line.size))
+            painter.setPen(QColor("#757575"))
+            right_w = fm_plain.horizontalAdvance(line.right)
+            painter.drawText(
+                QRect(rect.right() - right_w + 1, rect.top(), right_w, fm_plain.lineSpacing()),
+                Qt.AlignLeft | Qt.AlignTop, line.right,
+            )
+            available -= right_w + _GAP
+
+        x = rect.left()
+        for i, (text, color, bold) in enumerate(line.segments):
+            font = _font(option.font, line.size, bold=bold, italic=line.italic)
+            painter.setFont(font)
+            painter.setPen(text_color if color == "palette" else QColor(color))
+            fm = painter.fontMetrics()
+            last = i == len(line.segments) - 1
+            y = rect.top()
+            width = 0
+            for text_line in text.split("\n")[:line.max_lines]:
+                room = max(0, available - (x - rect.left()))
+                shown = fm.elidedText(text_line, Qt.ElideRight, room) if last else text_line
+                painter.drawText(
+                    QRect(x, y, room, fm.lineSpacing()), Qt.AlignLeft | Qt.AlignTop, shown,
+                )
+                width = max(width, fm.horizontalAdvance(shown))
+                y += fm.lineSpacing()
+            x += width
+
+    def _paint_button(self, painter, option, action, rect, hovered):
+        if not action.enabled:
+            color = action.disabled_color
+        elif hovered and action.hover_color:
+            color = action.hover_color
+        else:
+            color = action.color
+        self._paint_pill(painter, rect, color)
+
+        content = rect.adjusted(12 if action.label else 0, 0, -12 if action.label else 0, 0)
+        fg = QColor("white") if action.enabled else QColor("#9E9E9E")
+        if action.icon:
+            icon = self._icon(action.icon)
+            if action.label:
+                icon_rect = QRect(content.left(), rect.top() + (rect.height() - _ICON) // 2, _ICON, _ICON)
+                content.setLeft(icon_rect.right() + 5)
+            else:
+                icon_rect = QRect(rect.center().x() - _ICON // 2 + 1,
+                                  rect.top() + (rect.height() - _ICON) // 2, _ICON, _ICON)
+            icon.paint(painter, icon_rect)
+        if action.label:
+            painter.setFont(_font(option.font, 11))
+            painter.setPen(fg)
+            painter.drawText(content, Qt.AlignVCenter | Qt.AlignLeft, action.label)
+
+    def _icon(self, path):
+        icon = self._icons.get(path)
+        if icon is None:
+            icon = tinted_icon(path, "#FFFFFF")
+            self._icons[path] = icon
+        return icon
+
+    # --- Interação ---
+
+    def editorEvent(self, event, model, option, index):
+        etype = event.type()
+        if etype not in (QEvent.MouseMove, QEvent.MouseButtonPress,
+                         QEvent.MouseButtonRelease, QEvent.MouseButtonDblClick):
+            return False
+        spec = index.data(SpecRole)
+        if spec is None:
+            return False
+        kind, obj = self._hit(option, spec, event.pos())
+        action = obj if kind == "action" and obj.enabled else None
+
+        if etype == QEvent.MouseMove:
+            self._set_hover(index.row() if action else None, action.key if action else None)
+            return False
+        if action is None or event.button() != Qt.LeftButton:
+            return False
+        if etype == QEvent.MouseButtonRelease:
+            self.action_triggered.emit(action.key, index.data(ItemRole))
+        return True
+
+    def _set_hover(self, row, key):
+        hover = (row, key) if key else None
+        if hover == self._hover:
+            return
+        self._hover = hover
+        view = self.parent()
+        if view is not None:
+            view.setCursor(Qt.PointingHandCursor if hover else Qt.ArrowCursor)
+            view.viewport().update()
+
+    def clear_hover(self):
+        self._set_hover(None, None)
+
+    def helpEvent(self, event, view, option, index):
+        spec = index.data(SpecRole)
+        tooltip = ""
+        if spec is not None:
+            kind, obj = self._hit(option, spec, event.pos())
+            if kind in ("action", "badge", "line"):
+                tooltip = obj.tooltip
+        if tooltip:
+            QToolTip.showText(event.globalPos(), tooltip, view)
+        else:
+            QToolTip.hideText()
+        return True
+
+
+# ================================================================
+# View
+# ================================================================
+
+class CardListView(QListView):
+    """``QListView`` pré-configurada com ``CardListModel`` + ``CardDelegate``."""
+
+    action_triggered = pyqtSignal(str, object)  # (chave da ação, item)
+
+    def __init__(self, spec_builder: Callable, parent=None):
+        super().__init__(parent)
+        self._card_model = CardListModel(spec_builder, self)
+        self._delegate = CardDelegate(self)
+        self.setModel(self._card_model)
+        self.setItemDelegate(self._delegate)
+        self._delegate.action_triggered.connect(self.action_triggered)
+        # Spec recriado pode mudar a altura da linha
+        self._card_model.dataChanged.connect(self._on_rows_changed)
+
+        self.setSelectionMode(QListView.NoSelection)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.setSpacing(4)
+        self.setMouseTracking(True)
+        self.setStyleSheet("QListView { border: none; background: transparent; }")
+
+    @property
+    def card_model(self) -> CardListModel:
+        return self._card_model
+
+    def _on_rows_changed(self, *_args):
+        self.scheduleDelayedItemsLayout()
+
+    def leaveEvent(self, event):
+        self._delegate.clear_hover()
+        super().leaveEvent(event)
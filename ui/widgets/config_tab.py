@@ -100,6 +100,24 @@ class ConfigTab(QWidget):
         self._fields["auto_zoom_on_load"] = QCheckBox("Zoom automático ao carregar camada")
         form.addRow("", self._fields["auto_zoom_on_load"])
 
+        # Cache de tiles (0 desativa)
+        self._fields["tile_cache_max_mb"] = QSpinBox()
+        self._fields["tile_cache_max_mb"].setRange(0, 50000)
+        self._fields["tile_cache_max_mb"].setSingleStep(256)
+        self._fields["tile_cache_max_mb"].setSuffix(" MB")
+        self._fields["tile_cache_max_mb"].setToolTip(
+            "Espaço em disco para tiles de imagens já visualizadas (0 desativa)"
+        )
+        form.addRow("Cache de tiles:", self._fields["tile_cache_max_mb"])
+
+        # Mosaico: uma camada por data + banda (requer o cache de tiles)
+        self._fields["raster_mosaic"] = QCheckBox("Unir cenas de uma data em uma camada")
+        self._fields["raster_mosaic"].setToolTip(
+            "Cada banda de uma data vira um único mosaico em vez de uma camada "
+            "por cena Sentinel-2 (requer cache de tiles ativo)"
+        )
+        form.addRow("", self._fields["raster_mosaic"])
+
         # Log level
         self._fields["log_level"] = QComboBox()
         self._fields["log_level"].addItems(["DEBUG", "INFO", "WARNING", "ERROR"])
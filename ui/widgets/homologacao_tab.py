@@ -4,11 +4,10 @@ import os
 from datetime import datetime
 
 from qgis.PyQt.QtCore import Qt, QSize, QTimer
-from qgis.PyQt.QtGui import QColor, QIcon, QTextDocument, QFontMetrics
+from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QComboBox, QLineEdit,
-    QLabel, QListWidget, QListWidgetItem, QFrame, QSizePolicy,
-    QGraphicsDropShadowEffect, QMessageBox, QToolButton,
+    QLabel, QFrame, QMessageBox, QToolButton,
 )
 
 _ICONS_DIR = os.path.join(
@@ -22,7 +21,7 @@ from ..theme import SectionHeader
 
 from ...domain.models.enums import ZonalStatusEnum, DownloadOrigin
 from ...infra.config.settings import PLUGIN_NAME
-from ..icon_utils import tinted_icon
+from .card_list import CardAction, CardBadge, CardLine, CardListView, CardSpec
 
 
 # Opções de ordenação: label exibido → campo da API
@@ -57,6 +56,10 @@ class HomologacaoTab(QWidget):
         self._total_pages = 1
         self._total_items = 0
 
+        # Downloads em andamento refletidos nos botões dos cards
+        self._downloading_zonals = set()
+        self._downloading_mapeamentos = set()
+
         # Debounce para filtros textuais
         self._search_timer = QTimer(self)
         self._search_timer.setSingleShot(True)
@@ -149,16 +152,8 @@ class HomologacaoTab(QWidget):
         layout.addLayout(sort_row)
 
         # Lista de cards
-        self._card_list = QListWidget()
-        self._card_list.setSelectionMode(QListWidget.NoSelection)
-        self._card_list.setFocusPolicy(Qt.NoFocus)
-        self._card_list.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self._card_list.setVerticalScrollMode(QListWidget.ScrollPerPixel)
-        self._card_list.setSpacing(4)
-        self._card_list.setStyleSheet(
-            "QListWidget { border: none; background: transparent; }"
-            "QListWidget::item { border: none; background: transparent; }"
-        )
+        self._card_list = CardListView(self._card_spec)
+        self._card_list.action_triggered.connect(self._on_card_action)
         layout.addWidget(self._card_list, 1)
 
         # Paginação
@@ -195,37 +190,12 @@ class HomologacaoTab(QWidget):
         self.setLayout(layout)
 
     # ================================================================
-    # Card factory
+    # Card spec
     # ================================================================
 
-    def _create_card(self, item):
-        """Cria widget de card para um CatalogoItem de homologação."""
-        card = QWidget()
-        card.setAttribute(Qt.WA_StyledBackground, True)
-        card.setStyleSheet(
-            "QWidget#satirriga_card { border: 1px solid palette(mid); border-radius: 6px;"
-            " padding: 6px; background: palette(base); }"
-        )
-        card.setObjectName("satirriga_card")
-
-        shadow = QGraphicsDropShadowEffect(card)
-        shadow.setBlurRadius(8)
-        shadow.setOffset(0, 2)
-        shadow.setColor(QColor(0, 0, 0, 40))
-        card.setGraphicsEffect(shadow)
-
-        layout = QVBoxLayout()
-        layout.setContentsMargins(8, 6, 8, 6)
-        layout.setSpacing(3)
-
-        # --- Linha 1: #ID + status badge ---
-        row1 = QHBoxLayout()
-        row1.setSpacing(6)
-
-        id_label = QLabel(f"<b>#{item.mapeamento_id or 0}</b>")
-        id_label.setStyleSheet("font-size: 13px;")
-        row1.addWidget(id_label)
-
+    def _card_spec(self, item):
+        """Monta o ``CardSpec`` de um CatalogoItem de homologação."""
+        # --- Cabeçalho: #ID + status badge ---
         status_text = item.status
         status_color = "#9E9E9E"
         try:
@@ -235,17 +205,6 @@ class HomologacaoTab(QWidget):
         except ValueError:
             pass
 
-        badge = QLabel(status_text)
-        badge.setStyleSheet(
-            f"background-color: {status_color}; color: white;"
-            " border-radius: 3px; padding: 1px 6px; font-size: 10px; font-weight: bold;"
-        )
-        badge.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Fixed)
-        row1.addWidget(badge)
-
-        row1.addStretch()
-        layout.addLayout(row1)
-
         # --- Linha 2: data + método + máscara ---
         data_ref = "—"
         if item.data_referencia:
@@ -261,9 +220,7 @@ class HomologacaoTab(QWidget):
         meta_parts = [data_ref, metodo_label]
         if item.mascara_nome:
             meta_parts.append(item.mascara_nome)
-        meta = QLabel("  ·  ".join(meta_parts))
-        meta.setStyleSheet("font-size: 11px; color: #757575;")
-        layout.addWidget(meta)
+        lines = [CardLine.text("  ·  ".join(meta_parts))]
 
         # --- Linha 2b: data de edição ---
         if item.processed_at:
@@ -274,9 +231,7 @@ class HomologacaoTab(QWidget):
                 edit_date = dt_edit.strftime("%d/%m/%Y")
             except (ValueError, AttributeError):
                 edit_date = str(item.processed_at)[:10]
-            edit_label = QLabel(f"Editado em: {edit_date}")
-            edit_label.setStyleSheet("font-size: 10px; color: #757575;")
-            layout.addWidget(edit_label)
+            lines.append(CardLine.text(f"Editado em: {edit_date}", size=10))
 
         # --- Linha 2c: dados de homologação (quando HOMOLOGADO) ---
         if item.status == "HOMOLOGADO" and item.homologado_at:
@@ -290,186 +245,96 @@ class HomologacaoTab(QWidget):
             hom_text = f"Homologado em: {hom_date}"
             if item.homologador_nome:
                 hom_text += f" por {item.homologador_nome}"
-            hom_label = QLabel(hom_text)
-            hom_label.setStyleSheet("font-size: 10px; color: #2E7D32;")
-            layout.addWidget(hom_label)
+            lines.append(CardLine.text(hom_text, "#2E7D32", size=10))
 
         # --- Linha 3: descrição HTML (máximo 3 linhas) ---
-        desc_label = QLabel()
-        desc_label.setTextFormat(Qt.RichText)
-        desc_label.setWordWrap(True)
-        desc_label.setStyleSheet("font-size: 11px; padding: 0;")
-        line_height = QFontMetrics(desc_label.font()).lineSpacing()
-        desc_label.setMaximumHeight(line_height * 3 + 4)
-
-        plain = ""
-        if item.descricao:
-            doc = QTextDocument()
-            doc.setHtml(item.descricao)
-            plain = doc.toPlainText().strip()
-
-        if plain:
-            fm = QFontMetrics(desc_label.font())
-            max_width = 400
-            lines = plain.split("\n")
-            displayed = []
-            for line in lines:
-                if len(displayed) >= 3:
-                    break
-                elided = fm.elidedText(line, Qt.ElideRight, max_width)
-                displayed.append(elided)
-            desc_label.setText("<br>".join(displayed))
-            desc_label.setToolTip(plain)
-        else:
-            desc_label.setText("<i style='color:#9E9E9E'>Sem descrição</i>")
-
-        layout.addWidget(desc_label)
+        lines.append(CardLine.description(item.descricao, "Sem descrição"))
 
         # --- Linha 4: autor + features ---
-        row4 = QHBoxLayout()
-        row4.setSpacing(6)
-
-        author = QLabel(f"Autor: {item.author or '—'}")
-        author.setStyleSheet("font-size: 11px; color: #757575;")
-        row4.addWidget(author)
-
-        row4.addStretch()
+        lines.append(CardLine.text(
+            f"Autor: {item.author or '—'}",
+            right=f"{item.result_count or 0} feições",
+        ))
 
-        feat_area = f"{item.result_count or 0} feições"
-        stats = QLabel(feat_area)
-        stats.setStyleSheet("font-size: 11px; color: #757575;")
-        row4.addWidget(stats)
-
-        layout.addLayout(row4)
+        action_rows = []
 
         # --- Linha 5: ações de homologação ---
         if item.status == "AGUARDANDO":
-            row_actions = QHBoxLayout()
-            row_actions.setSpacing(4)
-            row_actions.addStretch()
-
-            btn_aprovar = QPushButton(tinted_icon(os.path.join(_ICONS_DIR, "action_check.svg"), "#FFFFFF"), "Aprovar")
-            btn_aprovar.setIconSize(QSize(14, 14))
-            btn_aprovar.setStyleSheet(
-                "QPushButton { background-color: #2E7D32; color: white;"
-                " border: none; padding: 3px 12px; border-radius: 3px; font-size: 11px; }"
-                "QPushButton:hover { background-color: #1B5E20; }"
-            )
-            btn_aprovar.clicked.connect(
-                lambda _, zid=item.id: self._on_parecer(zid)
-            )
-            row_actions.addWidget(btn_aprovar)
-
-            btn_devolver = QPushButton(tinted_icon(os.path.join(_ICONS_DIR, "action_undo.svg"), "#FFFFFF"), "Devolver")
-            btn_devolver.setIconSize(QSize(14, 14))
-            btn_devolver.setToolTip("Devolver para edição — retorna ao editor com orientações")
-            btn_devolver.setStyleSheet(
-                "QPushButton { background-color: #1565C0; color: white;"
-                " border: none; padding: 3px 12px; border-radius: 3px; font-size: 11px; }"
-                "QPushButton:hover { background-color: #0D47A1; }"
-            )
-            btn_devolver.clicked.connect(
-                lambda _, zid=item.id: self._on_devolver(zid)
-            )
-            row_actions.addWidget(btn_devolver)
-
-            btn_reprovar = QPushButton(tinted_icon(os.path.join(_ICONS_DIR, "action_x.svg"), "#FFFFFF"), "Reprovar")
-            btn_reprovar.setIconSize(QSize(14, 14))
-            btn_reprovar.setStyleSheet(
-                "QPushButton { background-color: #C62828; color: white;"
-                " border: none; padding: 3px 12px; border-radius: 3px; font-size: 11px; }"
-                "QPushButton:hover { background-color: #B71C1C; }"
-            )
-            btn_reprovar.clicked.connect(
-                lambda _, zid=item.id: self._on_parecer(zid)
-            )
-            row_actions.addWidget(btn_reprovar)
-
-            layout.addLayout(row_actions)
+            action_rows.append([
+                CardAction(
+                    "aprovar", "Aprovar", "#2E7D32", "#1B5E20",
+                    icon=os.path.join(_ICONS_DIR, "action_check.svg"),
+                ),
+                CardAction(
+                    "devolver", "Devolver", "#1565C0", "#0D47A1",
+                    icon=os.path.join(_ICONS_DIR, "action_undo.svg"),
+                    tooltip="Devolver para edição — retorna ao editor com orientações",
+                ),
+                CardAction(
+                    "reprovar", "Reprovar", "#C62828", "#B71C1C",
+                    icon=os.path.join(_ICONS_DIR, "action_x.svg"),
+                ),
+            ])
 
         # --- Linha 6: ações secundárias (Baixar, Retirar, Excluir) ---
-        row_secondary = QHBoxLayout()
-        row_secondary.setSpacing(4)
-        row_secondary.addStretch()
-
-        is_homologado_card = (
-            item.status == "HOMOLOGADO" and item.mapeamento_id is not None
-        )
-
-        if is_homologado_card:
-            btn_download = QPushButton(
-                tinted_icon(os.path.join(_ICONS_DIR, "action_download.svg"), "#FFFFFF"),
-                "Baixar Mapeamento Homologado",
-            )
-            btn_download.setIconSize(QSize(14, 14))
-            btn_download.setToolTip(
-                "Baixar GeoPackage consolidado do mapeamento homologado (somente leitura)"
-            )
-            btn_download.setStyleSheet(
-                "QPushButton { background-color: #2E7D32; color: white;"
-                " border: none; padding: 3px 12px; border-radius: 3px; font-size: 11px; }"
-                "QPushButton:hover { background-color: #1B5E20; }"
-                "QPushButton:disabled { background-color: #A5D6A7; }"
-            )
-            btn_download.clicked.connect(
-                lambda _, mid=item.mapeamento_id, ci=item:
-                    self._on_download_mapeamento_homologado(mid, ci)
-            )
-            row_secondary.addWidget(btn_download)
+        secondary = []
+        if self._is_homologado_card(item):
+            secondary.append(CardAction(
+                "download_homologado", "Baixar Mapeamento Homologado",
+                "#2E7D32", "#1B5E20",
+                icon=os.path.join(_ICONS_DIR, "action_download.svg"),
+                enabled=item.mapeamento_id not in self._downloading_mapeamentos,
+                tooltip="Baixar GeoPackage consolidado do mapeamento homologado (somente leitura)",
+                disabled_color="#A5D6A7",
+            ))
         else:
-            btn_download = QPushButton(
-                tinted_icon(os.path.join(_ICONS_DIR, "action_download.svg"), "#FFFFFF"),
-                "Baixar",
-            )
-            btn_download.setIconSize(QSize(14, 14))
-            btn_download.setToolTip("Baixar resultado zonal como GeoPackage editável")
-            btn_download.setStyleSheet(
-                "QPushButton { background-color: #1976D2; color: white;"
-                " border: none; padding: 3px 12px; border-radius: 3px; font-size: 11px; }"
-                "QPushButton:hover { background-color: #1565C0; }"
-                "QPushButton:disabled { background-color: #90CAF9; }"
-            )
-            btn_download.clicked.connect(
-                lambda _, zid=item.id, ci=item: self._on_download(zid, ci)
-            )
-            row_secondary.addWidget(btn_download)
+            secondary.append(CardAction(
+                "download", "Baixar", "#1976D2", "#1565C0",
+                icon=os.path.join(_ICONS_DIR, "action_download.svg"),
+                enabled=item.id not in self._downloading_zonals,
+                tooltip="Baixar resultado zonal como GeoPackage editável",
+                disabled_color="#90CAF9",
+            ))
 
         if item.status == "HOMOLOGADO":
-            btn_retirar = QPushButton(tinted_icon(os.path.join(_ICONS_DIR, "action_rotate_ccw.svg"), "#FFFFFF"), "Retirar")
-            btn_retirar.setIconSize(QSize(14, 14))
-            btn_retirar.setToolTip("Retirar homologação — reverte para reanálise")
-            btn_retirar.setStyleSheet(
-                "QPushButton { background-color: #E65100; color: white;"
-                " border: none; padding: 3px 12px; border-radius: 3px; font-size: 11px; }"
-                "QPushButton:hover { background-color: #BF360C; }"
-            )
-            btn_retirar.clicked.connect(
-                lambda _, zid=item.id: self._on_retirar(zid)
-            )
-            row_secondary.addWidget(btn_retirar)
+            secondary.append(CardAction(
+                "retirar", "Retirar", "#E65100", "#BF360C",
+                icon=os.path.join(_ICONS_DIR, "action_rotate_ccw.svg"),
+                tooltip="Retirar homologação — reverte para reanálise",
+            ))
 
         if item.mapeamento_id:
-            btn_suprimir = QPushButton(tinted_icon(os.path.join(_ICONS_DIR, "action_trash.svg"), "#FFFFFF"), "Excluir")
-            btn_suprimir.setIconSize(QSize(14, 14))
-            btn_suprimir.setToolTip("Excluir mapeamento definitivamente")
-            btn_suprimir.setStyleSheet(
-                "QPushButton { background-color: #7B1FA2; color: white;"
-                " border: none; padding: 3px 12px; border-radius: 3px; font-size: 11px; }"
-                "QPushButton:hover { background-color: #4A148C; }"
-            )
-            btn_suprimir.clicked.connect(
-                lambda _, mid=item.mapeamento_id: self._on_suprimir(mid)
-            )
-            row_secondary.addWidget(btn_suprimir)
-
-        layout.addLayout(row_secondary)
+            secondary.append(CardAction(
+                "suprimir", "Excluir", "#7B1FA2", "#4A148C",
+                icon=os.path.join(_ICONS_DIR, "action_trash.svg"),
+                tooltip="Excluir mapeamento definitivamente",
+            ))
+        action_rows.append(secondary)
+
+        return CardSpec(
+            title=f"#{item.mapeamento_id or 0}",
+            badges=[CardBadge(status_text, status_color)],
+            lines=lines,
+            action_rows=action_rows,
+        )
 
-        card.setLayout(layout)
-        card._download_btn = btn_download
-        card._zonal_id = item.id
-        card._mapeamento_id = item.mapeamento_id
-        card._is_homologado_card = is_homologado_card
-        return card
+    @staticmethod
+    def _is_homologado_card(item):
+        return item.status == "HOMOLOGADO" and item.mapeamento_id is not None
+
+    def _on_card_action(self, key, item):
+        if key in ("aprovar", "reprovar"):
+            self._on_parecer(item.id)
+        elif key == "devolver":
+            self._on_devolver(item.id)
+        elif key == "download":
+            self._on_download(item.id, item)
+        elif key == "download_homologado":
+            self._on_download_mapeamento_homologado(item.mapeamento_id, item)
+        elif key == "retirar":
+            self._on_retirar(item.id)
+        elif key == "suprimir":
+            self._on_suprimir(item.mapeamento_id)
 
     # ================================================================
     # Signals / slots
@@ -487,7 +352,7 @@ class HomologacaoTab(QWidget):
         if is_authenticated:
             self._load_data()
         else:
-            self._card_list.clear()
+            self._card_list.card_model.clear()
 
     def _on_text_filter_changed(self, _text):
         """Debounce nos filtros textuais — reseta para página 1."""
@@ -531,7 +396,7 @@ class HomologacaoTab(QWidget):
         self._current_page = pagination.get("page", 1)
         self._total_pages = pagination.get("totalPages", 1)
         self._total_items = pagination.get("total", len(items))
-        self._card_list.clear()
+        self._card_list.card_model.set_items(items)
 
         if not items:
             self._status_label.setText("Nenhum mapeamento encontrado")
@@ -539,14 +404,6 @@ class HomologacaoTab(QWidget):
             return
 
         self._status_label.setVisible(False)
-
-        for item in items:
-            card = self._create_card(item)
-            list_item = QListWidgetItem(self._card_list)
-            list_item.setSizeHint(card.sizeHint() + QSize(0, 8))
-            self._card_list.addItem(list_item)
-            self._card_list.setItemWidget(list_item, card)
-
         self._update_pagination()
 
     # ================================================================
@@ -669,11 +526,13 @@ class HomologacaoTab(QWidget):
                 self._status_label.setVisible(False)
         elif operation.startswith("download:"):
             target_zonal_id = int(operation.split(":", 1)[1])
-            for row in range(self._card_list.count()):
-                widget = self._card_list.itemWidget(self._card_list.item(row))
-                if widget and hasattr(widget, "_zonal_id") and widget._zonal_id == target_zonal_id:
-                    widget._download_btn.setEnabled(not is_loading)
-                    break
+            if is_loading:
+                self._downloading_zonals.add(target_zonal_id)
+            else:
+                self._downloading_zonals.discard(target_zonal_id)
+            self._card_list.card_model.refresh(
+                lambda item: item.id == target_zonal_id
+            )
         elif operation.startswith("download_homologado:"):
             try:
                 target_mapeamento_id = int(operation.split(":", 1)[1])
@@ -681,13 +540,14 @@ class HomologacaoTab(QWidget):
                 return
             # Desabilita o botao "Baixar Mapeamento Homologado" em TODOS os
             # cards do mesmo mapeamento (varios zonals podem compartilhar id).
-            for row in range(self._card_list.count()):
-                widget = self._card_list.itemWidget(self._card_list.item(row))
-                if (widget
-                        and getattr(widget, "_is_homologado_card", False)
-                        and getattr(widget, "_mapeamento_id", None)
-                        == target_mapeamento_id):
-                    widget._download_btn.setEnabled(not is_loading)
+            if is_loading:
+                self._downloading_mapeamentos.add(target_mapeamento_id)
+            else:
+                self._downloading_mapeamentos.discard(target_mapeamento_id)
+            self._card_list.card_model.refresh(
+                lambda item: self._is_homologado_card(item)
+                and item.mapeamento_id == target_mapeamento_id
+            )
 
     def _on_error(self, operation, message):
         if operation in ("catalogo_homologacao", "parecer"):
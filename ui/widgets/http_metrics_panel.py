@@ -0,0 +1,139 @@
+"""Painel de desempenho HTTP — tabela de metricas por endpoint (aba Logs)."""
+
+from datetime import datetime
+
+from qgis.PyQt.QtCore import Qt, QTimer
+from qgis.PyQt.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QHeaderView, QAbstractItemView, QPushButton, QLabel, QFileDialog,
+    QMessageBox,
+)
+
+from ...infra.http.metrics import get_metrics
+
+
+_HEADERS = [
+    "Endpoint", "N", "p50 ms", "p95 ms", "p99 ms", "Erros %",
+    "Recebido", "Enviado", "Retries", "Status",
+]
+
+
+def _fmt_bytes(n: int) -> str:
+    if n >= 1024 * 1024:
+        return f"{n / (1024 * 1024):.1f} MB"
+    if n >= 1024:
+        return f"{n / 1024:.1f} KB"
+    return f"{n} B"
+
+
+class HttpMetricsPanel(QWidget):
+    """Tabela de latencia/bytes/erros por endpoint com export CSV/JSON."""
+
+    REFRESH_MS = 2000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._metrics = get_metrics()
+        self._build_ui()
+
+        # Atualiza apenas enquanto visivel (showEvent/hideEvent)
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+
+    def _build_ui(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(4)
+
+        self._table = QTableWidget(0, len(_HEADERS))
+        self._table.setHorizontalHeaderLabels(_HEADERS)
+        self._table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self._table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self._table.verticalHeader().setVisible(False)
+        self._table.setMinimumHeight(160)
+        header = self._table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        for col in range(1, len(_HEADERS)):
+            header.setSectionResizeMode(col, QHeaderView.ResizeToContents)
+        layout.addWidget(self._table)
+
+        btn_layout = QHBoxLayout()
+        self._summary = QLabel("")
+        self._summary.setStyleSheet("font-size: 10px; color: #757575;")
+        btn_layout.addWidget(self._summary)
+        btn_layout.addStretch()
+
+        csv_btn = QPushButton("CSV")
+        csv_btn.setToolTip("Exportar métricas em CSV")
+        csv_btn.clicked.connect(lambda: self._on_export("csv"))
+        btn_layout.addWidget(csv_btn)
+
+        json_btn = QPushButton("JSON")
+        json_btn.setToolTip("Exportar métricas em JSON")
+        json_btn.clicked.connect(lambda: self._on_export("json"))
+        btn_layout.addWidget(json_btn)
+
+        reset_btn = QPushButton("Zerar")
+        reset_btn.setToolTip("Reiniciar a coleta de métricas")
+        reset_btn.clicked.connect(self._on_reset)
+        btn_layout.addWidget(reset_btn)
+
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+
+    def refresh(self):
+        rows = self._metrics.snapshot()
+        self._table.setRowCount(len(rows))
+        total = 0
+        for i, row in enumerate(rows):
+            total += row["count"]
+            statuses = " ".join(f"{k}:{v}" for k, v in row["statuses"].items())
+            values = [
+                row["endpoint"],
+                str(row["count"]),
+                f"{row['p50_ms']:.0f}",
+                f"{row['p95_ms']:.0f}",
+                f"{row['p99_ms']:.0f}",
+                f"{row['error_rate'] * 100:.1f}",
+                _fmt_bytes(row["bytes_in"]),
+                _fmt_bytes(row["bytes_out"]),
+                str(row["retries"]),
+                statuses,
+            ]
+            for col, text in enumerate(values):
+                item = QTableWidgetItem(text)
+                if col > 0:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self._table.setItem(i, col, item)
+
+        since = datetime.fromtimestamp(self._metrics.since).strftime("%H:%M:%S")
+        self._summary.setText(f"{total} requests desde {since}")
+
+    def _on_export(self, fmt):
+        default_name = f"satirriga_http_{datetime.now():%Y%m%d_%H%M%S}.{fmt}"
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Exportar métricas HTTP", default_name,
+            "CSV (*.csv)" if fmt == "csv" else "JSON (*.json)",
+        )
+        if not path:
+            return
+        content = self._metrics.to_csv() if fmt == "csv" else self._metrics.to_json()
+        try:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(content)
+        except OSError as e:
+            QMessageBox.warning(self, "Exportar métricas", f"Falha ao salvar: {e}")
+
+    def _on_reset(self):
+        self._metrics.reset()
+        self.refresh()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._timer.stop()
@@ -17,6 +17,7 @@ from qgis.core import QgsApplication, QgsMessageLog
 
 from ...infra.config.settings import PLUGIN_NAME
 from ..theme import SectionHeader
+from .http_metrics_panel import HttpMetricsPanel
 
 
 class LogsTab(QWidget):
@@ -51,6 +52,11 @@ class LogsTab(QWidget):
         )
         layout.addWidget(self._text)
 
+        # Painel de desempenho HTTP (oculto ate o usuario abrir)
+        self._metrics_panel = HttpMetricsPanel()
+        self._metrics_panel.setVisible(False)
+        layout.addWidget(self._metrics_panel)
+
         # Botoes
         btn_layout = QHBoxLayout()
         clear_btn = QPushButton(QIcon(os.path.join(_ICONS_DIR, "action_eraser.svg")), "Limpar")
@@ -67,6 +73,14 @@ class LogsTab(QWidget):
         copy_btn.clicked.connect(self._on_copy)
         btn_layout.addWidget(copy_btn)
 
+        perf_btn = QPushButton("Desempenho")
+        perf_btn.setCheckable(True)
+        perf_btn.setToolTip(
+            "Métricas HTTP por endpoint (latência, bytes, erros, retries)"
+        )
+        perf_btn.toggled.connect(self._metrics_panel.setVisible)
+        btn_layout.addWidget(perf_btn)
+
         btn_layout.addStretch()
         layout.addLayout(btn_layout)
 
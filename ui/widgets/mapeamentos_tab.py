@@ -4,17 +4,16 @@ import os
 from datetime import datetime
 
 from qgis.PyQt.QtCore import Qt, QSize, QTimer, pyqtSignal
-from qgis.PyQt.QtGui import QColor, QIcon, QTextDocument, QFontMetrics
+from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QLabel, QLineEdit, QComboBox, QListWidget, QListWidgetItem,
-    QFrame, QSizePolicy, QGraphicsDropShadowEffect, QToolButton,
+    QLabel, QLineEdit, QComboBox, QFrame, QToolButton,
 )
 
 from qgis.core import QgsMessageLog, Qgis
 
 from ..theme import SectionHeader
-from ..icon_utils import tinted_icon
+from .card_list import CardAction, CardBadge, CardLine, CardListView, CardSpec
 
 from ...domain.models.enums import ZonalStatusEnum, DownloadOrigin
 from ...domain.services.mapeamento_service import format_metodo_label
@@ -55,9 +54,10 @@ class MapeamentosTab(QWidget):
         self._total_pages = 1
         self._total_items = 0
 
-        # Tracking de widgets dinâmicos nos cards
-        self._progress_labels = {}     # zonal_id -> QLabel
-        self._encerrar_buttons = {}    # zonal_id -> QPushButton
+        # Estado dinâmico refletido nos cards
+        self._progress_status = {}     # zonal_id -> ultimo status do polling
+        self._downloading = set()      # zonal_ids com download em andamento
+        self._local_status = {}        # zonal_id -> local_gpkg_status (inspector)
 
         # Debounce timer para busca textual
         self._search_timer = QTimer(self)
@@ -121,16 +121,8 @@ class MapeamentosTab(QWidget):
         root.addWidget(self._build_filters())
 
         # --- Lista de cards ---
-        self._card_list = QListWidget()
-        self._card_list.setSelectionMode(QListWidget.NoSelection)
-        self._card_list.setFocusPolicy(Qt.NoFocus)
-        self._card_list.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self._card_list.setVerticalScrollMode(QListWidget.ScrollPerPixel)
-        self._card_list.setSpacing(4)
-        self._card_list.setStyleSheet(
-            "QListWidget { border: none; background: transparent; }"
-            "QListWidget::item { border: none; background: transparent; }"
-        )
+        self._card_list = CardListView(self._card_spec)
+        self._card_list.action_triggered.connect(self._on_card_action)
         root.addWidget(self._card_list, 1)
 
         # --- Paginação ---
@@ -277,38 +269,12 @@ class MapeamentosTab(QWidget):
         return frame
 
     # ================================================================
-    # Card widget factory
+    # Card spec
     # ================================================================
 
-    def _create_card(self, item):
-        """Cria widget de card para um CatalogoItem."""
-        card = QWidget()
-        card.setAttribute(Qt.WA_StyledBackground, True)
-        card.setStyleSheet(
-            "QWidget#satirriga_card { border: 1px solid palette(mid); border-radius: 6px;"
-            " padding: 6px; background: palette(base); }"
-        )
-        card.setObjectName("satirriga_card")
-
-        shadow = QGraphicsDropShadowEffect(card)
-        shadow.setBlurRadius(8)
-        shadow.setOffset(0, 2)
-        shadow.setColor(QColor(0, 0, 0, 40))
-        card.setGraphicsEffect(shadow)
-
-        layout = QVBoxLayout()
-        layout.setContentsMargins(8, 6, 8, 6)
-        layout.setSpacing(3)
-
-        # --- Linha 1: #ID + status badge + botão baixar ---
-        row1 = QHBoxLayout()
-        row1.setSpacing(6)
-
-        id_label = QLabel(f"<b>#{item.mapeamento_id or 0}</b>")
-        id_label.setStyleSheet("font-size: 13px;")
-        row1.addWidget(id_label)
-
-        # Status badge
+    def _card_spec(self, item):
+        """Monta o ``CardSpec`` de um CatalogoItem."""
+        # --- Cabeçalho: #ID + status badge + ações ---
         status_text = item.status
         status_color = "#9E9E9E"
         try:
@@ -318,16 +284,6 @@ class MapeamentosTab(QWidget):
         except ValueError:
             pass
 
-        badge = QLabel(status_text)
-        badge.setStyleSheet(
-            f"background-color: {status_color}; color: white;"
-            " border-radius: 3px; padding: 1px 6px; font-size: 10px; font-weight: bold;"
-        )
-        badge.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Fixed)
-        row1.addWidget(badge)
-
-        row1.addStretch()
-
         # --- Ações condicionais por status (mutuamente exclusivas) ---
 
         _reprocessable = {
@@ -343,83 +299,35 @@ class MapeamentosTab(QWidget):
         }
 
         is_polling = self._controller.is_polling(item.id)
+        actions = []
+        note = None
 
         if item.status in _reprocessable and not is_polling:
-            # Botão Reprocessar
-            btn_reprocess = QPushButton(
-                tinted_icon(os.path.join(_ICONS_DIR, "action_rotate_cw.svg"), "#FFFFFF"),
-                "Reprocessar",
-            )
-            btn_reprocess.setIconSize(QSize(14, 14))
-            btn_reprocess.setToolTip("Reenviar para processamento de overlay")
-            btn_reprocess.setStyleSheet(
-                "QPushButton { background-color: #FF9800; color: white;"
-                " border: none; padding: 3px 12px; border-radius: 3px; font-size: 11px; }"
-                "QPushButton:hover { background-color: #F57C00; }"
-            )
-            btn_reprocess.clicked.connect(
-                lambda _, zid=item.id: self._reprocess_overlay(zid)
-            )
-            row1.addWidget(btn_reprocess)
+            actions.append(CardAction(
+                "reprocess", "Reprocessar", "#FF9800", "#F57C00",
+                icon=os.path.join(_ICONS_DIR, "action_rotate_cw.svg"),
+                tooltip="Reenviar para processamento de overlay",
+            ))
 
         elif item.status in _intermediate or is_polling:
-            # Label de progresso inline
-            progress_text = self._progress_text_for_status(item.status)
-            lbl_progress = QLabel(progress_text)
-            lbl_progress.setStyleSheet(
-                "font-size: 10px; font-style: italic; color: #FF9800;"
-                " padding: 2px 6px;"
-            )
-            row1.addWidget(lbl_progress)
-            self._progress_labels[item.id] = lbl_progress
+            # Texto de progresso inline (atualizado pelo polling)
+            status = self._progress_status.get(item.id, item.status)
+            note = (self._progress_text_for_status(status), "#FF9800")
 
         elif item.status == ZonalStatusEnum.CONSOLIDATED.value:
-            # Botão Encerrar para Homologação
-            btn_encerrar = QPushButton(
-                tinted_icon(os.path.join(_ICONS_DIR, "action_check.svg"), "#FFFFFF"),
-                "Encerrar",
-            )
-            btn_encerrar.setIconSize(QSize(14, 14))
-            btn_encerrar.setToolTip("Enviar para homologação")
-            btn_encerrar.setStyleSheet(
-                "QPushButton { background-color: #2E7D32; color: white;"
-                " border: none; padding: 3px 12px; border-radius: 3px; font-size: 11px; }"
-                "QPushButton:hover { background-color: #1B5E20; }"
-                "QPushButton:disabled { background-color: #A5D6A7; color: #E8F5E9; }"
-            )
-            btn_encerrar.clicked.connect(
-                lambda _, zid=item.id: self._finalizar_zonal(zid)
-            )
-            row1.addWidget(btn_encerrar)
-            self._encerrar_buttons[item.id] = btn_encerrar
+            actions.append(CardAction(
+                "encerrar", "Encerrar", "#2E7D32", "#1B5E20",
+                icon=os.path.join(_ICONS_DIR, "action_check.svg"),
+                tooltip="Enviar para homologação",
+                disabled_color="#A5D6A7",
+            ))
 
         elif item.status in _parecer_statuses and item.mapeamento_id:
-            # Botão Ver Parecer
-            btn_parecer = QPushButton(
-                tinted_icon(os.path.join(_ICONS_DIR, "action_info.svg"), "#FFFFFF"),
-                "Parecer",
-            )
-            btn_parecer.setIconSize(QSize(14, 14))
-            btn_parecer.setToolTip("Visualizar pareceres deste mapeamento")
-            btn_parecer.setStyleSheet(
-                "QPushButton { background-color: #7B1FA2; color: white;"
-                " border: none; padding: 3px 12px; border-radius: 3px; font-size: 11px; }"
-                "QPushButton:hover { background-color: #6A1B9A; }"
-            )
-            btn_parecer.clicked.connect(
-                lambda _, mid=item.mapeamento_id: self._on_view_parecer(mid)
-            )
-            row1.addWidget(btn_parecer)
-
-        btn = QPushButton(tinted_icon(os.path.join(_ICONS_DIR, "action_download.svg"), "#FFFFFF"), "Baixar")
-        btn.setIconSize(QSize(14, 14))
-        btn.setToolTip("Baixar resultado zonal como GeoPackage editável")
-        btn.setStyleSheet(
-            "QPushButton { background-color: #1976D2; color: white;"
-            " border: none; padding: 3px 12px; border-radius: 3px; font-size: 11px; }"
-            "QPushButton:hover { background-color: #1565C0; }"
-            "QPushButton:disabled { background-color: #90CAF9; }"
-        )
+            actions.append(CardAction(
+                "parecer", "Parecer", "#7B1FA2", "#6A1B9A",
+                icon=os.path.join(_ICONS_DIR, "action_info.svg"),
+                tooltip="Visualizar pareceres deste mapeamento",
+            ))
 
         # Desabilitar download para status não-baixáveis
         _downloadable = {
@@ -429,18 +337,21 @@ class MapeamentosTab(QWidget):
             ZonalStatusEnum.HOMOLOGADO.value,
             ZonalStatusEnum.REPROVADO.value,
         }
-        if item.status not in _downloadable:
-            btn.setEnabled(False)
-            btn.setToolTip(f"Download indisponível (status: {status_text})")
-
-        row1.addWidget(btn)
-
-        layout.addLayout(row1)
+        downloading = item.id in self._downloading
+        can_download = item.status in _downloadable
+        actions.append(CardAction(
+            "download", "Baixando..." if downloading else "Baixar",
+            "#1976D2", "#1565C0",
+            icon=os.path.join(_ICONS_DIR, "action_download.svg"),
+            enabled=can_download and not downloading,
+            tooltip=(
+                "Baixar resultado zonal como GeoPackage editável" if can_download
+                else f"Download indisponível (status: {status_text})"
+            ),
+            disabled_color="#90CAF9",
+        ))
 
         # --- Linha 2: data + método ---
-        row2 = QHBoxLayout()
-        row2.setSpacing(6)
-
         data_ref = "—"
         if item.data_referencia:
             try:
@@ -452,100 +363,73 @@ class MapeamentosTab(QWidget):
                 data_ref = item.data_referencia[:10]
 
         metodo_label = format_metodo_label(item.metodo_apply)
-        meta = QLabel(f"{data_ref}  ·  {metodo_label}")
-        meta.setStyleSheet("font-size: 11px; color: #757575;")
-        row2.addWidget(meta)
-        row2.addStretch()
-
-        layout.addLayout(row2)
-
-        # --- Linha 3: descrição HTML (máximo 3 linhas) ---
-        desc_label = QLabel()
-        desc_label.setTextFormat(Qt.RichText)
-        desc_label.setWordWrap(True)
-        desc_label.setStyleSheet("font-size: 11px; padding: 0;")
-        line_height = QFontMetrics(desc_label.font()).lineSpacing()
-        desc_label.setMaximumHeight(line_height * 3 + 4)
-
-        # Extrair texto puro do HTML e limitar a 3 linhas
-        plain = ""
-        if item.descricao:
-            doc = QTextDocument()
-            doc.setHtml(item.descricao)
-            plain = doc.toPlainText().strip()
-
-        if plain:
-            fm = QFontMetrics(desc_label.font())
-            max_width = 400
-            lines = plain.split("\n")
-            displayed = []
-            for line in lines:
-                if len(displayed) >= 3:
-                    break
-                elided = fm.elidedText(line, Qt.ElideRight, max_width)
-                displayed.append(elided)
-            if len(lines) > 3:
-                displayed[-1] = fm.elidedText(lines[2], Qt.ElideRight, max_width)
-            desc_label.setText("<br>".join(displayed))
-            desc_label.setToolTip(plain)
+        lines = [
+            CardLine.text(f"{data_ref}  ·  {metodo_label}"),
+            # --- Linha 3: descrição HTML (máximo 3 linhas) ---
+            CardLine.description(item.descricao, "Sem descrição"),
+            # --- Linha 4: autor + features ---
+            CardLine.text(
+                f"Autor: {item.author or '—'}",
+                right=f"{item.result_count or 0} feições",
+            ),
+        ]
+
+        # --- Linha 5: sinc. local + tamanho GPKG (lido fora da main thread) ---
+        local = self._local_status.get(item.id)
+        if local is None:
+            self._request_local_status(item.id)
+            lines.append(CardLine.text("Verificando cópia local…", "#9E9E9E", size=10))
+        elif local.get("exists"):
+            sidecar = local.get("sidecar") or {}
+            sinc_status = "Baixado"
+            sinc_color = "#2E7D32"
+            if sidecar.get("editToken"):
+                sinc_status = "Em edição"
+                sinc_color = "#1565C0"
+            size_bytes = local.get("size_bytes", 0)
+            if size_bytes > 1024 * 1024:
+                size_str = f"{size_bytes / (1024 * 1024):.1f} MB"
+            else:
+                size_str = f"{size_bytes / 1024:.0f} KB"
+            lines.append(CardLine([
+                (sinc_status, sinc_color, True),
+                (f"  ·  {size_str}", "palette", False),
+            ], size=10))
         else:
-            desc_label.setText("<i style='color:#9E9E9E'>Sem descrição</i>")
-
-        layout.addWidget(desc_label)
-
-        # --- Linha 4: autor + features ---
-        row4 = QHBoxLayout()
-        row4.setSpacing(6)
-
-        author = QLabel(f"Autor: {item.author or '—'}")
-        author.setStyleSheet("font-size: 11px; color: #757575;")
-        row4.addWidget(author)
-
-        row4.addStretch()
+            lines.append(CardLine.text("Não baixado", "#9E9E9E", size=10))
+
+        return CardSpec(
+            title=f"#{item.mapeamento_id or 0}",
+            badges=[CardBadge(status_text, status_color)],
+            note=note,
+            header_actions=actions,
+            lines=lines,
+        )
 
-        feat_area = f"{item.result_count or 0} feições"
-        stats = QLabel(feat_area)
-        stats.setStyleSheet("font-size: 11px; color: #757575;")
-        row4.addWidget(stats)
+    def _request_local_status(self, zonal_id):
+        """Le existencia/tamanho/sidecar do GPKG local no ``GpkgInspector``."""
+        from ...domain.services.gpkg_service import gpkg_path_for_zonal
 
-        layout.addLayout(row4)
+        base = self._controller.get_gpkg_base_dir()
+        gpkg = gpkg_path_for_zonal(base, zonal_id, DownloadOrigin.MAPEAMENTOS.value)
+        self._controller.gpkg_inspector.local_status(
+            gpkg,
+            on_done=lambda status: self._on_local_status(zonal_id, status),
+        )
 
-        # --- Linha 5: sinc. local + tamanho GPKG ---
-        from ...domain.services.gpkg_service import gpkg_path_for_zonal, read_sidecar
-        try:
-            base = self._controller.get_gpkg_base_dir()
-            gpkg = gpkg_path_for_zonal(base, item.id, DownloadOrigin.MAPEAMENTOS.value)
-            row5 = QHBoxLayout()
-            row5.setSpacing(6)
-
-            if os.path.isfile(gpkg):
-                sidecar = read_sidecar(gpkg)
-                sinc_status = "Baixado"
-                sinc_color = "#2E7D32"
-                if sidecar.get("editToken"):
-                    sinc_status = "Em edição"
-                    sinc_color = "#1565C0"
-                size_bytes = os.path.getsize(gpkg)
-                if size_bytes > 1024 * 1024:
-                    size_str = f"{size_bytes / (1024 * 1024):.1f} MB"
-                else:
-                    size_str = f"{size_bytes / 1024:.0f} KB"
-                sinc_label = QLabel(f"<b style='color:{sinc_color}'>{sinc_status}</b>  ·  {size_str}")
-            else:
-                sinc_label = QLabel("<span style='color:#9E9E9E'>Não baixado</span>")
-            sinc_label.setStyleSheet("font-size: 10px;")
-            sinc_label.setTextFormat(Qt.RichText)
-            row5.addWidget(sinc_label)
-            row5.addStretch()
-
-            layout.addLayout(row5)
-        except Exception:
-            pass
+    def _on_local_status(self, zonal_id, status):
+        self._local_status[zonal_id] = status
+        self._card_list.card_model.refresh(lambda item: item.id == zonal_id)
 
-        card.setLayout(layout)
-        card._download_btn = btn
-        card._zonal_id = item.id
-        return card
+    def _on_card_action(self, key, item):
+        if key == "download":
+            self._on_zonal_download_clicked(item.id, item)
+        elif key == "reprocess":
+            self._reprocess_overlay(item.id)
+        elif key == "encerrar":
+            self._finalizar_zonal(item.id)
+        elif key == "parecer":
+            self._on_view_parecer(item.mapeamento_id)
 
     # ================================================================
     # Signals / slots
@@ -572,7 +456,7 @@ class MapeamentosTab(QWidget):
             self._request_page()
             self._controller.load_notifications()
         else:
-            self._card_list.clear()
+            self._card_list.card_model.clear()
             self._update_pagination_controls()
 
     # ================================================================
@@ -619,9 +503,8 @@ class MapeamentosTab(QWidget):
 
     def _on_catalogo_changed(self, items, pagination):
         """Recebe página de CatalogoItems + metadados de paginação."""
-        self._progress_labels.clear()
-        self._encerrar_buttons.clear()
-        self._card_list.clear()
+        self._progress_status.clear()
+        self._local_status.clear()
 
         # Atualizar estado de paginação
         self._current_page = pagination.get("page", 1)
@@ -635,16 +518,7 @@ class MapeamentosTab(QWidget):
         else:
             self._status_label.setVisible(False)
 
-        for item in items:
-            card = self._create_card(item)
-            card._download_btn.clicked.connect(
-                lambda checked, zid=item.id, ci=item: self._on_zonal_download_clicked(zid, ci)
-            )
-            list_item = QListWidgetItem(self._card_list)
-            list_item.setSizeHint(card.sizeHint() + QSize(0, 8))
-            self._card_list.addItem(list_item)
-            self._card_list.setItemWidget(list_item, card)
-
+        self._card_list.card_model.set_items(items)
         self._update_pagination_controls()
 
     # ================================================================
@@ -812,15 +686,9 @@ class MapeamentosTab(QWidget):
         self._request_page()
 
     def _on_zonal_status_polled(self, zonal_id, status):
-        """Atualiza label de progresso inline quando polling retorna novo status."""
-        lbl = self._progress_labels.get(zonal_id)
-        if lbl is not None:
-            try:
-                lbl.setText(self._progress_text_for_status(status))
-            except RuntimeError:
-                # Widget C++ já destruído
-                self._progress_labels.pop(zonal_id, None)
-                return
+        """Atualiza texto de progresso inline quando polling retorna novo status."""
+        self._progress_status[zonal_id] = status
+        self._card_list.card_model.refresh(lambda item: item.id == zonal_id)
 
         # Status terminal: refresh para recriar card com widget correto
         _intermediate = {"PROCESSING", "OVERLAID", "CREATED", "CONSOLIDATING"}
@@ -869,12 +737,14 @@ class MapeamentosTab(QWidget):
     def _on_loading_changed(self, operation, is_loading):
         if operation.startswith("download:"):
             target_zonal_id = int(operation.split(":", 1)[1])
-            for row in range(self._card_list.count()):
-                widget = self._card_list.itemWidget(self._card_list.item(row))
-                if widget and hasattr(widget, "_zonal_id") and widget._zonal_id == target_zonal_id:
-                    widget._download_btn.setEnabled(not is_loading)
-                    widget._download_btn.setText("Baixando..." if is_loading else "Baixar")
-                    break
+            if is_loading:
+                self._downloading.add(target_zonal_id)
+            else:
+                self._downloading.discard(target_zonal_id)
+                self._local_status.pop(target_zonal_id, None)
+            self._card_list.card_model.refresh(
+                lambda item: item.id == target_zonal_id
+            )
         elif operation == "catalogo":
             self._refresh_btn.setEnabled(not is_loading)
             if is_loading:
@@ -1,15 +1,12 @@
 """Widget de histórico de uploads — cards com status, métricas e comparação visual."""
 
 import os
-import tempfile
 from datetime import datetime
 
 from qgis.PyQt.QtCore import Qt, QSize
-from qgis.PyQt.QtGui import QColor, QIcon
+from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QListWidget, QListWidgetItem, QFrame, QSizePolicy, QComboBox,
-    QGraphicsDropShadowEffect,
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox,
 )
 
 from qgis.core import (
@@ -22,6 +19,7 @@ from qgis.utils import iface as qgis_iface
 from ...domain.models.enums import UploadBatchStatusEnum
 from ...infra.config.settings import PLUGIN_NAME
 from ..theme import SectionHeader
+from .card_list import CardAction, CardBadge, CardLine, CardListView, CardSpec
 
 _ICONS_DIR = os.path.join(
     os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
@@ -102,15 +100,8 @@ class UploadHistoryWidget(QWidget):
         layout.addWidget(section_header)
 
         # Lista de cards
-        self._card_list = QListWidget()
-        self._card_list.setSelectionMode(QListWidget.NoSelection)
-        self._card_list.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self._card_list.setVerticalScrollMode(QListWidget.ScrollPerPixel)
-        self._card_list.setSpacing(4)
-        self._card_list.setStyleSheet(
-            "QListWidget { border: none; background: transparent; }"
-            "QListWidget::item { border: none; background: transparent; }"
-        )
+        self._card_list = CardListView(self._card_spec)
+        self._card_list.action_triggered.connect(self._on_card_action)
         layout.addWidget(self._card_list, 1)
 
         # Paginação
@@ -154,36 +145,12 @@ class UploadHistoryWidget(QWidget):
         self._controller.compare_fgb_ready.connect(self._on_compare_fgb_ready)
 
     # ================================================================
-    # Card factory
+    # Card spec
     # ================================================================
 
-    def _create_card(self, item):
-        """Cria card para um UploadHistoryItem."""
-        card = QFrame()
-        card.setFrameShape(QFrame.StyledPanel)
-        card.setStyleSheet(
-            "QFrame { border: 1px solid palette(mid); border-radius: 6px;"
-            " padding: 6px; background: palette(base); }"
-        )
-
-        shadow = QGraphicsDropShadowEffect(card)
-        shadow.setBlurRadius(8)
-        shadow.setOffset(0, 2)
-        shadow.setColor(QColor(0, 0, 0, 40))
-        card.setGraphicsEffect(shadow)
-
-        layout = QVBoxLayout()
-        layout.setContentsMargins(8, 6, 8, 6)
-        layout.setSpacing(3)
-
-        # --- Linha 1: ID + status + data ---
-        row1 = QHBoxLayout()
-        row1.setSpacing(6)
-
-        id_label = QLabel(f"<b>#{item.mapeamento_id}</b>")
-        id_label.setStyleSheet("font-size: 13px;")
-        row1.addWidget(id_label)
-
+    def _card_spec(self, item):
+        """Monta o ``CardSpec`` de um UploadHistoryItem."""
+        # --- Cabeçalho: ID + status + data ---
         status_text = item.status
         status_color = _BATCH_COLORS.get(item.status, "#9E9E9E")
         try:
@@ -192,16 +159,6 @@ class UploadHistoryWidget(QWidget):
         except ValueError:
             pass
 
-        badge = QLabel(status_text)
-        badge.setStyleSheet(
-            f"background-color: {status_color}; color: white;"
-            " border-radius: 3px; padding: 1px 6px; font-size: 10px; font-weight: bold;"
-        )
-        badge.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Fixed)
-        row1.addWidget(badge)
-
-        row1.addStretch()
-
         created = "—"
         if item.created_at:
             try:
@@ -210,20 +167,11 @@ class UploadHistoryWidget(QWidget):
             except (ValueError, AttributeError):
                 created = str(item.created_at)[:16]
 
-        date_label = QLabel(created)
-        date_label.setStyleSheet("font-size: 10px; color: #757575;")
-        row1.addWidget(date_label)
-
-        layout.addLayout(row1)
-
         # --- Linha 2: descrição + autor ---
         desc = item.mapeamento_descricao or "—"
         if len(desc) > 80:
             desc = desc[:77] + "..."
-        meta = QLabel(f"{desc}  ·  Autor: {item.author or '—'}")
-        meta.setStyleSheet("font-size: 11px; color: #757575;")
-        meta.setWordWrap(True)
-        layout.addWidget(meta)
+        lines = [CardLine.text(f"{desc}  ·  Autor: {item.author or '—'}")]
 
         # --- Linha 3: métricas ---
         parts = []
@@ -241,20 +189,16 @@ class UploadHistoryWidget(QWidget):
             parts.append(f"{item.invalid_count} inválidas")
 
         if parts:
-            metrics = QLabel("  ·  ".join(parts))
-            metrics.setStyleSheet("font-size: 11px;")
-            layout.addWidget(metrics)
+            lines.append(CardLine.text("  ·  ".join(parts), "palette"))
 
         # --- Linha 4: erro ---
         if item.error_log and item.status == "FAILED":
             error_text = str(item.error_log)
             if len(error_text) > 120:
                 error_text = error_text[:117] + "..."
-            err_label = QLabel(error_text)
-            err_label.setStyleSheet("font-size: 10px; color: #F44336;")
-            err_label.setWordWrap(True)
-            err_label.setToolTip(str(item.error_log))
-            layout.addWidget(err_label)
+            lines.append(CardLine.text(
+                error_text, "#F44336", size=10, tooltip=str(item.error_log),
+            ))
 
         # --- Linha 5: duração ---
         if item.completed_at and item.created_at:
@@ -263,33 +207,29 @@ class UploadHistoryWidget(QWidget):
                 t1 = datetime.fromisoformat(item.completed_at.replace("Z", "+00:00"))
                 secs = int((t1 - t0).total_seconds())
                 duration = f"{secs}s" if secs < 60 else f"{secs // 60}m {secs % 60}s"
-                dur_label = QLabel(f"Duração: {duration}")
-                dur_label.setStyleSheet("font-size: 10px; color: #757575;")
-                layout.addWidget(dur_label)
+                lines.append(CardLine.text(f"Duração: {duration}", size=10))
             except (ValueError, AttributeError):
                 pass
 
         # --- Linha 6: ações ---
+        action_rows = []
         if item.status == "COMPLETED":
-            row_actions = QHBoxLayout()
-            row_actions.addStretch()
-
-            btn_compare = QPushButton("Comparar versões")
-            btn_compare.setToolTip("Comparar esta versão com outra no mapa")
-            btn_compare.setStyleSheet(
-                "QPushButton { background-color: #1976D2; color: white;"
-                " border: none; padding: 3px 12px; border-radius: 3px; font-size: 11px; }"
-                "QPushButton:hover { background-color: #1565C0; }"
-            )
-            btn_compare.clicked.connect(
-                lambda _, zid=item.zonal_id: self._on_compare_clicked(zid)
-            )
-            row_actions.addWidget(btn_compare)
-
-            layout.addLayout(row_actions)
+            action_rows.append([CardAction(
+                "compare", "Comparar versões", "#1976D2", "#1565C0",
+                tooltip="Comparar esta versão com outra no mapa",
+            )])
+
+        return CardSpec(
+            title=f"#{item.mapeamento_id}",
+            badges=[CardBadge(status_text, status_color)],
+            right_text=created,
+            lines=lines,
+            action_rows=action_rows,
+        )
 
-        card.setLayout(layout)
-        return card
+    def _on_card_action(self, key, item):
+        if key == "compare":
+            self._on_compare_clicked(item.zonal_id)
 
     # ================================================================
     # Comparação
@@ -325,24 +265,25 @@ class UploadHistoryWidget(QWidget):
         self._controller.download_compare_fgb(zonal_id, batch_a)
         self._controller.download_compare_fgb(zonal_id, batch_b)
 
-    def _on_compare_fgb_ready(self, zonal_id, batch_uuid, layer_bytes):
-        """Recebe GeoPackage de uma versão. Quando ambas chegam, carrega no mapa."""
+    def _on_compare_fgb_ready(self, zonal_id, batch_uuid, gpkg_path):
+        """Recebe GeoPackage de uma versão. Quando ambas chegam, carrega no mapa.
+
+        O arquivo já foi gravado em disco pelo HttpClient (streaming); o
+        widget passa a ser dono dele e o remove no cleanup.
+        """
+        self._temp_files.append(gpkg_path)
         if batch_uuid not in self._compare_pending:
             return
 
-        # Salvar GPKG em arquivo temporário
-        tmp = tempfile.NamedTemporaryFile(
-            suffix=f"_{batch_uuid[:8]}.gpkg", delete=False, prefix="compare_"
-        )
-        tmp.write(layer_bytes)
-        tmp.close()
-
-        self._compare_received[batch_uuid] = tmp.name
-        self._temp_files.append(tmp.name)
+        self._compare_received[batch_uuid] = gpkg_path
         self._compare_pending.pop(batch_uuid, None)
 
+        try:
+            size = os.path.getsize(gpkg_path)
+        except OSError:
+            size = 0
         QgsMessageLog.logMessage(
-            f"[Compare] GPKG recebido: {batch_uuid[:8]} ({len(layer_bytes)} bytes)",
+            f"[Compare] GPKG recebido: {batch_uuid[:8]} ({size} bytes)",
             PLUGIN_NAME, Qgis.Info,
         )
 
@@ -436,7 +377,7 @@ class UploadHistoryWidget(QWidget):
         )
 
     def _on_data_loaded(self, items, pagination):
-        self._card_list.clear()
+        self._card_list.card_model.set_items(items)
         self._current_page = pagination.get("page", 1)
         self._total_pages = pagination.get("totalPages", 1)
         self._total_items = pagination.get("total", len(items))
@@ -448,13 +389,6 @@ class UploadHistoryWidget(QWidget):
         else:
             self._status_label.setVisible(False)
 
-        for item in items:
-            card = self._create_card(item)
-            list_item = QListWidgetItem(self._card_list)
-            list_item.setSizeHint(card.sizeHint() + QSize(0, 8))
-            self._card_list.addItem(list_item)
-            self._card_list.setItemWidget(list_item, card)
-
         self._update_pagination()
 
     # ================================================================